@@ -0,0 +1,79 @@
+"""
+附件引用检查点基准
+
+对比文档消息内联 base64 PDF (原实现) 与附件引用 (src/open_canvas/documents/attachments.py)
+时图状态的检查点大小与序列化耗时。状态包含上传消息、转换后的文档消息 (messages 与
+_messages 各一份) 以及若干轮对话，使用 LangGraph 检查点的 JsonPlusSerializer 序列化。
+上传消息 additional_kwargs 中的原始文档两种方式都保留 (来自客户端)，因此节省的是
+转换后文档消息的那两份副本。
+
+运行 (在 apps/agents-py 目录下):
+    python -m benchmarks.bench_attachment_refs [--sizes 1M,10M] [--rounds 20]
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.store.memory import InMemoryStore
+
+
+SONNET = {"configurable": {"customModelName": "claude-3-5-sonnet-latest"}}
+
+
+def _parse_size(value: str) -> int:
+    units = {"K": 1024, "M": 1024 * 1024}
+    value = value.strip().upper()
+    if value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+async def _build_state(pdf: str, refs: bool) -> dict:
+    from src.open_canvas.nodes.generate_path import convert_context_document_to_human_message
+
+    upload = HumanMessage(
+        content="Summarize the attached report",
+        additional_kwargs={"documents": [{"name": "report.pdf", "type": "application/pdf", "data": pdf}]},
+    )
+    os.environ["ATTACHMENT_REFS"] = "on" if refs else "off"
+    doc_message = await convert_context_document_to_human_message([upload], SONNET, InMemoryStore())
+    conversation = [AIMessage(content="Here is a summary of the report.") for _ in range(4)]
+    messages = [upload, doc_message, *conversation]
+    return {"messages": messages, "_messages": list(messages)}
+
+
+def _measure(serde, state: dict, rounds: int) -> tuple[int, float]:
+    size = len(serde.dumps_typed(state)[1])
+    started = time.perf_counter()
+    for _ in range(rounds):
+        serde.dumps_typed(state)
+    return size, (time.perf_counter() - started) * 1000 / rounds
+
+
+def main() -> None:
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1M,10M")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    serde = JsonPlusSerializer()
+    print(f"{'pdf':>6}{'inline MB':>11}{'ms':>8}{'refs MB':>10}{'ms':>8}{'saved':>8}")
+    for size in (_parse_size(s) for s in args.sizes.split(",")):
+        # 随机内容模拟压缩过的 PDF 数据 (只测量序列化，不解析)
+        pdf = base64.b64encode(os.urandom(size)).decode()
+        inline_size, inline_ms = _measure(serde, asyncio.run(_build_state(pdf, refs=False)), args.rounds)
+        refs_size, refs_ms = _measure(serde, asyncio.run(_build_state(pdf, refs=True)), args.rounds)
+        print(
+            f"{size // (1024 * 1024):>5}M{inline_size / 2**20:>11.1f}{inline_ms:>8.1f}"
+            f"{refs_size / 2**20:>10.1f}{refs_ms:>8.1f}{1 - refs_size / inline_size:>8.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
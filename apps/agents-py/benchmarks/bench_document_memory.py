@@ -0,0 +1,157 @@
+"""
+文档解码内存基准
+
+用 tracemalloc 对比原实现 (整体 base64 解码 → BytesIO → 拼接全部页面文本) 与流式路径
+(src/documents/decode.py: 分块解码到临时文件 → 内存映射 → 逐页提取) 在合成大 PDF 上的
+峰值内存与耗时。合成 PDF 由若干文本页和一个不被页面引用的大二进制流 (模拟扫描件中的
+图像数据) 组成，文件大小由 --sizes 控制。同时对比 text/* 文档的整体解码与流式解码。
+"streaming" 列不设上限 (输出与原实现逐字一致)，"capped" 列使用默认的 DocumentLimits。
+
+运行 (在 apps/agents-py 目录下):
+    python -m benchmarks.bench_document_memory [--sizes 10M,50M] [--pages 200]
+
+峰值内存不含 base64 输入本身 (测量开始前已分配)，只统计 Python 堆分配;
+内存映射的文件页由操作系统页缓存承载，不计入 tracemalloc。
+"""
+
+import argparse
+import base64
+import os
+import time
+import tracemalloc
+from io import BytesIO
+from typing import Callable
+
+
+def _build_pdf(pages: int, size: int) -> bytes:
+    """合成 PDF: pages 个文本页 + 填充到 size 字节的未引用二进制流"""
+    line = "Quarterly results and operating metrics for the reporting period. " * 3
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            b" ".join(b"%d 0 R" % (4 + 2 * i) for i in range(pages)),
+            pages,
+        ),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i in range(pages):
+        text = " ".join(f"({line[:90]} {i}-{row}) Tj T*" for row in range(40))
+        stream = f"BT /F1 10 Tf 12 TL 36 756 Td {text} ET".encode("latin-1")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (5 + 2 * i)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+
+    current = sum(len(body) + 32 for body in objects)
+    filler = os.urandom(max(size - current, 0))
+    objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(filler), filler))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def _legacy_pdf_text(data: str) -> str:
+    from pypdf import PdfReader
+
+    reader = PdfReader(BytesIO(base64.b64decode(data)))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _streaming_pdf_text(data: str) -> str:
+    from src.documents.decode import decode_base64_to_file, make_temp_path
+    from src.documents.extraction import extract_page_range
+
+    path = make_temp_path()
+    try:
+        decode_base64_to_file(data, path)
+        pages, _ = extract_page_range(path, 0, None)
+        return "\n".join(pages)
+    finally:
+        os.unlink(path)
+
+
+def _legacy_text_document(data: str) -> str:
+    return base64.b64decode(data).decode("utf-8")
+
+
+def _streaming_text_document(data: str) -> str:
+    from src.documents.decode import DocumentLimits, decode_text_document
+
+    return decode_text_document(data, DocumentLimits(max_bytes=1 << 40, max_chars=1 << 40))
+
+
+def _capped_pdf_text(data: str) -> str:
+    from src.documents.decode import DocumentLimits, chars_truncated_marker
+
+    max_chars = DocumentLimits().max_chars
+    text = _streaming_pdf_text(data)
+    return text if len(text) <= max_chars else text[:max_chars] + chars_truncated_marker(max_chars)
+
+
+def _capped_text_document(data: str) -> str:
+    from src.documents.decode import DocumentLimits, decode_text_document
+
+    return decode_text_document(data, DocumentLimits())
+
+
+def _parse_size(value: str) -> int:
+    units = {"K": 1024, "M": 1024 * 1024}
+    value = value.strip().upper()
+    if value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def _measure(fn: Callable[[str], str], data: str) -> tuple[float, float, int]:
+    started = time.perf_counter()
+    result = fn(data)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    # tracemalloc 会拖慢分配，峰值内存单独再跑一次
+    tracemalloc.start()
+    fn(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_ms, peak / (1024 * 1024), len(result)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10M,50M")
+    parser.add_argument("--pages", type=int, default=200)
+    args = parser.parse_args()
+
+    # 预先导入，避免首次测量包含模块导入耗时
+    import src.documents.extraction  # noqa: F401
+
+    print(
+        f"{'document':<14}{'size':>6}{'legacy ms':>11}{'peak MB':>9}"
+        f"{'streaming ms':>14}{'peak MB':>9}{'capped ms':>11}{'peak MB':>9}{'capped chars':>14}"
+    )
+    for size in (_parse_size(s) for s in args.sizes.split(",")):
+        pdf = base64.b64encode(_build_pdf(args.pages, size)).decode()
+        text = base64.b64encode(("Plain text line for the context document.\n" * (size // 42)).encode()).decode()
+        for name, data, legacy, streaming, capped in (
+            (f"pdf {args.pages}p", pdf, _legacy_pdf_text, _streaming_pdf_text, _capped_pdf_text),
+            ("text/plain", text, _legacy_text_document, _streaming_text_document, _capped_text_document),
+        ):
+            legacy_ms, legacy_mb, legacy_chars = _measure(legacy, data)
+            new_ms, new_mb, new_chars = _measure(streaming, data)
+            capped_ms, capped_mb, capped_chars = _measure(capped, data)
+            assert legacy_chars == new_chars, f"{name} @ {size}: outputs differ"
+            print(
+                f"{name:<14}{size // (1024 * 1024):>5}M{legacy_ms:>11.0f}{legacy_mb:>9.1f}"
+                f"{new_ms:>14.0f}{new_mb:>9.1f}{capped_ms:>11.0f}{capped_mb:>9.1f}{capped_chars:>14}"
+            )
+
+
+if __name__ == "__main__":
+    main()
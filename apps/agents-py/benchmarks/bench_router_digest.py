@@ -0,0 +1,75 @@
+"""
+路由提示词大小基准
+
+对比 full 与 digest 两种路由上下文模式下，随工件/文档规模增长的路由输入大小
+(src/open_canvas/routing/digest.py)。digest 模式的输入大小应保持恒定。
+
+运行 (在 apps/agents-py 目录下):
+    python -m benchmarks.bench_router_digest [--sizes 1000,10000,100000,1000000]
+
+准确率对比: 分别以 ROUTER_CONTEXT_MODE=full / digest 运行 packages/evals 的查询路由评测。
+不发起任何网络请求。
+"""
+
+import argparse
+import asyncio
+import base64
+import time
+
+from langchain_core.messages import HumanMessage
+
+
+def _artifact(size: int) -> dict:
+    paragraph = "## Section\nThe quick brown fox jumps over the lazy dog. " * 4
+    body = (paragraph * (size // len(paragraph) + 1))[:size]
+    return {
+        "currentIndex": 1,
+        "contents": [{"index": 1, "type": "text", "title": "Benchmark essay", "fullMarkdown": body}],
+    }
+
+
+def _document_message(size: int) -> HumanMessage:
+    text = ("Quarterly report line item. " * (size // 28 + 1))[:size]
+    encoded = base64.b64encode(text.encode()).decode()
+    return HumanMessage(content=[{"type": "text", "text": text}, {"type": "text/plain", "data": encoded}])
+
+
+def _message_chars(messages: list) -> int:
+    total = 0
+    for message in messages:
+        content = message.content
+        if isinstance(content, str):
+            total += len(content)
+        else:
+            total += sum(len(block.get("text", "") or block.get("data", "")) for block in content)
+    return total
+
+
+async def _measure(size: int, mode: str) -> tuple[int, float]:
+    from src.open_canvas.nodes.generate_path import (
+        ROUTE_QUERY_OPTIONS_HAS_ARTIFACTS,
+        _build_route_query_messages,
+    )
+
+    state = {"_messages": [HumanMessage(content="Can you make this more concise?")], "artifact": _artifact(size)}
+    config = {"configurable": {"customModelName": "fake/canned", "routerContextMode": mode}}
+    new_messages = [_document_message(size)]
+    started = time.perf_counter()
+    messages = await _build_route_query_messages(state, config, ROUTE_QUERY_OPTIONS_HAS_ARTIFACTS, new_messages)
+    return _message_chars(messages), (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000", help="artifact/document sizes in chars")
+    args = parser.parse_args()
+
+    print(f"{'size':>10} {'full chars':>12} {'digest chars':>13} {'digest ms':>10}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        full_chars, _ = asyncio.run(_measure(size, "full"))
+        digest_chars, digest_ms = asyncio.run(_measure(size, "digest"))
+        print(f"{size:>10} {full_chars:>12} {digest_chars:>13} {digest_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
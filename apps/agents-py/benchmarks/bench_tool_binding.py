@@ -0,0 +1,98 @@
+"""
+工具绑定微基准
+
+对比每轮创建 RouteQuerySchema 类并调用 bind_tools/with_structured_output (原实现)
+与预编译工具定义 + 绑定模型缓存 (src/llm/tool_specs.py) 的单次开销。
+
+运行 (在 apps/agents-py 目录下):
+    python -m benchmarks.bench_tool_binding [--iterations 2000]
+
+不发起任何网络请求: 优先使用 ChatOpenAI (虚拟 API key)，未安装时使用 fake/ 模型。
+"""
+
+import argparse
+import os
+import timeit
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+def _build_model():
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    from src.utils import get_model_from_config
+
+    try:
+        import langchain_openai  # noqa: F401
+
+        model_name = "gpt-4o-mini"
+    except ImportError:
+        model_name = "fake/canned"
+    return model_name, get_model_from_config(
+        {"configurable": {"customModelName": model_name}}, temperature=0, is_tool_calling=True
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    from src.llm.tool_specs import (
+        bind_tools_cached,
+        get_tool_binding_stats,
+        with_structured_output_cached,
+    )
+    from src.open_canvas.nodes.generate_artifact import GenerateArtifactTool
+    from src.open_canvas.nodes.generate_path import ROUTE_QUERY_SCHEMAS, ShouldIncludeUrlContents
+    from src.open_canvas.nodes.rewrite_artifact import UpdateArtifactMetaTool
+    from src.reflection.graph import GenerateReflections
+    from src.thread_title.graph import GenerateTitle
+    from src.web_search.nodes.classify_message import ClassifyMessage
+
+    model_name, model = _build_model()
+    static_tools = [
+        GenerateArtifactTool,
+        UpdateArtifactMetaTool,
+        GenerateReflections,
+        GenerateTitle,
+        ShouldIncludeUrlContents,
+    ]
+
+    def before() -> None:
+        for artifact_route in ("generateArtifact", "rewriteArtifact"):
+            route_options = [artifact_route, "replyToGeneralInput"]
+
+            class RouteQuerySchema(BaseModel):
+                """The route to take based on the user's query."""
+                route: Literal[tuple(route_options)] = Field(  # type: ignore
+                    description="The route to take based on the user's query."
+                )
+
+            model.bind_tools([RouteQuerySchema], tool_choice="RouteQuerySchema")
+        for tool in static_tools:
+            model.bind_tools([tool], tool_choice=tool.__name__)
+        model.with_structured_output(ClassifyMessage, method="function_calling")
+
+    def after() -> None:
+        for schema in ROUTE_QUERY_SCHEMAS.values():
+            bind_tools_cached(model, [schema], tool_choice="RouteQuerySchema")
+        for tool in static_tools:
+            bind_tools_cached(model, [tool], tool_choice=tool.__name__)
+        with_structured_output_cached(model, ClassifyMessage, method="function_calling")
+
+    after()  # 预热缓存
+    n = args.iterations
+    before_s = min(timeit.repeat(before, number=n, repeat=3)) / n
+    after_s = min(timeit.repeat(after, number=n, repeat=3)) / n
+
+    bindings = len(ROUTE_QUERY_SCHEMAS) + len(static_tools) + 1
+    print(f"model: {model_name}, bindings per turn-set: {bindings}, iterations: {n}")
+    print(f"before (per-call schema + bind): {before_s * 1e6:9.1f} us")
+    print(f"after  (precompiled + cached):   {after_s * 1e6:9.1f} us")
+    print(f"speedup: {before_s / after_s:.1f}x")
+    print(f"cache stats: {get_tool_binding_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+URL 提取基准
+
+在 1 KB - 5 MB 的输入上对比单遍扫描 (src/open_canvas/urls/extract.py) 与原实现
+(先 sub 替换 markdown 链接、再扫描副本) 的耗时与峰值内存，并校验两者提取的 URL 集合一致。
+除普通文本外还包含近似 URL 的病态输入 (未闭合的 "["、残缺协议头、无合法结尾的超长 URL 等)，
+用于防止正则回溯导致的耗时爆炸。
+
+运行 (在 apps/agents-py 目录下):
+    python -m benchmarks.bench_url_extract [--sizes 1K,64K,1M,5M] [--legacy-max 64K]
+
+原实现在未闭合 "[" 上是平方级的，超过 --legacy-max 的输入不再运行原实现。
+"""
+
+import argparse
+import re
+import time
+import tracemalloc
+from typing import Callable
+
+
+# 原实现 (用于对比)
+_LEGACY_MARKDOWN = re.compile(r'\[([^\]]+)\]\((https?://[^\s)]+)\)')
+_LEGACY_PLAIN = re.compile(r'https?://[^\s<\]"\'{}|\\^`]+(?:[^<.,:;"\')\]\s]|(?=\s|$))', re.IGNORECASE)
+
+
+def _legacy_extract_urls(text: str) -> list[str]:
+    urls = set()
+
+    def replace_markdown(match):
+        urls.add(match.group(2))
+        return " " * len(match.group(0))
+
+    processed_text = _LEGACY_MARKDOWN.sub(replace_markdown, text)
+    for url in _LEGACY_PLAIN.findall(processed_text):
+        urls.add(url.rstrip(".,;:!?'\")"))
+    return list(urls)
+
+
+def _repeat(unit: str, size: int) -> str:
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+CASES: dict[str, Callable[[int], str]] = {
+    "prose+links": lambda n: _repeat(
+        "See https://example.com/docs/page?id=42 and [the guide](https://guide.dev/start). "
+        "Plain words follow here without anything special in them at all. ",
+        n,
+    ),
+    "no urls": lambda n: _repeat("Lorem ipsum dolor sit amet, consectetur adipiscing elit. ", n),
+    "unclosed [": lambda n: _repeat("[", n),
+    "[text]( no url": lambda n: _repeat("[a](b [c](http:/ ", n),
+    "near-miss schemes": lambda n: _repeat("http:/ https:/x htt://y hxxps://z http//w ", n),
+    "one huge url": lambda n: "https://" + _repeat("a.", n - 8),
+    "url of dots": lambda n: "https://x" + _repeat(".", n - 9),
+    "urls in brackets": lambda n: _repeat("https://a.io/[x](https://b.io) ", n),
+}
+
+
+def _parse_size(value: str) -> int:
+    units = {"K": 1024, "M": 1024 * 1024}
+    value = value.strip().upper()
+    if value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def _measure(fn: Callable[[str], list[str]], text: str) -> tuple[float, float, list[str]]:
+    started = time.perf_counter()
+    result = fn(text)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    # tracemalloc 会拖慢分配，峰值内存单独再跑一次
+    tracemalloc.start()
+    fn(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_ms, peak / 1024, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1K,64K,1M,5M")
+    parser.add_argument("--legacy-max", default="64K")
+    args = parser.parse_args()
+
+    from src.open_canvas.urls.extract import extract_urls
+
+    sizes = [_parse_size(s) for s in args.sizes.split(",")]
+    legacy_max = _parse_size(args.legacy_max)
+
+    print(f"{'case':<20}{'size':>9}{'urls':>7}{'single-pass ms':>16}{'peak KB':>10}{'legacy ms':>12}{'peak KB':>10}")
+    for name, build in CASES.items():
+        for size in sizes:
+            text = build(size)
+            new_ms, new_kb, urls = _measure(extract_urls, text)
+            legacy = "skipped"
+            legacy_kb = ""
+            if size <= legacy_max:
+                legacy_ms, legacy_peak, expected = _measure(_legacy_extract_urls, text)
+                assert set(expected) == set(urls), f"{name} @ {size}: results differ"
+                legacy, legacy_kb = f"{legacy_ms:.2f}", f"{legacy_peak:.0f}"
+            print(f"{name:<20}{size:>9}{len(urls):>7}{new_ms:>16.2f}{new_kb:>10.0f}{legacy:>12}{legacy_kb:>10}")
+
+
+if __name__ == "__main__":
+    main()
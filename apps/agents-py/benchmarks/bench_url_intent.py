@@ -0,0 +1,71 @@
+"""
+URL 意图判断延迟基准
+
+在标注语料上对比本地规则 (src/open_canvas/urls/intent.py) 与 LLM 判断的单条延迟，
+并报告本地规则的准确率与覆盖率 (置信度达到阈值的比例)。
+
+运行 (在 apps/agents-py 目录下):
+    python -m benchmarks.bench_url_intent [--llm-samples 5]
+
+LLM 一侧使用 fake/ 模型 (FAKE_LLM_FIRST_TOKEN_MS 等控制模拟延迟)，不发起任何网络请求;
+真实提供商的往返延迟通常更高。
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+async def _llm_latencies(messages: list[str], samples: int) -> list[float]:
+    from src.open_canvas.nodes.generate_path import _llm_should_include_url_contents
+
+    config = {"configurable": {"customModelName": "fake/url-intent"}}
+    latencies = []
+    for message in messages[:samples]:
+        started = time.perf_counter()
+        await _llm_should_include_url_contents(message, config)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-samples", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault("LLM_RESPONSE_CACHE", "off")
+    from src.open_canvas.urls.intent import (
+        detect_url_intent,
+        get_url_intent_threshold,
+        load_url_intent_examples,
+    )
+
+    examples = load_url_intent_examples()
+    threshold = get_url_intent_threshold()
+
+    local_ms = []
+    correct = confident = 0
+    for message, label in examples:
+        started = time.perf_counter()
+        decision = detect_url_intent(message)
+        local_ms.append((time.perf_counter() - started) * 1000)
+        correct += decision.include == label
+        confident += decision.confidence >= threshold
+
+    llm_ms = asyncio.run(_llm_latencies([m for m, _ in examples], args.llm_samples))
+
+    print(f"examples: {len(examples)}, threshold: {threshold}")
+    print(f"local accuracy: {correct / len(examples):.1%}, coverage: {confident / len(examples):.1%}")
+    print(f"local  p50 {_percentile(local_ms, 50):8.3f} ms  p99 {_percentile(local_ms, 99):8.3f} ms")
+    print(f"llm    p50 {_percentile(llm_ms, 50):8.3f} ms  p99 {_percentile(llm_ms, 99):8.3f} ms  (fake model)")
+    print(f"expected llm calls per 100 link messages: {100 * (1 - confident / len(examples)):.0f} (was 100)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+训练本地路由分类器
+
+用法 (在 apps/agents-py 目录下):
+    python scripts/train_router_classifier.py \
+        [--decisions .cache/route_decisions.jsonl] \
+        [--output .cache/router_classifier.npz]
+
+训练数据: 种子样例 + 可选的 ROUTER_DECISION_LOG 决策日志 (仅使用 LLM 决策)。
+报告: 留出集与 packages/evals 查询路由评测集上的准确率、覆盖率和推理延迟。
+"""
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.open_canvas.routing.classifier import (  # noqa: E402
+    DEFAULT_CLASSIFIER_PATH,
+    DEFAULT_CLASSIFIER_THRESHOLD,
+    DEFAULT_FEATURE_DIM,
+    SEED_EXAMPLES_PATH,
+    evaluate_classifier,
+    load_eval_examples,
+    load_jsonl_examples,
+    train_classifier,
+)
+
+DEFAULT_EVAL_PATH = ROOT.parents[1] / "packages" / "evals" / "src" / "data" / "query_routing.ts"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the local routing classifier")
+    parser.add_argument("--seed-data", type=Path, default=SEED_EXAMPLES_PATH)
+    parser.add_argument("--decisions", type=Path, help="ROUTER_DECISION_LOG JSONL file")
+    parser.add_argument("--eval-data", type=Path, default=DEFAULT_EVAL_PATH)
+    parser.add_argument("--output", type=Path, default=ROOT / DEFAULT_CLASSIFIER_PATH)
+    parser.add_argument("--dim", type=int, default=DEFAULT_FEATURE_DIM)
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_CLASSIFIER_THRESHOLD)
+    parser.add_argument("--holdout", type=float, default=0.2, help="fraction held out for the report")
+    args = parser.parse_args()
+
+    examples = load_jsonl_examples(args.seed_data)
+    if args.decisions and args.decisions.is_file():
+        # 只使用 LLM 做出的决策，避免用规则/分类器自身的输出训练
+        examples += load_jsonl_examples(args.decisions, sources={"llm"})
+
+    random.Random(0).shuffle(examples)
+    n_holdout = int(len(examples) * args.holdout)
+    holdout, train = examples[:n_holdout], examples[n_holdout:]
+
+    report = {}
+    if holdout:
+        report["holdout"] = evaluate_classifier(
+            train_classifier(train, dim=args.dim, epochs=args.epochs), holdout, args.threshold
+        )
+
+    classifier = train_classifier(examples, dim=args.dim, epochs=args.epochs)
+    if args.eval_data.is_file():
+        report["evalSet"] = evaluate_classifier(classifier, load_eval_examples(args.eval_data), args.threshold)
+
+    classifier.save(args.output)
+    print(f"trained on {len(examples)} examples, saved to {args.output}")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
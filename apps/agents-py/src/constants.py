@@ -19,6 +19,9 @@ OC_WEB_SEARCH_RESULTS_MESSAGE_KEY = "__oc_web_search_results_message"
 # ============================================
 
 CONTEXT_DOCUMENTS_NAMESPACE = ("context_documents",)
+PDF_TEXT_NAMESPACE = ("pdf_text",)
+DOCUMENT_VARIANTS_NAMESPACE = ("context_document_variants",)
+ATTACHMENTS_NAMESPACE = ("attachments",)
 
 # ============================================
 # 摘要触发阈值
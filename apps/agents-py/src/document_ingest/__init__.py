@@ -0,0 +1,9 @@
+"""
+文档预提取图
+
+上传上下文文档时提取文本，写入按提供商格式派生的内容
+"""
+
+from .graph import graph
+
+__all__ = ["graph"]
@@ -0,0 +1,129 @@
+"""
+文档预提取图
+
+上下文文档以原始 base64 保存在 CONTEXT_DOCUMENTS_NAMESPACE 中，原实现在运行中由
+create_context_document_messages 惰性转换，上传后的第一轮要承担完整的解析开销。
+本图在上传时并行提取每个文档的文本，计算 token 数与摘要，并把记录写入
+DOCUMENT_VARIANTS_NAMESPACE (格式见 src/documents/ingest.py)。agent 图的请求路径
+在文档未变时直接使用这些文本，不再解析 PDF。
+
+前端 (apps/web/src/hooks/useStore.tsx 的 putContextDocuments) 保存助手文档后在新线程中
+后台运行本图 (不传 documents，处理刚保存的文档)。
+
+输入:
+- state.documents: 上传的文档 (同时写入 CONTEXT_DOCUMENTS_NAMESPACE)，为空时处理已保存的文档
+- configurable.open_canvas_assistant_id: 文档所属的 agent 助手
+"""
+
+import asyncio
+import logging
+from typing import Any, Optional
+
+from langgraph.graph import END, START, StateGraph
+from langgraph.store.base import BaseStore
+from langgraph.types import RunnableConfig
+
+from ..constants import CONTEXT_DOCUMENTS_NAMESPACE, DOCUMENT_VARIANTS_NAMESPACE
+from ..documents.decode import decode_text_document
+from ..documents.ingest import build_ingest_record
+from ..types import ContextDocument
+from ..utils import convert_pdf_to_text
+from .state import DocumentIngestState
+
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# 辅助函数
+# ============================================
+
+
+async def extract_document_text(doc: ContextDocument, store: Optional[BaseStore] = None) -> Optional[str]:
+    """
+    提取单个文档的文本
+
+    Args:
+        doc: 上下文文档
+        store: LangGraph store (PDF 文本缓存的持久层)
+
+    Returns:
+        文本; 不支持的类型或提取失败时为 None (请求时会回退为按需转换)
+    """
+    doc_type = doc.get("type", "")
+    data = doc.get("data", "")
+    try:
+        if doc_type == "application/pdf":
+            return await convert_pdf_to_text(data, store=store)
+        if doc_type.startswith("text/"):
+            return await asyncio.to_thread(decode_text_document, data)
+        if doc_type == "text":
+            return data
+    except Exception as e:
+        logger.warning(f"Failed to extract context document {doc.get('name', '')!r}: {e}")
+    return None
+
+
+# ============================================
+# 节点函数
+# ============================================
+
+
+async def ingest_documents(
+    state: DocumentIngestState,
+    config: RunnableConfig,
+    *,
+    store: BaseStore,
+) -> dict[str, Any]:
+    """
+    预提取节点
+
+    并行提取所有文档的文本，并把预提取记录写入 Store。
+    """
+    # 1. 获取 assistant_id
+    configurable = config.get("configurable", {})
+    assistant_id = configurable.get("open_canvas_assistant_id")
+    if not assistant_id:
+        raise ValueError("`open_canvas_assistant_id` not found in configurable")
+
+    # 2. 获取文档: 上传的文档写入 Store，否则读取已保存的文档
+    existing = await store.aget(CONTEXT_DOCUMENTS_NAMESPACE, assistant_id)
+    value = dict(existing.value) if existing and existing.value else {}
+    documents = state.get("documents")
+    if documents:
+        await store.aput(CONTEXT_DOCUMENTS_NAMESPACE, assistant_id, {**value, "documents": documents})
+    else:
+        documents = value.get("documents", [])
+
+    if not documents:
+        await store.adelete(DOCUMENT_VARIANTS_NAMESPACE, assistant_id)
+        return {"ingested": []}
+
+    # 3. 并行提取文本 (PDF 在提取进程池中解析)
+    texts = await asyncio.gather(*(extract_document_text(doc, store) for doc in documents))
+
+    # 4. 写入预提取记录 (哈希大文档在线程中执行)
+    record = await asyncio.to_thread(build_ingest_record, documents, list(texts))
+    await store.aput(DOCUMENT_VARIANTS_NAMESPACE, assistant_id, record, index=False)
+
+    return {"ingested": record["documents"]}
+
+
+# ============================================
+# 图构建
+# ============================================
+
+
+def build_graph() -> StateGraph:
+    """构建文档预提取图"""
+    builder = StateGraph(DocumentIngestState)
+
+    builder.add_node("ingestDocuments", ingest_documents)
+
+    builder.add_edge(START, "ingestDocuments")
+    builder.add_edge("ingestDocuments", END)
+
+    return builder
+
+
+graph = build_graph().compile()
@@ -0,0 +1,23 @@
+"""
+文档预提取图状态定义
+"""
+
+from typing import Any, Optional
+
+from typing_extensions import TypedDict
+
+from ..types import ContextDocument
+
+
+class DocumentIngestState(TypedDict, total=False):
+    """
+    文档预提取图状态
+
+    用于在上传时预先提取上下文文档的文本。
+    """
+
+    # 上传的文档 (为空时处理 store 中已保存的上下文文档)
+    documents: Optional[list[ContextDocument]]
+
+    # 每个文档的派生信息 (名称、类型、内容哈希、字符数、token 数、摘要)
+    ingested: list[dict[str, Any]]
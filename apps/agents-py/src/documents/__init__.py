@@ -0,0 +1,54 @@
+"""
+文档处理
+
+上下文文档的流式解码、文本提取缓存、进程池提取、上传时预提取、附件存储等跨图共享的文档基础设施
+"""
+
+from .attachments import (
+    AttachmentStore,
+    get_attachment_stats,
+    get_attachment_store,
+    reset_attachment_store,
+)
+from .decode import DocumentLimits, decode_text_document
+from .extraction import (
+    PdfExtractionPool,
+    PdfExtractionTimeoutError,
+    get_pdf_extraction_pool,
+    get_pdf_extraction_stats,
+    shutdown_pdf_extraction_pool,
+)
+from .ingest import (
+    build_ingest_record,
+    get_document_ingest_stats,
+    load_ingested_texts,
+    reset_document_ingest_stats,
+)
+from .text_cache import (
+    PdfTextCache,
+    get_pdf_text_cache,
+    get_pdf_text_cache_stats,
+    reset_pdf_text_cache,
+)
+
+__all__ = [
+    "AttachmentStore",
+    "get_attachment_stats",
+    "get_attachment_store",
+    "reset_attachment_store",
+    "DocumentLimits",
+    "decode_text_document",
+    "PdfExtractionPool",
+    "PdfExtractionTimeoutError",
+    "get_pdf_extraction_pool",
+    "get_pdf_extraction_stats",
+    "shutdown_pdf_extraction_pool",
+    "build_ingest_record",
+    "get_document_ingest_stats",
+    "load_ingested_texts",
+    "reset_document_ingest_stats",
+    "PdfTextCache",
+    "get_pdf_text_cache",
+    "get_pdf_text_cache_stats",
+    "reset_pdf_text_cache",
+]
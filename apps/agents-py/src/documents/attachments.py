@@ -0,0 +1,249 @@
+"""
+按内容哈希寻址的附件存储
+
+原实现把完整的 base64 PDF (Anthropic document / Gemini application/pdf 片段) 写入
+messages 与 _messages 中的 HumanMessage，每个检查点、每次 Send(next_node, dict(state))
+和每个后台运行的负载都携带数 MB 的 base64。本模块保存附件内容，消息中只保留轻量的引用片段:
+
+    {"type": "attachment_ref", "contentHash": ..., "mediaType": ..., "format": ..., "size": ...}
+
+引用在调用模型前才展开为提供商格式 (见 src/open_canvas/documents/attachments.py)。
+
+存储分两层:
+- 内存层: 按 base64 总字节数限制的 LRU (ATTACHMENT_CACHE_MAX_BYTES，默认 128 MB)
+- 持久层: LangGraph store 的 ATTACHMENTS_NAMESPACE (键为内容哈希)，跨进程 / 重启可用
+"""
+
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Optional
+
+from langgraph.store.base import BaseStore
+
+from ..constants import ATTACHMENTS_NAMESPACE
+from .counters import Counters
+from .hashing import acontent_hash
+
+
+ATTACHMENT_REF_TYPE = "attachment_ref"
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+
+# ============================================
+# 引用片段
+# ============================================
+
+
+def attachment_refs_enabled() -> bool:
+    """是否用引用片段代替内联 base64 (ATTACHMENT_REFS=off 关闭)"""
+    return os.environ.get("ATTACHMENT_REFS", "on").lower() not in ("off", "false", "0")
+
+
+def attachment_ref(content_hash: str, media_type: str, doc_format: str, size: int) -> dict[str, Any]:
+    """
+    构建引用片段
+
+    Args:
+        content_hash: 附件内容哈希
+        media_type: MIME 类型
+        doc_format: 引用替换的原片段格式 (提供商没有对应格式时按原格式展开)
+        size: 附件解码后的大致字节数 (用于路由摘要)
+
+    Returns:
+        引用片段
+    """
+    return {
+        "type": ATTACHMENT_REF_TYPE,
+        "contentHash": content_hash,
+        "mediaType": media_type,
+        "format": doc_format,
+        "size": size,
+    }
+
+
+def attachment_missing_marker(content_hash: str) -> str:
+    """引用的附件在两层存储中都不存在时替代的文本"""
+    return f"[Attachment unavailable: {content_hash[:12]}]"
+
+
+def is_attachment_ref(part: Any) -> bool:
+    """判断内容片段是否为引用片段"""
+    return isinstance(part, dict) and part.get("type") == ATTACHMENT_REF_TYPE
+
+
+# ============================================
+# 附件存储
+# ============================================
+
+
+class AttachmentStore:
+    """
+    两层附件存储 (内存 LRU + LangGraph store)
+
+    Args:
+        max_bytes: 内存层的 base64 总字节数上限 (0 表示只使用持久层)
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._size = 0
+        # 每个 store 已写入的内容哈希 (同一附件不重复写入; 弱引用，store 释放后条目随之消失)
+        self._persisted: weakref.WeakKeyDictionary[BaseStore, set[str]] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    # ---------- 内存层 ----------
+
+    def _memory_get(self, digest: str) -> Optional[str]:
+        with self._lock:
+            data = self._entries.get(digest)
+            if data is not None:
+                self._entries.move_to_end(digest)
+            return data
+
+    def _memory_set(self, digest: str, data: str) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(digest, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[digest] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                _stats.record("evictions")
+
+    # ---------- 持久层 ----------
+
+    def _is_persisted(self, store: BaseStore, digest: str) -> bool:
+        with self._lock:
+            try:
+                return digest in self._persisted.get(store, ())
+            except TypeError:
+                # 不支持弱引用的 store: 每次都写入 (按内容哈希写入是幂等的)
+                return False
+
+    def _mark_persisted(self, store: BaseStore, digest: str) -> None:
+        with self._lock:
+            try:
+                self._persisted.setdefault(store, set()).add(digest)
+            except TypeError:
+                pass
+
+    # ---------- 公共接口 ----------
+
+    async def put(
+        self,
+        data: str,
+        media_type: str,
+        store: Optional[BaseStore] = None,
+    ) -> str:
+        """
+        保存附件
+
+        Args:
+            data: base64 内容 (原样保存，展开后与原片段逐字一致)
+            media_type: MIME 类型
+            store: LangGraph store (持久层)
+
+        Returns:
+            内容哈希
+        """
+        digest = await acontent_hash(data)
+        self._memory_set(digest, data)
+        if store is not None and not self._is_persisted(store, digest):
+            await store.aput(
+                ATTACHMENTS_NAMESPACE,
+                digest,
+                {"data": data, "mediaType": media_type, "size": len(data)},
+                index=False,
+            )
+            self._mark_persisted(store, digest)
+        _stats.record("puts")
+        return digest
+
+    async def get(self, digest: str, store: Optional[BaseStore] = None) -> Optional[str]:
+        """
+        读取附件
+
+        Args:
+            digest: 内容哈希
+            store: LangGraph store (持久层)
+
+        Returns:
+            base64 内容，不存在时返回 None
+        """
+        data = self._memory_get(digest)
+        if data is not None:
+            _stats.record("memoryHits")
+            return data
+
+        if store is not None:
+            item = await store.aget(ATTACHMENTS_NAMESPACE, digest)
+            if item is not None and isinstance(item.value.get("data"), str):
+                data = item.value["data"]
+                self._memory_set(digest, data)
+                _stats.record("persistentHits")
+                return data
+
+        _stats.record("misses")
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._persisted.clear()
+            self._size = 0
+
+    @property
+    def size(self) -> int:
+        """内存层当前的 base64 总字节数"""
+        return self._size
+
+
+_attachment_store: Optional[AttachmentStore] = None
+_attachment_store_lock = threading.Lock()
+
+
+def get_attachment_store() -> AttachmentStore:
+    """获取进程级附件存储 (首次调用时按 ATTACHMENT_CACHE_MAX_BYTES 创建)"""
+    global _attachment_store
+    with _attachment_store_lock:
+        if _attachment_store is None:
+            try:
+                max_bytes = int(os.environ.get("ATTACHMENT_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+            except ValueError:
+                max_bytes = DEFAULT_MAX_BYTES
+            _attachment_store = AttachmentStore(max_bytes)
+        return _attachment_store
+
+
+def reset_attachment_store() -> None:
+    """丢弃附件存储并重置统计 (测试用)"""
+    global _attachment_store
+    with _attachment_store_lock:
+        _attachment_store = None
+    _stats.reset()
+
+
+# ============================================
+# 统计
+# ============================================
+
+
+# 附件存储统计
+# - puts: 保存的附件
+# - memoryHits / persistentHits: 内存层 / 持久层命中
+# - misses: 两层都不存在
+# - evictions: 内存层淘汰
+_stats = Counters("puts", "memoryHits", "persistentHits", "misses", "evictions")
+
+
+def get_attachment_stats() -> dict[str, int]:
+    """获取附件存储统计快照"""
+    return _stats.snapshot()
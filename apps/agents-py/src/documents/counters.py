@@ -0,0 +1,34 @@
+"""
+线程安全的命名计数器
+
+文档索引、预提取记录和附件存储的统计都是一组固定名称的计数，
+各模块用 Counters 保存并通过各自的 get_*_stats / reset_*_stats 暴露。
+"""
+
+import threading
+
+
+class Counters:
+    """
+    一组固定名称的计数器
+
+    Args:
+        fields: 计数器名称
+    """
+
+    def __init__(self, *fields: str) -> None:
+        self._fields = fields
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(fields, 0)
+
+    def record(self, field: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[field] += amount
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = dict.fromkeys(self._fields, 0)
@@ -0,0 +1,247 @@
+"""
+流式、内存受限的文档解码
+
+原实现把整个 base64 负载解码为一个 bytes 对象，再复制进 BytesIO，并在内存中拼接所有页面
+的文本; 每个助手有多份 50 MB 上传时 worker 的 RSS 会剧烈上升。本模块提供:
+- 分块 base64 解码: 写入临时文件 (PDF) 或增量 UTF-8 解码 (text/*)，不产生完整的解码副本
+- PDF 通过内存映射文件交给 pypdf (按需读取，页面数据由操作系统页缓存承载)，逐页产出文本
+- 页数 / 字符数 / 字节数上限 (DOCUMENT_MAX_PAGES、DOCUMENT_MAX_CHARS、DOCUMENT_MAX_BYTES)，
+  超出时截断并附加截断标记
+"""
+
+import binascii
+import codecs
+import logging
+import mmap
+import os
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any, Optional
+
+
+logger = logging.getLogger(__name__)
+
+# 每次解码的 base64 字符数 (4 的倍数，约 3 MB 解码数据)
+DECODE_CHUNK_CHARS = 4 * 1024 * 1024
+
+# base64 换行/缩进中可能出现的空白 (子串查找比正则扫描快得多)
+_WHITESPACE_CHARS = ("\n", "\r", " ", "\t")
+
+
+# ============================================
+# 上限
+# ============================================
+
+
+@dataclass(frozen=True)
+class DocumentLimits:
+    """
+    文档解码上限
+
+    Attributes:
+        max_pages: PDF 最多提取的页数
+        max_chars: 每个文档最多保留的文本字符数
+        max_bytes: 每个文档最多解码的字节数 (超过上限的 PDF 不解析)
+    """
+
+    max_pages: int = 500
+    max_chars: int = 2_000_000
+    max_bytes: int = 100 * 1024 * 1024
+
+    @classmethod
+    def from_env(cls) -> "DocumentLimits":
+        """从 DOCUMENT_MAX_PAGES / DOCUMENT_MAX_CHARS / DOCUMENT_MAX_BYTES 读取上限"""
+        values: dict[str, Any] = {}
+        for field, name in (
+            ("max_pages", "DOCUMENT_MAX_PAGES"),
+            ("max_chars", "DOCUMENT_MAX_CHARS"),
+            ("max_bytes", "DOCUMENT_MAX_BYTES"),
+        ):
+            try:
+                values[field] = int(os.environ[name])
+            except (KeyError, ValueError):
+                pass
+        return cls(**values)
+
+
+def pages_truncated_marker(extracted: int, total: int) -> str:
+    return f"\n\n[Truncated: extracted the first {extracted} of {total} pages]"
+
+
+def chars_truncated_marker(max_chars: int) -> str:
+    return f"\n\n[Truncated: text exceeds {max_chars} characters]"
+
+
+def bytes_truncated_marker(max_bytes: int) -> str:
+    return f"\n\n[Truncated: document exceeds {max_bytes} bytes]"
+
+
+def document_omitted_marker(size: int, max_bytes: int) -> str:
+    return f"[Document omitted: {size} bytes exceeds the {max_bytes} byte limit]"
+
+
+# ============================================
+# base64 分块解码
+# ============================================
+
+
+def _payload_start(data: str) -> int:
+    """跳过 data URL 前缀 (与 clean_base64 一致)，不复制字符串"""
+    index = data.find("base64,")
+    return index + len("base64,") if index >= 0 else 0
+
+
+def decoded_size(data: str) -> int:
+    """base64 内容解码后的大致字节数 (不解码)"""
+    return (len(data) - _payload_start(data)) * 3 // 4
+
+
+def iter_base64_chunks(data: str, chunk_chars: int = DECODE_CHUNK_CHARS) -> Iterator[bytes]:
+    """
+    分块解码 base64 (可含 data URL 前缀与空白)
+
+    Args:
+        data: base64 字符串
+        chunk_chars: 每块的字符数
+
+    Yields:
+        解码后的字节块
+
+    Raises:
+        binascii.Error: 填充不正确
+    """
+    carry = ""
+    for offset in range(_payload_start(data), len(data), chunk_chars):
+        piece = carry + data[offset:offset + chunk_chars]
+        if any(ws in piece for ws in _WHITESPACE_CHARS):
+            piece = "".join(piece.split())
+        cut = len(piece) - len(piece) % 4
+        carry = piece[cut:]
+        if cut:
+            yield binascii.a2b_base64(piece[:cut])
+    if carry:
+        yield binascii.a2b_base64(carry)
+
+
+def decode_base64_to_file(data: str, path: str) -> int:
+    """
+    把 base64 内容分块解码写入文件
+
+    Args:
+        data: base64 字符串
+        path: 目标文件路径
+
+    Returns:
+        写入的字节数
+    """
+    written = 0
+    with open(path, "wb") as fh:
+        for chunk in iter_base64_chunks(data):
+            fh.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def make_temp_path(suffix: str = ".pdf") -> str:
+    """创建临时文件并返回路径 (由调用方删除; 目录由 TMPDIR 决定)"""
+    fd, path = tempfile.mkstemp(prefix="oc-doc-", suffix=suffix)
+    os.close(fd)
+    return path
+
+
+def decode_text_document(data: str, limits: Optional[DocumentLimits] = None) -> str:
+    """
+    流式解码 base64 文本文档 (UTF-8)
+
+    超过字节或字符上限时停止解码，并附加截断标记。
+
+    Args:
+        data: base64 字符串 (可含 data URL 前缀)
+        limits: 上限，缺省时从环境变量读取
+
+    Returns:
+        文档文本
+
+    Raises:
+        UnicodeDecodeError: 上限内的内容不是合法 UTF-8
+    """
+    limits = limits or DocumentLimits.from_env()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    parts: list[str] = []
+    chars = 0
+    remaining = limits.max_bytes
+
+    for chunk in iter_base64_chunks(data):
+        if len(chunk) > remaining:
+            parts.append(decoder.decode(chunk[:remaining]))
+            chars += len(parts[-1])
+            if chars > limits.max_chars:
+                break
+            return "".join(parts) + bytes_truncated_marker(limits.max_bytes)
+        remaining -= len(chunk)
+        parts.append(decoder.decode(chunk))
+        chars += len(parts[-1])
+        if chars > limits.max_chars:
+            break
+    else:
+        parts.append(decoder.decode(b"", final=True))
+        return "".join(parts)
+
+    return "".join(parts)[: limits.max_chars] + chars_truncated_marker(limits.max_chars)
+
+
+# ============================================
+# PDF 逐页提取
+# ============================================
+
+
+@contextmanager
+def open_pdf(path: str) -> Iterator[Any]:
+    """
+    以内存映射方式打开 PDF 文件
+
+    Args:
+        path: PDF 文件路径
+
+    Yields:
+        pypdf.PdfReader
+    """
+    from pypdf import PdfReader
+
+    with open(path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            yield PdfReader(BytesIO(b""))
+            return
+        buffer = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        reader = None
+        try:
+            reader = PdfReader(buffer)
+            yield reader
+        finally:
+            del reader
+            try:
+                buffer.close()
+            except BufferError:
+                # pypdf 仍持有指向映射的视图，交给垃圾回收释放
+                logger.debug("PDF memory map still referenced, leaving it to GC: %s", path)
+
+
+def iter_pdf_pages(reader: Any, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+    """
+    逐页提取文本
+
+    Args:
+        reader: pypdf.PdfReader
+        start: 起始页
+        stop: 结束页 (不含)，None 表示到最后一页
+
+    Yields:
+        每页的文本
+    """
+    total = len(reader.pages)
+    stop = total if stop is None else min(stop, total)
+    for index in range(start, stop):
+        yield reader.pages[index].extract_text() or ""
@@ -0,0 +1,322 @@
+"""
+进程池 PDF 文本提取
+
+pypdf 的逐页提取是 CPU 密集的同步操作，直接在协程中执行会阻塞事件循环
+(解析 200 页的 PDF 时所有流式响应都会停顿)。本模块把提取交给进程池:
+- 进程数 PDF_EXTRACT_WORKERS (默认按 CPU 核数，最多 8; 0 表示改用线程，仍不阻塞事件循环)
+- 有界队列: 同时排队/执行的任务数不超过 PDF_EXTRACT_QUEUE_SIZE (默认进程数 × 4)，
+  超出的调用者等待空位
+- 页级并行: 先提取前 PDF_EXTRACT_PAGE_CHUNK 页 (默认 32) 并得到总页数，剩余页按同样
+  大小分块并行提取，结果按页序拼接
+- 取消与超时: 调用方被取消 (运行被取消) 或单个文档超过 PDF_EXTRACT_TIMEOUT 秒 (默认 120)
+  时，尚未开始的分块被撤销; 正在执行的分块无法中断，其结果被丢弃
+- 内存受限: base64 先分块解码到临时文件，工作进程以内存映射方式读取，按 DocumentLimits
+  限制页数、字符数和字节数 (见 decode.py)
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Optional
+
+from .decode import (
+    DocumentLimits,
+    chars_truncated_marker,
+    decode_base64_to_file,
+    decoded_size,
+    document_omitted_marker,
+    iter_pdf_pages,
+    make_temp_path,
+    open_pdf,
+    pages_truncated_marker,
+)
+
+
+logger = logging.getLogger(__name__)
+
+MAX_DEFAULT_WORKERS = 8
+DEFAULT_TIMEOUT_SECONDS = 120.0
+DEFAULT_PAGE_CHUNK = 32
+
+
+class PdfExtractionTimeoutError(TimeoutError):
+    """单个文档的提取超过 PDF_EXTRACT_TIMEOUT"""
+
+
+# ============================================
+# 工作进程函数
+# ============================================
+
+
+def extract_page_range(
+    path: str,
+    start: int,
+    stop: Optional[int],
+    max_chars: Optional[int] = None,
+) -> tuple[list[str], int]:
+    """
+    提取 [start, stop) 页的文本 (在工作进程中执行)
+
+    Args:
+        path: 已解码的 PDF 临时文件
+        start: 起始页
+        stop: 结束页 (不含)，None 表示到最后一页
+        max_chars: 累计文本超过该字符数后不再提取后续页
+
+    Returns:
+        (各页文本, 总页数)
+    """
+    pages: list[str] = []
+    chars = 0
+    with open_pdf(path) as reader:
+        total = len(reader.pages)
+        for text in iter_pdf_pages(reader, start, stop):
+            pages.append(text)
+            chars += len(text) + 1
+            if max_chars is not None and chars > max_chars:
+                break
+    return pages, total
+
+
+# ============================================
+# 进程池
+# ============================================
+
+
+class PdfExtractionPool:
+    """
+    在进程池 (或线程) 中提取 PDF 文本
+
+    Args:
+        workers: 进程数，0 表示使用 asyncio.to_thread
+        queue_size: 同时排队/执行的分块任务上限
+        timeout_seconds: 单个文档的超时 (秒)，None 或 0 表示不限
+        page_chunk: 每个分块的页数
+        executor: 自定义执行器 (测试用)，提供时忽略 workers
+        limits: 页数 / 字符数 / 字节数上限，缺省时从环境变量读取
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int,
+        timeout_seconds: Optional[float] = DEFAULT_TIMEOUT_SECONDS,
+        page_chunk: int = DEFAULT_PAGE_CHUNK,
+        executor: Optional[Executor] = None,
+        limits: Optional[DocumentLimits] = None,
+    ) -> None:
+        self.workers = workers
+        self.queue_size = max(queue_size, 1)
+        self.timeout_seconds = timeout_seconds
+        self.page_chunk = max(page_chunk, 1)
+        self.limits = limits or DocumentLimits.from_env()
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._slots: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(
+            (
+                "documents", "pageChunks", "truncated", "omitted",
+                "timeouts", "cancellations", "failures", "poolRestarts",
+            ),
+            0,
+        )
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            self._counts[field] += 1
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.workers <= 0 and self._owns_executor:
+            return None
+        with self._lock:
+            if self._executor is None:
+                try:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                except (OSError, NotImplementedError, ValueError) as e:
+                    logger.warning(f"PDF extraction process pool unavailable, using threads: {e}")
+                    self.workers = 0
+            return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            slots = self._slots.get(loop)
+            if slots is None:
+                slots = self._slots[loop] = asyncio.Semaphore(self.queue_size)
+            return slots
+
+    async def _run_chunk(self, path: str, start: int, stop: int) -> tuple[list[str], int]:
+        max_chars = self.limits.max_chars
+        async with self._get_slots():
+            self._count("pageChunks")
+            executor = self._get_executor()
+            if executor is None:
+                return await asyncio.to_thread(extract_page_range, path, start, stop, max_chars)
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    executor, extract_page_range, path, start, stop, max_chars
+                )
+            except BrokenProcessPool:
+                # 工作进程异常退出 (如内存不足): 丢弃进程池，下次调用时重建
+                self._discard_executor(executor)
+                raise
+
+    def _discard_executor(self, executor: Executor) -> None:
+        with self._lock:
+            if self._owns_executor and self._executor is executor:
+                self._executor = None
+                self._counts["poolRestarts"] += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _extract(self, path: str) -> str:
+        limits = self.limits
+        first_stop = min(self.page_chunk, limits.max_pages)
+        pages, total = await self._run_chunk(path, 0, first_stop)
+        page_limit = min(total, limits.max_pages)
+        chars = sum(len(text) + 1 for text in pages)
+
+        rest = [
+            asyncio.ensure_future(self._run_chunk(path, start, min(start + self.page_chunk, page_limit)))
+            for start in range(first_stop, page_limit, self.page_chunk)
+        ] if chars <= limits.max_chars else []
+        try:
+            # 按页序合并，字符数超过上限后撤销其余分块
+            for task in rest:
+                if chars > limits.max_chars:
+                    break
+                chunk_pages, _ = await task
+                pages.extend(chunk_pages)
+                chars += sum(len(text) + 1 for text in chunk_pages)
+        finally:
+            for task in rest:
+                task.cancel()
+
+        text = "\n".join(pages)
+        if len(text) > limits.max_chars:
+            self._count("truncated")
+            return text[: limits.max_chars] + chars_truncated_marker(limits.max_chars)
+        if page_limit < total:
+            self._count("truncated")
+            return text + pages_truncated_marker(page_limit, total)
+        return text
+
+    async def extract(self, data: str) -> str:
+        """
+        提取 PDF 全部页面的文本
+
+        Args:
+            data: base64 PDF 内容 (可含 data URL 前缀)
+
+        Returns:
+            各页文本以换行拼接; 超过上限时截断并附加截断标记，超过字节上限的文档
+            只返回省略标记
+
+        Raises:
+            PdfExtractionTimeoutError: 超过单文档超时
+            asyncio.CancelledError: 调用方被取消
+        """
+        self._count("documents")
+        size = decoded_size(data)
+        if size > self.limits.max_bytes:
+            self._count("omitted")
+            return document_omitted_marker(size, self.limits.max_bytes)
+
+        path = make_temp_path()
+        try:
+            async with asyncio.timeout(self.timeout_seconds or None):
+                await asyncio.to_thread(decode_base64_to_file, data, path)
+                return await self._extract(path)
+        except TimeoutError as e:
+            self._count("timeouts")
+            raise PdfExtractionTimeoutError(
+                f"PDF extraction exceeded {self.timeout_seconds}s"
+            ) from e
+        except asyncio.CancelledError:
+            self._count("cancellations")
+            raise
+        except Exception:
+            self._count("failures")
+            raise
+        finally:
+            try:
+                os.unlink(path)
+            except OSError as e:
+                logger.debug("Failed to remove PDF temp file %s: %s", path, e)
+
+    def shutdown(self) -> None:
+        """关闭进程池 (不等待正在执行的任务)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None and self._owns_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        """获取提取统计"""
+        with self._lock:
+            return {
+                "mode": "process" if self.workers > 0 or not self._owns_executor else "thread",
+                "workers": self.workers,
+                "queueSize": self.queue_size,
+                **self._counts,
+            }
+
+
+# ============================================
+# 进程级单例
+# ============================================
+
+_pool: Optional[PdfExtractionPool] = None
+_pool_lock = threading.Lock()
+
+
+def _env_number(name: str, default: Any, cast: type) -> Any:
+    try:
+        return cast(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _build_pool_from_env() -> PdfExtractionPool:
+    default_workers = max(1, min(os.cpu_count() or 1, MAX_DEFAULT_WORKERS))
+    workers = _env_number("PDF_EXTRACT_WORKERS", default_workers, int)
+    return PdfExtractionPool(
+        workers=workers,
+        queue_size=_env_number("PDF_EXTRACT_QUEUE_SIZE", max(workers, 1) * 4, int),
+        timeout_seconds=_env_number("PDF_EXTRACT_TIMEOUT", DEFAULT_TIMEOUT_SECONDS, float),
+        page_chunk=_env_number("PDF_EXTRACT_PAGE_CHUNK", DEFAULT_PAGE_CHUNK, int),
+    )
+
+
+def get_pdf_extraction_pool() -> PdfExtractionPool:
+    """获取进程级 PDF 提取池 (首次调用时按环境变量创建，进程在首次提取时启动)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _build_pool_from_env()
+    return _pool
+
+
+def get_pdf_extraction_stats() -> dict[str, Any]:
+    """获取 PDF 提取统计"""
+    return get_pdf_extraction_pool().stats()
+
+
+def shutdown_pdf_extraction_pool() -> None:
+    """关闭并丢弃进程级提取池，下次使用时按环境变量重建"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
@@ -0,0 +1,40 @@
+"""
+文档内容哈希
+
+PDF 文本缓存、文档转换缓存、附件存储和预提取记录都以 base64 文档内容的 SHA-256 为键，
+统一由本模块计算:
+- 按块编码后送入哈希，不为数 MB 的文档整体复制一份 bytes
+- 异步版本把大内容 (超过 1 MB) 的哈希放到线程中计算，避免阻塞事件循环
+"""
+
+import asyncio
+import hashlib
+
+
+# 超过该大小的内容在线程中计算哈希
+INLINE_HASH_LIMIT = 1024 * 1024
+
+_CHUNK_CHARS = 1024 * 1024
+
+
+def content_hash(data: str) -> str:
+    """
+    base64 文档内容的 SHA-256 摘要
+
+    Args:
+        data: 文档内容 (调用方应先去掉 data URL 前缀)
+
+    Returns:
+        十六进制摘要
+    """
+    digest = hashlib.sha256()
+    for start in range(0, len(data), _CHUNK_CHARS):
+        digest.update(data[start:start + _CHUNK_CHARS].encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+async def acontent_hash(data: str) -> str:
+    """content_hash 的异步版本 (大内容在线程中计算)"""
+    if len(data) > INLINE_HASH_LIMIT:
+        return await asyncio.to_thread(content_hash, data)
+    return content_hash(data)
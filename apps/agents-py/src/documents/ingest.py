@@ -0,0 +1,159 @@
+"""
+上下文文档预提取记录
+
+document_ingest 图在上传时提取文档文本，并写入 DOCUMENT_VARIANTS_NAMESPACE (键为
+assistant_id)。请求路径上 create_context_document_messages 读取该记录，文档内容未变时
+直接使用预提取的文本，不再解析 PDF。
+
+记录格式:
+    {
+        "version": 1,
+        "documents": [{"name", "type", "contentHash", "chars", "tokens", "digest"}, ...],
+        "variants": {"text": [文本或 None, ...]},  # 与 documents 一一对应
+    }
+
+只有文本格式 (OpenAI、不支持原生 PDF 的 Anthropic 模型，以及所有提供商的 text/* 文档)
+需要解析; 原生 PDF 格式 (Anthropic document / Gemini application/pdf) 直接引用原始
+base64，在请求时由原始文档生成，不在记录中重复保存。
+"""
+
+import asyncio
+import hashlib
+import re
+from typing import Any, Optional
+
+from langgraph.store.base import BaseStore
+
+from ..constants import DOCUMENT_VARIANTS_NAMESPACE
+from .counters import Counters
+from .hashing import content_hash
+
+
+INGEST_RECORD_VERSION = 1
+VARIANT_TEXT = "text"
+
+CHARS_PER_TOKEN = 4
+DIGEST_MAX_CHARS = 280
+
+_WHITESPACE_RUN = re.compile(r"\s+")
+
+
+# ============================================
+# 派生信息
+# ============================================
+
+
+def document_content_hash(doc: dict[str, Any]) -> str:
+    """文档的内容哈希 (类型 + base64 内容; data URL 前缀不影响结果)"""
+    data = doc.get("data", "")
+    index = data.find("base64,")
+    if index >= 0:
+        data = data[index + len("base64,"):]
+    return hashlib.sha256(f"{doc.get('type', '')}\x00{content_hash(data)}".encode()).hexdigest()
+
+
+def estimate_tokens(text: str) -> int:
+    """按约 4 字符/token 估算 token 数"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def text_digest(text: str, max_chars: int = DIGEST_MAX_CHARS) -> str:
+    """文本开头的单行摘录"""
+    snippet = _WHITESPACE_RUN.sub(" ", text[: max_chars * 4]).strip()
+    return snippet if len(snippet) <= max_chars else snippet[: max_chars - 1].rstrip() + "…"
+
+
+def build_ingest_record(documents: list[dict[str, Any]], texts: list[Optional[str]]) -> dict[str, Any]:
+    """
+    构建预提取记录
+
+    Args:
+        documents: 上下文文档
+        texts: 与 documents 对应的提取文本 (不支持的类型为 None)
+
+    Returns:
+        写入 store 的记录
+    """
+    entries = []
+    for doc, text in zip(documents, texts):
+        text = text or ""
+        entries.append({
+            "name": doc.get("name", ""),
+            "type": doc.get("type", ""),
+            "contentHash": document_content_hash(doc),
+            "chars": len(text),
+            "tokens": estimate_tokens(text),
+            "digest": text_digest(text),
+        })
+    return {
+        "version": INGEST_RECORD_VERSION,
+        "documents": entries,
+        "variants": {VARIANT_TEXT: list(texts)},
+    }
+
+
+# ============================================
+# 读取
+# ============================================
+
+
+async def load_ingested_texts(
+    store: Optional[BaseStore],
+    assistant_id: Optional[str],
+    documents: list[dict[str, Any]],
+) -> Optional[dict[int, str]]:
+    """
+    读取与当前文档一致的预提取文本
+
+    Args:
+        store: LangGraph store
+        assistant_id: 助手 ID
+        documents: 当前的上下文文档
+
+    Returns:
+        {文档下标: 文本}; 没有记录或记录已过期 (文档被替换/增删) 时返回 None
+    """
+    if store is None or not assistant_id or not documents:
+        return None
+
+    item = await store.aget(DOCUMENT_VARIANTS_NAMESPACE, assistant_id)
+    record = item.value if item else None
+    if not record or record.get("version") != INGEST_RECORD_VERSION:
+        _stats.record("missing")
+        return None
+
+    entries = record.get("documents", [])
+    texts = record.get("variants", {}).get(VARIANT_TEXT, [])
+    if len(entries) != len(documents) or len(texts) != len(documents):
+        _stats.record("stale")
+        return None
+    # 哈希大文档时释放 GIL，在线程中执行避免阻塞事件循环
+    hashes = await asyncio.to_thread(lambda: [document_content_hash(doc) for doc in documents])
+    if any(entry.get("contentHash") != digest for entry, digest in zip(entries, hashes)):
+        _stats.record("stale")
+        return None
+
+    _stats.record("hits")
+    return {i: text for i, text in enumerate(texts) if isinstance(text, str)}
+
+
+# ============================================
+# 统计
+# ============================================
+
+
+# 预提取记录使用统计
+# - hits: 请求路径使用了预提取文本
+# - stale: 记录与当前文档不一致 (回退为请求时解析)
+# - missing: 没有记录
+_stats = Counters("hits", "stale", "missing")
+
+
+def get_document_ingest_stats() -> dict[str, int]:
+    """获取预提取记录使用统计快照"""
+    return _stats.snapshot()
+
+
+def reset_document_ingest_stats() -> None:
+    """重置预提取记录使用统计"""
+    _stats.reset()
@@ -0,0 +1,346 @@
+"""
+PDF 文本提取缓存
+
+convert_pdf_to_text 在路由、各工件节点和 fix_mis_formatted_context_doc_message 中都会被调用，
+同一份 PDF 每轮会被 pypdf 解析多次，且每轮重复。本模块按文档内容哈希缓存提取出的文本:
+- 键: 去掉 data URL 前缀后的 base64 内容的 SHA-256 (见 hashing.py，大文档在线程中计算)
+- 内存层: 按文本总字节数限制的 LRU (PDF_TEXT_CACHE_MAX_BYTES，默认 64 MB)
+- 可选持久层 (PDF_TEXT_CACHE): disk (PDF_TEXT_CACHE_DIR 下每个文档一个文件) 或
+  store (LangGraph store 的 PDF_TEXT_NAMESPACE，需要调用方传入 store)
+- 同一事件循环内对同一文档的并发请求只提取一次
+- 统计命中率与因命中而免于解析的 PDF 字节数
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from langgraph.store.base import BaseStore
+
+from ..constants import PDF_TEXT_NAMESPACE
+from .decode import decoded_size
+from .hashing import acontent_hash
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_CACHE_DIR = ".cache/pdf_text"
+
+Extractor = Callable[[str], Union[str, Awaitable[str]]]
+
+
+def _text_size(text: str) -> int:
+    return len(text.encode("utf-8", "surrogatepass"))
+
+
+# ============================================
+# 持久层
+# ============================================
+
+
+class DiskTextStore:
+    """磁盘持久层: 每个文档一个 UTF-8 文本文件，文件名为内容哈希"""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _file(self, digest: str) -> Path:
+        return self.path / f"{digest}.txt"
+
+    def get(self, digest: str) -> Optional[str]:
+        try:
+            return self._file(digest).read_bytes().decode("utf-8", "surrogatepass")
+        except FileNotFoundError:
+            return None
+
+    def set(self, digest: str, text: str) -> None:
+        target = self._file(digest)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(text.encode("utf-8", "surrogatepass"))
+        os.replace(tmp, target)
+
+    def clear(self) -> None:
+        for file in self.path.glob("*.txt"):
+            file.unlink(missing_ok=True)
+
+
+# ============================================
+# 缓存
+# ============================================
+
+
+class PdfTextCache:
+    """
+    按内容哈希缓存 PDF 文本
+
+    Args:
+        max_bytes: 内存层保存的文本总字节数上限 (超过上限的单个文本不进入内存层)
+        persistence: 持久层 "disk" / "store"，None 表示仅内存
+        disk_store: persistence="disk" 时使用的磁盘层
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        persistence: Optional[str] = None,
+        disk_store: Optional[DiskTextStore] = None,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.persistence = persistence
+        self.disk_store = disk_store
+        self._entries: OrderedDict[str, tuple[str, int]] = OrderedDict()
+        self._bytes = 0
+        self._pending: dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._persistent_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._bytes_saved = 0
+
+    # ----- 内存层 -----
+
+    def _memory_get(self, digest: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            self._entries.move_to_end(digest)
+            return entry[0]
+
+    def _memory_set(self, digest: str, text: str) -> None:
+        size = _text_size(text)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(digest, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[digest] = (text, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    # ----- 持久层 -----
+
+    async def _persistent_get(self, digest: str, store: Optional[BaseStore]) -> Optional[str]:
+        try:
+            if self.persistence == "disk" and self.disk_store is not None:
+                return await asyncio.to_thread(self.disk_store.get, digest)
+            if self.persistence == "store" and store is not None:
+                item = await store.aget(PDF_TEXT_NAMESPACE, digest)
+                if item and isinstance(item.value.get("text"), str):
+                    return item.value["text"]
+        except Exception as e:
+            logger.warning(f"PDF text cache read failed ({self.persistence}): {e}")
+        return None
+
+    async def _persistent_set(self, digest: str, text: str, store: Optional[BaseStore]) -> None:
+        try:
+            if self.persistence == "disk" and self.disk_store is not None:
+                await asyncio.to_thread(self.disk_store.set, digest, text)
+            elif self.persistence == "store" and store is not None:
+                await store.aput(PDF_TEXT_NAMESPACE, digest, {"text": text}, index=False)
+        except Exception as e:
+            logger.warning(f"PDF text cache write failed ({self.persistence}): {e}")
+
+    # ----- 查询 -----
+
+    def _record(self, field: str, data: str) -> None:
+        with self._lock:
+            if field == "misses":
+                self._misses += 1
+                return
+            if field == "hits":
+                self._hits += 1
+            else:
+                self._persistent_hits += 1
+            self._bytes_saved += decoded_size(data)
+
+    async def get(self, data: str, store: Optional[BaseStore] = None) -> Optional[str]:
+        """
+        只查询缓存，不提取
+
+        Args:
+            data: base64 PDF 内容 (已去掉 data URL 前缀)
+            store: LangGraph store (persistence="store" 时使用)
+
+        Returns:
+            已缓存的文本，各层都未命中时为 None
+        """
+        digest = await acontent_hash(data)
+        text = self._memory_get(digest)
+        if text is not None:
+            self._record("hits", data)
+            return text
+        text = await self._persistent_get(digest, store)
+        if text is not None:
+            self._record("persistentHits", data)
+            self._memory_set(digest, text)
+        return text
+
+    async def get_or_extract(
+        self,
+        data: str,
+        extract: Extractor,
+        store: Optional[BaseStore] = None,
+    ) -> str:
+        """
+        获取 PDF 文本，未缓存时提取并写入各层
+
+        Args:
+            data: base64 PDF 内容 (已去掉 data URL 前缀)
+            extract: 提取函数，接收 data，返回文本 (可为协程函数)
+            store: LangGraph store (persistence="store" 时使用)
+
+        Returns:
+            提取的文本
+
+        Raises:
+            提取函数抛出的异常 (失败不缓存)
+        """
+        digest = await acontent_hash(data)
+        loop = asyncio.get_running_loop()
+
+        while True:
+            text = self._memory_get(digest)
+            if text is not None:
+                self._record("hits", data)
+                return text
+            pending = self._pending.get(digest)
+            if pending is None or pending.get_loop() is not loop:
+                break
+            try:
+                text = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                current = asyncio.current_task()
+                if pending.cancelled() and not (current and current.cancelling()):
+                    continue
+                raise
+            self._record("hits", data)
+            return text
+
+        future = loop.create_future()
+        self._pending[digest] = future
+        try:
+            text = await self._persistent_get(digest, store)
+            if text is not None:
+                self._record("persistentHits", data)
+            else:
+                self._record("misses", data)
+                text = extract(data)
+                if inspect.isawaitable(text):
+                    text = await text
+                await self._persistent_set(digest, text, store)
+            self._memory_set(digest, text)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()
+            raise
+        finally:
+            if self._pending.get(digest) is future:
+                del self._pending[digest]
+        future.set_result(text)
+        return text
+
+    def clear(self) -> None:
+        """清空内存层与磁盘层 (store 层由 store 自身管理)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.disk_store is not None:
+            self.disk_store.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """获取缓存统计 (hits 包含内存与持久层命中)"""
+        with self._lock:
+            hits = self._hits + self._persistent_hits
+            total = hits + self._misses
+            return {
+                "persistence": self.persistence or "memory",
+                "size": len(self._entries),
+                "bytes": self._bytes,
+                "maxBytes": self.max_bytes,
+                "hits": hits,
+                "memoryHits": self._hits,
+                "persistentHits": self._persistent_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hitRate": hits / total if total else 0.0,
+                "bytesSaved": self._bytes_saved,
+            }
+
+
+# ============================================
+# 进程级单例
+# ============================================
+
+_pdf_text_cache: Optional[PdfTextCache] = None
+_pdf_text_cache_built = False
+_pdf_text_cache_lock = threading.Lock()
+
+
+def _build_pdf_text_cache_from_env() -> Optional[PdfTextCache]:
+    backend = os.environ.get("PDF_TEXT_CACHE", "memory").lower()
+    if backend in ("off", "false", "0", "none", ""):
+        return None
+
+    try:
+        max_bytes = int(os.environ.get("PDF_TEXT_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+    except ValueError:
+        max_bytes = DEFAULT_MAX_BYTES
+
+    if backend == "disk":
+        path = os.environ.get("PDF_TEXT_CACHE_DIR", DEFAULT_CACHE_DIR)
+        try:
+            return PdfTextCache(max_bytes, persistence="disk", disk_store=DiskTextStore(path))
+        except OSError as e:
+            logger.warning(f"PDF text cache disk tier unavailable ({path}): {e}")
+    elif backend == "store":
+        return PdfTextCache(max_bytes, persistence="store")
+    return PdfTextCache(max_bytes)
+
+
+def get_pdf_text_cache() -> Optional[PdfTextCache]:
+    """
+    获取进程级 PDF 文本缓存
+
+    由 PDF_TEXT_CACHE 控制: memory (默认) / disk / store / off
+
+    Returns:
+        PdfTextCache 实例，禁用时为 None
+    """
+    global _pdf_text_cache, _pdf_text_cache_built
+    if not _pdf_text_cache_built:
+        with _pdf_text_cache_lock:
+            if not _pdf_text_cache_built:
+                _pdf_text_cache = _build_pdf_text_cache_from_env()
+                _pdf_text_cache_built = True
+    return _pdf_text_cache
+
+
+def get_pdf_text_cache_stats() -> dict[str, Any]:
+    """获取 PDF 文本缓存统计，禁用时返回 {"persistence": "off"}"""
+    cache = get_pdf_text_cache()
+    return cache.stats() if cache is not None else {"persistence": "off"}
+
+
+def reset_pdf_text_cache() -> None:
+    """丢弃进程级缓存，下次使用时按环境变量重建 (测试用)"""
+    global _pdf_text_cache, _pdf_text_cache_built
+    with _pdf_text_cache_lock:
+        _pdf_text_cache = None
+        _pdf_text_cache_built = False
@@ -0,0 +1,94 @@
+"""
+LLM 模型层
+
+包含模型客户端缓存、共享 HTTP 传输、提示词缓存、响应缓存、请求合并、对冲请求、提供商限流、离线压测假模型、模型档位、工具定义预编译与绑定缓存等跨节点共享的模型基础设施
+"""
+
+from .client_cache import (
+    ModelClientCache,
+    clear_model_client_cache,
+    get_model_client_cache,
+    get_model_client_cache_stats,
+)
+from .coalesce import SingleFlight, get_coalesce_stats, get_single_flight
+from .fake import FakeStreamingChatModel
+from .hedging import HedgePolicy, get_hedge_stats
+from .limiter import (
+    CircuitOpenError,
+    LimiterRejectedError,
+    ProviderLimiter,
+    get_limiter_stats,
+    get_provider_limiter,
+)
+from .managed_model import ManagedChatModel
+from .prompt_cache import (
+    build_prompt_cache_messages,
+    get_prompt_cache_stats,
+    is_prompt_caching_enabled,
+    record_prompt_cache_usage,
+)
+from .response_cache import (
+    ResponseCache,
+    clear_response_cache,
+    get_response_cache,
+    get_response_cache_stats,
+)
+from .tiers import (
+    DEFAULT_CALL_SITE_TIERS,
+    ModelTier,
+    is_model_tiering_enabled,
+    resolve_call_site_tier,
+)
+from .tool_specs import (
+    bind_tools_cached,
+    clear_tool_binding_cache,
+    get_tool_binding_stats,
+    precompile_tool_specs,
+    with_structured_output_cached,
+)
+from .transport import (
+    HttpClientPool,
+    HttpTransportSettings,
+    get_http_client_pool,
+    get_http_pool_stats,
+)
+
+__all__ = [
+    "ModelClientCache",
+    "clear_model_client_cache",
+    "get_model_client_cache",
+    "get_model_client_cache_stats",
+    "SingleFlight",
+    "get_coalesce_stats",
+    "get_single_flight",
+    "FakeStreamingChatModel",
+    "HedgePolicy",
+    "get_hedge_stats",
+    "CircuitOpenError",
+    "LimiterRejectedError",
+    "ProviderLimiter",
+    "get_limiter_stats",
+    "get_provider_limiter",
+    "ManagedChatModel",
+    "build_prompt_cache_messages",
+    "get_prompt_cache_stats",
+    "is_prompt_caching_enabled",
+    "record_prompt_cache_usage",
+    "ResponseCache",
+    "clear_response_cache",
+    "get_response_cache",
+    "get_response_cache_stats",
+    "DEFAULT_CALL_SITE_TIERS",
+    "ModelTier",
+    "is_model_tiering_enabled",
+    "resolve_call_site_tier",
+    "bind_tools_cached",
+    "clear_tool_binding_cache",
+    "get_tool_binding_stats",
+    "precompile_tool_specs",
+    "with_structured_output_cached",
+    "HttpClientPool",
+    "HttpTransportSettings",
+    "get_http_client_pool",
+    "get_http_pool_stats",
+]
@@ -0,0 +1,134 @@
+"""
+模型客户端缓存
+
+进程级有界 LRU 缓存，复用 get_model_from_config 创建的聊天模型实例，
+避免每个节点每轮对话都重新构建客户端及其 HTTP 连接状态。
+
+缓存键为解析后的 (provider, model, temperature, max_tokens, base URL/deployment) 元组。
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+# 默认缓存容量 (可通过 MODEL_CLIENT_CACHE_SIZE 环境变量覆盖，0 表示禁用)
+DEFAULT_MODEL_CLIENT_CACHE_SIZE = 32
+
+
+class ModelClientCache:
+    """
+    线程/异步安全的模型实例 LRU 缓存
+
+    模型构造是同步操作 (不包含 await)，因此一把 threading.RLock
+    即可同时保证多线程与同一事件循环内多个协程的安全性。
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MODEL_CLIENT_CACHE_SIZE):
+        self._max_size = max_size
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        # 可重入: factory 可能递归调用 get_model_from_config (如创建对冲用的等价模型)
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        获取缓存的模型实例，不存在时调用 factory 创建并缓存
+
+        Args:
+            key: 解析后的模型参数元组
+            factory: 无参模型构造函数
+
+        Returns:
+            模型实例
+        """
+        if self._max_size <= 0:
+            with self._lock:
+                self._misses += 1
+            return factory()
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+
+            self._misses += 1
+            instance = factory()
+            self._entries[key] = instance
+
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+            return instance
+
+    def resize(self, max_size: int) -> None:
+        """调整缓存容量，超出部分按 LRU 顺序淘汰"""
+        with self._lock:
+            self._max_size = max_size
+            while len(self._entries) > max(max_size, 0):
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """清空缓存并重置计数器"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def stats(self) -> dict[str, Any]:
+        """返回命中/未命中/淘汰计数和当前容量"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "maxSize": self._max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hitRate": self._hits / total if total else 0.0,
+            }
+
+
+def _max_size_from_env() -> int:
+    raw = os.environ.get("MODEL_CLIENT_CACHE_SIZE")
+    if raw is None or raw == "":
+        return DEFAULT_MODEL_CLIENT_CACHE_SIZE
+    try:
+        return int(raw)
+    except ValueError:
+        return DEFAULT_MODEL_CLIENT_CACHE_SIZE
+
+
+_model_client_cache: Optional[ModelClientCache] = None
+_cache_init_lock = threading.Lock()
+
+
+def get_model_client_cache() -> ModelClientCache:
+    """获取进程级模型客户端缓存单例"""
+    global _model_client_cache
+    if _model_client_cache is None:
+        with _cache_init_lock:
+            if _model_client_cache is None:
+                _model_client_cache = ModelClientCache(_max_size_from_env())
+    return _model_client_cache
+
+
+def get_model_client_cache_stats() -> dict[str, Any]:
+    """获取进程级模型客户端缓存统计"""
+    return get_model_client_cache().stats()
+
+
+def clear_model_client_cache() -> None:
+    """清空进程级模型客户端缓存"""
+    get_model_client_cache().clear()
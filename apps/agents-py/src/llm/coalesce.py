@@ -0,0 +1,313 @@
+"""
+相同 LLM 请求的单飞 (single-flight) 合并
+
+双击快捷操作或前端重试会并发发出完全相同的 ainvoke (同一模型、同一消息)。
+同一事件循环中并发的相同请求共享一次上游调用及其结果 (或流)。
+
+- 键: 运行作用域 (用户 / 助手 / 线程) + 模型/绑定参数指纹 + 规范化输入 + 调用参数，
+  不同用户或线程的相同请求不会合并
+- 默认关闭: 合并的跟随者拿不到 on_llm_new_token 回调和自己的追踪记录，
+  温度 > 0 的生成节点合并后也会返回同一个采样结果。
+  通过 LLM_COALESCE=true 开启，建议配合 LLM_COALESCE_NODES 只用于确定性的辅助节点;
+  LLM_COALESCE_EXCLUDE_NODES 或 configurable.coalesceRequests 覆盖
+- 指标: 每个节点的请求数与被合并的请求数
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any, Optional
+
+from langchain_core.load import dumps
+from langchain_core.runnables import RunnableBinding, RunnableConfig, RunnableSequence
+
+from .response_cache import normalize_prompt
+
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# 节点策略
+# ============================================
+
+
+def _split_env_list(name: str) -> set[str]:
+    return {item.strip() for item in os.environ.get(name, "").split(",") if item.strip()}
+
+
+def is_coalescing_enabled(node: str, config: Optional[RunnableConfig] = None) -> bool:
+    """
+    判断指定节点是否启用请求合并
+
+    Args:
+        node: LangGraph 节点名 (metadata.langgraph_node)，图外调用时为空字符串
+        config: 运行配置，configurable.coalesceRequests 优先
+
+    Returns:
+        是否合并该节点的相同并发请求
+    """
+    flag = ((config or {}).get("configurable") or {}).get("coalesceRequests")
+    if flag is not None:
+        return bool(flag)
+
+    if os.environ.get("LLM_COALESCE", "false").lower() not in ("1", "true", "yes", "on"):
+        return False
+    if node in _split_env_list("LLM_COALESCE_EXCLUDE_NODES"):
+        return False
+    allowed = _split_env_list("LLM_COALESCE_NODES")
+    return not allowed or node in allowed
+
+
+# ============================================
+# 请求键
+# ============================================
+
+
+def runnable_fingerprint(runnable: Any) -> str:
+    """
+    计算模型/绑定链的指纹
+
+    聊天模型使用 LangChain llm_string (模型名、温度等)，
+    bind_tools 等绑定的参数 (含工具 Schema) 会一并计入。
+    """
+    if isinstance(runnable, RunnableBinding):
+        bound_kwargs = json.dumps(runnable.kwargs, sort_keys=True, default=str)
+        return f"{runnable_fingerprint(runnable.bound)}|{bound_kwargs}"
+    if isinstance(runnable, RunnableSequence):
+        return ">".join(runnable_fingerprint(step) for step in runnable.steps)
+
+    get_llm_string = getattr(runnable, "_get_llm_string", None)
+    if callable(get_llm_string):
+        try:
+            return get_llm_string()
+        except Exception:
+            return f"{type(runnable).__name__}:{id(runnable)}"
+    return type(runnable).__name__
+
+
+# 参与合并键的运行作用域 (configurable 中的键)
+_SCOPE_KEYS = ("supabase_user_id", "assistant_id", "thread_id")
+
+
+def request_scope(config: Optional[RunnableConfig] = None) -> str:
+    """运行作用域: 只有同一用户、同一助手、同一线程的请求才会合并"""
+    configurable = (config or {}).get("configurable") or {}
+    return "|".join(str(configurable.get(key) or "") for key in _SCOPE_KEYS)
+
+
+def make_request_key(
+    runnable: Any,
+    input: Any,
+    kwargs: dict[str, Any],
+    config: Optional[RunnableConfig] = None,
+) -> str:
+    """
+    根据运行作用域、模型指纹、规范化输入和调用参数生成合并键
+
+    Args:
+        runnable: 模型或绑定链
+        input: 模型输入
+        kwargs: 调用参数
+        config: 运行配置 (提供 assistant_id / thread_id 等作用域)
+
+    Returns:
+        合并键
+    """
+    try:
+        serialized_input = normalize_prompt(dumps(input))
+    except Exception:
+        serialized_input = repr(input)
+
+    digest = hashlib.sha256()
+    for part in (
+        request_scope(config),
+        runnable_fingerprint(runnable),
+        serialized_input,
+        json.dumps(kwargs, sort_keys=True, default=str),
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+# ============================================
+# Single-flight
+# ============================================
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class _StreamFlight:
+    def __init__(self) -> None:
+        self.chunks: list[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.condition = asyncio.Condition()
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+
+
+class SingleFlight:
+    """
+    按键合并同一事件循环中的并发协程/异步流
+
+    领头调用在独立任务中执行; 某个等待者被取消不会影响其他等待者，
+    只有全部等待者都取消时才取消上游调用。
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[tuple[int, str], _Flight] = {}
+        self._streams: dict[tuple[int, str], _StreamFlight] = {}
+        self._lock = threading.Lock()
+        self._nodes: dict[str, dict[str, int]] = {}
+
+    def _record(self, node: str, shared: bool) -> None:
+        with self._lock:
+            entry = self._nodes.setdefault(node or "<none>", {"requests": 0, "coalesced": 0})
+            entry["requests"] += 1
+            if shared:
+                entry["coalesced"] += 1
+
+    async def do(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        *,
+        node: str = "",
+    ) -> Any:
+        """
+        执行或加入一个进行中的调用
+
+        Args:
+            key: 合并键
+            factory: 创建上游协程的函数 (仅领头调用执行)
+            node: 节点名 (用于指标)
+
+        Returns:
+            上游调用结果 (所有等待者共享同一对象)
+        """
+        flight_key = (id(asyncio.get_running_loop()), key)
+        flight = self._calls.get(flight_key)
+        shared = flight is not None
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._calls[flight_key] = flight
+            flight.task.add_done_callback(
+                lambda _t, f=flight: self._calls.pop(flight_key, None)
+                if self._calls.get(flight_key) is f
+                else None
+            )
+        self._record(node, shared)
+        if shared:
+            logger.debug(f"[coalesce] joined in-flight request for node={node!r}")
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    async def stream(
+        self,
+        key: str,
+        factory: Callable[[], AsyncIterator[Any]],
+        *,
+        node: str = "",
+    ) -> AsyncIterator[Any]:
+        """
+        执行或订阅一个进行中的流
+
+        后加入的订阅者会先回放已产生的块，再接收后续块。
+        """
+        flight_key = (id(asyncio.get_running_loop()), key)
+        flight = self._streams.get(flight_key)
+        shared = flight is not None
+        if flight is None:
+            flight = _StreamFlight()
+            self._streams[flight_key] = flight
+            flight.task = asyncio.ensure_future(self._pump(flight_key, flight, factory))
+        self._record(node, shared)
+
+        flight.subscribers += 1
+        index = 0
+        try:
+            while True:
+                async with flight.condition:
+                    await flight.condition.wait_for(
+                        lambda: index < len(flight.chunks) or flight.done
+                    )
+                    pending = flight.chunks[index:]
+                    finished = flight.done
+                for chunk in pending:
+                    yield chunk
+                index += len(pending)
+                if finished and index >= len(flight.chunks):
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and flight.task is not None and not flight.task.done():
+                flight.task.cancel()
+
+    async def _pump(
+        self,
+        flight_key: tuple[int, str],
+        flight: _StreamFlight,
+        factory: Callable[[], AsyncIterator[Any]],
+    ) -> None:
+        try:
+            async for chunk in factory():
+                async with flight.condition:
+                    flight.chunks.append(chunk)
+                    flight.condition.notify_all()
+        except BaseException as e:
+            flight.error = e
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            if self._streams.get(flight_key) is flight:
+                del self._streams[flight_key]
+            async with flight.condition:
+                flight.done = True
+                flight.condition.notify_all()
+
+    def stats(self) -> dict[str, Any]:
+        """获取合并指标"""
+        with self._lock:
+            nodes = {node: dict(entry) for node, entry in self._nodes.items()}
+        return {
+            "inFlight": len(self._calls) + len(self._streams),
+            "nodes": nodes,
+            "coalesced": sum(entry["coalesced"] for entry in nodes.values()),
+        }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._nodes.clear()
+
+
+_single_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """获取进程级 SingleFlight 实例"""
+    return _single_flight
+
+
+def get_coalesce_stats() -> dict[str, Any]:
+    """获取请求合并指标"""
+    return _single_flight.stats()
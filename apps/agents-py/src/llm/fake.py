@@ -0,0 +1,280 @@
+"""
+离线压测用的假流式聊天模型
+
+通过 customModelName="fake/<mode>" 选择 (mode: echo / canned)，无需任何网络:
+- 按可配置速率流式输出 token，支持首 token 延迟与抖动
+- echo 模式回显最近一条用户消息，canned 模式输出固定文本
+- 绑定工具时按工具 JSON Schema 生成合法的工具调用参数，覆盖项目绑定的所有工具
+  (RouteQuerySchema、GenerateArtifactTool、UpdateArtifactMetaTool、GenerateReflections、
+  GenerateTitle、ClassifyMessage、ShouldIncludeUrlContents)
+
+时序参数来自环境变量 FAKE_LLM_*，见 .env.example。
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import time
+import uuid
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any, Callable, Optional, Union
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.chat_models import (
+    agenerate_from_stream,
+    generate_from_stream,
+)
+from langchain_core.messages import AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import Field
+
+
+DEFAULT_CANNED_TEXT = (
+    "This is a deterministic response from the fake streaming model. "
+    "It is used to benchmark graph orchestration without network access."
+)
+
+_TOKEN_RE = re.compile(r"\S+\s*|\s+")
+
+
+def _message_text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return " ".join(
+        block.get("text", "") for block in content if isinstance(block, dict)
+    )
+
+
+class FakeStreamingChatModel(BaseChatModel):
+    """
+    确定性的假流式聊天模型
+
+    Args:
+        model_name: fake/ 之后的部分，以 echo 开头时回显用户消息
+        tokens_per_second: 输出速率
+        first_token_latency: 首 token 延迟 (秒)
+        jitter: 首 token 延迟的随机抖动上限 (秒)
+        canned_text: canned 模式的输出文本
+        tool_args: 按工具名覆盖生成的工具参数
+        seed: 抖动随机种子
+    """
+
+    model_name: str = "canned"
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+    tokens_per_second: float = 200.0
+    first_token_latency: float = 0.15
+    jitter: float = 0.05
+    canned_text: str = DEFAULT_CANNED_TEXT
+    tool_args: dict[str, dict[str, Any]] = Field(default_factory=dict)
+    seed: Optional[int] = None
+
+    @classmethod
+    def from_env(cls, model_name: str, **kwargs: Any) -> "FakeStreamingChatModel":
+        """根据 FAKE_LLM_* 环境变量创建实例"""
+        env_kwargs: dict[str, Any] = {
+            "model_name": model_name,
+            "tokens_per_second": float(os.environ.get("FAKE_LLM_TOKENS_PER_SECOND", "200")),
+            "first_token_latency": float(os.environ.get("FAKE_LLM_FIRST_TOKEN_MS", "150")) / 1000,
+            "jitter": float(os.environ.get("FAKE_LLM_JITTER_MS", "50")) / 1000,
+            "canned_text": os.environ.get("FAKE_LLM_CANNED_TEXT", DEFAULT_CANNED_TEXT),
+            "tool_args": json.loads(os.environ.get("FAKE_LLM_TOOL_ARGS", "{}")),
+        }
+        if os.environ.get("FAKE_LLM_SEED"):
+            env_kwargs["seed"] = int(os.environ["FAKE_LLM_SEED"])
+        return cls(**{**env_kwargs, **kwargs})
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming-chat-model"
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return {"model_name": self.model_name, "temperature": self.temperature}
+
+    # ============================================
+    # 工具绑定
+    # ============================================
+
+    def bind_tools(
+        self,
+        tools: Sequence[Union[dict[str, Any], type, Callable, BaseTool]],
+        *,
+        tool_choice: Optional[Union[dict, str, bool]] = None,
+        **kwargs: Any,
+    ) -> Runnable:
+        formatted = [convert_to_openai_tool(tool) for tool in tools]
+        return self.bind(tools=formatted, tool_choice=tool_choice, **kwargs)
+
+    # ============================================
+    # 内容生成
+    # ============================================
+
+    def _response_text(self, messages: list[BaseMessage]) -> str:
+        if self.model_name.startswith("echo"):
+            for message in reversed(messages):
+                if message.type == "human":
+                    return _message_text(message)
+            return ""
+        return self.canned_text
+
+    @staticmethod
+    def _select_tool(tools: list[dict[str, Any]], tool_choice: Any) -> Optional[dict[str, Any]]:
+        if not tools or tool_choice in ("none", False):
+            return None
+        name = None
+        if isinstance(tool_choice, str) and tool_choice not in ("auto", "any", "required"):
+            name = tool_choice
+        elif isinstance(tool_choice, dict):
+            name = (tool_choice.get("function") or {}).get("name") or tool_choice.get("name")
+        for tool in tools:
+            if tool["function"]["name"] == name:
+                return tool
+        return tools[0]
+
+    def _fake_value(self, name: str, schema: dict[str, Any], defs: dict[str, Any], text: str) -> Any:
+        if "$ref" in schema:
+            schema = defs.get(schema["$ref"].split("/")[-1], {})
+        if "const" in schema:
+            return schema["const"]
+        if "enum" in schema:
+            return schema["enum"][0]
+        for key in ("anyOf", "oneOf"):
+            if key in schema:
+                options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+                return self._fake_value(name, options[0], defs, text)
+
+        schema_type = schema.get("type")
+        if schema_type == "boolean":
+            return False
+        if schema_type in ("integer", "number"):
+            return schema.get("minimum", 0)
+        if schema_type == "array":
+            return [self._fake_value(name, schema.get("items", {}), defs, text)]
+        if schema_type == "object":
+            return {
+                prop: self._fake_value(prop, prop_schema, defs, text)
+                for prop, prop_schema in schema.get("properties", {}).items()
+            }
+        lowered = name.lower()
+        if lowered == "language":
+            return "other"
+        if "title" in lowered:
+            return "Fake Title"
+        return text
+
+    def _tool_call_args(self, tool: dict[str, Any], text: str) -> dict[str, Any]:
+        function = tool["function"]
+        parameters = function.get("parameters", {})
+        args = self._fake_value("", {**parameters, "type": "object"}, parameters.get("$defs", {}), text)
+        return {**args, **self.tool_args.get(function["name"], {})}
+
+    # ============================================
+    # 流式输出
+    # ============================================
+
+    def _plan(
+        self, messages: list[BaseMessage], **kwargs: Any
+    ) -> tuple[float, float, list[AIMessageChunk]]:
+        """返回 (首 token 延迟, token 间隔, 待输出的块)"""
+        rng = random.Random(self.seed)
+        first_delay = max(0.0, self.first_token_latency + rng.uniform(-self.jitter, self.jitter))
+        interval = 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        text = self._response_text(messages)
+
+        tool = self._select_tool(kwargs.get("tools") or [], kwargs.get("tool_choice"))
+        if tool is not None:
+            args_json = json.dumps(self._tool_call_args(tool, text))
+            pieces = [args_json[i : i + 16] for i in range(0, len(args_json), 16)] or [""]
+            call_id = f"call_{uuid.uuid4().hex[:12]}"
+            chunks = [
+                AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": tool["function"]["name"] if i == 0 else None,
+                            "args": piece,
+                            "id": call_id if i == 0 else None,
+                            "index": 0,
+                        }
+                    ],
+                )
+                for i, piece in enumerate(pieces)
+            ]
+        else:
+            chunks = [AIMessageChunk(content=token) for token in _TOKEN_RE.findall(text)]
+            if not chunks:
+                chunks = [AIMessageChunk(content="")]
+
+        input_tokens = sum(len(_TOKEN_RE.findall(_message_text(m))) for m in messages)
+        chunks[-1] = chunks[-1] + AIMessageChunk(
+            content="",
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": len(chunks),
+                "total_tokens": input_tokens + len(chunks),
+            },
+        )
+        return first_delay, interval, chunks
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        first_delay, interval, chunks = self._plan(messages, **kwargs)
+        time.sleep(first_delay)
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(interval)
+            if run_manager and isinstance(chunk.content, str):
+                run_manager.on_llm_new_token(chunk.content, chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        first_delay, interval, chunks = self._plan(messages, **kwargs)
+        await asyncio.sleep(first_delay)
+        for i, chunk in enumerate(chunks):
+            if i:
+                await asyncio.sleep(interval)
+            if run_manager and isinstance(chunk.content, str):
+                await run_manager.on_llm_new_token(
+                    chunk.content, chunk=ChatGenerationChunk(message=chunk)
+                )
+            yield ChatGenerationChunk(message=chunk)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return generate_from_stream(self._stream(messages, stop, run_manager, **kwargs))
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return await agenerate_from_stream(self._astream(messages, stop, run_manager, **kwargs))
@@ -0,0 +1,323 @@
+"""
+等价模型间的对冲请求 (hedged requests)
+
+rewriteArtifact / replyToGeneralInput 的 p99 主要由偶发的慢响应决定。
+主请求在阈值内没有产生首个 token 时，向等价模型 (如同名模型的 Azure ↔ OpenAI 部署)
+发出第二个请求; 先产生首个 token 的一方胜出，另一方被取消。
+对冲请求的回调事件先缓存在转发器中 (src/llm/relay.py)，只有胜出时才回放给运行的处理器，
+落选的对冲请求不会向客户端推送任何流式块。
+
+- 阈值: 按 (provider, model) 统计的首 token 延迟分位数 (LLM_HEDGE_PERCENTILE)，
+  样本不足时使用 LLM_HEDGE_DELAY_MS
+- 启用: LLM_HEDGING=true，按节点限制 (LLM_HEDGE_NODES)
+- 指标: 对冲触发率与对冲胜出率
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from langchain_core.callbacks import AsyncCallbackManager
+from langchain_core.messages import AIMessage, BaseMessageChunk, message_chunk_to_message
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import ensure_config, get_async_callback_manager_for_config
+
+from .relay import CallbackRelay
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEDGE_NODES = ("rewriteArtifact", "replyToGeneralInput")
+
+
+# ============================================
+# 策略
+# ============================================
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """对冲策略配置"""
+
+    enabled: bool = False
+    nodes: frozenset[str] = field(default_factory=lambda: frozenset(DEFAULT_HEDGE_NODES))
+    percentile: float = 95.0
+    min_samples: int = 20
+    default_delay_seconds: float = 2.0
+    min_delay_seconds: float = 0.25
+
+    @classmethod
+    def from_env(cls) -> "HedgePolicy":
+        nodes_env = os.environ.get("LLM_HEDGE_NODES")
+        nodes = (
+            frozenset(n.strip() for n in nodes_env.split(",") if n.strip())
+            if nodes_env is not None
+            else frozenset(DEFAULT_HEDGE_NODES)
+        )
+        return cls(
+            enabled=os.environ.get("LLM_HEDGING", "false").lower() in ("1", "true", "yes"),
+            nodes=nodes,
+            percentile=float(os.environ.get("LLM_HEDGE_PERCENTILE", "95")),
+            min_samples=int(os.environ.get("LLM_HEDGE_MIN_SAMPLES", "20")),
+            default_delay_seconds=float(os.environ.get("LLM_HEDGE_DELAY_MS", "2000")) / 1000,
+            min_delay_seconds=float(os.environ.get("LLM_HEDGE_MIN_DELAY_MS", "250")) / 1000,
+        )
+
+    def applies_to(self, node: str) -> bool:
+        return self.enabled and node in self.nodes
+
+
+def resolve_hedge_model_name(model_cfg: dict[str, Any]) -> Optional[str]:
+    """
+    为 get_model_config 解析出的模型找到等价部署
+
+    LLM_HEDGE_MODEL 显式指定时直接使用; 否则 OpenAI ↔ Azure OpenAI 同名模型互为等价
+    (需要对端凭据已配置)。
+
+    Returns:
+        可作为 customModelName 的等价模型名，无等价部署时为 None
+    """
+    explicit = os.environ.get("LLM_HEDGE_MODEL")
+    if explicit:
+        return explicit
+
+    provider = model_cfg.get("modelProvider")
+    model_name = model_cfg.get("modelName", "")
+    if provider == "openai" and os.environ.get("_AZURE_OPENAI_API_KEY"):
+        return f"azure/{model_name}"
+    if provider == "azure_openai" and os.environ.get("OPENAI_API_KEY"):
+        return model_name
+    return None
+
+
+# ============================================
+# 首 token 延迟统计
+# ============================================
+
+
+class LatencyTracker:
+    """按键保存最近的首 token 延迟样本，计算分位数"""
+
+    def __init__(self, window: int = 200) -> None:
+        self._window = window
+        self._samples: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self._window)).append(seconds)
+
+    def percentile(self, key: str, pct: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < max(min_samples, 1):
+            return None
+        rank = min(len(samples) - 1, max(0, round(pct / 100 * (len(samples) - 1))))
+        return samples[rank]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+class HedgeStats:
+    """对冲指标: 调用数、触发数、对冲胜出数"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._nodes: dict[str, dict[str, int]] = {}
+
+    def record(self, node: str, fired: bool, hedge_won: bool) -> None:
+        with self._lock:
+            entry = self._nodes.setdefault(node or "<none>", {"calls": 0, "fired": 0, "hedgeWins": 0})
+            entry["calls"] += 1
+            entry["fired"] += int(fired)
+            entry["hedgeWins"] += int(hedge_won)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            result = {}
+            for node, entry in self._nodes.items():
+                result[node] = {
+                    **entry,
+                    "fireRate": entry["fired"] / entry["calls"] if entry["calls"] else 0.0,
+                    "hedgeWinRate": entry["hedgeWins"] / entry["fired"] if entry["fired"] else 0.0,
+                }
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._nodes.clear()
+
+
+_latency_tracker = LatencyTracker()
+_hedge_stats = HedgeStats()
+
+
+def get_hedge_stats() -> dict[str, dict[str, Any]]:
+    """获取各节点的对冲触发率与胜出率"""
+    return _hedge_stats.snapshot()
+
+
+def reset_hedge_stats() -> None:
+    """重置对冲指标与延迟样本"""
+    _hedge_stats.reset()
+    _latency_tracker.clear()
+
+
+# ============================================
+# 对冲调用
+# ============================================
+
+
+def hedge_delay(latency_key: str, policy: HedgePolicy) -> float:
+    """根据历史首 token 延迟分位数计算对冲等待时间 (秒)"""
+    observed = _latency_tracker.percentile(latency_key, policy.percentile, policy.min_samples)
+    delay = observed if observed is not None else policy.default_delay_seconds
+    return max(delay, policy.min_delay_seconds)
+
+
+# 流在产生首块前结束
+_EMPTY = object()
+
+
+async def _next_chunk(stream: AsyncIterator[Any]) -> Any:
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return _EMPTY
+
+
+def _produced_chunk(task: asyncio.Task) -> bool:
+    """任务是否成功读到了首块 (未取消、未失败、流不为空)"""
+    return task.done() and not task.cancelled() and task.exception() is None and task.result() is not _EMPTY
+
+
+async def _close_stream(stream: AsyncIterator[Any], task: Optional[asyncio.Task]) -> None:
+    if task is not None and not task.done():
+        task.cancel()
+        try:
+            await task
+        except BaseException:
+            pass
+    aclose = getattr(stream, "aclose", None)
+    if aclose is not None:
+        try:
+            await aclose()
+        except BaseException:
+            pass
+
+
+def _relayed_config(
+    config: RunnableConfig,
+    callback_manager: AsyncCallbackManager,
+    relay: CallbackRelay,
+) -> RunnableConfig:
+    """保留父运行、标签和 metadata，回调处理器替换为转发器"""
+    callbacks = callback_manager.copy()
+    callbacks.set_handlers([relay])
+    return {**config, "callbacks": callbacks}
+
+
+async def hedged_ainvoke(
+    primary: Any,
+    secondary: Any,
+    input: Any,
+    config: Optional[RunnableConfig],
+    kwargs: dict[str, Any],
+    *,
+    node: str,
+    latency_key: str,
+    policy: HedgePolicy,
+) -> Any:
+    """
+    以对冲方式调用模型
+
+    通过 astream 观察首个 token: 主请求超过阈值仍无输出时向 secondary 发出对冲请求，
+    先产生首块的流胜出并被完整消费，另一方被取消。对冲请求不直接使用运行的回调处理器，
+    胜出后才回放其已缓存的事件并实时转发剩余部分。
+
+    Args:
+        primary: 主模型 (Runnable)
+        secondary: 等价模型 (Runnable)
+        input: 模型输入
+        config: 调用配置 (两个请求共用 run_name、标签和 metadata 等流式标识)
+        kwargs: 额外调用参数
+        node: 节点名 (用于指标)
+        latency_key: 首 token 延迟统计键 (provider:model)
+        policy: 对冲策略
+
+    Returns:
+        胜出方的完整消息; 胜出方的流为空时返回空的 AIMessage
+    """
+    delay = hedge_delay(latency_key, policy)
+    started = time.monotonic()
+    config = ensure_config(config)
+    callback_manager = get_async_callback_manager_for_config(config)
+    relay = CallbackRelay()
+
+    primary_stream = primary.astream(input, config, **kwargs)
+    primary_task = asyncio.ensure_future(_next_chunk(primary_stream))
+    # 主请求首块到达的时间 (回调先于 asyncio.wait 的回调执行)
+    primary_first_chunk: list[float] = []
+    primary_task.add_done_callback(lambda _: primary_first_chunk.append(time.monotonic()))
+    secondary_stream = None
+    secondary_task = None
+
+    try:
+        done, _ = await asyncio.wait({primary_task}, timeout=delay)
+        if not done:
+            logger.info(f"[hedge] {node}: no first token after {delay:.2f}s, firing hedge request")
+            secondary_stream = secondary.astream(input, _relayed_config(config, callback_manager, relay), **kwargs)
+            secondary_task = asyncio.ensure_future(_next_chunk(secondary_stream))
+            done, _ = await asyncio.wait(
+                {primary_task, secondary_task}, return_when=asyncio.FIRST_COMPLETED
+            )
+            # 失败的一方不算胜出，等待另一方
+            if len(done) == 1:
+                first = next(iter(done))
+                other = secondary_task if first is primary_task else primary_task
+                if first.exception() is not None:
+                    await asyncio.wait({other})
+                    done = {other}
+
+        # 只记录主请求真实的首 token 延迟 (被对冲取代、失败或流为空时不记录样本)
+        if _produced_chunk(primary_task):
+            _latency_tracker.record(latency_key, primary_first_chunk[0] - started)
+        hedge_won = secondary_task is not None and secondary_task in done and (
+            primary_task not in done or primary_task.exception() is not None
+        )
+        if hedge_won:
+            winner_stream, winner_task = secondary_stream, secondary_task
+            loser_stream, loser_task = primary_stream, primary_task
+        else:
+            winner_stream, winner_task = primary_stream, primary_task
+            loser_stream, loser_task = secondary_stream, secondary_task
+
+        if loser_stream is not None:
+            await _close_stream(loser_stream, loser_task)
+        if hedge_won:
+            # 对冲请求胜出: 回放已缓存的事件 (开始事件与首块)，剩余部分实时推送
+            await relay.commit(callback_manager.handlers)
+        _hedge_stats.record(node, fired=secondary_task is not None, hedge_won=hedge_won)
+
+        aggregate = winner_task.result()
+        if aggregate is _EMPTY:
+            return AIMessage(content="")
+        async for chunk in winner_stream:
+            aggregate = aggregate + chunk
+    except BaseException:
+        await _close_stream(primary_stream, primary_task)
+        if secondary_stream is not None:
+            await _close_stream(secondary_stream, secondary_task)
+        raise
+
+    if isinstance(aggregate, BaseMessageChunk):
+        return message_chunk_to_message(aggregate)
+    return aggregate
@@ -0,0 +1,497 @@
+"""
+按提供商的自适应并发限制、重试与熔断
+
+所有节点的 ainvoke 原本没有并发控制，突发请求会触发提供商 429 以及 SDK 内部的级联重试。
+本模块按 get_model_config 的 modelProvider 为每个提供商维护:
+- AIMD 并发窗口: 成功时加性增长，429/5xx/超时时乘性缩小
+- 带抖动的指数退避重试，优先遵循 Retry-After / x-ratelimit-reset 等响应头
+- 熔断器: 连续失败达到阈值后快速失败，冷却后半开试探
+- 指标: 当前窗口、在途请求、排队深度、拒绝数、重试数、熔断状态
+
+启用时 SDK 自身的重试被关闭 (max_retries=0)，重试统一在这里完成。
+"""
+
+import asyncio
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, Optional, TypeVar
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 支持 max_retries 构造参数的提供商
+_SDK_RETRY_PROVIDERS = frozenset(
+    {"openai", "azure_openai", "anthropic", "google-genai", "fireworks", "groq"}
+)
+
+
+class LimiterRejectedError(RuntimeError):
+    """排队已满或熔断器打开时快速失败"""
+
+
+class CircuitOpenError(LimiterRejectedError):
+    """提供商熔断器处于打开状态"""
+
+
+# ============================================
+# 配置
+# ============================================
+
+
+@dataclass(frozen=True)
+class LimiterSettings:
+    """提供商限流配置"""
+
+    initial_window: float = 16
+    min_window: float = 1
+    max_window: float = 64
+    additive_increase: float = 1.0
+    multiplicative_decrease: float = 0.5
+    max_queue: int = 256
+    max_retries: int = 3
+    base_backoff_seconds: float = 0.5
+    max_backoff_seconds: float = 30.0
+    failure_threshold: int = 5
+    cooldown_seconds: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "LimiterSettings":
+        def env(name: str, default: float) -> float:
+            return float(os.environ.get(name, default))
+
+        return cls(
+            initial_window=env("LLM_LIMITER_INITIAL_WINDOW", 16),
+            min_window=env("LLM_LIMITER_MIN_WINDOW", 1),
+            max_window=env("LLM_LIMITER_MAX_WINDOW", 64),
+            max_queue=int(env("LLM_LIMITER_MAX_QUEUE", 256)),
+            max_retries=int(env("LLM_LIMITER_MAX_RETRIES", 3)),
+            base_backoff_seconds=env("LLM_LIMITER_BACKOFF_MS", 500) / 1000,
+            max_backoff_seconds=env("LLM_LIMITER_MAX_BACKOFF_MS", 30000) / 1000,
+            failure_threshold=int(env("LLM_CIRCUIT_FAILURE_THRESHOLD", 5)),
+            cooldown_seconds=env("LLM_CIRCUIT_COOLDOWN_MS", 30000) / 1000,
+        )
+
+
+def is_limiter_enabled() -> bool:
+    """LLM_LIMITER 控制是否启用提供商限流 (默认启用)"""
+    return os.environ.get("LLM_LIMITER", "true").lower() not in ("0", "false", "no", "off")
+
+
+def get_provider_retry_kwargs(provider: str) -> dict[str, Any]:
+    """
+    返回关闭 SDK 内部重试的构造参数
+
+    限流器启用时由它统一重试，避免 SDK 重试与限流器重试叠加。
+    """
+    if is_limiter_enabled() and provider in _SDK_RETRY_PROVIDERS:
+        return {"max_retries": 0}
+    return {}
+
+
+# ============================================
+# 错误分类
+# ============================================
+
+
+def _error_status(error: BaseException) -> Optional[int]:
+    for candidate in (
+        getattr(error, "status_code", None),
+        getattr(getattr(error, "response", None), "status_code", None),
+        getattr(error, "code", None),
+    ):
+        if isinstance(candidate, int):
+            return candidate
+    return None
+
+
+def _error_headers(error: BaseException) -> dict[str, str]:
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if headers is None:
+        return {}
+    try:
+        return {k.lower(): v for k, v in headers.items()}
+    except Exception:
+        return {}
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """429/5xx/连接与超时错误视为过载，可重试并收缩窗口"""
+    status = _error_status(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    name = type(error).__name__
+    return any(marker in name for marker in ("Timeout", "Connection", "Overloaded", "RateLimit"))
+
+
+_DURATION_RE = re.compile(r"(?P<value>\d+(?:\.\d+)?)(?P<unit>ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """解析 "1.5"、"20ms"、"6m0s" 形式的时长 (秒)"""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(v) * _DURATION_UNITS[u] for v, u in parts)
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """
+    从限流响应头中读取建议等待时间
+
+    依次检查 retry-after-ms、retry-after、x-ratelimit-reset-requests/-tokens、
+    anthropic-ratelimit-*-reset (RFC 3339 时间)。
+    """
+    headers = _error_headers(error)
+    if not headers:
+        return None
+
+    if "retry-after-ms" in headers:
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    for key in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+        if key in headers:
+            parsed = _parse_duration(headers[key])
+            if parsed is not None:
+                return parsed
+    for key in ("anthropic-ratelimit-requests-reset", "anthropic-ratelimit-tokens-reset"):
+        if key in headers:
+            try:
+                from datetime import datetime, timezone
+
+                reset_at = datetime.fromisoformat(headers[key].replace("Z", "+00:00"))
+                return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+            except ValueError:
+                pass
+    return None
+
+
+# ============================================
+# 提供商限流器
+# ============================================
+
+
+class ProviderLimiter:
+    """
+    单个提供商的 AIMD 并发窗口 + 重试 + 熔断
+
+    状态由 threading.Lock 保护，等待者是各自事件循环上的 Future，
+    因此可在多个事件循环/线程间共享。
+    """
+
+    def __init__(self, provider: str, settings: Optional[LimiterSettings] = None) -> None:
+        self.provider = provider
+        self.settings = settings or LimiterSettings()
+        self._lock = threading.Lock()
+        self._window = float(self.settings.initial_window)
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        # 熔断器
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._half_open_probe = False
+        # 指标
+        self._counters = {
+            "requests": 0,
+            "successes": 0,
+            "failures": 0,
+            "throttled": 0,
+            "retries": 0,
+            "rejections": 0,
+            "circuitOpens": 0,
+        }
+
+    # ----- 熔断器 -----
+
+    def _circuit_state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.settings.cooldown_seconds:
+            return "half_open"
+        return "open"
+
+    def _check_circuit(self) -> bool:
+        """熔断时拒绝; 半开时由本次调用占用唯一的探测名额并返回 True"""
+        state = self._circuit_state()
+        if state == "open" or (state == "half_open" and self._half_open_probe):
+            self._counters["rejections"] += 1
+            raise CircuitOpenError(f"Circuit open for provider {self.provider!r}")
+        if state == "half_open":
+            self._half_open_probe = True
+            return True
+        return False
+
+    # ----- 并发窗口 -----
+
+    def _has_capacity(self) -> bool:
+        return self._in_flight < max(int(self._window), 1)
+
+    async def acquire(self) -> None:
+        """获取一个并发槽位，窗口已满时排队"""
+        with self._lock:
+            probe = self._check_circuit()
+            if self._has_capacity() and not self._waiters:
+                self._in_flight += 1
+                return
+            if len(self._waiters) >= self.settings.max_queue:
+                self._counters["rejections"] += 1
+                # 探测请求没有发出，释放探测名额
+                if probe:
+                    self._half_open_probe = False
+                raise LimiterRejectedError(f"Limiter queue full for provider {self.provider!r}")
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                if probe:
+                    self._half_open_probe = False
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    return_slot = False
+                else:
+                    # 已被授予槽位但调用方取消
+                    return_slot = True
+            if return_slot:
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """归还槽位并唤醒排队者"""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self._has_capacity():
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._in_flight += 1
+            waiter.get_loop().call_soon_threadsafe(self._grant, waiter)
+
+    def _grant(self, waiter: asyncio.Future) -> None:
+        if waiter.done():
+            # 等待者在授予前已取消，归还槽位
+            self.release()
+        else:
+            waiter.set_result(None)
+
+    def _on_success(self) -> None:
+        with self._lock:
+            self._counters["successes"] += 1
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._half_open_probe = False
+            # 加性增长: 每个窗口的成功约增长 additive_increase
+            self._window = min(
+                self.settings.max_window,
+                self._window + self.settings.additive_increase / max(self._window, 1.0),
+            )
+            self._wake_waiters()
+
+    def _on_failure(self, error: BaseException) -> None:
+        overload = is_overload_error(error)
+        with self._lock:
+            self._counters["failures"] += 1
+            self._half_open_probe = False
+            if not overload:
+                return
+            if _error_status(error) == 429:
+                self._counters["throttled"] += 1
+            # 乘性缩小
+            self._window = max(
+                self.settings.min_window, self._window * self.settings.multiplicative_decrease
+            )
+            self._consecutive_failures += 1
+            if (
+                self._consecutive_failures >= self.settings.failure_threshold
+                or self._opened_at is not None
+            ):
+                if self._opened_at is None or self._circuit_state() == "half_open":
+                    self._counters["circuitOpens"] += 1
+                    logger.warning(f"[limiter] circuit opened for provider {self.provider!r}")
+                self._opened_at = time.monotonic()
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        hinted = retry_after_seconds(error)
+        if hinted is not None:
+            return min(hinted, self.settings.max_backoff_seconds) + random.uniform(0, 0.1)
+        ceiling = min(
+            self.settings.max_backoff_seconds,
+            self.settings.base_backoff_seconds * (2 ** attempt),
+        )
+        # 全抖动
+        return random.uniform(0, ceiling)
+
+    # ----- 调用 -----
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        在并发窗口内执行调用，过载错误按退避策略重试
+
+        Args:
+            call: 每次尝试都会重新调用的协程工厂
+
+        Returns:
+            调用结果
+        """
+        attempt = 0
+        while True:
+            await self.acquire()
+            with self._lock:
+                self._counters["requests"] += 1
+            try:
+                result = await call()
+            except asyncio.CancelledError:
+                with self._lock:
+                    self._half_open_probe = False
+                raise
+            except Exception as e:
+                self._on_failure(e)
+                if not is_overload_error(e) or attempt >= self.settings.max_retries:
+                    raise
+                delay = self._backoff(attempt, e)
+            else:
+                self._on_success()
+                return result
+            finally:
+                self.release()
+
+            attempt += 1
+            with self._lock:
+                self._counters["retries"] += 1
+            logger.info(
+                f"[limiter] {self.provider}: retry {attempt}/{self.settings.max_retries} "
+                f"in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+
+    async def stream(self, factory: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """
+        在并发窗口内执行流式调用
+
+        只在产生首个块之前失败时重试; 槽位持有到流结束。
+        """
+        attempt = 0
+        while True:
+            await self.acquire()
+            with self._lock:
+                self._counters["requests"] += 1
+            started = False
+            retry_delay: Optional[float] = None
+            try:
+                async for chunk in factory():
+                    started = True
+                    yield chunk
+            except (asyncio.CancelledError, GeneratorExit):
+                # 取消或消费方提前关闭流
+                with self._lock:
+                    self._half_open_probe = False
+                raise
+            except Exception as e:
+                self._on_failure(e)
+                if started or not is_overload_error(e) or attempt >= self.settings.max_retries:
+                    raise
+                retry_delay = self._backoff(attempt, e)
+            else:
+                self._on_success()
+                return
+            finally:
+                self.release()
+
+            attempt += 1
+            with self._lock:
+                self._counters["retries"] += 1
+            await asyncio.sleep(retry_delay)
+
+    def stats(self) -> dict[str, Any]:
+        """获取限流指标"""
+        with self._lock:
+            return {
+                "window": round(self._window, 2),
+                "inFlight": self._in_flight,
+                "queueDepth": len(self._waiters),
+                "circuitState": self._circuit_state(),
+                **self._counters,
+            }
+
+
+# ============================================
+# 注册表
+# ============================================
+
+_limiters: dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_provider_limiter(provider: str) -> ProviderLimiter:
+    """获取 (或创建) 提供商限流器"""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = ProviderLimiter(provider, LimiterSettings.from_env())
+            _limiters[provider] = limiter
+        return limiter
+
+
+def get_limiter_stats() -> dict[str, dict[str, Any]]:
+    """获取各提供商的限流指标"""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.provider: limiter.stats() for limiter in limiters}
+
+
+def reset_limiters() -> None:
+    """丢弃所有提供商限流器 (测试或配置变更后使用)"""
+    with _limiters_lock:
+        _limiters.clear()
+
+
+class LimitedRunnable:
+    """
+    让 Runnable 的 ainvoke/astream 经过提供商限流器
+
+    Args:
+        runnable: 被限流的 LangChain Runnable
+        provider: modelProvider
+    """
+
+    def __init__(self, runnable: Any, provider: str) -> None:
+        self.runnable = runnable
+        self.provider = provider
+
+    async def ainvoke(self, input: Any, config: Any = None, **kwargs: Any) -> Any:
+        if not is_limiter_enabled():
+            return await self.runnable.ainvoke(input, config, **kwargs)
+        return await get_provider_limiter(self.provider).run(
+            lambda: self.runnable.ainvoke(input, config, **kwargs)
+        )
+
+    async def astream(self, input: Any, config: Any = None, **kwargs: Any) -> AsyncIterator[Any]:
+        if not is_limiter_enabled():
+            async for chunk in self.runnable.astream(input, config, **kwargs):
+                yield chunk
+            return
+        async for chunk in get_provider_limiter(self.provider).stream(
+            lambda: self.runnable.astream(input, config, **kwargs)
+        ):
+            yield chunk
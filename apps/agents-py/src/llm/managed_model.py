@@ -0,0 +1,181 @@
+"""
+受管模型包装
+
+get_model_from_config 返回的模型外包一层 ManagedChatModel，
+在 ainvoke/astream 路径上挂载模型层策略: 相同请求合并 → 对冲请求 → 按提供商限流/重试/熔断。
+其余属性和方法透明转发给被包装的模型; bind_tools 等派生方法返回同样受管的对象，
+并同步应用到对冲用的等价模型上。with_config 绑定的配置 (如模型档位的追踪元数据)
+保存在包装层，跨 bind_tools/with_structured_output 保留并在调用时合并。
+"""
+
+from collections.abc import AsyncIterator
+from typing import Any, Optional
+
+from langchain_core.runnables import RunnableConfig, RunnableSequence, ensure_config
+from langchain_core.runnables.config import merge_configs
+
+from .coalesce import get_single_flight, is_coalescing_enabled, make_request_key
+from .hedging import HedgePolicy, hedged_ainvoke
+from .limiter import LimitedRunnable
+
+
+def _node_name(config: RunnableConfig) -> str:
+    return (config.get("metadata") or {}).get("langgraph_node", "")
+
+
+class ManagedChatModel:
+    """
+    模型层策略包装
+
+    Args:
+        runnable: 聊天模型，或其 bind_tools/with_structured_output 的结果
+        provider: get_model_config 解析出的 modelProvider
+        model_name: 解析后的模型名 (用于延迟统计)
+        hedge: 可选的等价模型 (同样是 ManagedChatModel)，用于对冲请求
+        bound_config: with_config 绑定的运行配置，调用时与传入的 config 合并
+    """
+
+    def __init__(
+        self,
+        runnable: Any,
+        *,
+        provider: str,
+        model_name: str = "",
+        hedge: Optional["ManagedChatModel"] = None,
+        bound_config: Optional[RunnableConfig] = None,
+    ) -> None:
+        self._runnable = runnable
+        self._provider = provider
+        self._model_name = model_name
+        self._hedge = hedge
+        self._bound_config = bound_config
+
+    @property
+    def wrapped(self) -> Any:
+        """被包装的 LangChain Runnable"""
+        return self._runnable
+
+    @property
+    def provider(self) -> str:
+        return self._provider
+
+    @property
+    def hedge(self) -> Optional["ManagedChatModel"]:
+        """对冲用的等价模型"""
+        return self._hedge
+
+    @property
+    def bound_config(self) -> RunnableConfig:
+        """with_config 绑定的运行配置"""
+        return self._bound_config or {}
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._runnable, name)
+
+    def __repr__(self) -> str:
+        return f"ManagedChatModel({self._runnable!r})"
+
+    def _derive(self, derive_method: str, /, *args: Any, **kwargs: Any) -> "ManagedChatModel":
+        # 仅位置参数: with_structured_output 自身有 method= 关键字参数
+        hedge = self._hedge._derive(derive_method, *args, **kwargs) if self._hedge is not None else None
+        return ManagedChatModel(
+            getattr(self._runnable, derive_method)(*args, **kwargs),
+            provider=self._provider,
+            model_name=self._model_name,
+            hedge=hedge,
+            bound_config=self._bound_config,
+        )
+
+    def _merge_config(self, config: Optional[RunnableConfig]) -> Optional[RunnableConfig]:
+        if not self._bound_config:
+            return config
+        return merge_configs(self._bound_config, config)
+
+    # ----- 派生 -----
+
+    def bind_tools(self, *args: Any, **kwargs: Any) -> "ManagedChatModel":
+        return self._derive("bind_tools", *args, **kwargs)
+
+    def with_structured_output(self, *args: Any, **kwargs: Any) -> "ManagedChatModel":
+        return self._derive("with_structured_output", *args, **kwargs)
+
+    def bind(self, **kwargs: Any) -> "ManagedChatModel":
+        return self._derive("bind", **kwargs)
+
+    def with_config(self, config: Optional[RunnableConfig] = None, **kwargs: Any) -> "ManagedChatModel":
+        hedge = self._hedge.with_config(config, **kwargs) if self._hedge is not None else None
+        return ManagedChatModel(
+            self._runnable,
+            provider=self._provider,
+            model_name=self._model_name,
+            hedge=hedge,
+            bound_config=merge_configs(self._bound_config, {**(config or {}), **kwargs}),
+        )
+
+    # ----- 上游调用 -----
+
+    async def _upstream_ainvoke(
+        self,
+        input: Any,
+        config: Optional[RunnableConfig],
+        kwargs: dict[str, Any],
+        node: str,
+    ) -> Any:
+        # 结构化输出链的流是解析后的对象，无法按消息块聚合，不做对冲
+        if self._hedge is not None and not isinstance(self._runnable, RunnableSequence):
+            policy = HedgePolicy.from_env()
+            if policy.applies_to(node):
+                return await hedged_ainvoke(
+                    LimitedRunnable(self._runnable, self._provider),
+                    LimitedRunnable(self._hedge.wrapped, self._hedge.provider),
+                    input,
+                    config,
+                    kwargs,
+                    node=node,
+                    latency_key=f"{self._provider}:{self._model_name}",
+                    policy=policy,
+                )
+        return await LimitedRunnable(self._runnable, self._provider).ainvoke(input, config, **kwargs)
+
+    # ----- 调用 -----
+
+    async def ainvoke(
+        self,
+        input: Any,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> Any:
+        config = self._merge_config(config)
+        merged = ensure_config(config)
+        node = _node_name(merged)
+
+        def call():
+            return self._upstream_ainvoke(input, config, kwargs, node)
+
+        if not is_coalescing_enabled(node, merged):
+            return await call()
+
+        key = make_request_key(self._runnable, input, kwargs, merged)
+        return await get_single_flight().do(key, call, node=node)
+
+    async def astream(
+        self,
+        input: Any,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[Any]:
+        config = self._merge_config(config)
+        merged = ensure_config(config)
+        node = _node_name(merged)
+
+        def stream():
+            return LimitedRunnable(self._runnable, self._provider).astream(input, config, **kwargs)
+
+        if not is_coalescing_enabled(node, merged):
+            async for chunk in stream():
+                yield chunk
+            return
+
+        key = make_request_key(self._runnable, input, kwargs, merged)
+        async for chunk in get_single_flight().stream(key, stream, node=node):
+            yield chunk
@@ -0,0 +1,230 @@
+"""
+提供商提示词缓存
+
+可选模式 (configurable.promptCaching 或 LLM_PROMPT_CACHING 环境变量):
+- 按稳定程度排列消息段: 指令/应用上下文 → 反思 → 上下文文档 → 工件 → 对话
+- Anthropic: 在系统提示词末尾和上下文文档末尾添加 cache_control 断点
+- OpenAI: 传入按线程划分的 prompt_cache_key，提高前缀缓存命中率
+- 统计响应中的缓存读取/写入 token 数，用于验证命中率
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Optional
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langgraph.types import RunnableConfig
+
+
+logger = logging.getLogger(__name__)
+
+PROMPT_CACHING_CONFIG_KEY = "promptCaching"
+
+# Anthropic 临时缓存断点
+EPHEMERAL_CACHE_CONTROL = {"type": "ephemeral"}
+
+
+# ============================================
+# 开关与提供商参数
+# ============================================
+
+
+def is_prompt_caching_enabled(config: RunnableConfig) -> bool:
+    """
+    判断当前运行是否启用提示词缓存模式
+
+    configurable.promptCaching 优先，未设置时读取 LLM_PROMPT_CACHING 环境变量
+    """
+    flag = config.get("configurable", {}).get(PROMPT_CACHING_CONFIG_KEY)
+    if flag is not None:
+        return bool(flag)
+    return os.environ.get("LLM_PROMPT_CACHING", "false").lower() in ("1", "true", "yes")
+
+
+def _get_model_provider(config: RunnableConfig) -> str:
+    # 延迟导入，避免与 utils 循环依赖
+    from ..utils import get_model_config
+
+    return get_model_config(config).get("modelProvider", "")
+
+
+def get_prompt_cache_key(config: RunnableConfig) -> str:
+    """按助手和线程生成 OpenAI prompt_cache_key"""
+    configurable = config.get("configurable", {})
+    assistant_id = configurable.get("assistant_id", "default")
+    thread_id = configurable.get("thread_id", "default")
+    return f"open-canvas:{assistant_id}:{thread_id}"
+
+
+def get_prompt_cache_invoke_kwargs(config: RunnableConfig) -> dict[str, Any]:
+    """
+    返回调用模型时需要附加的提示词缓存参数
+
+    Returns:
+        OpenAI 启用缓存时为 {"prompt_cache_key": ...}，否则为空字典
+    """
+    if not is_prompt_caching_enabled(config):
+        return {}
+    if _get_model_provider(config) == "openai":
+        return {"prompt_cache_key": get_prompt_cache_key(config)}
+    return {}
+
+
+# ============================================
+# 消息布局
+# ============================================
+
+
+def _text_blocks(texts: list[str], cache_last: bool) -> list[dict[str, Any]]:
+    blocks: list[dict[str, Any]] = [{"type": "text", "text": t} for t in texts]
+    if cache_last and blocks:
+        blocks[-1] = {**blocks[-1], "cache_control": EPHEMERAL_CACHE_CONTROL}
+    return blocks
+
+
+def _with_cache_breakpoint(context_document_messages: list[dict]) -> list[dict]:
+    """在最后一条上下文文档消息的最后一个内容块上添加 cache_control"""
+    if not context_document_messages:
+        return []
+
+    messages = [dict(m) for m in context_document_messages]
+    last = messages[-1]
+    content = last.get("content")
+    if isinstance(content, list) and content:
+        content = list(content)
+        content[-1] = {**content[-1], "cache_control": EPHEMERAL_CACHE_CONTROL}
+        last["content"] = content
+    return messages
+
+
+def build_prompt_cache_messages(
+    config: RunnableConfig,
+    *,
+    stable_segments: list[str],
+    context_document_messages: list[dict],
+    volatile: Optional[str],
+    conversation: list[BaseMessage],
+    use_system_role: bool = True,
+) -> list[Any]:
+    """
+    按稳定程度构建缓存友好的消息列表
+
+    顺序: 指令 (含用户系统提示词/应用上下文) → 反思 → 上下文文档 → 工件等易变内容 → 对话。
+    跨轮次不变的前缀越长，提供商前缀缓存命中越多。
+
+    Args:
+        config: LangGraph 运行配置
+        stable_segments: 跨轮次稳定的系统指令段 (用户系统提示词、含反思的节点提示词等)，空段会被忽略
+        context_document_messages: create_context_document_messages 的输出
+        volatile: 每轮变化的内容 (如当前工件)，放在文档之后
+        conversation: 对话消息
+        use_system_role: False 时 (O1 模型) 用用户消息承载系统提示词
+
+    Returns:
+        可直接传给模型的消息列表
+    """
+    provider = _get_model_provider(config)
+    is_anthropic = provider == "anthropic"
+    system_cls = SystemMessage if use_system_role else HumanMessage
+
+    stable_texts = [t for t in stable_segments if t]
+    if is_anthropic:
+        system_message = system_cls(content=_text_blocks(stable_texts, cache_last=True))
+        doc_messages = _with_cache_breakpoint(context_document_messages)
+    else:
+        system_message = system_cls(content="\n".join(stable_texts))
+        doc_messages = list(context_document_messages)
+
+    messages: list[Any] = [system_message, *doc_messages]
+
+    if volatile:
+        # OpenAI 允许中途出现系统消息；其他提供商要求系统消息在最前，改用用户消息
+        if use_system_role and provider in ("openai", "azure_openai"):
+            messages.append(SystemMessage(content=volatile))
+        else:
+            messages.append(HumanMessage(content=volatile))
+
+    messages.extend(conversation)
+    return messages
+
+
+# ============================================
+# 缓存命中统计
+# ============================================
+
+
+class PromptCacheStats:
+    """按节点累计输入 token 与缓存读取/写入 token"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._nodes: dict[str, dict[str, int]] = {}
+
+    def record(self, node: str, usage: dict[str, Any]) -> dict[str, int]:
+        details = usage.get("input_token_details") or {}
+        entry = {
+            "inputTokens": int(usage.get("input_tokens") or 0),
+            "cacheReadTokens": int(details.get("cache_read") or 0),
+            "cacheCreationTokens": int(details.get("cache_creation") or 0),
+        }
+        with self._lock:
+            totals = self._nodes.setdefault(
+                node,
+                {"calls": 0, "inputTokens": 0, "cacheReadTokens": 0, "cacheCreationTokens": 0},
+            )
+            totals["calls"] += 1
+            for key, value in entry.items():
+                totals[key] += value
+        return entry
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            result: dict[str, dict[str, Any]] = {}
+            for node, totals in self._nodes.items():
+                input_tokens = totals["inputTokens"]
+                result[node] = {
+                    **totals,
+                    "cacheHitRate": totals["cacheReadTokens"] / input_tokens if input_tokens else 0.0,
+                }
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._nodes.clear()
+
+
+_prompt_cache_stats = PromptCacheStats()
+
+
+def record_prompt_cache_usage(node: str, response: Any) -> Optional[dict[str, int]]:
+    """
+    记录一次模型响应的缓存 token 使用情况
+
+    Args:
+        node: 节点名称 (用于分组统计)
+        response: 模型返回的 AIMessage
+
+    Returns:
+        本次调用的 token 明细，响应不含 usage_metadata 时为 None
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if not isinstance(usage, dict):
+        return None
+
+    entry = _prompt_cache_stats.record(node, usage)
+    logger.info(
+        f"[prompt-cache] {node}: input={entry['inputTokens']} "
+        f"cache_read={entry['cacheReadTokens']} cache_creation={entry['cacheCreationTokens']}"
+    )
+    return entry
+
+
+def get_prompt_cache_stats() -> dict[str, dict[str, Any]]:
+    """获取各节点的提示词缓存统计"""
+    return _prompt_cache_stats.snapshot()
+
+
+def reset_prompt_cache_stats() -> None:
+    """重置提示词缓存统计"""
+    _prompt_cache_stats.reset()
@@ -0,0 +1,75 @@
+"""
+回调事件转发器
+
+推测执行的候选分支和对冲请求的备用请求都可能被丢弃，不能直接使用运行的回调处理器
+(流式事件会提前送达客户端)。转发器先缓存事件，确定保留后再回放到运行的处理器，
+之后的事件直接转发; 未提交的转发器连同其事件一起丢弃。
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional
+
+from langchain_core.callbacks import AsyncCallbackHandler, BaseCallbackHandler
+from langchain_core.callbacks.manager import ahandle_event
+
+
+# 转发的回调事件 → 处理器上对应的忽略开关 (与 langchain_core 回调管理器一致)
+RELAYED_EVENTS = {
+    "on_chat_model_start": "ignore_chat_model",
+    "on_llm_start": "ignore_llm",
+    "on_llm_new_token": "ignore_llm",
+    "on_llm_end": "ignore_llm",
+    "on_llm_error": "ignore_llm",
+    "on_chain_start": "ignore_chain",
+    "on_chain_end": "ignore_chain",
+    "on_chain_error": "ignore_chain",
+    "on_tool_start": "ignore_agent",
+    "on_tool_end": "ignore_agent",
+    "on_tool_error": "ignore_agent",
+    "on_retriever_start": "ignore_retriever",
+    "on_retriever_end": "ignore_retriever",
+    "on_retriever_error": "ignore_retriever",
+    "on_custom_event": "ignore_custom_event",
+}
+
+
+class CallbackRelay(AsyncCallbackHandler):
+    """
+    缓存回调事件，提交后回放并转发
+
+    提交前缓存产生的回调事件; commit 后按原顺序回放到运行的处理器，
+    并把之后的事件直接转发。未提交时事件随转发器丢弃。
+    """
+
+    def __init__(self) -> None:
+        self._events: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+        self._handlers: Optional[list[BaseCallbackHandler]] = None
+        self._lock = asyncio.Lock()
+
+    async def _relay(self, event: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> None:
+        async with self._lock:
+            if self._handlers is None:
+                self._events.append((event, args, kwargs))
+            else:
+                await ahandle_event(self._handlers, event, RELAYED_EVENTS[event], *args, **kwargs)
+
+    async def commit(self, handlers: list[BaseCallbackHandler]) -> None:
+        """回放已缓存的事件，之后的事件直接转发到 handlers"""
+        async with self._lock:
+            for event, args, kwargs in self._events:
+                await ahandle_event(handlers, event, RELAYED_EVENTS[event], *args, **kwargs)
+            self._events.clear()
+            self._handlers = handlers
+
+
+def _make_relay_method(event: str) -> Callable[..., Awaitable[None]]:
+    async def relay(self: CallbackRelay, *args: Any, **kwargs: Any) -> None:
+        await self._relay(event, args, kwargs)
+
+    relay.__name__ = event
+    return relay
+
+
+for _event in RELAYED_EVENTS:
+    setattr(CallbackRelay, _event, _make_relay_method(_event))
@@ -0,0 +1,348 @@
+"""
+确定性 LLM 调用的响应缓存
+
+temperature=0 的路由、分类、标题等调用是输入的纯函数。
+本模块实现 LangChain BaseCache，挂到这些调用使用的模型实例上:
+- 键: 规范化后的提示词 + 模型参数 + 绑定的工具 Schema (LangChain llm_string)
+- 内存层: 带 TTL 的 LRU
+- 可选磁盘层: SQLite (LLM_RESPONSE_CACHE=sqlite)，跨进程/重启复用
+- 统计命中率；内存操作加锁，SQLite 读写在线程中执行，不阻塞事件循环
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+
+logger = logging.getLogger(__name__)
+
+# 历史消息中与语义无关、每次调用都会变化的字段
+_VOLATILE_MESSAGE_FIELDS = frozenset({"id", "response_metadata", "usage_metadata"})
+
+
+# ============================================
+# 缓存键
+# ============================================
+
+
+def _strip_volatile_fields(node: Any) -> Any:
+    if isinstance(node, dict):
+        return {
+            key: _strip_volatile_fields(value)
+            for key, value in node.items()
+            if key not in _VOLATILE_MESSAGE_FIELDS
+        }
+    if isinstance(node, list):
+        return [_strip_volatile_fields(item) for item in node]
+    return node
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    规范化 LangChain 序列化后的提示词
+
+    去除消息 id、response_metadata、usage_metadata 等易变字段，并按键排序，
+    使内容相同的重复/重新生成轮次得到相同的键。
+    """
+    try:
+        parsed = json.loads(prompt)
+    except (TypeError, ValueError):
+        return prompt
+    return json.dumps(_strip_volatile_fields(parsed), sort_keys=True, ensure_ascii=False)
+
+
+def make_cache_key(prompt: str, llm_string: str) -> str:
+    """根据规范化提示词和模型参数字符串生成缓存键"""
+    digest = hashlib.sha256()
+    digest.update(normalize_prompt(prompt).encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(llm_string.encode("utf-8"))
+    return digest.hexdigest()
+
+
+# ============================================
+# SQLite 磁盘层
+# ============================================
+
+
+class SQLiteResponseStore:
+    """SQLite 持久化层，值为 LangChain 序列化的 Generation 列表"""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str, ttl_seconds: Optional[float]) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if ttl_seconds and time.time() - created_at > ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# ============================================
+# 响应缓存
+# ============================================
+
+
+class ResponseCache(BaseCache):
+    """
+    LRU + TTL 内存缓存，可选 SQLite 磁盘层
+
+    Args:
+        max_size: 内存中最多保留的响应数
+        ttl_seconds: 过期时间 (秒)，None 或 0 表示不过期
+        store: 可选的 SQLite 磁盘层
+    """
+
+    def __init__(
+        self,
+        max_size: int = 512,
+        ttl_seconds: Optional[float] = 3600,
+        store: Optional[SQLiteResponseStore] = None,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+        self._entries: OrderedDict[str, tuple[float, RETURN_VAL_TYPE]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def _is_expired(self, created_at: float) -> bool:
+        return bool(self.ttl_seconds) and time.monotonic() - created_at > self.ttl_seconds
+
+    def _memory_get(self, key: str) -> Optional[RETURN_VAL_TYPE]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, value = entry
+            if self._is_expired(created_at):
+                del self._entries[key]
+                self._expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def _memory_set(self, key: str, value: RETURN_VAL_TYPE) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def _load_from_store(self, key: str) -> Optional[RETURN_VAL_TYPE]:
+        if self.store is None:
+            return None
+        raw = self.store.get(key, self.ttl_seconds)
+        if raw is None:
+            return None
+        try:
+            try:
+                value = loads(raw, allowed_objects="core")
+            except TypeError:
+                # 旧版 langchain-core 不支持 allowed_objects
+                value = loads(raw)
+        except Exception as e:
+            logger.warning(f"Failed to deserialize cached response: {e}")
+            return None
+        return value
+
+    def _record_lookup(self, value: Optional[RETURN_VAL_TYPE], from_disk: bool) -> None:
+        with self._lock:
+            if value is None:
+                self._misses += 1
+            elif from_disk:
+                self._disk_hits += 1
+
+    # ----- BaseCache 接口 -----
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = make_cache_key(prompt, llm_string)
+        value = self._memory_get(key)
+        if value is not None:
+            return value
+
+        value = self._load_from_store(key)
+        if value is not None:
+            self._memory_set(key, value)
+        self._record_lookup(value, from_disk=True)
+        return value
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = make_cache_key(prompt, llm_string)
+        self._memory_set(key, return_val)
+        if self.store is not None:
+            self.store.set(key, dumps(return_val))
+
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = make_cache_key(prompt, llm_string)
+        value = self._memory_get(key)
+        if value is not None:
+            return value
+        if self.store is None:
+            self._record_lookup(None, from_disk=False)
+            return None
+
+        value = await asyncio.to_thread(self._load_from_store, key)
+        if value is not None:
+            self._memory_set(key, value)
+        self._record_lookup(value, from_disk=True)
+        return value
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = make_cache_key(prompt, llm_string)
+        self._memory_set(key, return_val)
+        if self.store is not None:
+            await asyncio.to_thread(self.store.set, key, dumps(return_val))
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    async def aclear(self, **kwargs: Any) -> None:
+        self.clear(**kwargs)
+
+    def stats(self) -> dict[str, Any]:
+        """获取缓存统计 (hits 包含内存与磁盘命中)"""
+        with self._lock:
+            hits = self._hits + self._disk_hits
+            total = hits + self._misses
+            return {
+                "backend": "sqlite" if self.store is not None else "memory",
+                "size": len(self._entries),
+                "maxSize": self.max_size,
+                "ttlSeconds": self.ttl_seconds,
+                "hits": hits,
+                "memoryHits": self._hits,
+                "diskHits": self._disk_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "hitRate": hits / total if total else 0.0,
+            }
+
+
+# ============================================
+# 进程级单例
+# ============================================
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def _build_response_cache_from_env() -> Optional[ResponseCache]:
+    backend = os.environ.get("LLM_RESPONSE_CACHE", "memory").lower()
+    if backend in ("off", "false", "0", "none", ""):
+        return None
+
+    max_size = int(os.environ.get("LLM_RESPONSE_CACHE_SIZE", "512"))
+    ttl_seconds = float(os.environ.get("LLM_RESPONSE_CACHE_TTL", "3600"))
+
+    store = None
+    if backend == "sqlite":
+        path = os.environ.get("LLM_RESPONSE_CACHE_PATH", ".cache/llm_responses.sqlite")
+        try:
+            store = SQLiteResponseStore(path)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Response cache SQLite backend unavailable ({path}): {e}")
+
+    return ResponseCache(max_size=max_size, ttl_seconds=ttl_seconds, store=store)
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    获取进程级响应缓存
+
+    由 LLM_RESPONSE_CACHE 控制: memory (默认) / sqlite / off
+
+    Returns:
+        ResponseCache 实例，禁用时为 None
+    """
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = _build_response_cache_from_env()
+    return _response_cache
+
+
+def get_response_cache_stats() -> dict[str, Any]:
+    """获取响应缓存统计，禁用时返回 {"backend": "off"}"""
+    cache = get_response_cache()
+    return cache.stats() if cache is not None else {"backend": "off"}
+
+
+def clear_response_cache() -> None:
+    """清空响应缓存 (包括磁盘层)"""
+    cache = get_response_cache()
+    if cache is not None:
+        cache.clear()
+
+
+def attach_response_cache(model: Any, cache: Optional[ResponseCache]) -> Any:
+    """
+    将响应缓存挂到模型实例上
+
+    Args:
+        model: BaseChatModel 实例
+        cache: 响应缓存，None 时不做修改
+
+    Returns:
+        同一个模型实例
+    """
+    if cache is not None:
+        model.cache = cache
+    return model
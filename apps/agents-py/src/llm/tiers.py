@@ -0,0 +1,150 @@
+"""
+模型档位策略
+
+将每个 LLM 调用点映射到 "fast" 或 "quality" 档位:
+- quality: 用户选择的 customModelName (主内容生成节点)
+- fast: 路由、元数据判断、追问、分类、检索词生成、反思、标题等辅助调用，
+  使用同一提供商的小模型，避免在是/否判断上等待推理模型
+
+fast 档位模型按以下优先级解析:
+configurable.fastModelName > LLM_FAST_MODEL > LLM_FAST_MODELS 中的提供商映射 > 内置默认值。
+LLM_FAST_MODEL="ollama-llama3.3" 可将所有辅助调用切到本地 Ollama。
+
+解析出的档位和调用点写入运行元数据 (model_tier / model_call_site) 与标签，便于在追踪中查看。
+"""
+
+import os
+from typing import Any, Literal, Optional
+
+from langchain_core.runnables import RunnableConfig
+
+
+ModelTier = Literal["fast", "quality"]
+
+# 调用点 → 默认档位 (未列出的调用点使用 quality)
+DEFAULT_CALL_SITE_TIERS: dict[str, ModelTier] = {
+    "routeQuery": "fast",
+    "urlIntent": "fast",
+    "artifactMeta": "fast",
+    "generateFollowup": "fast",
+    "classifyMessage": "fast",
+    "queryGenerator": "fast",
+    "reflection": "fast",
+    "threadTitle": "fast",
+}
+
+# 提供商 → 默认 fast 档位模型 (customModelName 形式)
+# Azure 只配置了单个部署，Fireworks/Groq/Ollama 工具调用模型已固定，均沿用用户模型
+DEFAULT_FAST_MODELS: dict[str, str] = {
+    "openai": "gpt-4o-mini",
+    "anthropic": "claude-haiku-4-5",
+    "google-genai": "gemini-2.0-flash",
+}
+
+
+def _parse_mapping(raw: str) -> dict[str, str]:
+    """解析 "a=b,c=d" 形式的环境变量"""
+    mapping: dict[str, str] = {}
+    for item in raw.split(","):
+        key, sep, value = item.partition("=")
+        if sep and key.strip() and value.strip():
+            mapping[key.strip()] = value.strip()
+    return mapping
+
+
+def is_model_tiering_enabled(config: Optional[RunnableConfig] = None) -> bool:
+    """
+    判断是否启用模型档位策略
+
+    Args:
+        config: 运行配置，configurable.modelTiering 优先于 LLM_MODEL_TIERS 环境变量
+
+    Returns:
+        是否启用 (默认启用)
+    """
+    configurable = (config or {}).get("configurable", {}) or {}
+    if configurable.get("modelTiering") is not None:
+        return bool(configurable["modelTiering"])
+    return os.environ.get("LLM_MODEL_TIERS", "true").lower() in ("1", "true", "yes")
+
+
+def resolve_call_site_tier(call_site: str, config: Optional[RunnableConfig] = None) -> ModelTier:
+    """
+    解析调用点的档位
+
+    Args:
+        call_site: 调用点名称 (见 DEFAULT_CALL_SITE_TIERS)
+        config: 运行配置，configurable.modelTiers 可按调用点覆盖
+
+    Returns:
+        "fast" 或 "quality"
+    """
+    if not is_model_tiering_enabled(config):
+        return "quality"
+
+    configurable = (config or {}).get("configurable", {}) or {}
+    overrides: dict[str, Any] = {
+        **_parse_mapping(os.environ.get("LLM_MODEL_TIER_OVERRIDES", "")),
+        **(configurable.get("modelTiers") or {}),
+    }
+    tier = overrides.get(call_site, DEFAULT_CALL_SITE_TIERS.get(call_site, "quality"))
+    return "fast" if tier == "fast" else "quality"
+
+
+def resolve_fast_model_name(config: RunnableConfig, provider: str) -> Optional[str]:
+    """
+    解析 fast 档位使用的 customModelName
+
+    Args:
+        config: 运行配置
+        provider: 用户模型的 modelProvider
+
+    Returns:
+        customModelName，None 表示沿用用户模型
+    """
+    configurable = config.get("configurable", {}) or {}
+    explicit = configurable.get("fastModelName") or os.environ.get("LLM_FAST_MODEL")
+    if explicit:
+        return explicit
+
+    per_provider = _parse_mapping(os.environ.get("LLM_FAST_MODELS", ""))
+    return per_provider.get(provider) or DEFAULT_FAST_MODELS.get(provider)
+
+
+def apply_model_tier(
+    config: RunnableConfig,
+    call_site: str,
+    provider: str,
+) -> tuple[RunnableConfig, ModelTier]:
+    """
+    按调用点档位改写运行配置中的模型
+
+    Args:
+        config: 运行配置
+        call_site: 调用点名称
+        provider: 用户模型的 modelProvider
+
+    Returns:
+        (用于创建模型的配置, 档位)。切换模型时丢弃用户模型的 modelConfig，
+        其温度/最大 token 范围只对用户选择的模型有效
+    """
+    tier = resolve_call_site_tier(call_site, config)
+    if tier != "fast":
+        return config, tier
+
+    configurable = config.get("configurable", {}) or {}
+    fast_model_name = resolve_fast_model_name(config, provider)
+    if not fast_model_name or fast_model_name == configurable.get("customModelName"):
+        return config, tier
+
+    tier_configurable = {**configurable, "customModelName": fast_model_name}
+    tier_configurable.pop("modelConfig", None)
+    return {**config, "configurable": tier_configurable}, tier
+
+
+def get_tier_tracing_config(call_site: str, tier: ModelTier) -> RunnableConfig:
+    """返回写入追踪的档位元数据与标签"""
+    return {
+        "metadata": {"model_tier": tier, "model_call_site": call_site},
+        "tags": [f"model_tier:{tier}"],
+    }
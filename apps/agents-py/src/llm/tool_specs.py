@@ -0,0 +1,194 @@
+"""
+预编译工具 Schema 与绑定模型缓存
+
+节点每轮调用 bind_tools/with_structured_output 时，LangChain 都会从 Pydantic 类重新生成
+JSON Schema 并构造新的 Runnable。本模块:
+- 按 Schema 类缓存转换后的 OpenAI 格式工具定义 (各提供商的 bind_tools 均接受该格式)
+- 按 (模型实例, 工具, tool_choice) 缓存绑定后的 Runnable
+
+模型实例来自进程级模型客户端缓存，因此同一配置下每轮对话直接复用绑定结果。
+绑定缓存以弱引用持有模型，模型被客户端缓存淘汰后对应条目自动释放。
+"""
+
+import json
+import threading
+import weakref
+from typing import Any, Optional, Sequence
+
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+
+# ============================================
+# 工具 Schema 预编译
+# ============================================
+
+_compiled_specs: dict[Any, dict[str, Any]] = {}
+_compiled_lock = threading.Lock()
+
+
+def _spec_key(tool: Any) -> Any:
+    if isinstance(tool, dict):
+        return json.dumps(tool, sort_keys=True, default=str)
+    return tool
+
+
+def precompile_tool_spec(tool: Any) -> dict[str, Any]:
+    """
+    获取工具的 OpenAI 格式定义 (按 Schema 缓存)
+
+    Args:
+        tool: Pydantic 类、函数或工具定义字典
+
+    Returns:
+        OpenAI 格式工具定义
+    """
+    key = _spec_key(tool)
+    spec = _compiled_specs.get(key)
+    if spec is None:
+        spec = convert_to_openai_tool(tool)
+        with _compiled_lock:
+            _compiled_specs.setdefault(key, spec)
+    return spec
+
+
+def precompile_tool_specs(*tools: Any) -> None:
+    """在模块导入时预编译一组工具定义"""
+    for tool in tools:
+        precompile_tool_spec(tool)
+
+
+# ============================================
+# 绑定模型缓存
+# ============================================
+
+
+class BoundModelCache:
+    """
+    按模型实例缓存 bind_tools/with_structured_output 的结果
+
+    外层为以模型为键的 WeakKeyDictionary，内层键为 (方法, 工具, 参数)。
+    """
+
+    def __init__(self) -> None:
+        self._entries: "weakref.WeakKeyDictionary[Any, dict[Any, Any]]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_bind(self, model: Any, key: Any, bind: Any) -> Any:
+        """
+        获取缓存的绑定结果，不存在时调用 bind 创建
+
+        Args:
+            model: 模型实例
+            key: 绑定参数键
+            bind: 无参绑定函数
+
+        Returns:
+            绑定后的 Runnable
+        """
+        try:
+            with self._lock:
+                bound = self._entries.setdefault(model, {}).get(key)
+        except TypeError:
+            # 不可哈希/不支持弱引用的模型不缓存
+            return bind()
+
+        if bound is not None:
+            with self._lock:
+                self._hits += 1
+            return bound
+
+        bound = bind()
+        with self._lock:
+            self._misses += 1
+            self._entries.setdefault(model, {})[key] = bound
+        return bound
+
+    def clear(self) -> None:
+        """清空缓存并重置计数器"""
+        with self._lock:
+            self._entries = weakref.WeakKeyDictionary()
+            self._hits = 0
+            self._misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        """返回命中/未命中计数和当前条目数"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "models": len(self._entries),
+                "bindings": sum(len(v) for v in self._entries.values()),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hitRate": self._hits / total if total else 0.0,
+            }
+
+
+_bound_model_cache = BoundModelCache()
+
+
+def _kwargs_key(kwargs: dict[str, Any]) -> str:
+    return json.dumps(kwargs, sort_keys=True, default=str)
+
+
+def bind_tools_cached(
+    model: Any,
+    tools: Sequence[Any],
+    *,
+    tool_choice: Optional[Any] = None,
+    **kwargs: Any,
+) -> Any:
+    """
+    使用预编译的工具定义绑定工具，并按模型实例缓存结果
+
+    Args:
+        model: get_model_from_config 返回的模型
+        tools: 工具 Schema 列表
+        tool_choice: 强制调用的工具
+        **kwargs: 透传给 bind_tools 的其他参数
+
+    Returns:
+        绑定工具后的模型
+    """
+    key = (
+        "bind_tools",
+        tuple(_spec_key(tool) for tool in tools),
+        _kwargs_key({"tool_choice": tool_choice, **kwargs}),
+    )
+
+    def bind() -> Any:
+        specs = [precompile_tool_spec(tool) for tool in tools]
+        return model.bind_tools(specs, tool_choice=tool_choice, **kwargs)
+
+    return _bound_model_cache.get_or_bind(model, key, bind)
+
+
+def with_structured_output_cached(model: Any, schema: Any, **kwargs: Any) -> Any:
+    """
+    with_structured_output 的缓存版本
+
+    输出解析需要原始 Schema 类，因此这里只缓存绑定结果，不替换为预编译定义。
+
+    Args:
+        model: get_model_from_config 返回的模型
+        schema: 输出 Schema
+        **kwargs: 透传给 with_structured_output 的参数
+
+    Returns:
+        结构化输出 Runnable
+    """
+    key = ("with_structured_output", _spec_key(schema), _kwargs_key(kwargs))
+    return _bound_model_cache.get_or_bind(
+        model, key, lambda: model.with_structured_output(schema, **kwargs)
+    )
+
+
+def get_tool_binding_stats() -> dict[str, Any]:
+    """获取绑定模型缓存统计"""
+    return {**_bound_model_cache.stats(), "compiledSpecs": len(_compiled_specs)}
+
+
+def clear_tool_binding_cache() -> None:
+    """清空绑定模型缓存"""
+    _bound_model_cache.clear()
@@ -0,0 +1,418 @@
+"""
+共享 HTTP 传输层
+
+为每个 LLM 提供商端点构建一个调优过的 httpx.AsyncClient，并在所有节点、
+运行和图 (agent / reflection / thread_title / summarizer / web_search) 之间共享，
+让 keep-alive 连接得以复用，避免每个 SDK 客户端各自维护连接池。
+
+配置 (环境变量):
+    LLM_SHARED_TRANSPORT: 是否启用共享传输 (默认 true)
+    LLM_HTTP_MAX_CONNECTIONS: 每个端点最大连接数 (默认 200)
+    LLM_HTTP_MAX_KEEPALIVE: 每个端点最大 keep-alive 连接数 (默认 50)
+    LLM_HTTP_KEEPALIVE_EXPIRY: 空闲连接保留秒数 (默认 60)
+    LLM_HTTP_CONNECT_TIMEOUT / LLM_HTTP_READ_TIMEOUT /
+    LLM_HTTP_WRITE_TIMEOUT / LLM_HTTP_POOL_TIMEOUT: 超时秒数
+    LLM_HTTP2: "auto" (安装了 h2 时启用) / "true" / "false"
+"""
+
+import functools
+import importlib
+import importlib.util
+import inspect
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# 默认端点
+# ============================================
+
+DEFAULT_PROVIDER_ENDPOINTS: dict[str, str] = {
+    "openai": "https://api.openai.com",
+    "anthropic": "https://api.anthropic.com",
+    "google-genai": "https://generativelanguage.googleapis.com",
+    "fireworks": "https://api.fireworks.ai",
+    "groq": "https://api.groq.com",
+}
+
+
+# ============================================
+# 传输配置
+# ============================================
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+@dataclass(frozen=True)
+class HttpTransportSettings:
+    """共享 HTTP 客户端的连接池与超时设置"""
+
+    max_connections: int = 200
+    max_keepalive_connections: int = 50
+    keepalive_expiry: float = 60.0
+    connect_timeout: float = 10.0
+    read_timeout: float = 600.0
+    write_timeout: float = 60.0
+    pool_timeout: float = 30.0
+    http2: bool = False
+
+    @classmethod
+    def from_env(cls) -> "HttpTransportSettings":
+        """从环境变量读取设置"""
+        http2_flag = os.environ.get("LLM_HTTP2", "auto").lower()
+        if http2_flag == "auto":
+            http2 = importlib.util.find_spec("h2") is not None
+        else:
+            http2 = http2_flag in ("1", "true", "yes")
+
+        return cls(
+            max_connections=_env_int("LLM_HTTP_MAX_CONNECTIONS", cls.max_connections),
+            max_keepalive_connections=_env_int(
+                "LLM_HTTP_MAX_KEEPALIVE", cls.max_keepalive_connections
+            ),
+            keepalive_expiry=_env_float("LLM_HTTP_KEEPALIVE_EXPIRY", cls.keepalive_expiry),
+            connect_timeout=_env_float("LLM_HTTP_CONNECT_TIMEOUT", cls.connect_timeout),
+            read_timeout=_env_float("LLM_HTTP_READ_TIMEOUT", cls.read_timeout),
+            write_timeout=_env_float("LLM_HTTP_WRITE_TIMEOUT", cls.write_timeout),
+            pool_timeout=_env_float("LLM_HTTP_POOL_TIMEOUT", cls.pool_timeout),
+            http2=http2,
+        )
+
+    def client_kwargs(self, httpx_module: ModuleType = httpx) -> dict[str, Any]:
+        """
+        返回可直接传给 httpx 客户端构造函数的参数
+
+        Args:
+            httpx_module: httpx 兼容模块 (部分新版 SDK 使用 httpx2)
+        """
+        return {
+            "limits": httpx_module.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            "timeout": httpx_module.Timeout(
+                connect=self.connect_timeout,
+                read=self.read_timeout,
+                write=self.write_timeout,
+                pool=self.pool_timeout,
+            ),
+            "http2": self.http2,
+        }
+
+
+def is_shared_transport_enabled() -> bool:
+    """是否启用共享传输层"""
+    return os.environ.get("LLM_SHARED_TRANSPORT", "true").lower() not in ("0", "false", "no")
+
+
+# ============================================
+# 端点级客户端池
+# ============================================
+
+
+def _endpoint_key(url: str) -> str:
+    """将 URL 规范化为 scheme://host[:port] 形式的端点键"""
+    parts = urlsplit(url if "://" in url else f"https://{url}")
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def _sdk_httpx_module(sdk_name: str) -> ModuleType:
+    """
+    返回提供商 SDK 期望的 httpx 兼容模块
+
+    Stainless 生成的 SDK (openai / anthropic / groq / fireworks) 的新版本
+    改用 httpx2，只接受对应模块的客户端实例。
+    """
+    try:
+        base_client = importlib.import_module(f"{sdk_name}._base_client")
+    except ImportError:
+        return httpx
+    return getattr(base_client, "httpx2", None) or getattr(base_client, "httpx", httpx)
+
+
+class _EndpointStats:
+    """单个端点的请求计数"""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.responses = 0
+        self.status_classes: dict[str, int] = {}
+
+
+class HttpClientPool:
+    """
+    按端点共享的 httpx.AsyncClient 池
+
+    每个端点 (scheme://host:port) 只创建一个 AsyncClient，所有提供商 SDK 共用。
+    """
+
+    def __init__(self, settings: Optional[HttpTransportSettings] = None):
+        self._settings = settings
+        self._clients: dict[tuple[str, str], Any] = {}
+        self._stats: dict[tuple[str, str], _EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def settings(self) -> HttpTransportSettings:
+        if self._settings is None:
+            self._settings = HttpTransportSettings.from_env()
+        return self._settings
+
+    def get_async_client(
+        self,
+        endpoint: str,
+        httpx_module: ModuleType = httpx,
+    ) -> Any:
+        """
+        获取 (必要时创建) 指定端点的共享 AsyncClient
+
+        Args:
+            endpoint: 提供商 API 端点 URL
+            httpx_module: 构建客户端使用的 httpx 兼容模块
+        """
+        key = (_endpoint_key(endpoint), httpx_module.__name__)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None or client.is_closed:
+                client = self._build_client(key, httpx_module)
+                self._clients[key] = client
+            return client
+
+    def _build_client(self, key: tuple[str, str], httpx_module: ModuleType) -> Any:
+        stats = self._stats.setdefault(key, _EndpointStats())
+
+        async def on_request(request: Any) -> None:
+            stats.requests += 1
+
+        async def on_response(response: Any) -> None:
+            stats.responses += 1
+            status_class = f"{response.status_code // 100}xx"
+            stats.status_classes[status_class] = stats.status_classes.get(status_class, 0) + 1
+
+        settings = self.settings
+        logger.debug(
+            "Creating shared HTTP client for %s (http2=%s, max_connections=%s)",
+            key,
+            settings.http2,
+            settings.max_connections,
+        )
+        return httpx_module.AsyncClient(
+            **settings.client_kwargs(httpx_module),
+            event_hooks={"request": [on_request], "response": [on_response]},
+        )
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """返回每个端点的连接池统计 (非 httpx 模块的客户端以 "#模块名" 后缀区分)"""
+        with self._lock:
+            items = list(self._clients.items())
+
+        result: dict[str, dict[str, Any]] = {}
+        for key, client in items:
+            endpoint, module_name = key
+            stats = self._stats.get(key, _EndpointStats())
+            connections, idle = _pool_connection_counts(client)
+            label = endpoint if module_name == "httpx" else f"{endpoint}#{module_name}"
+            result[label] = {
+                "requests": stats.requests,
+                "responses": stats.responses,
+                "statusClasses": dict(stats.status_classes),
+                "connections": connections,
+                "idleConnections": idle,
+                "maxConnections": self.settings.max_connections,
+                "http2": self.settings.http2,
+                "closed": client.is_closed,
+            }
+        return result
+
+    async def aclose(self) -> None:
+        """关闭所有共享客户端"""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+
+def _pool_connection_counts(client: Any) -> tuple[int, int]:
+    """尽力读取 httpcore 连接池的连接数/空闲连接数 (内部 API，失败时返回 0)"""
+    try:
+        pool = client._transport._pool  # type: ignore[attr-defined]
+        connections = list(pool.connections)
+        idle = sum(1 for conn in connections if conn.is_idle())
+        return len(connections), idle
+    except Exception:
+        return 0, 0
+
+
+_http_client_pool = HttpClientPool()
+
+
+def get_http_client_pool() -> HttpClientPool:
+    """获取进程级 HTTP 客户端池"""
+    return _http_client_pool
+
+
+def get_http_pool_stats() -> dict[str, dict[str, Any]]:
+    """获取进程级 HTTP 连接池统计"""
+    return _http_client_pool.stats()
+
+
+# ============================================
+# 提供商注入
+# ============================================
+
+
+def resolve_provider_endpoint(provider: str, model_cfg: dict[str, Any]) -> Optional[str]:
+    """
+    解析提供商的 API 端点
+
+    Args:
+        provider: get_model_config 解析出的 modelProvider
+        model_cfg: get_model_config 返回的完整配置
+
+    Returns:
+        端点 URL，未知提供商返回 None
+    """
+    if provider == "azure_openai":
+        azure_cfg = model_cfg.get("azureConfig") or {}
+        base_path = azure_cfg.get("azureOpenAIBasePath")
+        if base_path:
+            return base_path
+        return f"https://{azure_cfg.get('azureOpenAIApiInstanceName')}.openai.azure.com"
+    if provider == "ollama":
+        return model_cfg.get("baseUrl", "http://localhost:11434")
+    if provider == "openai":
+        return os.environ.get("OPENAI_BASE_URL") or DEFAULT_PROVIDER_ENDPOINTS["openai"]
+    if provider == "anthropic":
+        return os.environ.get("ANTHROPIC_BASE_URL") or DEFAULT_PROVIDER_ENDPOINTS["anthropic"]
+    return DEFAULT_PROVIDER_ENDPOINTS.get(provider)
+
+
+def get_provider_transport_kwargs(provider: str, model_cfg: dict[str, Any]) -> dict[str, Any]:
+    """
+    返回注入到提供商构造函数的传输参数
+
+    - openai / azure_openai / groq: 共享 http_async_client
+    - fireworks: 基于共享客户端构建的 async_client
+    - google-genai / ollama: SDK 自建客户端，只能传入调优后的 httpx 参数
+    - anthropic: 构造函数不接受客户端，见 attach_shared_transport
+
+    Returns:
+        构造参数字典 (禁用共享传输或未知提供商时为空)
+    """
+    if not is_shared_transport_enabled():
+        return {}
+
+    endpoint = resolve_provider_endpoint(provider, model_cfg)
+    if not endpoint:
+        return {}
+
+    pool = get_http_client_pool()
+
+    if provider in ("openai", "azure_openai", "groq"):
+        sdk_name = "groq" if provider == "groq" else "openai"
+        return {
+            "http_async_client": pool.get_async_client(endpoint, _sdk_httpx_module(sdk_name))
+        }
+
+    if provider == "fireworks":
+        api_key = model_cfg.get("apiKey") or os.environ.get("FIREWORKS_API_KEY")
+        if not api_key:
+            return {}
+        try:
+            from fireworks import AsyncFireworks
+
+            # 与 langchain-fireworks 一致: 重试由 LangChain 负责，关闭 SDK 重试
+            sdk_client = AsyncFireworks(
+                api_key=api_key,
+                http_client=pool.get_async_client(endpoint, _sdk_httpx_module("fireworks")),
+                max_retries=0,
+            )
+        except Exception as e:
+            # 旧版 fireworks-ai SDK 不支持注入 http_client
+            logger.warning(f"Failed to build shared Fireworks client: {e}")
+            return {}
+        return {"async_client": sdk_client.chat.completions}
+
+    if provider == "google-genai":
+        return {"client_args": pool.settings.client_kwargs()}
+
+    if provider == "ollama":
+        # Ollama 通常是本地 HTTP/1.1 服务
+        return {"client_kwargs": {**pool.settings.client_kwargs(), "http2": False}}
+
+    return {}
+
+
+def _supports_async_client_override(model: Any) -> bool:
+    """
+    模型类是否以 cached_property `_async_client` + `_client_params` 懒加载 SDK 客户端
+
+    ChatAnthropic 没有接受 HTTP 客户端的构造参数，注入依赖这两个内部属性;
+    pyproject 将 langchain-anthropic 限制在已验证的 1.x 版本 (见 test_llm_transport.py)。
+    """
+    cls = type(model)
+    return isinstance(inspect.getattr_static(cls, "_async_client", None), functools.cached_property) and (
+        inspect.getattr_static(cls, "_client_params", None) is not None
+    )
+
+
+def attach_shared_transport(provider: str, model: Any, model_cfg: dict[str, Any]) -> Any:
+    """
+    为构造函数不接受 HTTP 客户端的提供商注入共享传输
+
+    ChatAnthropic 通过 cached_property `_async_client` 懒加载 SDK 客户端，
+    这里预先填充一个使用共享 httpx 客户端的 anthropic.AsyncClient。
+    langchain-anthropic 内部结构不符合预期时不注入，使用 SDK 默认客户端。
+
+    Returns:
+        传入的模型实例
+    """
+    if provider != "anthropic" or not is_shared_transport_enabled():
+        return model
+
+    if not _supports_async_client_override(model):
+        logger.warning(
+            f"{type(model).__name__} does not expose a cached _async_client, "
+            "using the SDK default HTTP client"
+        )
+        return model
+
+    endpoint = resolve_provider_endpoint(provider, model_cfg)
+    try:
+        import anthropic
+
+        client_params = dict(model._client_params)
+        model.__dict__["_async_client"] = anthropic.AsyncClient(
+            **client_params,
+            http_client=get_http_client_pool().get_async_client(
+                endpoint, _sdk_httpx_module("anthropic")
+            ),
+        )
+    except Exception as e:
+        logger.warning(f"Failed to attach shared transport to ChatAnthropic: {e}")
+
+    return model
@@ -0,0 +1,20 @@
+"""
+Open Canvas 上下文文档
+
+跨轮次的文档消息索引与附件引用展开
+"""
+
+from .attachments import externalize_document_parts, resolve_attachment_refs
+from .tracking import (
+    detect_document_format,
+    get_document_tracking_stats,
+    provider_document_format,
+)
+
+__all__ = [
+    "externalize_document_parts",
+    "resolve_attachment_refs",
+    "detect_document_format",
+    "get_document_tracking_stats",
+    "provider_document_format",
+]
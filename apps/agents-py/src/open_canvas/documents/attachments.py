@@ -0,0 +1,173 @@
+"""
+文档消息中的附件引用
+
+convert_context_document_to_human_message 生成的文档消息不再内联 base64 PDF:
+原生 PDF 片段 (Anthropic document / Gemini application/pdf) 保存到附件存储
+(src/documents/attachments.py)，消息中只保留引用片段。节点在调用模型前通过
+resolve_attachment_refs 把引用展开为当前提供商的格式:
+
+- OpenAI / Azure OpenAI: 文本片段 (经 PDF 文本缓存，不重复解析)
+- Anthropic: document 片段
+- Google Gemini: application/pdf 片段
+- 其他提供商: 按引用替换的原片段格式展开
+
+引用与提供商无关，切换模型提供商时无需 fix_mis_formatted_context_doc_message 改写消息。
+"""
+
+import asyncio
+import logging
+from typing import Any, Optional
+
+from langchain_core.messages import BaseMessage
+from langgraph.store.base import BaseStore
+from langgraph.types import RunnableConfig
+
+from ...documents.attachments import (
+    attachment_missing_marker,
+    attachment_ref,
+    get_attachment_store,
+    is_attachment_ref,
+)
+from ...documents.hashing import content_hash
+from ...utils import clean_base64, convert_pdf_to_text, get_config_store
+from .tracking import (
+    FORMAT_ANTHROPIC,
+    FORMAT_GEMINI,
+    FORMAT_TEXT,
+    provider_document_format,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# 引用化
+# ============================================
+
+
+def _native_document_data(part: Any) -> Optional[tuple[str, str, str]]:
+    """原生 PDF 片段的 (base64 内容, MIME 类型, 格式)，其他片段返回 None"""
+    if not isinstance(part, dict):
+        return None
+    if part.get("type") == "document" and part.get("source", {}).get("type") == "base64":
+        source = part["source"]
+        return source.get("data", ""), source.get("media_type", "application/pdf"), FORMAT_ANTHROPIC
+    if part.get("type") == "application/pdf":
+        return part.get("data", ""), "application/pdf", FORMAT_GEMINI
+    return None
+
+
+async def externalize_document_parts(
+    content: list[Any],
+    store: Optional[BaseStore] = None,
+) -> list[Any]:
+    """
+    把原生 PDF 片段保存到附件存储，替换为引用片段
+
+    Args:
+        content: 消息内容片段
+        store: LangGraph store (附件的持久层)
+
+    Returns:
+        新的内容片段列表 (其他片段原样保留)
+    """
+    attachments = get_attachment_store()
+
+    async def convert(part: Any) -> Any:
+        native = _native_document_data(part)
+        if native is None:
+            return part
+        data, media_type, doc_format = native
+        digest = await attachments.put(data, media_type, store)
+        return attachment_ref(digest, media_type, doc_format, len(data) * 3 // 4)
+
+    return list(await asyncio.gather(*(convert(part) for part in content)))
+
+
+# ============================================
+# 引用展开
+# ============================================
+
+
+def _find_in_message_documents(messages: list[Any], digest: str) -> Optional[str]:
+    """在消息携带的原始上传文档 (additional_kwargs.documents) 中按内容哈希查找附件"""
+    for message in reversed(messages):
+        kwargs = getattr(message, "additional_kwargs", None) or {}
+        for doc in kwargs.get("documents", []) or []:
+            data = clean_base64(doc.get("data", ""))
+            if data and content_hash(data) == digest:
+                return data
+    return None
+
+
+async def _resolve_part(
+    ref: dict[str, Any],
+    target_format: Optional[str],
+    messages: list[Any],
+    store: Optional[BaseStore],
+) -> dict[str, Any]:
+    """把单个引用片段展开为目标格式"""
+    digest = ref.get("contentHash", "")
+    media_type = ref.get("mediaType", "application/pdf")
+    doc_format = target_format or ref.get("format", FORMAT_ANTHROPIC)
+
+    attachments = get_attachment_store()
+    data = await attachments.get(digest, store)
+    if data is None:
+        # 附件已被淘汰且没有持久层: 回退到消息中的原始上传文档
+        data = await asyncio.to_thread(_find_in_message_documents, messages, digest)
+        if data is None:
+            logger.warning(f"Attachment {digest} not found, omitting it from the model input")
+            return {"type": "text", "text": attachment_missing_marker(digest)}
+        await attachments.put(data, media_type, store)
+
+    if doc_format == FORMAT_TEXT:
+        return {"type": "text", "text": await convert_pdf_to_text(data, store=store)}
+    if doc_format == FORMAT_GEMINI:
+        return {"type": media_type, "data": data}
+    return {
+        "type": "document",
+        "source": {"type": "base64", "media_type": media_type, "data": data},
+    }
+
+
+def has_attachment_refs(message: Any) -> bool:
+    """消息是否包含引用片段"""
+    content = getattr(message, "content", None)
+    return isinstance(content, list) and any(is_attachment_ref(part) for part in content)
+
+
+async def resolve_attachment_refs(
+    messages: list[Any],
+    config: RunnableConfig,
+    store: Optional[BaseStore] = None,
+) -> list[Any]:
+    """
+    调用模型前把消息中的引用片段展开为当前提供商的格式
+
+    Args:
+        messages: 发送给模型的消息列表
+        config: LangGraph 配置
+        store: LangGraph store (附件的持久层)，缺省时使用当前运行的 store
+
+    Returns:
+        展开后的消息列表; 不含引用时原样返回同一个列表
+    """
+    positions = [i for i, message in enumerate(messages) if has_attachment_refs(message)]
+    if not positions:
+        return messages
+
+    target_format = provider_document_format(config)
+    store = store if store is not None else get_config_store(config)
+
+    async def resolve_message(message: BaseMessage) -> BaseMessage:
+        refs = [part for part in message.content if is_attachment_ref(part)]
+        parts = iter(await asyncio.gather(*(_resolve_part(ref, target_format, messages, store) for ref in refs)))
+        content = [next(parts) if is_attachment_ref(part) else part for part in message.content]
+        return message.model_copy(update={"content": content})
+
+    resolved = list(messages)
+    for i, message in zip(positions, await asyncio.gather(*(resolve_message(messages[i]) for i in positions))):
+        resolved[i] = message
+    return resolved
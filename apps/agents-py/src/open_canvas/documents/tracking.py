@@ -0,0 +1,158 @@
+"""
+上下文文档消息的索引
+
+原实现每轮都线性扫描 _messages 的全部内容片段来查找文档消息。本模块提供索引:
+图状态 contextDocumentMessages 按消息顺序记录含文档消息的 ID 及其格式
+("text" / "anthropic" / "gemini" / "mixed")，格式与当前提供商一致时无需访问消息内容;
+旧线程 (状态中没有该字段) 回退为一次线性扫描并据此建立索引。
+
+提供商切换时转换为文本的 PDF 由 PDF 文本缓存 (src/documents/text_cache.py，
+按内容哈希、按字节数限制) 保证只解析一次。
+"""
+
+from typing import Optional
+
+from langchain_core.messages import BaseMessage, HumanMessage
+from langgraph.types import RunnableConfig
+
+from ...documents.attachments import ATTACHMENT_REF_TYPE
+from ...documents.counters import Counters
+from ..run_context import get_run_context
+
+
+FORMAT_TEXT = "text"
+FORMAT_ANTHROPIC = "anthropic"
+FORMAT_GEMINI = "gemini"
+FORMAT_MIXED = "mixed"
+# 附件引用 (与提供商无关，调用模型前展开，不需要格式修复)
+FORMAT_REF = "ref"
+
+# 模型提供商 -> 文档消息应使用的格式 (未列出的提供商不做格式修复)
+_PROVIDER_FORMATS = {
+    "openai": FORMAT_TEXT,
+    "azure_openai": FORMAT_TEXT,
+    "anthropic": FORMAT_ANTHROPIC,
+    "google-genai": FORMAT_GEMINI,
+}
+
+
+# ============================================
+# 格式判断
+# ============================================
+
+
+def provider_document_format(config: RunnableConfig) -> Optional[str]:
+    """
+    获取当前模型提供商对应的文档格式 (模型配置取自运行上下文，每次运行只计算一次)
+
+    Args:
+        config: LangGraph 配置
+
+    Returns:
+        "text" / "anthropic" / "gemini"，不需要修复格式的提供商返回 None
+    """
+    return _PROVIDER_FORMATS.get(get_run_context(config).model_config(config).get("modelProvider", ""))
+
+
+def detect_document_format(message: BaseMessage) -> Optional[str]:
+    """
+    判断消息中文档片段的格式
+
+    Args:
+        message: 消息
+
+    Returns:
+        "anthropic" (document 片段) / "gemini" (application/pdf 片段) / "ref" (附件引用) /
+        "mixed" (多种都有)，不含原生文档片段或引用时返回 None
+    """
+    if not isinstance(message, HumanMessage) or not isinstance(message.content, list):
+        return None
+    found = set()
+    for part in message.content:
+        if isinstance(part, dict):
+            if part.get("type") == "document":
+                found.add(FORMAT_ANTHROPIC)
+            elif part.get("type") == "application/pdf":
+                found.add(FORMAT_GEMINI)
+            elif part.get("type") == ATTACHMENT_REF_TYPE:
+                found.add(FORMAT_REF)
+    if len(found) > 1:
+        return FORMAT_MIXED
+    return found.pop() if found else None
+
+
+def index_document_messages(messages: list[BaseMessage]) -> dict[str, str]:
+    """
+    线性扫描消息列表，建立文档消息索引 (仅用于尚无索引的旧线程)
+
+    Args:
+        messages: 内部消息列表
+
+    Returns:
+        {消息 ID: 格式}，按消息顺序
+    """
+    _stats.record("legacyScans")
+    index = {}
+    for message in messages:
+        doc_format = detect_document_format(message)
+        if doc_format and message.id:
+            index[message.id] = doc_format
+    return index
+
+
+def find_message_to_fix(
+    messages: list[BaseMessage],
+    index: dict[str, str],
+    target_format: Optional[str],
+) -> Optional[HumanMessage]:
+    """
+    根据索引找到需要转换为当前提供商格式的文档消息
+
+    与原实现一致，只考虑 (仍存在于消息列表中的) 第一条含原生文档片段的消息。
+    所有已索引消息的格式都与目标一致时直接返回，不访问消息列表。
+
+    Args:
+        messages: 内部消息列表
+        index: 文档消息索引 (会移除已不存在的消息)
+        target_format: 当前提供商的文档格式
+
+    Returns:
+        需要修复的消息，或 None
+    """
+    candidates = [msg_id for msg_id, doc_format in index.items() if doc_format not in (FORMAT_TEXT, FORMAT_REF)]
+    if target_format is None or all(index[msg_id] == target_format for msg_id in candidates):
+        _stats.record("indexedLookups")
+        return None
+
+    # 格式不一致: 只按 ID 定位消息，不遍历内容片段 (摘要后被清除的消息从索引中移除)
+    wanted = set(candidates)
+    by_id = {m.id: m for m in messages if m.id in wanted}
+    for msg_id in candidates:
+        message = by_id.get(msg_id)
+        if message is None:
+            del index[msg_id]
+            continue
+        _stats.record("indexedLookups")
+        return message if index[msg_id] != target_format else None
+    return None
+
+
+# ============================================
+# 统计
+# ============================================
+
+
+# 文档消息索引统计
+# - indexedLookups: 通过索引完成的查找 (未扫描消息内容)
+# - legacyScans: 无索引时的线性扫描
+_stats = Counters("indexedLookups", "legacyScans")
+
+
+def get_document_tracking_stats() -> dict[str, int]:
+    """获取文档消息索引统计快照"""
+    return _stats.snapshot()
+
+
+def reset_document_tracking_stats() -> None:
+    """重置文档消息索引统计"""
+    _stats.reset()
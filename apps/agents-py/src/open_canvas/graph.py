@@ -311,6 +311,9 @@ def build_graph() -> StateGraph:
             "customAction",
             "updateHighlightedText",
             "webSearch",
+            # 推测执行提交胜出分支后直接进入其后继节点 (见 routing/speculative.py)
+            "generateFollowup",
+            "cleanState",
         ],
     )
 
@@ -11,6 +11,7 @@ from langgraph.store.base import BaseStore
 from langgraph.types import RunnableConfig
 
 from ..state import OpenCanvasGraphReturnType, OpenCanvasState
+from ..run_context import get_run_context
 from ...utils import (
     ensure_store_in_config,
     format_reflections,
@@ -107,6 +108,8 @@ async def custom_action(
     Returns:
         包含更新后 artifact 的状态更新
     """
+    run = get_run_context(config)
+
     # 检查自定义操作 ID
     custom_quick_action_id = state.get("customQuickActionId")
     if not custom_quick_action_id:
@@ -130,15 +133,15 @@ async def custom_action(
     memory_namespace = ("memories", assistant_id)
     memory_key = "reflection"
 
-    # 并行获取自定义操作和记忆
-    custom_actions_item = await store.aget(custom_actions_namespace, actions_key)
-    memories = await store.aget(memory_namespace, memory_key)
+    # 获取自定义操作和记忆 (同一运行内只读取一次)
+    custom_actions = await run.store_value(store, custom_actions_namespace, actions_key)
+    memories = await run.store_value(store, memory_namespace, memory_key)
 
     # 验证自定义操作存在
-    if not custom_actions_item or not custom_actions_item.value:
+    if not custom_actions:
         raise ValueError("No custom actions found.")
 
-    custom_quick_action = custom_actions_item.value.get(custom_quick_action_id)
+    custom_quick_action = custom_actions.get(custom_quick_action_id)
     if not custom_quick_action:
         raise ValueError(
             f"No custom quick action found from ID {custom_quick_action_id}"
@@ -151,8 +154,8 @@ async def custom_action(
     formatted_prompt = f"<custom-instructions>\n{custom_quick_action.get('prompt', '')}\n</custom-instructions>"
 
     # 可选: 添加反思/记忆
-    if custom_quick_action.get("includeReflections") and memories and memories.value:
-        memories_as_string = format_reflections(memories.value)
+    if custom_quick_action.get("includeReflections") and memories:
+        memories_as_string = format_reflections(memories)
         reflections_prompt = REFLECTIONS_QUICK_ACTION_PROMPT.format(
             reflections=memories_as_string
         )
@@ -14,12 +14,17 @@ from langgraph.types import RunnableConfig
 
 from ..state import OpenCanvasGraphReturnType, OpenCanvasState
 from ..prompts import NEW_ARTIFACT_PROMPT
+from ..documents.attachments import resolve_attachment_refs
+from ..run_context import get_run_context
+from ...llm.prompt_cache import (
+    build_prompt_cache_messages,
+    get_prompt_cache_invoke_kwargs,
+    is_prompt_caching_enabled,
+    record_prompt_cache_usage,
+)
+from ...llm.tool_specs import bind_tools_cached, precompile_tool_specs
 from ...utils import (
-    create_context_document_messages,
-    get_formatted_reflections,
-    get_model_config,
     get_model_from_config,
-    is_using_o1_mini_model,
     optionally_get_system_prompt_from_config,
 )
 from ...types import ArtifactCodeV3, ArtifactMarkdownV3, ArtifactV3
@@ -54,6 +59,9 @@ class GenerateArtifactTool(BaseModel):
     )
 
 
+precompile_tool_specs(GenerateArtifactTool)
+
+
 def _format_new_artifact_prompt(memories_as_string: str, model_name: str) -> str:
     """格式化新工件生成提示词"""
     # Claude 模型需要禁用 CoT
@@ -111,8 +119,10 @@ async def generate_artifact(
     Returns:
         包含新 artifact 的状态更新
     """
+    run = get_run_context(config)
+
     # 获取模型配置
-    model_cfg = get_model_config(config, is_tool_calling=True)
+    model_cfg = run.model_config(config, is_tool_calling=True)
     model_name = model_cfg.get("modelName", "")
 
     # 获取模型 (使用工具调用模式)
@@ -121,13 +131,14 @@ async def generate_artifact(
     )
 
     # 绑定工件生成工具
-    model_with_artifact_tool = small_model.bind_tools(
+    model_with_artifact_tool = bind_tools_cached(
+        small_model,
         [GenerateArtifactTool],
         tool_choice="GenerateArtifactTool",
     )
 
     # 获取反思/记忆
-    memories_as_string = await get_formatted_reflections(config)
+    memories_as_string = await run.reflections(config, store)
 
     # 格式化提示词
     formatted_prompt = _format_new_artifact_prompt(memories_as_string, model_name)
@@ -141,15 +152,25 @@ async def generate_artifact(
     )
 
     # 获取上下文文档消息
-    context_document_messages = await create_context_document_messages(config)
+    context_document_messages = await run.context_document_messages(config)
 
     # 检查是否使用 O1 模型
-    is_o1_model = is_using_o1_mini_model(config)
+    is_o1_model = run.is_using_o1_mini_model(config)
 
     # 构建消息列表
     internal_messages = state.get("_messages", [])
-
-    if is_o1_model:
+    prompt_caching = is_prompt_caching_enabled(config)
+
+    if prompt_caching:
+        messages = build_prompt_cache_messages(
+            config,
+            stable_segments=[user_system_prompt, formatted_prompt],
+            context_document_messages=context_document_messages,
+            volatile=None,
+            conversation=internal_messages,
+            use_system_role=not is_o1_model,
+        )
+    elif is_o1_model:
         messages = [
             HumanMessage(content=full_system_prompt),
             *context_document_messages,
@@ -162,8 +183,13 @@ async def generate_artifact(
             *internal_messages,
         ]
 
-    # 调用模型
-    response = await model_with_artifact_tool.ainvoke(messages)
+    # 调用模型 (文档附件引用展开为当前提供商格式)
+    messages = await resolve_attachment_refs(messages, config, store)
+    response = await model_with_artifact_tool.ainvoke(
+        messages, **get_prompt_cache_invoke_kwargs(config)
+    )
+    if prompt_caching:
+        record_prompt_cache_usage("generateArtifact", response)
 
     # 提取工具调用结果
     if not response.tool_calls:
@@ -12,9 +12,9 @@ from langgraph.types import RunnableConfig
 
 from ..state import OpenCanvasGraphReturnType, OpenCanvasState
 from ..prompts import FOLLOWUP_ARTIFACT_PROMPT
+from ..run_context import get_run_context
 from ...utils import (
     ensure_store_in_config,
-    format_reflections,
     get_model_from_config,
 )
 from ...types import Reflections
@@ -86,25 +86,15 @@ async def generate_followup(
     Returns:
         包含 messages 和 _messages 的状态更新
     """
-    # 使用小模型 (maxTokens=250, isToolCalling=True 会选择较小的模型)
-    small_model = get_model_from_config(config, is_tool_calling=True, max_tokens=250)
+    run = get_run_context(config)
 
-    # 获取 assistant_id
-    assistant_id = config.get("configurable", {}).get("assistant_id")
-    if not assistant_id:
-        raise ValueError("`assistant_id` not found in configurable")
+    # 使用小模型 (maxTokens=250, isToolCalling=True 会选择较小的模型)
+    small_model = get_model_from_config(
+        config, is_tool_calling=True, max_tokens=250, call_site="generateFollowup"
+    )
 
     # 从 store 获取反思/记忆
-    memory_namespace = ("memories", assistant_id)
-    memory_key = "reflection"
-    memories = await store.aget(memory_namespace, memory_key)
-
-    if memories and memories.value:
-        memories_as_string = format_reflections(
-            memories.value, only_content=True
-        )
-    else:
-        memories_as_string = "No reflections found."
+    memories_as_string = await run.reflections(config, store, only_content=True)
 
     # 获取当前工件内容
     artifact_content = _get_artifact_content(state.get("artifact"))
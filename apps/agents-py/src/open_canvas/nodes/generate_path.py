@@ -8,83 +8,98 @@ Generate Path 节点
 关键功能:
 - 上下文文档处理 (PDF/文本文件)
 - 跨模型提供商文档格式修复
-- URL 内容自动提取 (FireCrawl)
+- URL 内容自动提取 (FireCrawl，异步并发抓取 + 缓存)
+- 候选路由推测执行 (可选，见 routing/speculative.py)
 - 消息状态正确返回 (messages/_messages)
 """
 
+import asyncio
 import logging
-import re
+import time
 import uuid
-from typing import Literal
-
-logger = logging.getLogger(__name__)
+from collections.abc import Awaitable
+from typing import Any, Literal, Optional, TypeVar
 
 from langchain_core.messages import BaseMessage, HumanMessage, RemoveMessage
+from langgraph.graph.message import add_messages
 from langgraph.store.base import BaseStore
 from langgraph.types import RunnableConfig
 from pydantic import BaseModel, Field
 
 from ...constants import OC_HIDE_FROM_UI_KEY
-from ...types import ArtifactV3, ContextDocument
+from ...documents.attachments import attachment_refs_enabled
+from ...llm.tool_specs import bind_tools_cached, precompile_tool_specs
+from ...types import ContextDocument
 from ...utils import (
-    clean_base64,
     convert_pdf_to_text,
     create_context_document_messages,
-    format_artifact_content,
-    get_model_config,
+    get_config_store,
     get_model_from_config,
     get_string_from_content,
 )
+from ..documents.attachments import externalize_document_parts
+from ..documents.tracking import (
+    FORMAT_TEXT,
+    detect_document_format,
+    find_message_to_fix,
+    index_document_messages,
+    provider_document_format,
+)
 from ..prompts import (
+    CURRENT_ARTIFACT_DIGEST_PROMPT,
     CURRENT_ARTIFACT_PROMPT,
     NO_ARTIFACT_PROMPT,
+    ROUTE_QUERY_DOCUMENTS_DIGEST_PROMPT,
     ROUTE_QUERY_OPTIONS_HAS_ARTIFACTS,
     ROUTE_QUERY_OPTIONS_NO_ARTIFACTS,
     ROUTE_QUERY_PROMPT,
 )
+from ..routing.classifier import (
+    get_classifier_threshold,
+    get_routing_classifier,
+    log_route_decision,
+)
+from ..routing.digest import (
+    build_artifact_digest,
+    build_documents_digest,
+    format_recent_messages_digest,
+    get_digest_token_budget,
+    get_router_context_mode,
+    split_digest_budget,
+)
+from ..routing.pre_router import (
+    RouteDecision,
+    get_pre_router_threshold,
+    is_pre_router_enabled,
+    pre_route,
+)
+from ..routing.speculative import (
+    SPECULATIVE_ROUTE_SUCCESSORS,
+    SpeculationPolicy,
+    record_speculation_skipped,
+    run_speculative_route,
+)
+from ..run_context import get_run_context
 from ..state import OpenCanvasGraphReturnType, OpenCanvasState
-
-
-# ============================================
-# URL 提取
-# ============================================
-
-# URL 正则表达式 - 匹配 TypeScript extractUrls 行为
-MARKDOWN_LINK_PATTERN = re.compile(r'\[([^\]]+)\]\((https?://[^\s)]+)\)')
-PLAIN_URL_PATTERN = re.compile(
-    r'https?://[^\s<\]"\'{}|\\^`]+(?:[^<.,:;"\')\]\s]|(?=\s|$))',
-    re.IGNORECASE
+from ..urls.extract import (  # noqa: F401 - 保持 generate_path.extract_urls 可导入
+    MARKDOWN_LINK_PATTERN,
+    PLAIN_URL_PATTERN,
+    extract_urls,
 )
+from ..urls.fetcher import get_url_fetcher
+from ..urls.intent import (
+    detect_url_intent,
+    get_url_intent_mode,
+    get_url_intent_threshold,
+    is_url_intent_llm_fallback_enabled,
+)
+from .generate_artifact import generate_artifact
+from .reply_to_general_input import reply_to_general_input
+from .rewrite_artifact import rewrite_artifact
 
+logger = logging.getLogger(__name__)
 
-def extract_urls(text: str) -> list[str]:
-    """
-    从文本中提取 URLs，支持 markdown 链接格式
-
-    匹配 TypeScript: packages/shared/src/utils/urls.ts
-
-    Args:
-        text: 输入文本
-
-    Returns:
-        URL 列表 (去重)
-    """
-    urls = set()
-
-    # 先提取 markdown 链接中的 URL
-    def replace_markdown(match):
-        urls.add(match.group(2))
-        return " " * len(match.group(0))
-
-    processed_text = MARKDOWN_LINK_PATTERN.sub(replace_markdown, text)
-
-    # 再提取纯文本中的 URL
-    for url in PLAIN_URL_PATTERN.findall(processed_text):
-        # 移除尾部标点符号 (句号、逗号等不应成为 URL 的一部分)
-        cleaned_url = url.rstrip(".,;:!?'\")")
-        urls.add(cleaned_url)
-
-    return list(urls)
+T = TypeVar("T")
 
 
 # ============================================
@@ -95,18 +110,22 @@ def extract_urls(text: str) -> list[str]:
 async def convert_context_document_to_human_message(
     messages: list[BaseMessage],
     config: RunnableConfig,
+    store: Optional[BaseStore] = None,
 ) -> HumanMessage | None:
     """
     将消息中的上下文文档转换为 HumanMessage
 
     检查最后一条消息的 additional_kwargs.documents，
-    如果存在则转换为正确格式的 HumanMessage。
+    如果存在则转换为正确格式的 HumanMessage。有持久 store 时原生 PDF 片段替换为附件引用，
+    避免检查点与 Send 负载携带完整的 base64; 没有 store 时保留内联 base64
+    (引用只在内存层可用，换进程后无法展开)。
 
     匹配 TypeScript: generate-path/documents.ts convertContextDocumentToHumanMessage
 
     Args:
         messages: 消息列表
         config: LangGraph 配置
+        store: LangGraph store (附件的持久层)，缺省时使用当前运行的 store
 
     Returns:
         包含文档内容的 HumanMessage，或 None
@@ -121,7 +140,10 @@ async def convert_context_document_to_human_message(
         return None
 
     # 使用 create_context_document_messages 获取正确格式的文档消息
-    context_messages = await create_context_document_messages(config, documents)
+    store = store if store is not None else get_config_store(config)
+    context_messages = await create_context_document_messages(
+        config, documents, store, get_run_context(config).model_config(config)
+    )
     if not context_messages:
         return None
 
@@ -131,6 +153,10 @@ async def convert_context_document_to_human_message(
         if isinstance(msg.get("content"), list):
             content_items.extend(msg["content"])
 
+    # 原生 PDF 片段保存到附件存储，状态中的消息只保留引用 (调用模型前展开)
+    if attachment_refs_enabled() and store is not None:
+        content_items = await externalize_document_parts(content_items, store)
+
     return HumanMessage(
         id=str(uuid.uuid4()),
         content=content_items,
@@ -138,9 +164,24 @@ async def convert_context_document_to_human_message(
     )
 
 
+async def _pdf_text_part(data: str, store: Optional[BaseStore] = None) -> dict:
+    """
+    将 base64 PDF 转换为文本片段 (PDF 文本缓存按内容哈希缓存，提供商来回切换时不重复解析)
+
+    Args:
+        data: Base64 编码的 PDF 数据
+        store: 可选的 LangGraph store (PDF 文本缓存的持久层)
+
+    Returns:
+        {"type": "text", "text": ...}
+    """
+    return {"type": "text", "text": await convert_pdf_to_text(data, store=store)}
+
+
 async def fix_mis_formatted_context_doc_message(
     message: HumanMessage,
     config: RunnableConfig,
+    store: Optional[BaseStore] = None,
 ) -> list[BaseMessage] | None:
     """
     修复跨模型提供商的文档格式
@@ -153,6 +194,7 @@ async def fix_mis_formatted_context_doc_message(
     Args:
         message: 需要检查的 HumanMessage
         config: LangGraph 配置
+        store: LangGraph store (PDF 文本缓存的持久层)，缺省时使用当前运行的 store
 
     Returns:
         [RemoveMessage, 新 HumanMessage] 列表，或 None (无需修复)
@@ -160,7 +202,9 @@ async def fix_mis_formatted_context_doc_message(
     if isinstance(message.content, str):
         return None
 
-    model_cfg = get_model_config(config)
+    store = store if store is not None else get_config_store(config)
+
+    model_cfg = get_run_context(config).model_config(config)
     model_provider = model_cfg.get("modelProvider", "")
     new_msg_id = str(uuid.uuid4())
     changes_made = False
@@ -173,13 +217,11 @@ async def fix_mis_formatted_context_doc_message(
                 if item.get("type") == "document" and item.get("source", {}).get("type") == "base64":
                     # Anthropic 格式 -> OpenAI 文本
                     changes_made = True
-                    text = await convert_pdf_to_text(item["source"]["data"])
-                    new_content.append({"type": "text", "text": text})
+                    new_content.append(await _pdf_text_part(item["source"]["data"], store))
                 elif item.get("type") == "application/pdf":
                     # Gemini 格式 -> OpenAI 文本
                     changes_made = True
-                    text = await convert_pdf_to_text(item["data"])
-                    new_content.append({"type": "text", "text": text})
+                    new_content.append(await _pdf_text_part(item["data"], store))
                 else:
                     new_content.append(item)
             else:
@@ -273,80 +315,89 @@ class ShouldIncludeUrlContents(BaseModel):
     )
 
 
-async def fetch_url_contents(url: str) -> dict:
+precompile_tool_specs(ShouldIncludeUrlContents)
+
+
+async def _llm_should_include_url_contents(prompt_text: str, config: RunnableConfig) -> bool:
+    """使用 fast 档位模型判断是否需要包含 URL 内容 (原实现固定为 Gemini 2.0 Flash)"""
+    model = get_model_from_config(
+        config,
+        temperature=0,
+        is_tool_calling=True,
+        response_cache=True,
+        call_site="urlIntent",
+    )
+
+    model_with_tool = bind_tools_cached(
+        model,
+        [ShouldIncludeUrlContents],
+        tool_choice="ShouldIncludeUrlContents",
+    )
+
+    formatted_prompt = INCLUDE_URL_PROMPT.replace("{message}", prompt_text)
+    result = await model_with_tool.ainvoke([["user", formatted_prompt]])
+
+    if not result.tool_calls:
+        return False
+    return bool(result.tool_calls[0].get("args", {}).get("shouldIncludeUrlContents"))
+
+
+async def _should_include_url_contents(prompt_text: str, config: RunnableConfig) -> bool:
     """
-    使用 FireCrawl 抓取 URL 内容
+    判断是否需要抓取并内联消息中的 URL 内容
+
+    本地规则 (urls/intent.py) 置信度达到阈值时直接采用; 否则在允许时回退到 LLM 判断。
+    URL_INTENT_DETECTOR=llm 时始终使用 LLM。
 
     Args:
-        url: 要抓取的 URL
+        prompt_text: 用户消息文本
+        config: 运行配置
 
     Returns:
-        {"url": url, "pageContent": content}
+        是否内联 URL 内容
     """
-    try:
-        from firecrawl import FirecrawlApp
+    if get_url_intent_mode(config) == "llm":
+        return await _llm_should_include_url_contents(prompt_text, config)
+
+    decision = detect_url_intent(prompt_text)
+    if decision.confidence >= get_url_intent_threshold() or not is_url_intent_llm_fallback_enabled():
+        logger.info(
+            "URL intent include=%s decided by rules (confidence=%.2f, reason=%s)",
+            decision.include, decision.confidence, decision.reason,
+        )
+        return decision.include
 
-        app = FirecrawlApp()
-        result = app.scrape_url(url, params={"formats": ["markdown"]})
-        return {
-            "url": url,
-            "pageContent": result.get("markdown", "") if result else "",
-        }
-    except ImportError:
-        print("Warning: firecrawl-py not installed, skipping URL content fetch")
-        return {"url": url, "pageContent": ""}
-    except Exception as e:
-        print(f"Failed to fetch URL contents: {e}")
-        return {"url": url, "pageContent": ""}
+    include = await _llm_should_include_url_contents(prompt_text, config)
+    logger.info("URL intent include=%s decided by llm (rules uncertain: %s)", include, decision.reason)
+    return include
 
 
 async def include_url_contents(
     message: HumanMessage,
     urls: list[str],
+    config: RunnableConfig,
 ) -> HumanMessage | None:
     """
-    使用 LLM 判断是否需要包含 URL 内容，如果需要则抓取
+    判断是否需要包含 URL 内容 (本地规则，必要时回退到 LLM)，如果需要则抓取
 
     匹配 TypeScript: generate-path/include-url-contents.ts
 
     Args:
         message: 用户消息
         urls: 消息中的 URL 列表
+        config: 运行配置 (用于选择 fast 档位模型)
 
     Returns:
         包含 URL 内容的更新后消息，或 None
     """
     try:
-        from langchain_google_genai import ChatGoogleGenerativeAI
-
         prompt_text = message.content if isinstance(message.content, str) else get_string_from_content(message.content)
 
-        # 使用 Gemini 2.0 Flash 判断
-        model = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash",
-            temperature=0,
-        )
-
-        model_with_tool = model.bind_tools(
-            [ShouldIncludeUrlContents],
-            tool_choice="ShouldIncludeUrlContents",
-        )
-
-        formatted_prompt = INCLUDE_URL_PROMPT.replace("{message}", prompt_text)
-        result = await model_with_tool.ainvoke([["user", formatted_prompt]])
-
-        if not result.tool_calls:
+        if not await _should_include_url_contents(prompt_text, config):
             return None
 
-        args = result.tool_calls[0].get("args", {})
-        if not args.get("shouldIncludeUrlContents"):
-            return None
-
-        # 抓取 URL 内容
-        url_contents = []
-        for url in urls:
-            content = await fetch_url_contents(url)
-            url_contents.append(content)
+        # 并发抓取 URL 内容 (有界并发、超时与缓存由抓取器负责)
+        url_contents = await get_url_fetcher().fetch_many(urls)
 
         # 将 URL 替换为抓取的内容
         transformed_prompt = prompt_text
@@ -365,11 +416,8 @@ async def include_url_contents(
             additional_kwargs=message.additional_kwargs,
         )
 
-    except ImportError:
-        print("Warning: langchain-google-genai not installed, skipping URL content inclusion")
-        return None
     except Exception as e:
-        print(f"Failed to handle included URLs: {e}")
+        logger.warning(f"Failed to handle included URLs: {e}")
         return None
 
 
@@ -435,8 +483,61 @@ def _format_artifact_for_prompt(content: dict | None) -> str:
     return ""
 
 
+def _get_hardcoded_route(state: OpenCanvasState) -> str | None:
+    """
+    根据状态标志判断硬编码路由 (高亮、主题变换、自定义操作、Web 搜索)
+
+    Returns:
+        目标节点名，无硬编码路由时为 None
+    """
+    # 检查高亮代码 → updateArtifact
+    if state.get("highlightedCode"):
+        return "updateArtifact"
+
+    # 检查高亮文本 → updateHighlightedText
+    if state.get("highlightedText"):
+        return "updateHighlightedText"
+
+    # 检查文本主题标志 → rewriteArtifactTheme
+    if any([
+        state.get("language"),
+        state.get("artifactLength"),
+        state.get("readingLevel"),
+        state.get("regenerateWithEmojis"),
+    ]):
+        return "rewriteArtifactTheme"
+
+    # 检查代码主题标志 → rewriteCodeArtifactTheme
+    if any([
+        state.get("addComments"),
+        state.get("addLogs"),
+        state.get("portLanguage"),
+        state.get("fixBugs"),
+    ]):
+        return "rewriteCodeArtifactTheme"
+
+    # 检查自定义操作 → customAction
+    if state.get("customQuickActionId"):
+        return "customAction"
+
+    # 检查 Web 搜索 → webSearch
+    if state.get("webSearchEnabled"):
+        return "webSearch"
+
+    return None
+
+
+async def _timed(name: str, awaitable: Awaitable[T], timings: dict[str, float]) -> T:
+    """等待 awaitable 并将耗时 (毫秒) 记录到 timings[name]"""
+    started = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[name] = (time.perf_counter() - started) * 1000
+
+
 def _find_existing_doc_message(messages: list[BaseMessage]) -> HumanMessage | None:
-    """查找消息中已存在的文档消息"""
+    """查找消息中已存在的文档消息 (线性扫描; generate_path 优先使用 contextDocumentMessages 索引)"""
     for msg in messages:
         if not isinstance(msg, HumanMessage):
             continue
@@ -452,40 +553,103 @@ def _find_existing_doc_message(messages: list[BaseMessage]) -> HumanMessage | No
 # ============================================
 
 
-async def _dynamic_determine_path(
+def _create_route_query_schema(artifact_route: str) -> type[BaseModel]:
+    """
+    创建路由 schema - 与 TS 版本保持一致
+
+    参考: apps/agents/src/open-canvas/nodes/generate-path/dynamic-determine-path.ts:71-88
+    注意: 将 artifact_route 放在第一位，影响 LLM 的默认偏好
+    """
+    route_options = (artifact_route, "replyToGeneralInput")
+
+    class RouteQuerySchema(BaseModel):
+        """The route to take based on the user's query."""
+        route: Literal[route_options] = Field(  # type: ignore
+            description="The route to take based on the user's query."
+        )
+
+    return RouteQuerySchema
+
+
+# 两种路由选项各创建一次，避免每轮重新创建 Pydantic 类和 JSON Schema
+ROUTE_QUERY_SCHEMAS: dict[str, type[BaseModel]] = {
+    route: _create_route_query_schema(route)
+    for route in ("generateArtifact", "rewriteArtifact")
+}
+precompile_tool_specs(*ROUTE_QUERY_SCHEMAS.values())
+
+
+async def _build_route_query_messages(
     state: OpenCanvasState,
     config: RunnableConfig,
+    artifact_options: str,
     new_messages: list[BaseMessage] | None = None,
-) -> str:
+    context_documents: list[ContextDocument] | None = None,
+) -> list:
     """
-    使用 LLM 动态决定路由
+    构建路由调用的输入消息
+
+    - full 模式: 完整工件 + 完整上下文文档消息 + 新消息 (与 TS 版本一致)
+    - digest 模式 (默认): 工件/文档/最近消息均替换为有界摘要，提示词大小与工件、文档大小无关
+
+    Args:
+        state: 图状态
+        config: LangGraph 运行配置
+        artifact_options: 路由选项说明
+        new_messages: 本轮新增的文档消息
+        context_documents: 已预取的上下文文档 (None 时从 store 读取)
 
     Returns:
-        路由目标: "replyToGeneralInput", "generateArtifact", 或 "rewriteArtifact"
+        传给路由模型的消息列表
     """
     internal_messages = state.get("_messages", [])
-    artifact = state.get("artifact")
-    current_artifact_content = _get_artifact_content(artifact)
-
-    # 确定可用的路由选项
-    if current_artifact_content:
-        artifact_options = ROUTE_QUERY_OPTIONS_HAS_ARTIFACTS
-        artifact_route = "rewriteArtifact"
-    else:
-        artifact_options = ROUTE_QUERY_OPTIONS_NO_ARTIFACTS
-        artifact_route = "generateArtifact"
-
-    # 格式化最近消息
-    recent_messages = _format_recent_messages(internal_messages, 3)
-
-    # 格式化当前工件提示词
-    if current_artifact_content:
-        artifact_text = _format_artifact_for_prompt(current_artifact_content)
-        current_artifact_prompt = CURRENT_ARTIFACT_PROMPT.format(
-            artifact=artifact_text
+    current_artifact_content = _get_artifact_content(state.get("artifact"))
+    mode = get_router_context_mode(config)
+
+    if mode == "full":
+        recent_messages = _format_recent_messages(internal_messages, 3)
+        if current_artifact_content:
+            current_artifact_prompt = CURRENT_ARTIFACT_PROMPT.format(
+                artifact=_format_artifact_for_prompt(current_artifact_content)
+            )
+        else:
+            current_artifact_prompt = NO_ARTIFACT_PROMPT
+        # 获取上下文文档消息 - 与 TS 版本保持一致
+        # 参考: apps/agents/src/open-canvas/nodes/generate-path/dynamic-determine-path.ts:90
+        context_document_messages = (
+            await get_run_context(config).context_document_messages(config)
+            if context_documents is None or context_documents else []
         )
+        documents_prompt = ""
     else:
-        current_artifact_prompt = NO_ARTIFACT_PROMPT
+        if context_documents is None:
+            context_documents = await get_run_context(config).context_documents(config)
+        budget = split_digest_budget(
+            get_digest_token_budget(), has_documents=bool(context_documents or new_messages)
+        )
+        recent_messages = format_recent_messages_digest(
+            [(msg.type, _get_message_content(msg)) for msg in internal_messages[-3:]],
+            budget["recentMessages"],
+        )
+        if current_artifact_content:
+            current_artifact_prompt = CURRENT_ARTIFACT_DIGEST_PROMPT.format(
+                artifact=build_artifact_digest(current_artifact_content, budget["artifact"])
+            )
+        else:
+            current_artifact_prompt = NO_ARTIFACT_PROMPT
+        documents_digest = await build_documents_digest(
+            context_documents,
+            new_messages or [],
+            budget["documents"],
+            get_config_store(config),
+            config.get("configurable", {}).get("assistant_id"),
+        )
+        documents_prompt = (
+            ROUTE_QUERY_DOCUMENTS_DIGEST_PROMPT.format(documents=documents_digest)
+            if documents_digest else ""
+        )
+        context_document_messages = []
+        new_messages = []
 
     # 构建完整提示词
     formatted_prompt = ROUTE_QUERY_PROMPT.replace(
@@ -495,47 +659,73 @@ async def _dynamic_determine_path(
     ).replace(
         "{currentArtifactPrompt}", current_artifact_prompt
     )
+    if documents_prompt:
+        formatted_prompt = f"{formatted_prompt}\n\n{documents_prompt}"
 
     # 调试日志 - 打印 formatted_prompt
     logger.info(f"[DEBUG] artifact_options: {artifact_options[:100]}...")
     logger.info(f"[DEBUG] recent_messages: {recent_messages}")
     logger.info(f"[DEBUG] current_artifact_prompt: {current_artifact_prompt}")
     logger.info(f"[DEBUG] formatted_prompt (last 500 chars): ...{formatted_prompt[-500:]}")
+    logger.info(f"Routing prompt: mode={mode}, chars={len(formatted_prompt)}")
+
+    # 注入上下文文档和新消息以提供完整信息给路由决策
+    # 与 TS 版本保持一致: [...contextDocumentMessages, ...newMessages, formattedPrompt]
+    return [
+        *context_document_messages,
+        *(new_messages if new_messages else []),
+        HumanMessage(content=formatted_prompt),
+    ]
+
+
+async def _dynamic_determine_path(
+    state: OpenCanvasState,
+    config: RunnableConfig,
+    new_messages: list[BaseMessage] | None = None,
+    context_documents: list[ContextDocument] | None = None,
+) -> str:
+    """
+    使用 LLM 动态决定路由
+
+    Returns:
+        路由目标: "replyToGeneralInput", "generateArtifact", 或 "rewriteArtifact"
+    """
+    current_artifact_content = _get_artifact_content(state.get("artifact"))
+
+    # 确定可用的路由选项
+    if current_artifact_content:
+        artifact_options = ROUTE_QUERY_OPTIONS_HAS_ARTIFACTS
+        artifact_route = "rewriteArtifact"
+    else:
+        artifact_options = ROUTE_QUERY_OPTIONS_NO_ARTIFACTS
+        artifact_route = "generateArtifact"
 
     # 获取模型
-    model = get_model_from_config(config, temperature=0, is_tool_calling=True)
+    model = get_model_from_config(
+        config,
+        temperature=0,
+        is_tool_calling=True,
+        response_cache=True,
+        call_site="routeQuery",
+    )
     model_name = config.get("configurable", {}).get("customModelName", "unknown")
     logger.info(f"[DEBUG] model type: {type(model).__name__}, model_name: {model_name}")
 
-    # 创建动态 schema - 与 TS 版本保持一致
-    # 参考: apps/agents/src/open-canvas/nodes/generate-path/dynamic-determine-path.ts:71-88
-    # 注意: 将 artifact_route 放在第一位，影响 LLM 的默认偏好
     route_options = [artifact_route, "replyToGeneralInput"]
 
-    class RouteQuerySchema(BaseModel):
-        """The route to take based on the user's query."""
-        route: Literal[tuple(route_options)] = Field(  # type: ignore
-            description="The route to take based on the user's query."
-        )
-
     # 绑定工具 - 使用与 TS 相同的 tool_choice 名称
-    model_with_tool = model.bind_tools(
-        [RouteQuerySchema],
+    # schema 按 artifact_route 预先创建 (见 ROUTE_QUERY_SCHEMAS)
+    model_with_tool = bind_tools_cached(
+        model,
+        [ROUTE_QUERY_SCHEMAS[artifact_route]],
         tool_choice="RouteQuerySchema",
     )
     logger.info(f"[DEBUG] route_options: {route_options}")
 
-    # 获取上下文文档消息 - 与 TS 版本保持一致
-    # 参考: apps/agents/src/open-canvas/nodes/generate-path/dynamic-determine-path.ts:90
-    context_document_messages = await create_context_document_messages(config)
-
-    # 调用模型 - 注入上下文文档和新消息以提供完整信息给路由决策
-    # 与 TS 版本保持一致: [...contextDocumentMessages, ...newMessages, formattedPrompt]
-    result = await model_with_tool.ainvoke([
-        *context_document_messages,
-        *(new_messages if new_messages else []),
-        HumanMessage(content=formatted_prompt),
-    ])
+    route_messages = await _build_route_query_messages(
+        state, config, artifact_options, new_messages, context_documents
+    )
+    result = await model_with_tool.ainvoke(route_messages)
 
     # 提取路由结果
     logger.info(f"[DEBUG] LLM result.tool_calls: {result.tool_calls}")
@@ -551,6 +741,93 @@ async def _dynamic_determine_path(
     return "replyToGeneralInput"
 
 
+# 推测执行时可与路由调用并发运行的候选节点
+_SPECULATIVE_NODES = {
+    "replyToGeneralInput": reply_to_general_input,
+    "generateArtifact": generate_artifact,
+    "rewriteArtifact": rewrite_artifact,
+}
+
+
+async def _route_query(
+    state: OpenCanvasState,
+    config: RunnableConfig,
+    message_text: str,
+    new_messages: list[BaseMessage],
+    candidate_state: Optional[OpenCanvasState] = None,
+    store: Optional[BaseStore] = None,
+    context_documents: Optional[list[ContextDocument]] = None,
+) -> tuple[RouteDecision, Optional[dict[str, Any]]]:
+    """
+    依次尝试词法预路由、本地分类器，置信度均不足时回退到 LLM 路由
+
+    启用推测执行且预路由置信度落在推测区间时，候选节点与 LLM 路由并发执行。
+
+    Args:
+        state: 图状态 (已替换 URL 内容)
+        config: LangGraph 运行配置
+        message_text: 最新用户消息原文
+        new_messages: 本轮新增的文档消息
+        candidate_state: 候选节点的输入状态 (应用 generatePath 更新后的状态)，None 表示不推测
+        store: 跨线程存储 (传给候选节点)
+        context_documents: 已预取的上下文文档 (None 时由路由调用自行读取)
+
+    Returns:
+        (RouteDecision, 胜出候选节点的状态更新); LLM 决策的置信度记为 1.0，
+        未推测或推测未提交时状态更新为 None
+    """
+    has_artifact = _get_artifact_content(state.get("artifact")) is not None
+    local_decisions: list[RouteDecision] = []
+    pre_decision = None
+
+    if is_pre_router_enabled(config) and message_text:
+        pre_decision = pre_route(message_text, has_artifact, has_new_documents=bool(new_messages))
+        local_decisions.append(pre_decision)
+
+        classifier = get_routing_classifier() if pre_decision.confidence < get_pre_router_threshold() else None
+        if classifier is not None:
+            local_decisions.append(classifier.predict(message_text, has_artifact))
+
+        thresholds = {"rules": get_pre_router_threshold(), "classifier": get_classifier_threshold()}
+        for decision in local_decisions:
+            if decision.confidence >= thresholds[decision.source]:
+                logger.info(
+                    "Route %s decided by %s (confidence=%.2f, reason=%s)",
+                    decision.route, decision.source, decision.confidence, decision.reason,
+                )
+                return decision, None
+
+    routing = _dynamic_determine_path(
+        state, config, new_messages=new_messages, context_documents=context_documents
+    )
+    speculative_update = None
+    policy = SpeculationPolicy.from_config(config)
+    if candidate_state is not None and policy.should_speculate(pre_decision):
+        artifact_route = "rewriteArtifact" if has_artifact else "generateArtifact"
+        candidates = {
+            name: (lambda cfg, node=_SPECULATIVE_NODES[name]: node(candidate_state, cfg, store=store))
+            for name in (artifact_route, "replyToGeneralInput")
+            if name in policy.routes
+        }
+        route, speculative_update = await run_speculative_route(routing, candidates, config)
+    else:
+        if policy.enabled:
+            record_speculation_skipped()
+        route = await routing
+
+    reason = (
+        "local routing uncertain ("
+        + ", ".join(f"{d.source}: {d.route} @ {d.confidence:.2f}" for d in local_decisions)
+        + ")"
+        if local_decisions else "local routing disabled"
+    )
+    logger.info("Route %s decided by llm (%s)", route, reason)
+    decision = RouteDecision(route, 1.0, "llm", reason)
+    if message_text:
+        log_route_decision(message_text, has_artifact, decision)
+    return decision, speculative_update
+
+
 # ============================================
 # 主函数
 # ============================================
@@ -572,6 +849,7 @@ async def generate_path(
     - 跨模型提供商文档格式修复
     - URL 内容自动提取
     - 每个路由都正确返回 messages/_messages
+    - 文档处理、URL 处理与上下文文档读取并发执行，并记录各步耗时
 
     Args:
         state: 当前图状态
@@ -583,99 +861,122 @@ async def generate_path(
     """
     internal_messages = state.get("_messages", [])
     new_messages: list[BaseMessage] = []
-
-    # ===== 上下文文档处理 =====
-
-    # 1. 检查是否有新的上下文文档需要转换
-    doc_message = await convert_context_document_to_human_message(
-        internal_messages, config
-    )
-
-    # 2. 查找已存在的文档消息
-    existing_doc_message = _find_existing_doc_message(internal_messages)
-
-    if doc_message:
-        new_messages.append(doc_message)
-    elif existing_doc_message:
-        # 如果存在旧格式文档，尝试修复
-        fixed_messages = await fix_mis_formatted_context_doc_message(
-            existing_doc_message, config
+    new_internal_messages = list(internal_messages)
+    last_message_text = ""
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    # 文档消息索引 {消息 ID: 格式}，变化时随状态更新写回
+    doc_index: dict[str, str] = dict(state.get("contextDocumentMessages") or {})
+
+    # 硬编码路由只取决于状态标志，先行判断以确定需要哪些前置步骤
+    hardcoded_route = _get_hardcoded_route(state)
+
+    # ===== 并发前置步骤 =====
+    # 文档处理链 (转换 → 修复)、URL 内容处理 (意图判断 + 抓取) 与上下文文档读取
+    # 彼此独立，并发执行; 节点耗时取决于最慢的一条链而非各步之和
+
+    async def process_documents() -> None:
+        nonlocal doc_index
+        if state.get("contextDocumentMessages") is None:
+            # 无索引的旧线程: 扫描一次建立索引
+            doc_index = index_document_messages(internal_messages)
+
+        # 1. 检查是否有新的上下文文档需要转换
+        doc_message = await _timed(
+            "convertDocuments", convert_context_document_to_human_message(internal_messages, config, store), timings
         )
-        if fixed_messages:
-            new_messages.extend(fixed_messages)
 
-    # 构建消息返回辅助函数
-    def build_messages_return() -> dict:
-        if new_messages:
-            return {
-                "messages": new_messages,
-                "_messages": new_messages,
-            }
-        return {}
-
-    # ===== 硬编码路由优先 =====
-
-    # 检查高亮代码 → updateArtifact
-    if state.get("highlightedCode"):
-        return {"next": "updateArtifact", **build_messages_return()}
-
-    # 检查高亮文本 → updateHighlightedText
-    if state.get("highlightedText"):
-        return {"next": "updateHighlightedText", **build_messages_return()}
+        if doc_message:
+            new_messages.append(doc_message)
+            doc_index[doc_message.id] = detect_document_format(doc_message) or FORMAT_TEXT
+            return
+
+        # 2. 通过索引查找格式与当前提供商不一致的已存在文档消息
+        target_format = provider_document_format(config)
+        existing_doc_message = find_message_to_fix(internal_messages, doc_index, target_format)
+
+        if existing_doc_message:
+            # 如果存在旧格式文档，尝试修复
+            fixed_messages = await _timed(
+                "fixDocuments", fix_mis_formatted_context_doc_message(existing_doc_message, config, store), timings
+            )
+            if fixed_messages:
+                new_messages.extend(fixed_messages)
+                doc_index.pop(existing_doc_message.id, None)
+                doc_index[fixed_messages[-1].id] = target_format
+
+    async def process_urls(last_msg: HumanMessage, message_urls: list[str]) -> None:
+        nonlocal new_internal_messages
+        updated_message = await _timed(
+            "includeUrlContents", include_url_contents(last_msg, message_urls, config), timings
+        )
+        if updated_message:
+            # 替换最后一条消息
+            new_internal_messages = [
+                updated_message if (hasattr(m, 'id') and m.id == updated_message.id) else m
+                for m in internal_messages
+            ]
 
-    # 检查文本主题标志 → rewriteArtifactTheme
-    if any([
-        state.get("language"),
-        state.get("artifactLength"),
-        state.get("readingLevel"),
-        state.get("regenerateWithEmojis"),
-    ]):
-        return {"next": "rewriteArtifactTheme", **build_messages_return()}
+    context_documents_task = None
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(process_documents())
 
-    # 检查代码主题标志 → rewriteCodeArtifactTheme
-    if any([
-        state.get("addComments"),
-        state.get("addLogs"),
-        state.get("portLanguage"),
-        state.get("fixBugs"),
-    ]):
-        return {"next": "rewriteCodeArtifactTheme", **build_messages_return()}
+            if hardcoded_route is None:
+                # 预取路由所需的上下文文档 (store 读取)
+                context_documents_task = tg.create_task(
+                    _timed("loadContextDocuments", get_run_context(config).context_documents(config), timings)
+                )
 
-    # 检查自定义操作 → customAction
-    if state.get("customQuickActionId"):
-        return {"next": "customAction", **build_messages_return()}
+                # URL 内容处理
+                if internal_messages and isinstance(internal_messages[-1], HumanMessage):
+                    last_msg = internal_messages[-1]
+                    last_message_text = _get_message_content(last_msg)
+                    message_urls = extract_urls(last_message_text)
+                    if message_urls:
+                        tg.create_task(process_urls(last_msg, message_urls))
+    except ExceptionGroup as eg:
+        # 保持原有的异常类型 (顺序执行时第一个失败步骤的异常)
+        raise eg.exceptions[0]
+
+    timings["prelude"] = (time.perf_counter() - started) * 1000
+    logger.info(
+        "generatePath prelude timings (ms): "
+        + ", ".join(f"{name}={ms:.1f}" for name, ms in timings.items())
+    )
 
-    # 检查 Web 搜索 → webSearch
-    if state.get("webSearchEnabled"):
-        return {"next": "webSearch", **build_messages_return()}
+    # 索引有变化时写回状态
+    index_update: dict[str, Any] = {}
+    if doc_index != (state.get("contextDocumentMessages") or {}):
+        index_update["contextDocumentMessages"] = doc_index
 
-    # ===== URL 内容处理 =====
+    # ===== 硬编码路由优先 =====
 
-    new_internal_messages = list(internal_messages)
+    if hardcoded_route is not None:
+        if new_messages:
+            return {"next": hardcoded_route, "messages": new_messages, "_messages": new_messages, **index_update}
+        return {"next": hardcoded_route, **index_update}
 
-    if internal_messages:
-        last_msg = internal_messages[-1]
-        if isinstance(last_msg, HumanMessage):
-            last_msg_content = _get_message_content(last_msg)
-            message_urls = extract_urls(last_msg_content)
-
-            if message_urls:
-                updated_message = await include_url_contents(last_msg, message_urls)
-                if updated_message:
-                    # 替换最后一条消息
-                    new_internal_messages = [
-                        updated_message if (hasattr(m, 'id') and m.id == updated_message.id) else m
-                        for m in internal_messages
-                    ]
-
-    # ===== LLM 动态路由 =====
+    # ===== 词法预路由 / LLM 动态路由 =====
     # 传递 new_messages 使 LLM 看到用户最新消息，与 TS 版本保持一致
 
-    route = await _dynamic_determine_path(
+    # 候选节点看到的状态与 route_node 发送给它们的状态一致 (已按 reducer 应用本节点的消息更新，
+    # RemoveMessage 在此生效，不会传给模型)
+    candidate_state = {
+        **state,
+        "messages": add_messages(state.get("messages", []), new_messages),
+        "_messages": add_messages(new_internal_messages, new_messages),
+    }
+    decision, speculative_update = await _route_query(
         {**state, "_messages": new_internal_messages},
         config,
-        new_messages=new_messages,
+        last_message_text,
+        new_messages,
+        candidate_state=candidate_state,
+        store=store,
+        context_documents=context_documents_task.result(),
     )
+    route = decision.route
 
     # 验证路由结果 - 与 TS 版本保持一致
     # 参考: apps/agents/src/open-canvas/nodes/generate-path/index.ts:150-152
@@ -684,16 +985,30 @@ async def generate_path(
 
     # 构建最终返回
     if new_messages:
-        return {
+        result = {
             "next": route,
             "messages": new_messages,
             "_messages": [*new_internal_messages, *new_messages],
         }
     elif new_internal_messages != internal_messages:
         # URL 内容被更新了
-        return {
+        result = {
             "next": route,
             "_messages": new_internal_messages,
         }
     else:
-        return {"next": route}
+        result = {"next": route}
+    result.update(index_update)
+
+    if speculative_update is not None:
+        # 推测分支胜出: 一并提交其状态更新，跳过该节点直接进入其后继节点
+        for key in ("messages", "_messages"):
+            if key in speculative_update:
+                result[key] = [*result.get(key, []), *speculative_update[key]]
+        result = {
+            **speculative_update,
+            **result,
+            "next": SPECULATIVE_ROUTE_SUCCESSORS[route],
+        }
+
+    return result
@@ -12,13 +12,18 @@ from langgraph.types import RunnableConfig
 
 from ..state import OpenCanvasGraphReturnType, OpenCanvasState
 from ..prompts import CURRENT_ARTIFACT_PROMPT, NO_ARTIFACT_PROMPT
+from ..documents.attachments import resolve_attachment_refs
+from ..run_context import get_run_context
+from ...llm.prompt_cache import (
+    build_prompt_cache_messages,
+    get_prompt_cache_invoke_kwargs,
+    is_prompt_caching_enabled,
+    record_prompt_cache_usage,
+)
 from ...utils import (
-    create_context_document_messages,
     ensure_store_in_config,
     format_artifact_content,
-    format_reflections,
     get_model_from_config,
-    is_using_o1_mini_model,
 )
 from ...types import Reflections
 
@@ -70,23 +75,13 @@ async def reply_to_general_input(
     Returns:
         包含 messages 和 _messages 的状态更新
     """
+    run = get_run_context(config)
+
     # 获取模型
     model = get_model_from_config(config)
 
-    # 获取 assistant_id
-    assistant_id = config.get("configurable", {}).get("assistant_id")
-    if not assistant_id:
-        raise ValueError("`assistant_id` not found in configurable")
-
     # 从 store 获取反思/记忆
-    memory_namespace = ("memories", assistant_id)
-    memory_key = "reflection"
-    memories = await store.aget(memory_namespace, memory_key)
-
-    if memories and memories.value:
-        memories_as_string = format_reflections(memories.value)
-    else:
-        memories_as_string = "No reflections found."
+    memories_as_string = await run.reflections(config, store)
 
     # 获取当前工件内容
     current_artifact_content = _get_current_artifact_content(state.get("artifact"))
@@ -107,13 +102,30 @@ async def reply_to_general_input(
     )
 
     # 获取上下文文档消息
-    context_document_messages = await create_context_document_messages(config)
+    context_document_messages = await run.context_document_messages(config)
 
     # 检查是否使用 O1 模型 (O1 不支持系统提示词)
-    is_o1_model = is_using_o1_mini_model(config)
+    is_o1_model = run.is_using_o1_mini_model(config)
 
     # 构建消息列表
-    if is_o1_model:
+    prompt_caching = is_prompt_caching_enabled(config)
+
+    if prompt_caching:
+        # 缓存模式: 工件内容放在上下文文档之后，保持前缀稳定
+        messages = build_prompt_cache_messages(
+            config,
+            stable_segments=[
+                REPLY_PROMPT.format(
+                    reflections=memories_as_string,
+                    currentArtifactPrompt="",
+                ).rstrip()
+            ],
+            context_document_messages=context_document_messages,
+            volatile=current_artifact_prompt,
+            conversation=state.get("_messages", []),
+            use_system_role=not is_o1_model,
+        )
+    elif is_o1_model:
         # O1 模型: 系统提示词作为用户消息
         messages = [
             HumanMessage(content=formatted_prompt),
@@ -128,8 +140,11 @@ async def reply_to_general_input(
             *state.get("_messages", []),
         ]
 
-    # 调用模型
-    response = await model.ainvoke(messages)
+    # 调用模型 (文档附件引用展开为当前提供商格式)
+    messages = await resolve_attachment_refs(messages, config, store)
+    response = await model.ainvoke(messages, **get_prompt_cache_invoke_kwargs(config))
+    if prompt_caching:
+        record_prompt_cache_usage("replyToGeneralInput", response)
 
     return {
         "messages": [response],
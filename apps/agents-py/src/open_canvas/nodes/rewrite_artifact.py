@@ -14,16 +14,27 @@ from langgraph.store.base import BaseStore
 from langgraph.types import RunnableConfig
 
 from ..state import OpenCanvasGraphReturnType, OpenCanvasState
-from ..prompts import UPDATE_ENTIRE_ARTIFACT_PROMPT, OPTIONALLY_UPDATE_META_PROMPT, GET_TITLE_TYPE_REWRITE_ARTIFACT
+from ..prompts import (
+    UPDATE_ENTIRE_ARTIFACT_PROMPT,
+    UPDATE_ENTIRE_ARTIFACT_CONTENT_PROMPT,
+    UPDATE_ENTIRE_ARTIFACT_STABLE_PROMPT,
+    OPTIONALLY_UPDATE_META_PROMPT,
+    GET_TITLE_TYPE_REWRITE_ARTIFACT,
+)
+from ..documents.attachments import resolve_attachment_refs
+from ..run_context import get_run_context
+from ...llm.prompt_cache import (
+    build_prompt_cache_messages,
+    get_prompt_cache_invoke_kwargs,
+    is_prompt_caching_enabled,
+    record_prompt_cache_usage,
+)
+from ...llm.tool_specs import bind_tools_cached, precompile_tool_specs
 from ...utils import (
-    create_context_document_messages,
     extract_thinking_and_response,
     format_artifact_content,
-    get_formatted_reflections,
-    get_model_config,
     get_model_from_config,
     is_thinking_model,
-    is_using_o1_mini_model,
     optionally_get_system_prompt_from_config,
 )
 from ...types import ArtifactCodeV3, ArtifactMarkdownV3, ArtifactV3
@@ -50,6 +61,9 @@ class UpdateArtifactMetaTool(BaseModel):
     )
 
 
+precompile_tool_specs(UpdateArtifactMetaTool)
+
+
 def _get_artifact_content(artifact: dict | None) -> dict | None:
     """获取当前工件内容"""
     if not artifact:
@@ -78,7 +92,7 @@ def _is_code_artifact(content: dict | None) -> bool:
 async def _optionally_update_artifact_meta(
     state: OpenCanvasState,
     config: RunnableConfig,
-    store: BaseStore,  # pylint: disable=unused-argument
+    store: BaseStore,
 ) -> dict:
     """
     使用 LLM 决定是否需要更新工件类型和标题
@@ -93,10 +107,17 @@ async def _optionally_update_artifact_meta(
         return {"type": "text", "title": None, "language": None, "isValidReact": None}
 
     # 获取模型
-    small_model = get_model_from_config(config, is_tool_calling=True)
+    small_model = get_model_from_config(
+        config,
+        temperature=0,
+        is_tool_calling=True,
+        response_cache=True,
+        call_site="artifactMeta",
+    )
 
     # 绑定工具
-    model_with_tool = small_model.bind_tools(
+    model_with_tool = bind_tools_cached(
+        small_model,
         [UpdateArtifactMetaTool],
         tool_choice="UpdateArtifactMetaTool",
     )
@@ -124,14 +145,19 @@ async def _optionally_update_artifact_meta(
     )
 
     # 检查是否使用 O1 模型
-    is_o1_model = is_using_o1_mini_model(config)
+    is_o1_model = get_run_context(config).is_using_o1_mini_model(config)
 
-    # 调用模型 - 设置 run_name 以供前端识别流式事件
-    response = await model_with_tool.ainvoke(
+    # 调用模型 - 设置 run_name 以供前端识别流式事件 (文档附件引用展开为当前提供商格式)
+    messages = await resolve_attachment_refs(
         [
             {"role": "user" if is_o1_model else "system", "content": prompt},
             recent_human_message,
         ],
+        config,
+        store,
+    )
+    response = await model_with_tool.ainvoke(
+        messages,
         config={"run_name": "optionally_update_artifact_meta"},
     )
 
@@ -154,14 +180,8 @@ async def _optionally_update_artifact_meta(
     }
 
 
-def _build_prompt(
-    artifact_content: str,
-    memories_as_string: str,
-    is_new_type: bool,
-    artifact_meta: dict,
-) -> str:
-    """构建重写提示词"""
-    # 构建元数据提示词
+def _build_meta_prompt(is_new_type: bool, artifact_meta: dict) -> str:
+    """构建元数据提示词"""
     meta_prompt = ""
     if is_new_type:
         title_section = ""
@@ -173,10 +193,20 @@ def _build_prompt(
             artifactTitle=title_section,
         )
 
+    return meta_prompt
+
+
+def _build_prompt(
+    artifact_content: str,
+    memories_as_string: str,
+    is_new_type: bool,
+    artifact_meta: dict,
+) -> str:
+    """构建重写提示词"""
     return UPDATE_ENTIRE_ARTIFACT_PROMPT.format(
         artifactContent=artifact_content,
         reflections=memories_as_string,
-        updateMetaPrompt=meta_prompt,
+        updateMetaPrompt=_build_meta_prompt(is_new_type, artifact_meta),
     )
 
 
@@ -239,13 +269,15 @@ async def rewrite_artifact(
     Returns:
         包含更新后 artifact 的状态更新，可能包含思考消息
     """
+    run = get_run_context(config)
+
     # 获取模型
-    model_cfg = get_model_config(config)
+    model_cfg = run.model_config(config)
     model_name = model_cfg.get("modelName", "")
     small_model = get_model_from_config(config)
 
     # 获取反思/记忆
-    memories_as_string = await get_formatted_reflections(config)
+    memories_as_string = await run.reflections(config, store)
 
     # 验证状态
     current_artifact_content = _get_artifact_content(state.get("artifact"))
@@ -274,47 +306,62 @@ async def rewrite_artifact(
     else:
         artifact_content = current_artifact_content.get("code", "")
 
-    # 构建提示词
-    formatted_prompt = _build_prompt(
-        artifact_content,
-        memories_as_string,
-        is_new_type,
-        artifact_meta,
-    )
-
     # 获取用户自定义系统提示词
     user_system_prompt = optionally_get_system_prompt_from_config(config)
-    full_system_prompt = (
-        f"{user_system_prompt}\n{formatted_prompt}"
-        if user_system_prompt
-        else formatted_prompt
-    )
 
     # 获取上下文文档消息
-    context_document_messages = await create_context_document_messages(config)
+    context_document_messages = await run.context_document_messages(config)
 
     # 检查是否使用 O1 模型
-    is_o1_model = is_using_o1_mini_model(config)
+    is_o1_model = run.is_using_o1_mini_model(config)
 
     # 构建消息列表
-    if is_o1_model:
-        messages = [
-            HumanMessage(content=full_system_prompt),
-            *context_document_messages,
-            recent_human_message,
-        ]
+    prompt_caching = is_prompt_caching_enabled(config)
+
+    if prompt_caching:
+        # 缓存模式: 指令与反思在前，工件内容放在上下文文档之后
+        messages = build_prompt_cache_messages(
+            config,
+            stable_segments=[
+                user_system_prompt,
+                UPDATE_ENTIRE_ARTIFACT_STABLE_PROMPT.format(reflections=memories_as_string),
+            ],
+            context_document_messages=context_document_messages,
+            volatile=UPDATE_ENTIRE_ARTIFACT_CONTENT_PROMPT.format(
+                artifactContent=artifact_content,
+                updateMetaPrompt=_build_meta_prompt(is_new_type, artifact_meta),
+            ),
+            conversation=[recent_human_message],
+            use_system_role=not is_o1_model,
+        )
     else:
+        formatted_prompt = _build_prompt(
+            artifact_content,
+            memories_as_string,
+            is_new_type,
+            artifact_meta,
+        )
+        full_system_prompt = (
+            f"{user_system_prompt}\n{formatted_prompt}"
+            if user_system_prompt
+            else formatted_prompt
+        )
+        system_cls = HumanMessage if is_o1_model else SystemMessage
         messages = [
-            SystemMessage(content=full_system_prompt),
+            system_cls(content=full_system_prompt),
             *context_document_messages,
             recent_human_message,
         ]
 
-    # 调用模型 - 设置 run_name 以供前端识别流式事件
+    # 调用模型 - 设置 run_name 以供前端识别流式事件 (文档附件引用展开为当前提供商格式)
+    messages = await resolve_attachment_refs(messages, config, store)
     new_artifact_response = await small_model.ainvoke(
         messages,
         config={"run_name": "rewrite_artifact_model_call"},
+        **get_prompt_cache_invoke_kwargs(config),
     )
+    if prompt_caching:
+        record_prompt_cache_usage("rewriteArtifact", new_artifact_response)
 
     # 处理思考模型输出
     thinking_message = None
@@ -19,11 +19,10 @@ from ..prompts import (
     CHANGE_ARTIFACT_READING_LEVEL_PROMPT,
     CHANGE_ARTIFACT_TO_PIRATE_PROMPT,
 )
+from ..run_context import get_run_context
 from ...utils import (
     ensure_store_in_config,
     extract_thinking_and_response,
-    format_reflections,
-    get_model_config,
     get_model_from_config,
     is_thinking_model,
 )
@@ -90,25 +89,15 @@ async def rewrite_artifact_theme(
     Returns:
         包含更新后 artifact 的状态更新，可能包含思考消息
     """
+    run = get_run_context(config)
+
     # 获取模型
-    model_cfg = get_model_config(config)
+    model_cfg = run.model_config(config)
     model_name = model_cfg.get("modelName", "")
     small_model = get_model_from_config(config)
 
-    # 获取 assistant_id
-    assistant_id = config.get("configurable", {}).get("assistant_id")
-    if not assistant_id:
-        raise ValueError("`assistant_id` not found in configurable")
-
     # 从 store 获取反思/记忆
-    memory_namespace = ("memories", assistant_id)
-    memory_key = "reflection"
-    memories = await store.aget(memory_namespace, memory_key)
-
-    if memories and memories.value:
-        memories_as_string = format_reflections(memories.value)
-    else:
-        memories_as_string = "No reflections found."
+    memories_as_string = await run.reflections(config, store)
 
     # 获取当前工件内容
     current_artifact_content = _get_artifact_content(state.get("artifact"))
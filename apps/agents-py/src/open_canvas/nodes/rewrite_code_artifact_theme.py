@@ -18,9 +18,9 @@ from ..prompts import (
     FIX_BUGS_CODE_ARTIFACT_PROMPT,
     PORT_LANGUAGE_CODE_ARTIFACT_PROMPT,
 )
+from ..run_context import get_run_context
 from ...utils import (
     extract_thinking_and_response,
-    get_model_config,
     get_model_from_config,
     is_thinking_model,
 )
@@ -83,8 +83,10 @@ async def rewrite_code_artifact_theme(
     Returns:
         包含更新后 artifact 的状态更新，可能包含思考消息
     """
+    run = get_run_context(config)
+
     # 获取模型
-    model_cfg = get_model_config(config)
+    model_cfg = run.model_config(config)
     model_name = model_cfg.get("modelName", "")
     small_model = get_model_from_config(config)
 
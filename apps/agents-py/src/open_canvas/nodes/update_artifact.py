@@ -12,13 +12,11 @@ from langgraph.types import RunnableConfig
 
 from ..state import OpenCanvasGraphReturnType, OpenCanvasState
 from ..prompts import UPDATE_HIGHLIGHTED_ARTIFACT_PROMPT
+from ..documents.attachments import resolve_attachment_refs
+from ..run_context import get_run_context
 from ...utils import (
-    create_context_document_messages,
     ensure_store_in_config,
-    format_reflections,
-    get_model_config,
     get_model_from_config,
-    is_using_o1_mini_model,
 )
 from ...types import ArtifactCodeV3, ArtifactV3, Reflections
 
@@ -63,8 +61,10 @@ async def update_artifact(
     Returns:
         包含更新后 artifact 的状态更新
     """
+    run = get_run_context(config)
+
     # 获取模型配置
-    model_cfg = get_model_config(config)
+    model_cfg = run.model_config(config)
     model_provider = model_cfg.get("modelProvider", "")
     model_name = model_cfg.get("modelName", "")
 
@@ -82,20 +82,8 @@ async def update_artifact(
         }
         small_model = get_model_from_config(override_config, temperature=0)
 
-    # 获取 assistant_id
-    assistant_id = config.get("configurable", {}).get("assistant_id")
-    if not assistant_id:
-        raise ValueError("`assistant_id` not found in configurable")
-
     # 从 store 获取反思/记忆
-    memory_namespace = ("memories", assistant_id)
-    memory_key = "reflection"
-    memories = await store.aget(memory_namespace, memory_key)
-
-    if memories and memories.value:
-        memories_as_string = format_reflections(memories.value)
-    else:
-        memories_as_string = "No reflections found."
+    memories_as_string = await run.reflections(config, store)
 
     # 获取当前工件内容
     current_artifact_content = _get_artifact_content(state.get("artifact"))
@@ -131,7 +119,7 @@ async def update_artifact(
     )
 
     # 获取上下文文档消息
-    context_document_messages = await create_context_document_messages(config)
+    context_document_messages = await run.context_document_messages(config)
 
     # 获取最近的用户消息
     internal_messages = state.get("_messages", [])
@@ -145,7 +133,7 @@ async def update_artifact(
         raise ValueError("No recent human message found")
 
     # 检查是否使用 O1 模型
-    is_o1_model = is_using_o1_mini_model(config)
+    is_o1_model = run.is_using_o1_mini_model(config)
 
     # 构建消息列表
     if is_o1_model:
@@ -161,7 +149,8 @@ async def update_artifact(
             recent_human_message,
         ]
 
-    # 调用模型
+    # 调用模型 (文档附件引用展开为当前提供商格式)
+    messages = await resolve_attachment_refs(messages, config, store)
     updated_artifact = await small_model.ainvoke(messages)
 
     # 拼接完整内容
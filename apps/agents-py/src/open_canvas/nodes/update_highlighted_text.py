@@ -11,11 +11,10 @@ from langgraph.store.base import BaseStore
 from langgraph.types import RunnableConfig
 
 from ..state import OpenCanvasGraphReturnType, OpenCanvasState
+from ..documents.attachments import resolve_attachment_refs
+from ..run_context import get_run_context
 from ...utils import (
-    create_context_document_messages,
-    get_model_config,
     get_model_from_config,
-    is_using_o1_mini_model,
 )
 from ...types import ArtifactMarkdownV3, ArtifactV3
 
@@ -81,8 +80,10 @@ async def update_highlighted_text(
     Returns:
         包含更新后 artifact 的状态更新
     """
+    run = get_run_context(config)
+
     # 获取模型配置
-    model_cfg = get_model_config(config)
+    model_cfg = run.model_config(config)
     model_provider = model_cfg.get("modelProvider", "")
     model_name = model_cfg.get("modelName", "")
 
@@ -124,7 +125,7 @@ async def update_highlighted_text(
     )
 
     # 获取上下文文档消息
-    context_document_messages = await create_context_document_messages(config)
+    context_document_messages = await run.context_document_messages(config)
 
     # 获取最近的用户消息
     internal_messages = state.get("_messages", [])
@@ -136,7 +137,7 @@ async def update_highlighted_text(
         raise ValueError("Expected a human message")
 
     # 检查是否使用 O1 模型
-    is_o1_model = is_using_o1_mini_model(config)
+    is_o1_model = run.is_using_o1_mini_model(config)
 
     # 构建消息列表
     if is_o1_model:
@@ -152,7 +153,8 @@ async def update_highlighted_text(
             recent_user_message,
         ]
 
-    # 调用模型
+    # 调用模型 (文档附件引用展开为当前提供商格式)
+    messages = await resolve_attachment_refs(messages, config, store)
     response = await model.ainvoke(messages)
     response_content = str(response.content)
 
@@ -137,6 +137,36 @@ Follow these rules and guidelines:
 Ensure you ONLY reply with the rewritten artifact and NO other content.
 """
 
+# 提示词缓存模式: 稳定部分在前，工件内容在上下文文档之后单独发送
+UPDATE_ENTIRE_ARTIFACT_STABLE_PROMPT = f"""You are an AI assistant, and the user has requested you make an update to an artifact you generated in the past.
+
+You also have the following reflections on style guidelines and general memories/facts about the user to use when generating your response.
+<reflections>
+{{reflections}}
+</reflections>
+
+Please update the artifact based on the user's request. The current content of the artifact is provided in a separate message.
+
+Follow these rules and guidelines:
+<rules-guidelines>
+- You should respond with the ENTIRE updated artifact, with no additional text before and after.
+- Do not wrap it in any XML tags you see in this prompt.
+- You should use proper markdown syntax when appropriate, as the text you generate will be rendered in markdown. UNLESS YOU ARE WRITING CODE.
+- When you generate code, a markdown renderer is NOT used so if you respond with code in markdown syntax, or wrap the code in tipple backticks it will break the UI for the user.
+- If generating code, it is imperative you never wrap it in triple backticks, or prefix/suffix it with plain text. Ensure you ONLY respond with the code.
+{DEFAULT_CODE_PROMPT_RULES}
+</rules-guidelines>
+"""
+
+UPDATE_ENTIRE_ARTIFACT_CONTENT_PROMPT = """Here is the current content of the artifact:
+<artifact>
+{artifactContent}
+</artifact>
+
+{updateMetaPrompt}
+
+Ensure you ONLY reply with the rewritten artifact and NO other content."""
+
 # ============================================
 # 文本修改 Prompts
 # ============================================
@@ -338,6 +368,17 @@ CURRENT_ARTIFACT_PROMPT = """This artifact is the one the user is currently view
 
 NO_ARTIFACT_PROMPT = """The user has not generated an artifact yet."""
 
+# 路由摘要模式: 以有界摘要代替完整工件/文档
+CURRENT_ARTIFACT_DIGEST_PROMPT = """This is a digest of the artifact the user is currently viewing (outline and excerpts, not the full text).
+<artifact-digest>
+{artifact}
+</artifact-digest>"""
+
+ROUTE_QUERY_DOCUMENTS_DIGEST_PROMPT = """The user has provided the following documents as context (names and first-page snippets only):
+<documents-digest>
+{documents}
+</documents-digest>"""
+
 ROUTE_QUERY_PROMPT = f"""You are an assistant tasked with routing the users query based on their most recent message.
 You should look at this message in isolation and determine where to best route there query.
 
@@ -416,6 +457,8 @@ __all__ = [
     "GET_TITLE_TYPE_REWRITE_ARTIFACT",
     "OPTIONALLY_UPDATE_META_PROMPT",
     "UPDATE_ENTIRE_ARTIFACT_PROMPT",
+    "UPDATE_ENTIRE_ARTIFACT_STABLE_PROMPT",
+    "UPDATE_ENTIRE_ARTIFACT_CONTENT_PROMPT",
     # 文本修改 Prompts
     "CHANGE_ARTIFACT_LANGUAGE_PROMPT",
     "CHANGE_ARTIFACT_READING_LEVEL_PROMPT",
@@ -432,6 +475,8 @@ __all__ = [
     "ROUTE_QUERY_OPTIONS_NO_ARTIFACTS",
     "CURRENT_ARTIFACT_PROMPT",
     "NO_ARTIFACT_PROMPT",
+    "CURRENT_ARTIFACT_DIGEST_PROMPT",
+    "ROUTE_QUERY_DOCUMENTS_DIGEST_PROMPT",
     "ROUTE_QUERY_PROMPT",
     # 跟进消息
     "FOLLOWUP_ARTIFACT_PROMPT",
@@ -0,0 +1,27 @@
+"""
+Open Canvas 路由辅助
+
+generate_path 在 LLM 路由之前使用的本地路由组件，以及路由不确定时的推测执行
+"""
+
+from .classifier import (
+    RoutingClassifier,
+    get_routing_classifier,
+    train_classifier,
+)
+from .digest import get_router_context_mode
+from .pre_router import RouteDecision, is_pre_router_enabled, pre_route
+from .speculative import SpeculationPolicy, get_speculation_stats, run_speculative_route
+
+__all__ = [
+    "RoutingClassifier",
+    "get_routing_classifier",
+    "train_classifier",
+    "get_router_context_mode",
+    "RouteDecision",
+    "is_pre_router_enabled",
+    "pre_route",
+    "SpeculationPolicy",
+    "get_speculation_stats",
+    "run_speculative_route",
+]
@@ -0,0 +1,442 @@
+"""
+本地路由分类器
+
+哈希 n-gram TF-IDF 特征 + 多分类逻辑回归，NumPy 向量化推理 (亚毫秒级)。
+离线训练 (scripts/train_router_classifier.py)，数据来自:
+- data/routing_examples.jsonl 种子样例
+- packages/evals/src/data/query_routing.ts 评测集
+- ROUTER_DECISION_LOG 记录的 LLM 路由决策
+
+模型序列化为 .npz 文件 (ROUTER_CLASSIFIER_PATH)，每个进程只加载一次。
+generate_path 在词法预路由未能决定时查询分类器，置信度低于
+ROUTER_CLASSIFIER_THRESHOLD 时回退到 LLM 路由。
+
+分类器需显式启用 (ROUTER_CLASSIFIER=true) 并提供训练好的模型文件；启用但模型文件
+不存在或无法加载时记录警告并回退到 LLM 路由。
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from .pre_router import RouteDecision
+
+
+logger = logging.getLogger(__name__)
+
+ROUTE_LABELS = ("generateArtifact", "rewriteArtifact", "replyToGeneralInput")
+DEFAULT_FEATURE_DIM = 1 << 12
+DEFAULT_CLASSIFIER_THRESHOLD = 0.85
+DEFAULT_CLASSIFIER_PATH = ".cache/router_classifier.npz"
+SEED_EXAMPLES_PATH = Path(__file__).parent / "data" / "routing_examples.jsonl"
+
+_WORD_RE = re.compile(r"\w+|[?!]", re.UNICODE)
+
+
+@dataclass(frozen=True)
+class RoutingExample:
+    """单条路由样例"""
+
+    message: str
+    has_artifact: bool
+    route: str
+
+
+# ============================================
+# 特征
+# ============================================
+
+
+def _hash(feature: str, dim: int) -> int:
+    # crc32 在进程间稳定 (内置 hash 有随机化)
+    return zlib.crc32(feature.encode("utf-8")) % dim
+
+
+def extract_features(message: str, has_artifact: bool) -> list[str]:
+    """
+    提取 n-gram 特征
+
+    Args:
+        message: 用户消息
+        has_artifact: 当前是否存在工件
+
+    Returns:
+        特征字符串列表 (词一元/二元、首词、字符三元组、工件标记)
+    """
+    text = " ".join(message.lower().split())
+    words = _WORD_RE.findall(text)
+    features = [f"w:{w}" for w in words]
+    features += [f"b:{a}_{b}" for a, b in zip(words, words[1:])]
+    if words:
+        features.append(f"first:{words[0]}")
+        features.append(f"last:{words[-1]}")
+    padded = f" {text} "
+    features += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    features.append("artifact:yes" if has_artifact else "artifact:no")
+    return features
+
+
+def _hashed_counts(message: str, has_artifact: bool, dim: int):
+    import numpy as np
+
+    indices = np.fromiter(
+        (_hash(f, dim) for f in extract_features(message, has_artifact)), dtype=np.int64
+    )
+    return np.unique(indices, return_counts=True)
+
+
+# ============================================
+# 模型
+# ============================================
+
+
+class RoutingClassifier:
+    """
+    哈希 TF-IDF + 逻辑回归路由分类器
+
+    Args:
+        weights: (dim, 类别数) 权重矩阵
+        bias: (类别数,) 偏置
+        idf: (dim,) IDF 向量
+        labels: 类别名
+        metadata: 训练信息 (样例数、训练时间等)
+    """
+
+    def __init__(self, weights, bias, idf, labels: Iterable[str] = ROUTE_LABELS, metadata=None):
+        self.weights = weights
+        self.bias = bias
+        self.idf = idf
+        self.labels = tuple(labels)
+        self.metadata: dict[str, Any] = dict(metadata or {})
+
+    @property
+    def dim(self) -> int:
+        return int(self.weights.shape[0])
+
+    def _sparse_vector(self, message: str, has_artifact: bool):
+        import numpy as np
+
+        indices, counts = _hashed_counts(message, has_artifact, self.dim)
+        values = np.log1p(counts) * self.idf[indices]
+        norm = np.linalg.norm(values)
+        return indices, values / norm if norm else values
+
+    def predict_proba(self, message: str, has_artifact: bool) -> dict[str, float]:
+        """
+        预测各路由概率，按工件状态屏蔽不可用的路由
+
+        Args:
+            message: 用户消息
+            has_artifact: 当前是否存在工件
+
+        Returns:
+            {路由: 概率}
+        """
+        import numpy as np
+
+        indices, values = self._sparse_vector(message, has_artifact)
+        logits = values @ self.weights[indices] + self.bias
+        unavailable = "generateArtifact" if has_artifact else "rewriteArtifact"
+        logits = np.where(np.array(self.labels) == unavailable, -np.inf, logits)
+        exp = np.exp(logits - logits.max())
+        probs = exp / exp.sum()
+        return {label: float(p) for label, p in zip(self.labels, probs)}
+
+    def predict(self, message: str, has_artifact: bool) -> RouteDecision:
+        """返回最可能的路由 (source="classifier")"""
+        probs = self.predict_proba(message, has_artifact)
+        route = max(probs, key=probs.get)
+        return RouteDecision(route, round(probs[route], 3), "classifier", "hashed tf-idf")
+
+    # ----- 序列化 -----
+
+    def save(self, path: str | Path) -> None:
+        """保存为压缩 .npz 文件"""
+        import numpy as np
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"labels": list(self.labels), **self.metadata}
+        np.savez_compressed(
+            path,
+            weights=self.weights.astype(np.float32),
+            bias=self.bias.astype(np.float32),
+            idf=self.idf.astype(np.float32),
+            meta=np.array(json.dumps(meta)),
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "RoutingClassifier":
+        """从 .npz 文件加载"""
+        import numpy as np
+
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            labels = meta.pop("labels")
+            return cls(data["weights"], data["bias"], data["idf"], labels, meta)
+
+
+def train_classifier(
+    examples: list[RoutingExample],
+    *,
+    dim: int = DEFAULT_FEATURE_DIM,
+    epochs: int = 300,
+    learning_rate: float = 4.0,
+    l2: float = 1e-4,
+    batch_size: int = 256,
+    seed: int = 0,
+) -> RoutingClassifier:
+    """
+    使用小批量梯度下降训练 softmax 回归
+
+    Args:
+        examples: 训练样例
+        dim: 哈希特征维度
+        epochs: 训练轮数
+        learning_rate: 学习率
+        l2: L2 正则系数
+        batch_size: 批大小
+        seed: 随机种子
+
+    Returns:
+        训练好的 RoutingClassifier
+    """
+    import numpy as np
+
+    if not examples:
+        raise ValueError("No routing examples to train on")
+
+    label_index = {label: i for i, label in enumerate(ROUTE_LABELS)}
+    counts = [_hashed_counts(e.message, e.has_artifact, dim) for e in examples]
+
+    doc_freq = np.zeros(dim, dtype=np.float64)
+    for indices, _ in counts:
+        doc_freq[indices] += 1
+    idf = np.log((1 + len(examples)) / (1 + doc_freq)) + 1
+
+    def dense_rows(batch: np.ndarray) -> np.ndarray:
+        x = np.zeros((len(batch), dim), dtype=np.float32)
+        for row, i in enumerate(batch):
+            indices, c = counts[i]
+            values = np.log1p(c) * idf[indices]
+            norm = np.linalg.norm(values)
+            x[row, indices] = values / norm if norm else values
+        return x
+
+    y = np.array([label_index[e.route] for e in examples])
+    weights = np.zeros((dim, len(ROUTE_LABELS)), dtype=np.float32)
+    bias = np.zeros(len(ROUTE_LABELS), dtype=np.float32)
+    rng = np.random.default_rng(seed)
+
+    for _ in range(epochs):
+        order = rng.permutation(len(examples))
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            x = dense_rows(batch)
+            logits = x @ weights + bias
+            logits -= logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+            probs[np.arange(len(batch)), y[batch]] -= 1
+            grad_w = x.T @ probs / len(batch) + l2 * weights
+            grad_b = probs.mean(axis=0)
+            weights -= learning_rate * grad_w
+            bias -= learning_rate * grad_b
+
+    metadata = {"examples": len(examples), "dim": dim, "epochs": epochs, "trainedAt": int(time.time())}
+    return RoutingClassifier(weights, bias, idf, ROUTE_LABELS, metadata)
+
+
+def evaluate_classifier(
+    classifier: RoutingClassifier,
+    examples: list[RoutingExample],
+    threshold: float = DEFAULT_CLASSIFIER_THRESHOLD,
+) -> dict[str, Any]:
+    """
+    计算准确率、覆盖率和推理延迟
+
+    Args:
+        classifier: 分类器
+        examples: 评测样例
+        threshold: 置信度阈值 (低于阈值视为回退到 LLM)
+
+    Returns:
+        包含 accuracy/coverage/confidentAccuracy/latency 的报告
+    """
+    correct = confident = confident_correct = 0
+    latencies: list[float] = []
+    for example in examples:
+        start = time.perf_counter()
+        decision = classifier.predict(example.message, example.has_artifact)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hit = decision.route == example.route
+        correct += hit
+        if decision.confidence >= threshold:
+            confident += 1
+            confident_correct += hit
+
+    latencies.sort()
+    total = len(examples)
+    return {
+        "examples": total,
+        "accuracy": correct / total if total else 0.0,
+        "coverage": confident / total if total else 0.0,
+        "confidentAccuracy": confident_correct / confident if confident else 0.0,
+        "latencyMsP50": latencies[total // 2] if total else 0.0,
+        "latencyMsP99": latencies[min(total - 1, int(total * 0.99))] if total else 0.0,
+    }
+
+
+# ============================================
+# 数据加载
+# ============================================
+
+
+def load_jsonl_examples(
+    path: str | Path,
+    sources: Optional[set[str]] = None,
+) -> list[RoutingExample]:
+    """
+    加载 JSONL 样例 (种子数据或 ROUTER_DECISION_LOG)
+
+    每行: {"message": str, "hasArtifact": bool, "route": str, "source"?: str}
+
+    Args:
+        path: JSONL 文件路径
+        sources: 只保留这些决策来源的行 (None 表示全部)
+    """
+    examples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if sources is not None and row.get("source") not in sources:
+                continue
+            if row.get("route") in ROUTE_LABELS:
+                examples.append(RoutingExample(row["message"], bool(row.get("hasArtifact")), row["route"]))
+    return examples
+
+
+_TS_STRING = r'"((?:[^"\\]|\\.)*)"|`((?:[^`\\]|\\.)*)`'
+
+
+def load_eval_examples(path: str | Path) -> list[RoutingExample]:
+    """
+    从 packages/evals/src/data/query_routing.ts 解析评测样例
+
+    每个样例取 inputs.messages 中最后一条 HumanMessage、是否带 artifact，
+    以及 referenceOutputs.next 作为标签。
+    """
+    source = Path(path).read_text(encoding="utf-8")
+    examples = []
+    for block in re.split(r"(?=\binputs\s*:)", source)[1:]:
+        human = re.findall(r"new HumanMessage\(\s*(?:" + _TS_STRING + r")", block)
+        label = re.search(r"referenceOutputs\s*:\s*\{\s*next\s*:\s*\"(\w+)\"", block)
+        if not human or not label or label.group(1) not in ROUTE_LABELS:
+            continue
+        double, backtick = human[-1]
+        message = json.loads(f'"{double}"') if double else backtick
+        artifact_part = block.split("referenceOutputs")[0]
+        has_artifact = bool(re.search(r"\bartifact\s*:\s*\{", artifact_part))
+        examples.append(RoutingExample(message, has_artifact, label.group(1)))
+    return examples
+
+
+# ============================================
+# 运行时
+# ============================================
+
+
+_classifier: Optional[RoutingClassifier] = None
+_classifier_loaded = False
+_classifier_lock = threading.Lock()
+
+
+def is_classifier_enabled() -> bool:
+    """分类器是否启用 (ROUTER_CLASSIFIER，默认关闭: 需要先离线训练模型文件)"""
+    return os.environ.get("ROUTER_CLASSIFIER", "false").lower() in ("1", "true", "yes")
+
+
+def get_routing_classifier() -> Optional[RoutingClassifier]:
+    """
+    获取进程级路由分类器 (首次调用时从 ROUTER_CLASSIFIER_PATH 加载)
+
+    Returns:
+        分类器，禁用/文件不存在/缺少 numpy 时返回 None
+    """
+    global _classifier, _classifier_loaded
+    if _classifier_loaded:
+        return _classifier
+
+    with _classifier_lock:
+        if _classifier_loaded:
+            return _classifier
+        path = os.environ.get("ROUTER_CLASSIFIER_PATH", DEFAULT_CLASSIFIER_PATH)
+        if not is_classifier_enabled():
+            logger.debug("Routing classifier disabled (set ROUTER_CLASSIFIER=true to enable)")
+        elif not Path(path).is_file():
+            logger.warning(
+                f"ROUTER_CLASSIFIER is enabled but {path} does not exist, routing falls back to the LLM; "
+                "train a model with scripts/train_router_classifier.py"
+            )
+        else:
+            try:
+                _classifier = RoutingClassifier.load(path)
+                logger.info("Loaded routing classifier from %s (%s)", path, _classifier.metadata)
+            except ImportError:
+                logger.warning("numpy is not installed, routing classifier disabled")
+            except Exception as e:
+                logger.warning(f"Failed to load routing classifier from {path}: {e}")
+        _classifier_loaded = True
+        return _classifier
+
+
+def reset_routing_classifier() -> None:
+    """清除已加载的分类器，下次调用时重新加载"""
+    global _classifier, _classifier_loaded
+    with _classifier_lock:
+        _classifier = None
+        _classifier_loaded = False
+
+
+def get_classifier_threshold() -> float:
+    """获取采用分类器结果的置信度阈值 (ROUTER_CLASSIFIER_THRESHOLD)"""
+    try:
+        return float(os.environ.get("ROUTER_CLASSIFIER_THRESHOLD", DEFAULT_CLASSIFIER_THRESHOLD))
+    except ValueError:
+        return DEFAULT_CLASSIFIER_THRESHOLD
+
+
+def log_route_decision(message: str, has_artifact: bool, decision: RouteDecision) -> None:
+    """
+    将路由决策追加到 ROUTER_DECISION_LOG (JSONL)，作为分类器的训练数据
+
+    Args:
+        message: 用户消息
+        has_artifact: 当前是否存在工件
+        decision: 路由决策
+    """
+    path = os.environ.get("ROUTER_DECISION_LOG")
+    if not path:
+        return
+    row = {
+        "message": message,
+        "hasArtifact": has_artifact,
+        "route": decision.route,
+        "source": decision.source,
+        "confidence": decision.confidence,
+    }
+    try:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    except OSError as e:
+        logger.warning(f"Failed to log route decision: {e}")
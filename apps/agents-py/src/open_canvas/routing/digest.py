@@ -0,0 +1,300 @@
+"""
+路由输入摘要 (routing digest)
+
+_dynamic_determine_path 只需在两个路由间做选择，却会把完整工件和全部上下文文档
+(整份 PDF) 发给模型。摘要模式用有界的概要代替原文:
+
+- 工件: 标题、类型/语言、长度、Markdown 标题或代码符号、首尾摘录
+- 文档: 文件名、类型、大小与开头片段 (PDF 优先使用 document_ingest 预提取的文本或
+  PDF 文本缓存，都未命中时才解析首页)
+- 最近消息: 每条按预算截断 (保留首尾)
+
+摘要总长度受 ROUTER_DIGEST_TOKEN_BUDGET 约束，路由提示词大小与工件/文档大小无关。
+ROUTER_CONTEXT_MODE=full (或 configurable.routerContextMode) 回退到完整上下文，
+用于对比两种模式的路由准确率。
+"""
+
+import asyncio
+import base64
+import logging
+import os
+import re
+from itertools import islice
+from typing import Any, Optional
+
+from langchain_core.messages import BaseMessage
+from langgraph.store.base import BaseStore
+from langgraph.types import RunnableConfig
+
+from ...documents.attachments import is_attachment_ref
+from ...documents.decode import decode_base64_to_file, iter_pdf_pages, make_temp_path, open_pdf
+from ...documents.ingest import load_ingested_texts
+from ...documents.text_cache import get_pdf_text_cache
+from ...types import ContextDocument
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIGEST_TOKEN_BUDGET = 1000
+CHARS_PER_TOKEN = 4
+
+# 预算分配: 最近消息 / 工件 / 文档 (无文档时文档份额并入工件)
+_RECENT_MESSAGES_SHARE = 0.25
+_DOCUMENTS_SHARE = 0.3
+
+_MAX_OUTLINE_ITEMS = 12
+# 只在前缀范围内收集标题/符号，摘要耗时不随工件大小线性增长
+_OUTLINE_SCAN_CHARS = 50_000
+
+_MARKDOWN_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$", re.MULTILINE)
+_CODE_SYMBOL = re.compile(
+    r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?(?:pub\s+)?"
+    r"(?:def|class|function|func|fn|interface|struct|enum|trait|type|const|let|var)\s+"
+    r"([A-Za-z_$][\w$]*)",
+    re.MULTILINE,
+)
+
+
+# ============================================
+# 配置
+# ============================================
+
+
+def get_router_context_mode(config: Optional[RunnableConfig] = None) -> str:
+    """
+    获取路由上下文模式
+
+    Args:
+        config: 运行配置，configurable.routerContextMode 优先于 ROUTER_CONTEXT_MODE 环境变量
+
+    Returns:
+        "digest" (默认) 或 "full"
+    """
+    configurable = (config or {}).get("configurable", {}) or {}
+    mode = configurable.get("routerContextMode") or os.environ.get("ROUTER_CONTEXT_MODE", "digest")
+    return "full" if str(mode).lower() == "full" else "digest"
+
+
+def get_digest_token_budget() -> int:
+    """获取路由摘要的 token 预算 (ROUTER_DIGEST_TOKEN_BUDGET)"""
+    try:
+        return max(int(os.environ.get("ROUTER_DIGEST_TOKEN_BUDGET", DEFAULT_DIGEST_TOKEN_BUDGET)), 100)
+    except ValueError:
+        return DEFAULT_DIGEST_TOKEN_BUDGET
+
+
+# ============================================
+# 摘要构建
+# ============================================
+
+
+def _truncate_middle(text: str, max_chars: int) -> str:
+    """超出长度时保留首尾，中间以省略标记代替"""
+    if len(text) <= max_chars:
+        return text
+    marker = "\n[...]\n"
+    if max_chars <= len(marker) + 2:
+        return text[:max_chars]
+    head = (max_chars - len(marker)) * 2 // 3
+    tail = max_chars - len(marker) - head
+    return text[:head] + marker + text[-tail:] if tail > 0 else text[:head] + marker
+
+
+def _format_size(num_bytes: int) -> str:
+    if num_bytes >= 1024 * 1024:
+        return f"{num_bytes / (1024 * 1024):.1f} MB"
+    if num_bytes >= 1024:
+        return f"{num_bytes / 1024:.1f} KB"
+    return f"{num_bytes} B"
+
+
+def _outline(pattern: re.Pattern, body: str, group: int) -> str:
+    """收集前若干个标题/符号 (找到上限或超出扫描范围后停止，不遍历整个大工件)"""
+    matches = pattern.finditer(body, 0, _OUTLINE_SCAN_CHARS)
+    items = [m.group(group) for m in islice(matches, _MAX_OUTLINE_ITEMS + 1)]
+    suffix = " (+more)" if len(items) > _MAX_OUTLINE_ITEMS else ""
+    return "; ".join(items[:_MAX_OUTLINE_ITEMS]) + suffix
+
+
+def build_artifact_digest(content: dict[str, Any] | None, max_chars: int) -> str:
+    """
+    构建工件摘要
+
+    Args:
+        content: 当前工件内容 (ArtifactMarkdownV3 / ArtifactCodeV3)
+        max_chars: 摘要最大字符数
+
+    Returns:
+        不超过 max_chars 的工件摘要
+    """
+    if not content:
+        return ""
+
+    is_code = content.get("type") == "code"
+    body = content.get("code", "") if is_code else content.get("fullMarkdown", "")
+    lines = [f"title: {content.get('title', '')}"]
+    if is_code:
+        lines.append(f"type: code ({content.get('language', 'other')})")
+    else:
+        lines.append("type: text")
+    lines.append(f"length: {len(body)} chars, {body.count(chr(10)) + 1 if body else 0} lines")
+
+    outline = _outline(_CODE_SYMBOL, body, 1) if is_code else _outline(_MARKDOWN_HEADING, body, 2)
+    if outline:
+        lines.append(f"{'symbols' if is_code else 'headings'}: {outline}")
+
+    header = "\n".join(lines)
+    remaining = max_chars - len(header) - 1
+    if remaining <= 0 or not body:
+        return header[:max_chars]
+    return f"{header}\n{_truncate_middle(body, remaining)}"
+
+
+def _first_page_text(data: str) -> str:
+    """提取 PDF 首页文本 (分块解码到临时文件，失败时返回空字符串)"""
+    path = make_temp_path()
+    try:
+        decode_base64_to_file(data, path)
+        with open_pdf(path) as reader:
+            return next(iter_pdf_pages(reader, 0, 1), "")
+    except Exception as e:
+        logger.warning(f"Failed to read first PDF page for routing digest: {e}")
+        return ""
+    finally:
+        os.unlink(path)
+
+
+async def _pdf_snippet_text(data: str, store: Optional[BaseStore]) -> str:
+    """PDF 片段文本: 优先使用 PDF 文本缓存，未命中时只解析首页 (在线程中执行避免阻塞事件循环)"""
+    from ...utils import clean_base64
+
+    cache = get_pdf_text_cache()
+    if cache is not None:
+        text = await cache.get(clean_base64(data), store)
+        if text is not None:
+            return text
+    return await asyncio.to_thread(_first_page_text, data)
+
+
+async def _document_snippet(
+    doc: ContextDocument,
+    max_chars: int,
+    ingested_text: Optional[str] = None,
+    store: Optional[BaseStore] = None,
+) -> str:
+    from ...utils import clean_base64
+
+    doc_type = doc.get("type", "")
+    data = doc.get("data", "")
+    if ingested_text is not None:
+        text = ingested_text
+    elif doc_type == "application/pdf":
+        text = await _pdf_snippet_text(data, store)
+    elif doc_type.startswith("text/"):
+        # 只解码足够生成片段的前缀 (base64 每 4 字符解码为 3 字节)
+        prefix = clean_base64(data)[: (max_chars * 4 // 3 + 4) // 4 * 4]
+        text = base64.b64decode(prefix).decode("utf-8", errors="ignore")
+    elif doc_type == "text":
+        text = data
+    else:
+        text = ""
+    return re.sub(r"\s+", " ", text[: max_chars * 2]).strip()[:max_chars]
+
+
+def _content_block_digest(block: Any, max_chars: int) -> Optional[str]:
+    """为已转换的文档消息内容块 (text / document / application/pdf / 附件引用) 生成一行摘要"""
+    if isinstance(block, str):
+        block = {"type": "text", "text": block}
+    if not isinstance(block, dict):
+        return None
+    block_type = block.get("type")
+    if is_attachment_ref(block):
+        return f"{block.get('mediaType', 'attachment')}, {_format_size(block.get('size', 0))}"
+    if block_type == "text":
+        raw = block.get("text", "")
+        text = re.sub(r"\s+", " ", raw[: max_chars * 2]).strip()
+        return f"text, {len(raw)} chars: {text[:max_chars]}"
+    source = block.get("source") or {}
+    data = block.get("data") or source.get("data", "")
+    if data:
+        return f"{source.get('media_type', block_type)}, {_format_size(len(data) * 3 // 4)}"
+    return None
+
+
+async def build_documents_digest(
+    documents: list[ContextDocument],
+    new_messages: list[BaseMessage],
+    max_chars: int,
+    store: Optional[BaseStore] = None,
+    assistant_id: Optional[str] = None,
+) -> str:
+    """
+    构建上下文文档摘要
+
+    Args:
+        documents: 助手级上下文文档 (来自 store)
+        new_messages: 本轮新增的文档消息 (已转换为提供商格式)
+        max_chars: 摘要最大字符数
+        store: LangGraph store (预提取记录与 PDF 文本缓存)
+        assistant_id: 助手 ID (读取预提取记录)
+
+    Returns:
+        不超过 max_chars 的文档摘要，无文档时为空字符串
+    """
+    blocks = [
+        block
+        for message in new_messages
+        for block in (message.content if isinstance(message.content, list) else [message.content])
+    ]
+    count = len(documents) + len(blocks)
+    if not count or max_chars <= 0:
+        return ""
+
+    per_item = max(max_chars // count, 40)
+    ingested = await load_ingested_texts(store, assistant_id, documents) or {}
+    lines = []
+    for i, doc in enumerate(documents):
+        data = doc.get("data", "")
+        prefix = f"- {doc.get('name', 'document')} ({doc.get('type', '')}, {_format_size(len(data) * 3 // 4)})"
+        snippet = await _document_snippet(doc, max(per_item - len(prefix) - 2, 0), ingested.get(i), store)
+        lines.append(f"{prefix}: {snippet}" if snippet else prefix)
+    for i, block in enumerate(blocks, 1):
+        summary = _content_block_digest(block, per_item)
+        if summary:
+            lines.append(f"- attached document {i} ({summary})")
+
+    return "\n".join(line[:per_item] for line in lines)[:max_chars]
+
+
+def format_recent_messages_digest(recent: list[tuple[str, str]], max_chars: int) -> str:
+    """
+    按预算格式化最近消息 (每条消息平分预算，超长时保留首尾)
+
+    Args:
+        recent: (消息类型, 文本) 列表
+        max_chars: 最大字符数
+
+    Returns:
+        格式化的最近消息
+    """
+    if not recent:
+        return ""
+    per_message = max(max_chars // len(recent), 40)
+    formatted = []
+    for msg_type, text in recent:
+        prefix = f"{msg_type}: "
+        formatted.append(prefix + _truncate_middle(text, max(per_message - len(prefix), 0)))
+    return "\n\n".join(formatted)
+
+
+def split_digest_budget(budget_tokens: int, has_documents: bool) -> dict[str, int]:
+    """
+    将 token 预算换算为各部分的字符预算
+
+    Returns:
+        {"recentMessages", "artifact", "documents"} → 字符数
+    """
+    total = budget_tokens * CHARS_PER_TOKEN
+    recent = int(total * _RECENT_MESSAGES_SHARE)
+    documents = int(total * _DOCUMENTS_SHARE) if has_documents else 0
+    return {"recentMessages": recent, "artifact": total - recent - documents, "documents": documents}
@@ -0,0 +1,191 @@
+"""
+零 LLM 词法预路由
+
+在 generate_path 调用 _dynamic_determine_path 之前，根据最新用户消息的模式/关键词
+和当前是否存在工件，给出路由候选及置信度。置信度达到阈值时直接采用，不发起模型调用;
+否则回退到 LLM 路由。
+
+路由选项与 LLM 路由一致:
+- 无工件: generateArtifact / replyToGeneralInput
+- 有工件: rewriteArtifact / replyToGeneralInput
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from langgraph.types import RunnableConfig
+
+
+DEFAULT_PRE_ROUTER_THRESHOLD = 0.8
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    """
+    路由决策
+
+    Attributes:
+        route: 路由目标
+        confidence: 置信度 (0-1)
+        source: 决策来源 ("rules" / "classifier" / "llm")
+        reason: 命中的规则说明 (用于日志)
+    """
+
+    route: str
+    confidence: float
+    source: str
+    reason: str = ""
+
+
+# ============================================
+# 词法规则
+# ============================================
+
+# 礼貌性前缀，剥离后再判断祈使动词
+_REQUEST_PREFIX = re.compile(
+    r"^(?:(?:hey|hi|ok|okay|so|now|great|thanks)[,!. ]+)?"
+    r"(?:please\s+|pls\s+|can you\s+|could you\s+|would you\s+|will you\s+|"
+    r"i want you to\s+|i'd like you to\s+|i need you to\s+|help me\s+|let's\s+|lets\s+)*"
+    r"(?:please\s+)?"
+)
+
+_CREATE_VERBS = re.compile(
+    r"^(?:write|create|generate|draft|compose|make|build|implement|code|produce|"
+    r"design|develop|outline|give me|come up with|prepare)\b"
+)
+_CREATE_WANT = re.compile(r"^(?:i need|i want|i'd like|i would like)\s+(?:a|an|some)\b")
+
+_EDIT_VERBS = re.compile(
+    r"^(?:update|change|modify|rewrite|re-write|edit|fix|improve|refactor|add|remove|"
+    r"delete|rename|shorten|lengthen|expand|extend|condense|simplify|translate|revise|"
+    r"convert|replace|adjust|tweak|polish|rephrase|reword|optimi[sz]e|clean up|"
+    r"make it|make the|make this|turn it|turn this|use)\b"
+)
+
+_ARTIFACT_NOUNS = re.compile(
+    r"\b(?:essay|poem|story|article|blog(?: post)?|post|email|letter|report|outline|"
+    r"document|doc|readme|script|function|class|program|code|component|module|snippet|"
+    r"api|endpoint|query|sql|regex|algorithm|app|page|website|template|resume|cv|"
+    r"speech|song|lyrics|tweet|summary|proposal|plan|guide|tutorial|paragraph|"
+    r"haiku|limerick|novel|chapter)s?\b"
+)
+
+_ARTIFACT_REFERENCE = re.compile(
+    r"\b(?:it|this|that|the (?:essay|poem|story|article|post|email|letter|report|"
+    r"document|code|function|class|script|program|component|text|draft|artifact|"
+    r"paragraph|title|intro|introduction|conclusion|ending|beginning)|above)\b"
+)
+
+_QUESTION_START = re.compile(
+    r"^(?:what|why|how|who|whom|whose|when|where|which|is|are|was|were|do|does|did|"
+    r"should|shall|explain|tell me|describe|define|compare)\b"
+)
+
+_SMALL_TALK = re.compile(
+    r"^(?:hi|hello|hey|yo|thanks|thank you|thx|ok|okay|cool|great|nice|awesome|"
+    r"good (?:morning|afternoon|evening)|bye|goodbye|你好|谢谢|好的)\b[\s!.?,:)]*$"
+)
+
+# 中文指令 (项目团队常用)
+_CREATE_VERBS_ZH = re.compile(r"^(?:请)?(?:帮我)?(?:写|创作|生成|起草|编写)")
+_EDIT_VERBS_ZH = re.compile(r"^(?:请)?(?:帮我)?(?:修改|改写|改成|重写|优化|翻译|缩短|扩写|删除|添加)")
+_QUESTION_ZH = re.compile(r"(?:吗|什么|为什么|怎么|如何|哪)[？?]?$|[？?]$")
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text.strip().lower())
+
+
+def pre_route(
+    message: str,
+    has_artifact: bool,
+    has_new_documents: bool = False,
+) -> RouteDecision:
+    """
+    根据最新用户消息给出路由候选和置信度
+
+    Args:
+        message: 最新用户消息文本
+        has_artifact: 当前是否存在工件
+        has_new_documents: 本轮是否附带了新的上下文文档 (降低置信度，交给 LLM 判断)
+
+    Returns:
+        RouteDecision (source="rules")
+    """
+    artifact_route = "rewriteArtifact" if has_artifact else "generateArtifact"
+    text = _normalize(message)
+
+    def decide(route: str, confidence: float, reason: str) -> RouteDecision:
+        if has_new_documents:
+            confidence -= 0.15
+        return RouteDecision(route, round(max(confidence, 0.0), 2), "rules", reason)
+
+    if not text:
+        return decide("replyToGeneralInput", 0.5, "empty message")
+
+    if _SMALL_TALK.match(text):
+        return decide("replyToGeneralInput", 0.95, "small talk")
+
+    command = _REQUEST_PREFIX.sub("", text, count=1)
+    is_question = text.endswith("?") or bool(_QUESTION_START.match(text))
+    mentions_artifact_noun = bool(_ARTIFACT_NOUNS.search(command))
+
+    # 编辑指令 (仅在有工件时有意义)
+    if has_artifact and (_EDIT_VERBS.match(command) or _EDIT_VERBS_ZH.match(command)):
+        if _ARTIFACT_REFERENCE.search(command) or mentions_artifact_noun:
+            return decide(artifact_route, 0.92, "edit verb referencing artifact")
+        return decide(artifact_route, 0.85, "edit verb")
+
+    # 创作指令
+    if _CREATE_VERBS.match(command) or _CREATE_VERBS_ZH.match(command) or _CREATE_WANT.match(command):
+        if mentions_artifact_noun or _CREATE_VERBS_ZH.match(command):
+            return decide(artifact_route, 0.9, "create verb with artifact noun")
+        return decide(artifact_route, 0.75, "create verb")
+
+    # 以疑问词开头的提问 (如 "how do I write a function?") 需要区分讲解与生成
+    if is_question or _QUESTION_ZH.search(text):
+        if mentions_artifact_noun and not has_artifact and re.search(r"\b(?:write|create|generate)\b", text):
+            return decide("replyToGeneralInput", 0.55, "question mentioning creation")
+        if has_artifact and _ARTIFACT_REFERENCE.search(text):
+            return decide("replyToGeneralInput", 0.8, "question about artifact")
+        return decide("replyToGeneralInput", 0.85, "question")
+
+    if has_artifact and _ARTIFACT_REFERENCE.search(command):
+        return decide(artifact_route, 0.6, "artifact reference")
+
+    # 仅给出名词短语 (如 "A poem about the sea")
+    if not has_artifact and re.match(r"^(?:a|an|another|some)\b", command) and mentions_artifact_noun:
+        return decide(artifact_route, 0.7, "artifact noun phrase")
+
+    return decide("replyToGeneralInput", 0.5, "no rule matched")
+
+
+# ============================================
+# 配置
+# ============================================
+
+
+def is_pre_router_enabled(config: Optional[RunnableConfig] = None) -> bool:
+    """
+    判断是否启用词法预路由
+
+    Args:
+        config: 运行配置，configurable.preRouter 优先于 ROUTER_PRE_ROUTER 环境变量
+
+    Returns:
+        是否启用 (默认启用)
+    """
+    configurable = (config or {}).get("configurable", {}) or {}
+    if configurable.get("preRouter") is not None:
+        return bool(configurable["preRouter"])
+    return os.environ.get("ROUTER_PRE_ROUTER", "true").lower() in ("1", "true", "yes")
+
+
+def get_pre_router_threshold() -> float:
+    """获取直接采用预路由结果的置信度阈值 (ROUTER_PRE_ROUTER_THRESHOLD)"""
+    try:
+        return float(os.environ.get("ROUTER_PRE_ROUTER_THRESHOLD", DEFAULT_PRE_ROUTER_THRESHOLD))
+    except ValueError:
+        return DEFAULT_PRE_ROUTER_THRESHOLD
@@ -0,0 +1,301 @@
+"""
+候选路由的推测执行 (speculative execution)
+
+路由不确定时，用户需要先等待 _dynamic_determine_path，再等待被选中的节点
+(replyToGeneralInput 或 generateArtifact/rewriteArtifact)。开启推测执行后，
+候选节点与路由调用并发启动; 路由确定后立即取消落选分支，只提交胜出分支的状态更新。
+
+- 启用: configurable.speculativeRouting 或 ROUTER_SPECULATIVE (默认关闭)
+- 花费控制: 仅当词法预路由置信度落在 [ROUTER_SPECULATIVE_MIN_CONFIDENCE,
+  ROUTER_SPECULATIVE_MAX_CONFIDENCE) 区间时推测; ROUTER_SPECULATIVE_ROUTES 限制可推测的节点
+- 推测分支不直接使用运行的回调处理器 (流式事件、追踪)，事件先缓存在分支的转发器中;
+  路由确定后回放胜出分支已缓存的事件，之后的事件实时转发，落选分支的事件随分支丢弃。
+  分支事件的 metadata.langgraph_node 为候选节点名，前端按该节点的流式事件处理
+- 指标: 推测次数、取消次数、浪费的 token 数 (见 get_speculation_stats)
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables.config import (
+    get_async_callback_manager_for_config,
+    merge_configs,
+    var_child_runnable_config,
+)
+from langgraph.types import RunnableConfig
+
+from ...llm.relay import CallbackRelay
+from .pre_router import RouteDecision
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPECULATIVE_ROUTES = ("replyToGeneralInput", "generateArtifact", "rewriteArtifact")
+
+# 推测提交后直接跳转到胜出节点的后继节点 (与 graph.py 中的边保持一致)
+SPECULATIVE_ROUTE_SUCCESSORS = {
+    "replyToGeneralInput": "cleanState",
+    "generateArtifact": "generateFollowup",
+    "rewriteArtifact": "generateFollowup",
+}
+
+
+# ============================================
+# 策略
+# ============================================
+
+
+@dataclass(frozen=True)
+class SpeculationPolicy:
+    """推测执行策略配置"""
+
+    enabled: bool = False
+    min_confidence: float = 0.5
+    max_confidence: float = 0.8
+    routes: frozenset[str] = field(default_factory=lambda: frozenset(DEFAULT_SPECULATIVE_ROUTES))
+
+    @classmethod
+    def from_config(cls, config: Optional[RunnableConfig] = None) -> "SpeculationPolicy":
+        """
+        从环境变量读取策略，configurable.speculativeRouting 覆盖开关
+
+        Args:
+            config: 运行配置
+
+        Returns:
+            SpeculationPolicy
+        """
+        configurable = (config or {}).get("configurable", {}) or {}
+        if configurable.get("speculativeRouting") is not None:
+            enabled = bool(configurable["speculativeRouting"])
+        else:
+            enabled = os.environ.get("ROUTER_SPECULATIVE", "false").lower() in ("1", "true", "yes")
+
+        routes_env = os.environ.get("ROUTER_SPECULATIVE_ROUTES")
+        routes = (
+            frozenset(r.strip() for r in routes_env.split(",") if r.strip())
+            if routes_env is not None
+            else frozenset(DEFAULT_SPECULATIVE_ROUTES)
+        )
+        return cls(
+            enabled=enabled,
+            min_confidence=float(os.environ.get("ROUTER_SPECULATIVE_MIN_CONFIDENCE", "0.5")),
+            max_confidence=float(os.environ.get("ROUTER_SPECULATIVE_MAX_CONFIDENCE", "0.8")),
+            routes=routes & frozenset(SPECULATIVE_ROUTE_SUCCESSORS),
+        )
+
+    def should_speculate(self, pre_decision: Optional[RouteDecision]) -> bool:
+        """预路由置信度落在推测区间内时返回 True (预路由关闭时不推测)"""
+        if not self.enabled or pre_decision is None:
+            return False
+        return self.min_confidence <= pre_decision.confidence < self.max_confidence
+
+
+# ============================================
+# 指标
+# ============================================
+
+
+class SpeculationStats:
+    """推测指标: 推测/跳过/提交/取消次数、胜出分支失败数、浪费 token 与节省时间"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        self.reset()
+
+    def add(self, **values: float) -> None:
+        with self._lock:
+            for key, value in values.items():
+                self._counters[key] += value
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            result = dict(self._counters)
+        speculations = result["speculations"]
+        result["commitRate"] = result["committed"] / speculations if speculations else 0.0
+        result["wastedTokensPerSpeculation"] = result["wastedTokens"] / speculations if speculations else 0.0
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters = {
+                "speculations": 0,
+                "skipped": 0,
+                "committed": 0,
+                "cancelled": 0,
+                "winnerFailures": 0,
+                "wastedTokens": 0,
+                "savedMs": 0.0,
+            }
+
+
+_speculation_stats = SpeculationStats()
+
+
+def get_speculation_stats() -> dict[str, Any]:
+    """获取推测执行指标"""
+    return _speculation_stats.snapshot()
+
+
+def reset_speculation_stats() -> None:
+    """重置推测执行指标"""
+    _speculation_stats.reset()
+
+
+def record_speculation_skipped() -> None:
+    """记录一次因置信度不在区间内而未推测的 LLM 路由"""
+    _speculation_stats.add(skipped=1)
+
+
+class _TokenCounter(BaseCallbackHandler):
+    """
+    统计推测分支消耗的 token
+
+    已结束的调用按 usage_metadata 计数 (缺失时按流式块数); 被取消的调用
+    只能按已收到的流式块数估算。
+    """
+
+    run_inline = True
+
+    def __init__(self) -> None:
+        self.tokens = 0
+        self._pending: dict[UUID, int] = {}
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._pending[run_id] = self._pending.get(run_id, 0) + 1
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        streamed = self._pending.pop(run_id, 0)
+        reported = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    reported += usage.get("total_tokens", 0)
+        self.tokens += reported or streamed
+
+    @property
+    def total(self) -> int:
+        return self.tokens + sum(self._pending.values())
+
+
+# ============================================
+# 推测执行
+# ============================================
+
+
+def _start_branch(
+    run_node: Callable[[RunnableConfig], Awaitable[dict[str, Any]]],
+    config: RunnableConfig,
+) -> asyncio.Task:
+    """
+    在以 config 为当前运行配置的上下文中启动推测分支
+
+    节点内部以自己的 config= (如只有 run_name) 调用模型时，ensure_config 从上下文
+    继承回调，模型事件因此同样经过分支的转发器与 token 计数，不会直接到达运行的处理器。
+    """
+    context = contextvars.copy_context()
+    context.run(var_child_runnable_config.set, config)
+    return asyncio.get_running_loop().create_task(run_node(config), context=context)
+
+
+async def run_speculative_route(
+    routing: Awaitable[str],
+    candidates: dict[str, Callable[[RunnableConfig], Awaitable[dict[str, Any]]]],
+    config: RunnableConfig,
+) -> tuple[str, Optional[dict[str, Any]]]:
+    """
+    与路由调用并发执行候选节点
+
+    Args:
+        routing: 路由调用 (返回路由目标)
+        candidates: 路由目标 → 以配置为参数执行节点的函数
+        config: 当前运行配置 (推测分支的回调经转发器缓存，胜出后才送达运行的处理器)
+
+    Returns:
+        (路由目标, 胜出分支的状态更新); 胜出路由未被推测或其分支失败时更新为 None，
+        由图按常规方式执行该节点
+    """
+    started = time.monotonic()
+    callback_manager = get_async_callback_manager_for_config(config)
+    counters: dict[str, _TokenCounter] = {}
+    relays: dict[str, CallbackRelay] = {}
+    tasks: dict[str, asyncio.Task] = {}
+    for name, run_node in candidates.items():
+        counters[name] = _TokenCounter()
+        relays[name] = CallbackRelay()
+        # 保留父运行、标签和 metadata，处理器替换为转发器与 token 计数
+        branch_callbacks = callback_manager.copy()
+        branch_callbacks.set_handlers([relays[name], counters[name]])
+        speculative_config = merge_configs(
+            config,
+            {
+                "tags": ["speculative"],
+                "metadata": {"speculative_route": name, "langgraph_node": name},
+            },
+        )
+        speculative_config["callbacks"] = branch_callbacks
+        tasks[name] = _start_branch(run_node, speculative_config)
+
+    try:
+        route = await routing
+    except BaseException:
+        await _cancel_all(tasks.values())
+        raise
+    routed_ms = (time.monotonic() - started) * 1000
+
+    cancelled = 0
+    wasted_tokens = 0
+    for name, task in tasks.items():
+        if name == route:
+            continue
+        if not task.done():
+            cancelled += 1
+        await _cancel_all([task])
+        wasted_tokens += counters[name].total
+
+    update = None
+    winner = tasks.get(route)
+    if winner is not None:
+        # 胜出分支: 回放已缓存的流式事件，剩余部分实时推送
+        await relays[route].commit(callback_manager.handlers)
+        try:
+            update = await winner
+        except Exception as e:
+            logger.warning(f"[speculative] {route} branch failed, running it again: {e}")
+            wasted_tokens += counters[route].total
+            _speculation_stats.add(winnerFailures=1)
+
+    _speculation_stats.add(
+        speculations=1,
+        committed=int(update is not None),
+        cancelled=cancelled,
+        wastedTokens=wasted_tokens,
+        savedMs=routed_ms if update is not None else 0.0,
+    )
+    logger.info(
+        f"[speculative] route={route} committed={update is not None} "
+        f"cancelled={cancelled} wasted_tokens={wasted_tokens}"
+    )
+    return route, update
+
+
+async def _cancel_all(tasks: Any) -> None:
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+        try:
+            await task
+        except BaseException:
+            pass
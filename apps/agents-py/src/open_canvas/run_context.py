@@ -0,0 +1,343 @@
+"""
+运行级上下文
+
+同一次运行中，各节点会重复计算相同的值: get_model_config (is_using_o1_mini_model 也会再算一次)、
+从 store 读取反思、读取并转换助手的上下文文档 (路由与工件节点各一次)。RunContext 在一次运行内
+惰性计算并缓存这些值，异步值在并发节点 (如推测执行的候选节点) 之间只初始化一次。
+
+上下文的定位方式 (按顺序):
+- configurable[RUN_CONTEXT_KEY]: 调用方通过 attach_run_context 显式挂载 (configurable 中的对象
+  在同一运行的各节点间按引用共享)
+- configurable.run_id (LangGraph Server 为每次运行设置): 进程级注册表，LRU + TTL 淘汰
+  (RUN_CONTEXT_MAX_RUNS，默认 32; RUN_CONTEXT_TTL，默认 600 秒)
+- 两者都没有时 (如直接调用节点函数): 每次返回新的上下文，只在节点内部复用
+
+缓存的值在运行内视为只读; 返回前对可变结构做拷贝。
+"""
+
+import asyncio
+import copy
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, Optional, TypeVar
+
+from langgraph.store.base import BaseStore
+from langgraph.types import RunnableConfig
+
+from ..utils import (
+    create_context_document_messages,
+    format_reflections,
+    get_config_store,
+    get_context_documents,
+    get_model_config,
+)
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RUN_CONTEXT_KEY = "__open_canvas_run_context"
+
+DEFAULT_MAX_RUNS = 32
+DEFAULT_TTL_SECONDS = 600.0
+
+NO_REFLECTIONS = "No reflections found."
+
+
+class RunContext:
+    """
+    一次运行内的惰性缓存
+
+    Attributes:
+        run_id: 运行 ID (未知时为 None)
+    """
+
+    _COUNTERS = ("modelConfigReuses", "storeReadsAvoided", "conversionsAvoided")
+
+    def __init__(self, run_id: Optional[str] = None) -> None:
+        self.run_id = run_id
+        self.created_at = time.monotonic()
+        self._values: dict[Hashable, Any] = {}
+        self._pending: dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self._COUNTERS, 0)
+
+    # ============================================
+    # 通用缓存
+    # ============================================
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counts[counter] += 1
+
+    def _memo(self, key: Hashable, compute: Callable[[], T], counter: str) -> T:
+        with self._lock:
+            if key in self._values:
+                self._counts[counter] += 1
+                return self._values[key]
+        value = compute()
+        with self._lock:
+            return self._values.setdefault(key, value)
+
+    async def _amemo(self, key: Hashable, factory: Callable[[], Awaitable[T]], counter: str) -> T:
+        """
+        异步单次初始化: 并发调用者等待同一个初始化结果
+
+        初始化者被取消 (如推测执行的落败分支) 时，其余等待者接手重新初始化; 初始化失败时
+        异常传给所有等待者，且不缓存，之后的调用会重试。
+        """
+        while True:
+            if key in self._values:
+                self._count(counter)
+                return self._values[key]
+            future = self._pending.get(key)
+            if future is None:
+                break
+            try:
+                value = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                current = asyncio.current_task()
+                if future.cancelled() and not (current and current.cancelling()):
+                    continue
+                raise
+            self._count(counter)
+            return value
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            value = await factory()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        finally:
+            self._pending.pop(key, None)
+        self._values[key] = value
+        future.set_result(value)
+        return value
+
+    # ============================================
+    # 模型配置
+    # ============================================
+
+    def model_config(self, config: RunnableConfig, is_tool_calling: bool = False) -> dict[str, Any]:
+        """
+        get_model_config 的运行级缓存
+
+        Args:
+            config: 运行配置 (按档位改写过的配置以其模型名区分)
+            is_tool_calling: 是否用于工具调用
+
+        Returns:
+            模型配置的浅拷贝
+        """
+        configurable = config.get("configurable", {}) or {}
+        key = (
+            "modelConfig",
+            configurable.get("customModelName"),
+            "modelConfig" in configurable,
+            is_tool_calling,
+        )
+        return dict(self._memo(key, lambda: get_model_config(config, is_tool_calling), "modelConfigReuses"))
+
+    def is_using_o1_mini_model(self, config: RunnableConfig) -> bool:
+        """是否使用 o1-mini 模型 (基于缓存的模型配置)"""
+        return "o1-mini" in self.model_config(config).get("modelName", "")
+
+    # ============================================
+    # Store 读取
+    # ============================================
+
+    async def store_value(self, store: Optional[BaseStore], namespace: tuple[str, ...], key: str) -> Any:
+        """
+        读取 store 条目的值 (每次运行每个键只读取一次)
+
+        Args:
+            store: 存储 (None 时返回 None)
+            namespace: 命名空间
+            key: 键
+
+        Returns:
+            条目的 value，不存在时为 None
+        """
+        if store is None:
+            return None
+
+        async def load() -> Any:
+            item = await store.aget(namespace, key)
+            return item.value if item else None
+
+        return copy.deepcopy(await self._amemo(("store", namespace, key), load, "storeReadsAvoided"))
+
+    async def reflections(
+        self,
+        config: RunnableConfig,
+        store: Optional[BaseStore] = None,
+        only_content: bool = False,
+    ) -> str:
+        """
+        获取格式化后的用户反思
+
+        Args:
+            config: 运行配置 (需要 assistant_id)
+            store: 存储，缺省时使用当前运行的 store
+            only_content: 是否只包含内容 (见 format_reflections)
+
+        Returns:
+            格式化的反思字符串，没有反思时为 "No reflections found."
+        """
+        store = store if store is not None else get_config_store(config)
+        if store is None:
+            return NO_REFLECTIONS
+
+        assistant_id = config.get("configurable", {}).get("assistant_id")
+        if not assistant_id:
+            raise ValueError("`assistant_id` not found in configurable")
+
+        memories = await self.store_value(store, ("memories", assistant_id), "reflection")
+        if memories:
+            return format_reflections(memories, only_content=only_content)
+        return NO_REFLECTIONS
+
+    # ============================================
+    # 上下文文档
+    # ============================================
+
+    async def context_documents(self, config: RunnableConfig) -> list[dict]:
+        """助手的上下文文档 (每次运行只从 store 读取一次)"""
+
+        async def load() -> list[dict]:
+            return await get_context_documents(config)
+
+        return list(await self._amemo(("contextDocuments",), load, "storeReadsAvoided"))
+
+    async def context_document_messages(self, config: RunnableConfig) -> list[dict]:
+        """
+        当前模型格式的上下文文档消息 (每次运行每种模型格式只解码/转换一次)
+
+        Args:
+            config: 运行配置
+
+        Returns:
+            create_context_document_messages 的输出 (深拷贝)
+        """
+        model_cfg = self.model_config(config)
+        key = ("contextDocumentMessages", model_cfg.get("modelProvider"), model_cfg.get("modelName"))
+
+        async def convert() -> list[dict]:
+            documents = await self.context_documents(config)
+            if not documents:
+                return []
+            return await create_context_document_messages(config, documents, model_cfg=model_cfg)
+
+        return copy.deepcopy(await self._amemo(key, convert, "conversionsAvoided"))
+
+    # ============================================
+    # 统计
+    # ============================================
+
+    def stats(self) -> dict[str, int]:
+        """本次运行避免的重复计算次数"""
+        with self._lock:
+            return dict(self._counts)
+
+
+# ============================================
+# 定位
+# ============================================
+
+
+class _RunContextRegistry:
+    """按 run_id 保存运行上下文 (LRU + TTL)"""
+
+    def __init__(self, max_runs: int, ttl_seconds: float) -> None:
+        self.max_runs = max_runs
+        self.ttl_seconds = ttl_seconds
+        self._contexts: OrderedDict[str, RunContext] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, run_id: str) -> RunContext:
+        now = time.monotonic()
+        with self._lock:
+            context = self._contexts.get(run_id)
+            if context is None or (self.ttl_seconds and now - context.created_at > self.ttl_seconds):
+                context = RunContext(run_id)
+                self._contexts[run_id] = context
+            self._contexts.move_to_end(run_id)
+            while len(self._contexts) > self.max_runs:
+                _, evicted = self._contexts.popitem(last=False)
+                logger.debug("Run context %s evicted: %s", evicted.run_id, evicted.stats())
+            return context
+
+    def clear(self) -> None:
+        with self._lock:
+            self._contexts.clear()
+
+
+_registry: Optional[_RunContextRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def _get_registry() -> _RunContextRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            try:
+                max_runs = int(os.environ.get("RUN_CONTEXT_MAX_RUNS", DEFAULT_MAX_RUNS))
+                ttl = float(os.environ.get("RUN_CONTEXT_TTL", DEFAULT_TTL_SECONDS))
+            except ValueError:
+                max_runs, ttl = DEFAULT_MAX_RUNS, DEFAULT_TTL_SECONDS
+            _registry = _RunContextRegistry(max(max_runs, 1), ttl)
+        return _registry
+
+
+def reset_run_contexts() -> None:
+    """丢弃所有运行上下文 (测试用)"""
+    global _registry
+    with _registry_lock:
+        _registry = None
+
+
+def get_run_context(config: RunnableConfig) -> RunContext:
+    """
+    获取当前运行的上下文
+
+    Args:
+        config: 节点收到的运行配置
+
+    Returns:
+        RunContext (同一运行的各节点得到同一个实例，见模块说明)
+    """
+    configurable = config.get("configurable", {}) or {}
+    context = configurable.get(RUN_CONTEXT_KEY)
+    if isinstance(context, RunContext):
+        return context
+
+    run_id = configurable.get("run_id") or (config.get("metadata") or {}).get("run_id")
+    if run_id:
+        return _get_registry().get(str(run_id))
+    return RunContext()
+
+
+def attach_run_context(config: RunnableConfig) -> RunnableConfig:
+    """
+    返回挂载了新运行上下文的配置 (用于直接调用图，如测试和基准)
+
+    Args:
+        config: 运行配置
+
+    Returns:
+        新的配置 (不修改原配置)
+    """
+    configurable = {**(config.get("configurable", {}) or {}), RUN_CONTEXT_KEY: RunContext()}
+    return {**config, "configurable": configurable}
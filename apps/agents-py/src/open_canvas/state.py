@@ -126,6 +126,7 @@ class OpenCanvasState(TypedDict, total=False):
         customQuickActionId: 自定义快捷操作 ID
         webSearchEnabled: 是否启用网络搜索
         webSearchResults: 网络搜索结果
+        contextDocumentMessages: 含上下文文档的内部消息索引 {消息 ID: 文档格式}，按消息顺序
     """
 
     # 消息列表 - 使用 add_messages reducer
@@ -163,6 +164,9 @@ class OpenCanvasState(TypedDict, total=False):
     webSearchEnabled: Optional[bool]
     webSearchResults: Optional[list[SearchResult]]
 
+    # 上下文文档消息索引 - 由 generatePath 维护
+    contextDocumentMessages: Optional[dict[str, str]]
+
 
 # 返回类型别名
 OpenCanvasGraphReturnType = dict[str, Any]
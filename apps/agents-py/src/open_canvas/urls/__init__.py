@@ -0,0 +1,26 @@
+"""
+Open Canvas URL 处理
+
+generate_path 中用户消息所含链接的意图判断与内容抓取
+"""
+
+from .extract import extract_urls
+from .fetcher import (
+    UrlFetcher,
+    UrlFetchSettings,
+    get_url_fetch_stats,
+    get_url_fetcher,
+    normalize_url,
+)
+from .intent import UrlIntentDecision, detect_url_intent
+
+__all__ = [
+    "extract_urls",
+    "UrlFetcher",
+    "UrlFetchSettings",
+    "get_url_fetch_stats",
+    "get_url_fetcher",
+    "normalize_url",
+    "UrlIntentDecision",
+    "detect_url_intent",
+]
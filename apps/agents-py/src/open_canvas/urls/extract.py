@@ -0,0 +1,136 @@
+"""
+单遍 URL 提取
+
+原实现先用 MARKDOWN_LINK_PATTERN.sub 把 markdown 链接替换为等长空格 (复制整段文本)，
+再用 PLAIN_URL_PATTERN 扫描替换后的副本; 用户粘贴的超大消息会被完整复制，
+且大量未闭合的 "[" 会让 markdown 正则对每个 "[" 扫描到文本末尾 (平方级)。
+
+本实现在原文上单遍扫描，输出与原实现一致 (相同的 URL 集合)，并按首次出现顺序去重:
+
+- 只在 "[" 与 "http(s)://" 处尝试匹配，不复制文本
+- markdown 链接文本不能包含 "]"，因此 "[" 之后的第一个 "]" 即为唯一候选，
+  匹配失败时到该右括号为止的 "[" 都被跳过，未闭合的 "[" 不会重复扫描
+- 纯文本 URL 内部若出现 markdown 链接 (原实现中该处已被替换为空格)，在链接起点截断
+
+匹配 TypeScript: packages/shared/src/utils/urls.ts
+"""
+
+import re
+from typing import Optional
+
+
+# URL 正则表达式 - 匹配 TypeScript extractUrls 行为
+MARKDOWN_LINK_PATTERN = re.compile(r'\[([^\]]+)\]\((https?://[^\s)]+)\)')
+PLAIN_URL_PATTERN = re.compile(
+    r'https?://[^\s<\]"\'{}|\\^`]+(?:[^<.,:;"\')\]\s]|(?=\s|$))',
+    re.IGNORECASE
+)
+
+# markdown 链接中 "](" 之后的 URL 部分 (与 MARKDOWN_LINK_PATTERN 的第二组一致)
+_MARKDOWN_TARGET = re.compile(r'(https?://[^\s)]+)\)')
+# 扫描事件: markdown 链接起点或 URL 起点
+# 以字符集开头 (而非整体 IGNORECASE 的分支) 可让 re 走首字符快速扫描，无事件的长文本上快约 3 倍
+_EVENT = re.compile(r'[\[hH](?:(?<=\[)|(?i:ttps?://))')
+_URL_START = re.compile(r'[hH](?i:ttps?://)')
+
+_TRAILING_PUNCTUATION = ".,;:!?'\")"
+
+
+class _MarkdownMatcher:
+    """
+    判断某个 "[" 处是否开始一个 markdown 链接
+
+    调用位置单调不减; 只缓存最近一个右括号的位置与匹配结果，整体为线性时间、常数内存。
+    """
+
+    def __init__(self, text: str) -> None:
+        self._text = text
+        self._close = -1
+        self._target: Optional[re.Match] = None
+
+    def match(self, start: int) -> tuple[Optional[re.Match], int]:
+        """
+        Args:
+            start: "[" 的位置
+
+        Returns:
+            (链接目标匹配或 None, 对应右括号位置; 之后不再有 "]" 时为文本长度)
+            匹配失败时，start 与右括号之间的其它 "[" 共用同一右括号，也必然失败
+        """
+        text = self._text
+        if self._close <= start:
+            close = text.find("]", start + 1)
+            self._close = len(text) if close == -1 else close
+            self._target = None
+            if close != -1 and text.startswith("(", close + 1):
+                self._target = _MARKDOWN_TARGET.match(text, close + 2)
+        if self._close == start + 1:
+            # 链接文本不能为空
+            return None, start + 1
+        return self._target, self._close
+
+
+def extract_urls(text: str) -> list[str]:
+    """
+    从文本中提取 URLs，支持 markdown 链接格式
+
+    匹配 TypeScript: packages/shared/src/utils/urls.ts
+
+    Args:
+        text: 输入文本
+
+    Returns:
+        URL 列表 (去重，按首次出现顺序)
+    """
+    urls: dict[str, None] = {}
+    markdown = _MarkdownMatcher(text)
+    length = len(text)
+    # 此位置之前的 "[" 已确定不会开始 markdown 链接，只需查找 URL 起点
+    no_markdown_before = 0
+    pos = 0
+
+    while pos < length:
+        if pos < no_markdown_before:
+            event = _URL_START.search(text, pos, no_markdown_before)
+            if event is None:
+                pos = no_markdown_before
+                continue
+        else:
+            event = _EVENT.search(text, pos)
+            if event is None:
+                break
+        start = event.start()
+
+        if text[start] == "[":
+            target, close = markdown.match(start)
+            if target is None:
+                no_markdown_before = close
+                pos = start + 1
+            else:
+                urls.setdefault(target.group(1))
+                pos = target.end()
+            continue
+
+        plain = PLAIN_URL_PATTERN.match(text, start)
+        if plain is None:
+            pos = start + 1
+            continue
+
+        end = plain.end()
+        # 纯文本 URL 中出现的 markdown 链接在原实现中已被空格替换: 在其起点截断
+        bracket = text.find("[", max(start, no_markdown_before), end)
+        while bracket != -1:
+            target, close = markdown.match(bracket)
+            if target is not None:
+                plain = PLAIN_URL_PATTERN.match(text, start, bracket)
+                end = bracket
+                break
+            no_markdown_before = close
+            bracket = text.find("[", max(bracket + 1, close), end)
+
+        if plain is not None:
+            # 移除尾部标点符号 (句号、逗号等不应成为 URL 的一部分)
+            urls.setdefault(plain.group(0).rstrip(_TRAILING_PUNCTUATION))
+        pos = max(end, start + 1)
+
+    return list(urls)
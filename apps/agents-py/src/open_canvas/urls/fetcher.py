@@ -0,0 +1,382 @@
+"""
+异步 URL 内容抓取
+
+include_url_contents 原先逐个 URL 调用同步的 FirecrawlApp.scrape_url，直接阻塞事件循环:
+一个慢页面会拖住服务器上所有并发运行的流式输出。本模块提供:
+
+- 有界并发: 单次请求内最多 URL_FETCH_CONCURRENCY 个 URL 并行抓取
+- 超时: 单个 URL 超时 (URL_FETCH_TIMEOUT_MS) 与整体截止时间 (URL_FETCH_DEADLINE_MS);
+  后端都是异步 HTTP 请求，超时或超过截止时间时请求被取消，不在后台继续运行
+- 大小上限: 返回的 markdown 截断到 URL_FETCH_MAX_CHARS
+- 缓存: 以规范化 URL 为键的 TTL + LRU 内存缓存 (失败结果不缓存)
+- 可插拔后端 (URL_FETCH_BACKEND):
+  - firecrawl (默认): 异步调用 FireCrawl scrape 接口 (FIRECRAWL_API_KEY / FIRECRAWL_API_URL)
+  - http: 直接 HTTP GET (httpx)，用于本地/测试环境
+"""
+
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, Protocol
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+logger = logging.getLogger(__name__)
+
+_TRUNCATION_MARKER = "\n\n[content truncated]"
+
+DEFAULT_FIRECRAWL_API_URL = "https://api.firecrawl.dev"
+
+# 规范化时丢弃的追踪参数
+_TRACKING_PARAMS = re.compile(r"^(?:utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref_src)$", re.IGNORECASE)
+
+
+# ============================================
+# 配置
+# ============================================
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+@dataclass(frozen=True)
+class UrlFetchSettings:
+    """URL 抓取配置"""
+
+    backend: str = "firecrawl"
+    max_concurrency: int = 4
+    timeout_seconds: float = 10.0
+    deadline_seconds: float = 15.0
+    max_chars: int = 50_000
+    cache_size: int = 256
+    cache_ttl_seconds: float = 900.0
+
+    @classmethod
+    def from_env(cls) -> "UrlFetchSettings":
+        return cls(
+            backend=os.environ.get("URL_FETCH_BACKEND", "firecrawl").lower(),
+            max_concurrency=max(int(_env_float("URL_FETCH_CONCURRENCY", 4)), 1),
+            timeout_seconds=_env_float("URL_FETCH_TIMEOUT_MS", 10_000) / 1000,
+            deadline_seconds=_env_float("URL_FETCH_DEADLINE_MS", 15_000) / 1000,
+            max_chars=int(_env_float("URL_FETCH_MAX_CHARS", 50_000)),
+            cache_size=int(_env_float("URL_FETCH_CACHE_SIZE", 256)),
+            cache_ttl_seconds=_env_float("URL_FETCH_CACHE_TTL", 900),
+        )
+
+
+def normalize_url(url: str) -> str:
+    """
+    规范化 URL 作为缓存键
+
+    小写 scheme/host，去掉默认端口、片段、追踪参数和路径末尾的斜杠，查询参数排序。
+
+    Args:
+        url: 原始 URL
+
+    Returns:
+        规范化后的 URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _TRACKING_PARAMS.match(k)
+    ))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+# ============================================
+# 后端
+# ============================================
+
+
+class UrlFetchBackend(Protocol):
+    """URL 抓取后端: 返回页面的 markdown/文本内容"""
+
+    name: str
+
+    async def fetch(self, url: str, timeout: float) -> str: ...
+
+
+class FirecrawlBackend:
+    """
+    FireCrawl 后端
+
+    直接以 httpx.AsyncClient 调用 FireCrawl 的 scrape 接口: 单个 URL 的超时同时传给
+    服务端 (timeout 参数) 并作为客户端请求的总时限，超时或被取消时请求随之中止，
+    不会在后台线程中继续占用连接。
+
+    Args:
+        api_key: API key，缺省时读取 FIRECRAWL_API_KEY
+        api_url: 服务地址，缺省时读取 FIRECRAWL_API_URL (自托管实例)
+        transport: 可选的 httpx 传输层 (如测试中的 httpx.MockTransport)
+    """
+
+    name = "firecrawl"
+
+    def __init__(self, api_key: Optional[str] = None, api_url: Optional[str] = None, transport: Any = None) -> None:
+        self._api_key = api_key if api_key is not None else os.environ.get("FIRECRAWL_API_KEY", "")
+        self._api_url = (api_url or os.environ.get("FIRECRAWL_API_URL") or DEFAULT_FIRECRAWL_API_URL).rstrip("/")
+        self._transport = transport
+
+    async def _scrape(self, url: str, timeout: float) -> str:
+        import httpx
+
+        headers = {"Authorization": f"Bearer {self._api_key}"} if self._api_key else {}
+        payload = {"url": url, "formats": ["markdown"], "timeout": int(timeout * 1000)}
+        async with httpx.AsyncClient(timeout=timeout, transport=self._transport) as client:
+            try:
+                response = await client.post(f"{self._api_url}/v1/scrape", json=payload, headers=headers)
+            except httpx.TimeoutException as e:
+                raise asyncio.TimeoutError(str(e)) from e
+            response.raise_for_status()
+        body = response.json()
+        if not body.get("success", True):
+            raise RuntimeError(body.get("error") or "FireCrawl scrape failed")
+        return (body.get("data") or {}).get("markdown", "") or ""
+
+    async def fetch(self, url: str, timeout: float) -> str:
+        # httpx 的超时按连接/读取等单个阶段计算，外层再限制整个请求的总时长
+        return await asyncio.wait_for(self._scrape(url, timeout), timeout)
+
+
+class HttpBackend:
+    """直接 HTTP GET 后端 (HTML 粗略转换为纯文本)"""
+
+    name = "http"
+
+    _SCRIPT_STYLE = re.compile(r"<(script|style)\b.*?</\1>", re.IGNORECASE | re.DOTALL)
+    _TAG = re.compile(r"<[^>]+>")
+
+    def __init__(self, transport: Any = None) -> None:
+        # transport: 可选的 httpx 传输层 (如测试中的 httpx.MockTransport)
+        self._transport = transport
+
+    async def fetch(self, url: str, timeout: float) -> str:
+        import httpx
+
+        async with httpx.AsyncClient(timeout=timeout, follow_redirects=True, transport=self._transport) as client:
+            response = await client.get(url)
+            response.raise_for_status()
+        text = response.text
+        if "html" in response.headers.get("content-type", ""):
+            text = self._TAG.sub(" ", self._SCRIPT_STYLE.sub(" ", text))
+            text = re.sub(r"[ \t]+", " ", re.sub(r"\n\s*\n+", "\n\n", text)).strip()
+        return text
+
+
+def _build_backend(settings: UrlFetchSettings) -> UrlFetchBackend:
+    if settings.backend == "http":
+        return HttpBackend()
+    if settings.backend != "firecrawl":
+        logger.warning(f"Unknown URL_FETCH_BACKEND={settings.backend!r}, using firecrawl")
+    return FirecrawlBackend()
+
+
+# ============================================
+# 缓存
+# ============================================
+
+
+class UrlContentCache:
+    """以规范化 URL 为键的 TTL + LRU 内存缓存"""
+
+    def __init__(self, max_size: int = 256, ttl_seconds: float = 900.0) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def set(self, key: str, content: str) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), content)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "maxSize": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hitRate": self._hits / total if total else 0.0,
+            }
+
+
+# ============================================
+# 抓取器
+# ============================================
+
+
+class UrlFetcher:
+    """
+    并发、带缓存的 URL 抓取器
+
+    Args:
+        backend: 抓取后端
+        settings: 抓取配置
+    """
+
+    def __init__(self, backend: UrlFetchBackend, settings: UrlFetchSettings) -> None:
+        self.backend = backend
+        self.settings = settings
+        self.cache = UrlContentCache(settings.cache_size, settings.cache_ttl_seconds)
+        self._lock = threading.Lock()
+        self._fetches = 0
+        self._failures = 0
+        self._timeouts = 0
+        self._truncated = 0
+
+    def _count(self, **values: int) -> None:
+        with self._lock:
+            self._fetches += values.get("fetches", 0)
+            self._failures += values.get("failures", 0)
+            self._timeouts += values.get("timeouts", 0)
+            self._truncated += values.get("truncated", 0)
+
+    def _cap(self, content: str) -> str:
+        limit = self.settings.max_chars
+        if limit > 0 and len(content) > limit:
+            self._count(truncated=1)
+            return content[:limit] + _TRUNCATION_MARKER
+        return content
+
+    async def _fetch_one(self, url: str, key: str, semaphore: asyncio.Semaphore) -> str:
+        async with semaphore:
+            self._count(fetches=1)
+            try:
+                content = await self.backend.fetch(url, self.settings.timeout_seconds)
+            except asyncio.TimeoutError:
+                self._count(timeouts=1)
+                logger.warning(f"Timed out fetching URL contents after {self.settings.timeout_seconds:.1f}s: {url}")
+                return ""
+            except Exception as e:
+                self._count(failures=1)
+                logger.warning(f"Failed to fetch URL contents: {url}: {e}")
+                return ""
+        content = self._cap(content)
+        if content:
+            self.cache.set(key, content)
+        return content
+
+    async def fetch_many(self, urls: list[str]) -> list[dict[str, str]]:
+        """
+        并发抓取多个 URL
+
+        Args:
+            urls: URL 列表
+
+        Returns:
+            与输入顺序一致的 [{"url": url, "pageContent": content}]; 失败、超时或
+            超过整体截止时间的 URL 内容为空字符串
+        """
+        contents: dict[str, str] = {}
+        tasks: dict[str, asyncio.Task] = {}
+        semaphore = asyncio.Semaphore(self.settings.max_concurrency)
+
+        for url in urls:
+            key = normalize_url(url)
+            if key in contents or key in tasks:
+                continue
+            cached = self.cache.get(key)
+            if cached is not None:
+                contents[key] = cached
+            else:
+                tasks[key] = asyncio.ensure_future(self._fetch_one(url, key, semaphore))
+
+        if tasks:
+            done, pending = await asyncio.wait(tasks.values(), timeout=self.settings.deadline_seconds)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+                self._count(timeouts=len(pending))
+                logger.warning(
+                    f"URL fetch deadline of {self.settings.deadline_seconds:.1f}s exceeded, "
+                    f"dropping {len(pending)} URL(s)"
+                )
+            for key, task in tasks.items():
+                contents[key] = task.result() if task in done else ""
+
+        return [{"url": url, "pageContent": contents[normalize_url(url)]} for url in urls]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            counters = {
+                "fetches": self._fetches,
+                "failures": self._failures,
+                "timeouts": self._timeouts,
+                "truncated": self._truncated,
+            }
+        return {"backend": self.backend.name, **counters, "cache": self.cache.stats()}
+
+
+# ============================================
+# 进程级单例
+# ============================================
+
+_url_fetcher: Optional[UrlFetcher] = None
+_url_fetcher_lock = threading.Lock()
+
+
+def get_url_fetcher() -> UrlFetcher:
+    """获取进程级 URL 抓取器 (首次调用时按环境变量创建)"""
+    global _url_fetcher
+    if _url_fetcher is None:
+        with _url_fetcher_lock:
+            if _url_fetcher is None:
+                settings = UrlFetchSettings.from_env()
+                _url_fetcher = UrlFetcher(_build_backend(settings), settings)
+    return _url_fetcher
+
+
+def reset_url_fetcher() -> None:
+    """丢弃进程级抓取器 (重新读取环境变量，清空缓存)"""
+    global _url_fetcher
+    with _url_fetcher_lock:
+        _url_fetcher = None
+
+
+def get_url_fetch_stats() -> dict[str, Any]:
+    """获取 URL 抓取与缓存统计"""
+    return get_url_fetcher().stats()
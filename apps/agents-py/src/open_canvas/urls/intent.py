@@ -0,0 +1,175 @@
+"""
+本地 URL 意图判断
+
+判断用户附上链接是为了让模型读取页面内容 (需要抓取并内联)，还是把链接本身作为
+内容的一部分 (如 "在 README 中加一个指向文档的链接")。原实现对每条含链接的消息都
+发起一次 LLM 调用; 本模块基于链接周围的短语模式、消息长度与 markdown 链接上下文
+在本地给出判断与置信度，置信度不足时才 (可选地) 回退到 fast 档位模型。
+
+- 模式: configurable.urlIntentDetector 或 URL_INTENT_DETECTOR ("local" 默认 / "llm")
+- 阈值: URL_INTENT_THRESHOLD (默认 0.75)
+- LLM 回退: URL_INTENT_LLM_FALLBACK (默认开启; 关闭时低置信度结果直接采用)
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from langgraph.types import RunnableConfig
+
+
+DEFAULT_URL_INTENT_THRESHOLD = 0.75
+
+URL_INTENT_EXAMPLES_PATH = Path(__file__).parent / "data" / "url_intent_examples.jsonl"
+
+
+@dataclass(frozen=True)
+class UrlIntentDecision:
+    """
+    URL 意图判断结果
+
+    Attributes:
+        include: 是否应抓取并内联页面内容
+        confidence: 置信度 (0-1)
+        source: 判断来源 ("rules" / "llm")
+        reason: 命中的规则说明 (用于日志)
+    """
+
+    include: bool
+    confidence: float
+    source: str = "rules"
+    reason: str = ""
+
+
+# ============================================
+# 规则
+# ============================================
+
+_URL = re.compile(r"https?://[^\s<>()\[\]`\"']+", re.IGNORECASE)
+_MARKDOWN_LINK = re.compile(r"\[([^\]]+)\]\(\s*https?://[^\s)]+\s*\)", re.IGNORECASE)
+_CODE_SPAN = re.compile(r"```.*?```|`[^`\n]*https?://[^`\n]*`", re.DOTALL | re.IGNORECASE)
+
+# 读取/使用页面内容的表述
+_CONSUME = re.compile(
+    r"\b(?:summari[sz]e|summary of|tl;?dr|read|analy[sz]e|review|explain|translate|extract|"
+    r"based on|according to|using the (?:content|info|information)|from (?:this|the|that) "
+    r"(?:article|page|post|link|site|website|doc|docs|documentation|blog|paper|thread|repo)|"
+    r"what does (?:this|it|the \w+) say|what is (?:this|it) about|take a look|look at|check out|"
+    r"go through|key points|main points|takeaways|compare|turn (?:this|it) into|rewrite|"
+    r"write (?:a|an) \w+ (?:about|on|based on) (?:this|it)|fact[- ]check|quote from)\b"
+)
+
+# 把链接当作内容本身 (插入、引用) 的表述
+_LINK_AS_CONTENT = re.compile(
+    r"\b(?:(?:add|insert|include|put|embed|place|append)\b.{0,40}\b(?:link|url|href|hyperlink|"
+    r"reference|citation|source|button)s?|link (?:to|it to)|hyperlink|href|as a reference|cite|"
+    r"citation|footnote|bibliography|in the footer|link text|anchor text|make (?:this|it|that) a link|"
+    r"replace (?:the )?(?:link|url)|update (?:the )?(?:link|url)|change (?:the )?(?:link|url)|"
+    r"broken link|redirect|og:|canonical)\b"
+)
+
+# 指代页面本身的名词短语
+_PAGE_REFERENCE = re.compile(
+    r"\b(?:this|that|the|these) (?:article|page|post|link|site|website|doc|docs|documentation|"
+    r"blog|paper|thread|tweet|pr|issue|readme|video)s?\b"
+)
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text.strip().lower())
+
+
+def detect_url_intent(message: str) -> UrlIntentDecision:
+    """
+    根据消息文本判断是否需要内联链接内容
+
+    Args:
+        message: 用户消息 (包含 URL)
+
+    Returns:
+        UrlIntentDecision (source="rules")
+    """
+    if _CODE_SPAN.search(message) and not _URL.search(_CODE_SPAN.sub(" ", message)):
+        return UrlIntentDecision(False, 0.9, reason="urls only inside code")
+
+    markdown_links = _MARKDOWN_LINK.findall(message)
+    text = _normalize(_URL.sub(" <url> ", _MARKDOWN_LINK.sub(lambda m: f" {m.group(1)} <url> ", message)))
+    words = [w for w in re.findall(r"[\w']+", text.replace("<url>", " ")) if w]
+
+    if _LINK_AS_CONTENT.search(text):
+        if _CONSUME.search(text) and not re.search(r"\b(?:add|insert|put|embed)\b", text):
+            return UrlIntentDecision(True, 0.6, reason="link wording with content verb")
+        return UrlIntentDecision(False, 0.85, reason="link used as content")
+
+    if _CONSUME.search(text):
+        return UrlIntentDecision(True, 0.9, reason="content verb")
+
+    if markdown_links:
+        return UrlIntentDecision(False, 0.75, reason="markdown link in text")
+
+    if len(words) <= 3:
+        return UrlIntentDecision(True, 0.8, reason="message is mostly urls")
+
+    if _PAGE_REFERENCE.search(text):
+        return UrlIntentDecision(True, 0.75, reason="refers to the page")
+
+    if len(words) > 60:
+        # 长消息中顺带提到的链接多为上下文而非待读取内容
+        return UrlIntentDecision(False, 0.6, reason="long message with passing link")
+
+    return UrlIntentDecision(False, 0.5, reason="no rule matched")
+
+
+# ============================================
+# 配置
+# ============================================
+
+
+def get_url_intent_mode(config: Optional[RunnableConfig] = None) -> str:
+    """
+    获取 URL 意图判断模式
+
+    Args:
+        config: 运行配置，configurable.urlIntentDetector 优先于 URL_INTENT_DETECTOR 环境变量
+
+    Returns:
+        "local" (默认) 或 "llm"
+    """
+    configurable = (config or {}).get("configurable", {}) or {}
+    mode = configurable.get("urlIntentDetector") or os.environ.get("URL_INTENT_DETECTOR", "local")
+    return "llm" if str(mode).lower() == "llm" else "local"
+
+
+def get_url_intent_threshold() -> float:
+    """获取直接采用本地判断的置信度阈值 (URL_INTENT_THRESHOLD)"""
+    try:
+        return float(os.environ.get("URL_INTENT_THRESHOLD", DEFAULT_URL_INTENT_THRESHOLD))
+    except ValueError:
+        return DEFAULT_URL_INTENT_THRESHOLD
+
+
+def is_url_intent_llm_fallback_enabled() -> bool:
+    """低置信度时是否回退到 LLM 判断 (URL_INTENT_LLM_FALLBACK，默认开启)"""
+    return os.environ.get("URL_INTENT_LLM_FALLBACK", "true").lower() in ("1", "true", "yes")
+
+
+def load_url_intent_examples(path: Path = URL_INTENT_EXAMPLES_PATH) -> list[tuple[str, bool]]:
+    """
+    读取标注语料
+
+    Args:
+        path: JSONL 文件 (每行 {"message": ..., "include": true/false})
+
+    Returns:
+        (消息, 是否内联) 列表
+    """
+    examples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                examples.append((row["message"], bool(row["include"])))
+    return examples
@@ -14,6 +14,7 @@ from langgraph.store.base import BaseStore
 from langgraph.types import RunnableConfig
 from pydantic import BaseModel, Field
 
+from ..llm.tool_specs import bind_tools_cached, precompile_tool_specs
 from ..types import ArtifactCodeV3, ArtifactMarkdownV3, ArtifactV3
 from ..utils import format_reflections, get_model_from_config
 from .prompts import REFLECT_SYSTEM_PROMPT, REFLECT_USER_PROMPT
@@ -36,6 +37,9 @@ class GenerateReflections(BaseModel):
     )
 
 
+precompile_tool_specs(GenerateReflections)
+
+
 # ============================================
 # 辅助函数
 # ============================================
@@ -127,8 +131,11 @@ async def reflect(
             artifact_text = artifact_content.get("code", "")
 
     # 4. 创建模型并绑定工具 (使用用户配置的模型)
-    model = get_model_from_config(config, temperature=0, is_tool_calling=True)
-    model_with_tool = model.bind_tools(
+    model = get_model_from_config(
+        config, temperature=0, is_tool_calling=True, call_site="reflection"
+    )
+    model_with_tool = bind_tools_cached(
+        model,
         [GenerateReflections],
         tool_choice="GenerateReflections",
     )
@@ -14,6 +14,7 @@ from langgraph.graph import END, START, StateGraph
 from langgraph.types import RunnableConfig
 from pydantic import BaseModel, Field
 
+from ..llm.tool_specs import bind_tools_cached, precompile_tool_specs
 from ..types import ArtifactCodeV3, ArtifactMarkdownV3, ArtifactV3
 from ..utils import get_model_from_config
 from .prompts import TITLE_SYSTEM_PROMPT, TITLE_USER_PROMPT
@@ -31,6 +32,9 @@ class GenerateTitle(BaseModel):
     title: str = Field(description="The generated title for the conversation.")
 
 
+precompile_tool_specs(GenerateTitle)
+
+
 # ============================================
 # 辅助函数
 # ============================================
@@ -98,8 +102,15 @@ async def generate_title(
         raise ValueError("open_canvas_thread_id not found in configurable")
 
     # 2. 创建模型并绑定工具 (使用用户配置的模型)
-    model = get_model_from_config(config, temperature=0, is_tool_calling=True)
-    model_with_tool = model.bind_tools(
+    model = get_model_from_config(
+        config,
+        temperature=0,
+        is_tool_calling=True,
+        response_cache=True,
+        call_site="threadTitle",
+    )
+    model_with_tool = bind_tools_cached(
+        model,
         [GenerateTitle],
         tool_choice="GenerateTitle",
     )
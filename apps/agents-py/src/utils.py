@@ -10,6 +10,7 @@ import uuid
 from typing import Any, Optional
 
 from langchain_core.messages import AIMessage, BaseMessage
+from langgraph.config import get_store
 from langgraph.store.base import BaseStore
 from langgraph.types import RunnableConfig
 
@@ -22,6 +23,17 @@ from .constants import (
     PROGRAMMING_LANGUAGES,
     TEMPERATURE_EXCLUDED_MODELS,
 )
+from .documents.decode import decode_text_document
+from .documents.extraction import get_pdf_extraction_pool
+from .documents.ingest import load_ingested_texts
+from .documents.text_cache import get_pdf_text_cache
+from .llm.client_cache import get_model_client_cache
+from .llm.hedging import HedgePolicy, resolve_hedge_model_name
+from .llm.limiter import get_provider_retry_kwargs
+from .llm.managed_model import ManagedChatModel
+from .llm.response_cache import attach_response_cache, get_response_cache
+from .llm.tiers import apply_model_tier, get_tier_tracing_config
+from .llm.transport import attach_shared_transport, get_provider_transport_kwargs
 from .types import (
     ArtifactCodeV3,
     ArtifactMarkdownV3,
@@ -117,6 +129,28 @@ def ensure_store_in_config(config: RunnableConfig) -> BaseStore:
     return store
 
 
+def get_config_store(config: RunnableConfig) -> Optional[BaseStore]:
+    """
+    获取当前运行的 store
+
+    LangGraph 不会把 store 放到 config 顶层: 图内通过运行时 (langgraph.config.get_store)
+    获取; config["store"] 只在直接调用时由调用方显式传入。
+
+    Args:
+        config: LangGraph 运行配置
+
+    Returns:
+        store，不在图运行中且 config 未提供时为 None
+    """
+    store = config.get("store")
+    if store is not None:
+        return store
+    try:
+        return get_store()
+    except (RuntimeError, KeyError, AttributeError):
+        return None
+
+
 async def get_formatted_reflections(config: RunnableConfig) -> str:
     """
     从 store 获取并格式化用户反思
@@ -319,6 +353,13 @@ def get_model_config(
             "baseUrl": os.environ.get("OLLAMA_API_URL", "http://host.docker.internal:11434"),
         }
 
+    # 离线压测用假模型 (见 src/llm/fake.py)
+    if custom_model_name.startswith("fake/"):
+        return {
+            "modelName": custom_model_name.replace("fake/", "", 1),
+            "modelProvider": "fake",
+        }
+
     raise ValueError(f"Unknown model provider for model: {custom_model_name}")
 
 
@@ -327,6 +368,9 @@ def get_model_from_config(
     is_tool_calling: bool = False,
     temperature: Optional[float] = None,
     max_tokens: Optional[int] = None,
+    response_cache: bool = False,
+    hedge: bool = True,
+    call_site: Optional[str] = None,
 ):
     """
     根据配置创建并返回 LLM 模型实例
@@ -336,15 +380,28 @@ def get_model_from_config(
         is_tool_calling: 是否用于工具调用
         temperature: 可选温度参数 (覆盖 modelConfig 默认值)
         max_tokens: 可选最大 token 数 (覆盖 modelConfig 默认值)
+        response_cache: 是否为确定性调用启用响应缓存 (仅 temperature=0 时生效)
+        hedge: 是否允许挂载等价模型用于对冲请求 (LLM_HEDGING 启用时生效)
+        call_site: 可选调用点名称，按模型档位策略选择 fast/quality 档位模型
 
     Returns:
-        BaseChatModel 实例
+        包装 BaseChatModel 的 ManagedChatModel (按解析后的参数在进程内复用)
 
     Note:
         - 从 modelConfig 读取默认值，extra 参数可覆盖
+        - 相同 (provider, model, temperature, max_tokens, base URL/deployment)
+          的调用共享同一实例，见 src/llm/client_cache.py
         - 推理模型 (o1, o3 系列) 使用 max_completion_tokens 而非 max_tokens
+        - response_cache 见 src/llm/response_cache.py
+        - 返回 ManagedChatModel 包装 (相同并发请求合并等)，见 src/llm/managed_model.py
         - Anthropic 需要覆盖默认的 top_p/top_k 避免 API 错误
+        - call_site 档位见 src/llm/tiers.py，档位写入追踪元数据
     """
+    tier = None
+    if call_site is not None:
+        provider = get_model_config(config).get("modelProvider", "")
+        config, tier = apply_model_tier(config, call_site, provider)
+
     model_cfg = get_model_config(config, is_tool_calling)
     provider = model_cfg.get("modelProvider", "")
     model_name = model_cfg.get("modelName", "")
@@ -385,12 +442,111 @@ def get_model_from_config(
             kwargs["max_tokens"] = final_max_tokens
 
     # ============================================
-    # 根据 provider 创建模型
+    # 从进程级缓存获取模型 (按解析后的参数复用实例)
     # ============================================
+    # 只有 temperature=0 的调用是输入的纯函数，才使用响应缓存
+    cache = None
+    if response_cache and kwargs.get("temperature") == 0:
+        cache = get_response_cache()
+
+    # 对冲请求的等价模型 (如同名模型的 Azure ↔ OpenAI 部署)
+    hedge_model_name = None
+    if hedge and HedgePolicy.from_env().enabled:
+        hedge_model_name = resolve_hedge_model_name(model_cfg)
+
+    azure_cfg = model_cfg.get("azureConfig") or {}
+    cache_key = (
+        provider,
+        model_name,
+        kwargs.get("temperature"),
+        kwargs.get("max_tokens"),
+        kwargs.get("max_completion_tokens"),
+        model_cfg.get("baseUrl"),
+        azure_cfg.get("azureOpenAIApiInstanceName"),
+        azure_cfg.get("azureOpenAIApiDeploymentName"),
+        azure_cfg.get("azureOpenAIApiVersion"),
+        cache is not None,
+        hedge_model_name,
+    )
+
+    def create_managed_model() -> ManagedChatModel:
+        model = _create_chat_model(
+            provider,
+            model_cfg,
+            kwargs,
+            is_reasoning_model=is_reasoning_model,
+            temperature=final_temperature,
+            max_tokens=final_max_tokens,
+        )
+        hedge_model = None
+        if hedge_model_name:
+            hedge_config = {
+                **config,
+                "configurable": {
+                    **config.get("configurable", {}),
+                    "customModelName": hedge_model_name,
+                },
+            }
+            hedge_model = get_model_from_config(
+                hedge_config,
+                is_tool_calling=is_tool_calling,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                response_cache=response_cache,
+                hedge=False,
+            )
+        return ManagedChatModel(
+            attach_response_cache(model, cache),
+            provider=provider,
+            model_name=model_name,
+            hedge=hedge_model,
+        )
+
+    model = get_model_client_cache().get_or_create(cache_key, create_managed_model)
+    if tier is None:
+        return model
+
+    # 带档位追踪元数据的包装同样缓存，保证绑定模型缓存 (src/llm/tool_specs.py) 可复用
+    return get_model_client_cache().get_or_create(
+        (*cache_key, call_site, tier),
+        lambda: model.with_config(get_tier_tracing_config(call_site, tier)),
+    )
+
+
+def _create_chat_model(
+    provider: str,
+    model_cfg: dict[str, Any],
+    kwargs: dict[str, Any],
+    *,
+    is_reasoning_model: bool,
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+):
+    """
+    根据 provider 创建新的聊天模型实例 (无缓存)
+
+    Args:
+        provider: get_model_config 解析出的 modelProvider
+        model_cfg: get_model_config 返回的完整配置
+        kwargs: 通用构造参数 (model/temperature/max_tokens 等)
+        is_reasoning_model: 是否为推理模型
+        temperature: 最终温度
+        max_tokens: 最终最大 token 数
+
+    Returns:
+        BaseChatModel 实例
+    """
+    model_name = kwargs["model"]
+
+    # 共享的连接池 HTTP 传输 (见 src/llm/transport.py)
+    transport_kwargs = get_provider_transport_kwargs(provider, model_cfg)
+    # 限流器统一重试时关闭 SDK 内部重试 (见 src/llm/limiter.py)
+    transport_kwargs.update(get_provider_retry_kwargs(provider))
+
     if provider == "openai":
         from langchain_openai import ChatOpenAI
 
-        return ChatOpenAI(**kwargs)
+        return ChatOpenAI(**kwargs, **transport_kwargs)
 
     elif provider == "azure_openai":
         from langchain_openai import AzureChatOpenAI
@@ -404,6 +560,7 @@ def get_model_from_config(
             azure_deployment=azure_cfg.get("azureOpenAIApiDeploymentName"),
             temperature=kwargs.get("temperature"),
             max_tokens=kwargs.get("max_tokens"),
+            **transport_kwargs,
         )
 
     elif provider == "anthropic":
@@ -417,29 +574,32 @@ def get_model_from_config(
             "top_p": None,
             "top_k": None,
         }
-        if not is_reasoning_model and final_temperature is not None:
-            anthropic_kwargs["temperature"] = final_temperature
-        if final_max_tokens is not None:
-            anthropic_kwargs["max_tokens"] = final_max_tokens
-
-        return ChatAnthropic(**anthropic_kwargs)
+        if not is_reasoning_model and temperature is not None:
+            anthropic_kwargs["temperature"] = temperature
+        if max_tokens is not None:
+            anthropic_kwargs["max_tokens"] = max_tokens
+        anthropic_kwargs.update(get_provider_retry_kwargs(provider))
+
+        return attach_shared_transport(
+            provider, ChatAnthropic(**anthropic_kwargs), model_cfg
+        )
 
     elif provider == "google-genai":
         from langchain_google_genai import ChatGoogleGenerativeAI
 
-        return ChatGoogleGenerativeAI(**kwargs)
+        return ChatGoogleGenerativeAI(**kwargs, **transport_kwargs)
 
     elif provider == "fireworks":
         from langchain_fireworks import ChatFireworks
 
-        return ChatFireworks(**kwargs)
+        return ChatFireworks(**kwargs, **transport_kwargs)
 
     elif provider == "groq":
         # Groq 使用 langchain-groq 包
         try:
             from langchain_groq import ChatGroq
 
-            return ChatGroq(**kwargs)
+            return ChatGroq(**kwargs, **transport_kwargs)
         except ImportError:
             raise ImportError("langchain-groq package is required for Groq models")
 
@@ -447,7 +607,14 @@ def get_model_from_config(
         from langchain_ollama import ChatOllama
 
         base_url = model_cfg.get("baseUrl", "http://localhost:11434")
-        return ChatOllama(model=model_name, base_url=base_url)
+        return ChatOllama(model=model_name, base_url=base_url, **transport_kwargs)
+
+    elif provider == "fake":
+        from .llm.fake import FakeStreamingChatModel
+
+        return FakeStreamingChatModel.from_env(
+            model_name, temperature=temperature, max_tokens=max_tokens
+        )
 
     else:
         raise ValueError(f"Unknown model provider: {provider}")
@@ -638,31 +805,31 @@ def clean_base64(base64_string: str) -> str:
     return base64_string
 
 
-async def convert_pdf_to_text(base64_pdf: str) -> str:
+async def _extract_pdf_text(cleaned_base64: str) -> str:
+    """在 PDF 提取进程池中解析 PDF (不阻塞事件循环)"""
+    return await get_pdf_extraction_pool().extract(cleaned_base64)
+
+
+async def convert_pdf_to_text(base64_pdf: str, store: Optional[BaseStore] = None) -> str:
     """
     将 base64 编码的 PDF 转换为文本
 
+    在进程池中解析 (见 src/documents/extraction.py)，结果按文档内容哈希缓存，
+    同一文档只解析一次 (见 src/documents/text_cache.py)。
+
     Args:
         base64_pdf: Base64 编码的 PDF 数据
+        store: 可选的 LangGraph store (PDF_TEXT_CACHE=store 时作为持久层)
 
     Returns:
         提取的文本内容
     """
-    import base64
-    from io import BytesIO
-
     try:
-        from pypdf import PdfReader
-
         cleaned_base64 = clean_base64(base64_pdf)
-        pdf_bytes = base64.b64decode(cleaned_base64)
-        pdf_reader = PdfReader(BytesIO(pdf_bytes))
-
-        text_parts = []
-        for page in pdf_reader.pages:
-            text_parts.append(page.extract_text() or "")
-
-        return "\n".join(text_parts)
+        cache = get_pdf_text_cache()
+        if cache is None:
+            return await _extract_pdf_text(cleaned_base64)
+        return await cache.get_or_extract(cleaned_base64, _extract_pdf_text, store=store)
     except ImportError:
         print("Warning: pypdf not installed, cannot convert PDF to text")
         return ""
@@ -671,8 +838,39 @@ async def convert_pdf_to_text(base64_pdf: str) -> str:
         raise
 
 
+async def _convert_pdf_documents(
+    documents: list["ContextDocument"],
+    store: Optional[BaseStore] = None,
+    document_texts: Optional[dict[int, str]] = None,
+) -> dict[int, str]:
+    """
+    并行提取多个 PDF 文档的文本
+
+    Args:
+        documents: 上下文文档列表 (非 PDF 文档被忽略)
+        store: 可选的 LangGraph store (PDF 文本缓存的持久层)
+        document_texts: 预提取的文本 (见 src/documents/ingest.py)，其中的文档不再解析
+
+    Returns:
+        {文档下标: 文本}
+    """
+    import asyncio
+
+    document_texts = document_texts or {}
+    indices = [
+        i for i, doc in enumerate(documents)
+        if doc.get("type") == "application/pdf" and i not in document_texts
+    ]
+    texts = await asyncio.gather(
+        *(convert_pdf_to_text(documents[i].get("data", ""), store=store) for i in indices)
+    )
+    return {**document_texts, **dict(zip(indices, texts))}
+
+
 async def create_context_document_messages_openai(
     documents: list["ContextDocument"],
+    store: Optional[BaseStore] = None,
+    document_texts: Optional[dict[int, str]] = None,
 ) -> list[dict]:
     """
     为 OpenAI 模型创建上下文文档消息
@@ -681,23 +879,25 @@ async def create_context_document_messages_openai(
 
     Args:
         documents: 上下文文档列表
+        store: 可选的 LangGraph store (PDF 文本缓存的持久层)
+        document_texts: 预提取的文本 {文档下标: 文本}
 
     Returns:
         OpenAI 格式的消息内容列表
     """
-    import base64
+    document_texts = document_texts or {}
+    pdf_texts = await _convert_pdf_documents(documents, store, document_texts)
 
     messages = []
-    for doc in documents:
+    for i, doc in enumerate(documents):
         text = ""
         doc_type = doc.get("type", "")
         doc_data = doc.get("data", "")
 
         if doc_type == "application/pdf":
-            text = await convert_pdf_to_text(doc_data)
+            text = pdf_texts[i]
         elif doc_type.startswith("text/"):
-            cleaned = clean_base64(doc_data)
-            text = base64.b64decode(cleaned).decode("utf-8")
+            text = document_texts[i] if i in document_texts else decode_text_document(doc_data)
         elif doc_type == "text":
             text = doc_data
 
@@ -710,6 +910,8 @@ async def create_context_document_messages_openai(
 async def create_context_document_messages_anthropic(
     documents: list["ContextDocument"],
     native_support: bool = False,
+    store: Optional[BaseStore] = None,
+    document_texts: Optional[dict[int, str]] = None,
 ) -> list[dict]:
     """
     为 Anthropic 模型创建上下文文档消息
@@ -719,14 +921,17 @@ async def create_context_document_messages_anthropic(
     Args:
         documents: 上下文文档列表
         native_support: 是否支持原生 PDF (3.5 sonnet)
+        store: 可选的 LangGraph store (PDF 文本缓存的持久层)
+        document_texts: 预提取的文本 {文档下标: 文本}
 
     Returns:
         Anthropic 格式的消息内容列表
     """
-    import base64
+    document_texts = document_texts or {}
+    pdf_texts = {} if native_support else await _convert_pdf_documents(documents, store, document_texts)
 
     messages = []
-    for doc in documents:
+    for i, doc in enumerate(documents):
         doc_type = doc.get("type", "")
         doc_data = doc.get("data", "")
 
@@ -744,10 +949,9 @@ async def create_context_document_messages_anthropic(
             # 转换为文本
             text = ""
             if doc_type == "application/pdf" and not native_support:
-                text = await convert_pdf_to_text(doc_data)
+                text = pdf_texts[i]
             elif doc_type.startswith("text/"):
-                cleaned = clean_base64(doc_data)
-                text = base64.b64decode(cleaned).decode("utf-8")
+                text = document_texts[i] if i in document_texts else decode_text_document(doc_data)
             elif doc_type == "text":
                 text = doc_data
 
@@ -759,6 +963,7 @@ async def create_context_document_messages_anthropic(
 
 def create_context_document_messages_gemini(
     documents: list["ContextDocument"],
+    document_texts: Optional[dict[int, str]] = None,
 ) -> list[dict]:
     """
     为 Google Gemini 模型创建上下文文档消息
@@ -767,14 +972,14 @@ def create_context_document_messages_gemini(
 
     Args:
         documents: 上下文文档列表
+        document_texts: 预提取的文本 {文档下标: 文本}
 
     Returns:
         Gemini 格式的消息内容列表
     """
-    import base64
-
+    document_texts = document_texts or {}
     messages = []
-    for doc in documents:
+    for i, doc in enumerate(documents):
         doc_type = doc.get("type", "")
         doc_data = doc.get("data", "")
 
@@ -784,8 +989,7 @@ def create_context_document_messages_gemini(
                 "data": clean_base64(doc_data),
             })
         elif doc_type.startswith("text/"):
-            cleaned = clean_base64(doc_data)
-            text = base64.b64decode(cleaned).decode("utf-8")
+            text = document_texts[i] if i in document_texts else decode_text_document(doc_data)
             messages.append({"type": "text", "text": text})
         elif doc_type == "text":
             messages.append({"type": "text", "text": doc_data})
@@ -795,17 +999,21 @@ def create_context_document_messages_gemini(
     return messages
 
 
-async def get_context_documents(config: RunnableConfig) -> list["ContextDocument"]:
+async def get_context_documents(
+    config: RunnableConfig,
+    store: Optional[BaseStore] = None,
+) -> list["ContextDocument"]:
     """
     从 store 获取上下文文档
 
     Args:
         config: LangGraph 运行配置
+        store: LangGraph store，缺省时使用当前运行的 store
 
     Returns:
         上下文文档列表
     """
-    store = config.get("store")
+    store = store if store is not None else get_config_store(config)
     assistant_id = config.get("configurable", {}).get("assistant_id")
 
     if not store or not assistant_id:
@@ -818,6 +1026,8 @@ async def get_context_documents(config: RunnableConfig) -> list["ContextDocument
 async def create_context_document_messages(
     config: RunnableConfig,
     context_documents: list["ContextDocument"] | None = None,
+    store: Optional[BaseStore] = None,
+    model_cfg: Optional[dict[str, Any]] = None,
 ) -> list[dict]:
     """
     为当前模型提供商创建上下文文档消息
@@ -827,6 +1037,8 @@ async def create_context_document_messages(
     Args:
         config: LangGraph 配置 (包含模型信息)
         context_documents: 可选的文档列表 (如果不提供，从 store 获取)
+        store: LangGraph store (预提取文本与 PDF 文本缓存)，缺省时使用当前运行的 store
+        model_cfg: 已解析的模型配置 (节点传入运行上下文中缓存的值)，缺省时由 config 计算
 
     Returns:
         包含 role='user' 和格式化文档内容的消息列表
@@ -845,30 +1057,39 @@ async def create_context_document_messages(
     """
     from .types import ContextDocument
 
-    model_cfg = get_model_config(config)
+    if model_cfg is None:
+        model_cfg = get_model_config(config)
     model_provider = model_cfg.get("modelProvider", "")
     model_name = model_cfg.get("modelName", "")
 
+    store = store if store is not None else get_config_store(config)
     documents: list[ContextDocument] = list(context_documents) if context_documents else []
     if not documents:
-        documents = await get_context_documents(config)
+        documents = await get_context_documents(config, store)
 
     if not documents:
         return []
 
+    # document_ingest 图预提取的文本 (文档未变时可用)，请求路径上不再解析 PDF
+    document_texts = await load_ingested_texts(
+        store, config.get("configurable", {}).get("assistant_id"), documents
+    )
+
     # 根据提供商创建文档消息
     context_doc_messages: list[dict] = []
 
-    if model_provider == "openai" or model_provider == "azure_openai":
-        context_doc_messages = await create_context_document_messages_openai(documents)
+    if model_provider in ("openai", "azure_openai", "fake"):
+        context_doc_messages = await create_context_document_messages_openai(
+            documents, store=store, document_texts=document_texts
+        )
     elif model_provider == "anthropic":
         # Claude 3.5 Sonnet 支持原生 PDF
         native_support = "3-5-sonnet" in model_name or "3.5-sonnet" in model_name
         context_doc_messages = await create_context_document_messages_anthropic(
-            documents, native_support=native_support
+            documents, native_support=native_support, store=store, document_texts=document_texts
         )
     elif model_provider == "google-genai":
-        context_doc_messages = create_context_document_messages_gemini(documents)
+        context_doc_messages = create_context_document_messages_gemini(documents, document_texts)
 
     if not context_doc_messages:
         return []
@@ -11,6 +11,7 @@ from typing import Any
 from langgraph.types import RunnableConfig
 from pydantic import BaseModel, Field
 
+from ...llm.tool_specs import with_structured_output_cached
 from ...utils import get_model_from_config
 from ..state import WebSearchState
 
@@ -60,8 +61,15 @@ async def classify_message(
     参考 TS: apps/agents/src/web-search/nodes/classify-message.ts
     """
     # 1. 创建模型并使用结构化输出 (使用用户配置的模型)
-    model = get_model_from_config(config, temperature=0, is_tool_calling=True)
-    model_with_schema = model.with_structured_output(
+    model = get_model_from_config(
+        config,
+        temperature=0,
+        is_tool_calling=True,
+        response_cache=True,
+        call_site="classifyMessage",
+    )
+    model_with_schema = with_structured_output_cached(
+        model,
         ClassifyMessage,
         method="function_calling",
     )
@@ -56,7 +56,9 @@ async def query_generator(
     参考 TS: apps/agents/src/web-search/nodes/query-generator.ts
     """
     # 1. 创建模型 (使用用户配置的模型)
-    model = get_model_from_config(config, temperature=0)
+    model = get_model_from_config(
+        config, temperature=0, response_cache=True, call_site="queryGenerator"
+    )
 
     # 2. 添加当前日期上下文
     # TS 使用 date-fns format(new Date(), "PPpp")
@@ -298,7 +298,7 @@ class TestGraphWithMockLLM:
             return_value=mock_llm,
         ):
             with patch(
-                "src.open_canvas.nodes.generate_artifact.get_formatted_reflections",
+                "src.open_canvas.run_context.RunContext.reflections",
                 return_value="",
             ):
                 result = await generate_artifact(state, mock_config, store=store)
@@ -372,7 +372,7 @@ class TestGraphWithMockLLM:
             return_value=mock_llm,
         ):
             with patch(
-                "src.open_canvas.nodes.rewrite_artifact.get_formatted_reflections",
+                "src.open_canvas.run_context.RunContext.reflections",
                 return_value="",
             ):
                 result = await rewrite_artifact(state, mock_config, store=store)
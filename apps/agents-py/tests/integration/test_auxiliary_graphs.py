@@ -389,6 +389,11 @@ class TestAllGraphsLoad:
 
         assert search_graph is not None
 
+        # Document ingest
+        from src.document_ingest.graph import graph as ingest_graph
+
+        assert ingest_graph is not None
+
     def test_all_graphs_have_invoke_method(self):
         """All graphs should have invoke methods."""
         from src.open_canvas.graph import graph as main_graph
@@ -396,8 +401,9 @@ class TestAllGraphsLoad:
         from src.thread_title.graph import graph as title_graph
         from src.summarizer.graph import graph as summarizer_graph
         from src.web_search.graph import graph as search_graph
+        from src.document_ingest.graph import graph as ingest_graph
 
-        graphs = [main_graph, reflection_graph, title_graph, summarizer_graph, search_graph]
+        graphs = [main_graph, reflection_graph, title_graph, summarizer_graph, search_graph, ingest_graph]
 
         for graph in graphs:
             assert hasattr(graph, "invoke")
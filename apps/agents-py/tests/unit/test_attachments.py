@@ -0,0 +1,281 @@
+"""
+Unit tests for content-addressed attachments in src/documents/attachments.py
+and src/open_canvas/documents/attachments.py
+
+Tests cover:
+- Attachment store memory tier, byte-bounded eviction and LangGraph store persistence
+- Document messages holding reference parts instead of inline base64
+- Inline base64 kept when no persistent store is available
+- Resolving references into Anthropic, Gemini and OpenAI (text) parts
+- Fallback to the uploaded documents when an attachment is gone
+- Provider switches not rewriting reference messages
+- Nodes expanding references before invoking the model
+"""
+
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.store.memory import InMemoryStore
+
+
+SONNET = {"configurable": {"customModelName": "claude-3-5-sonnet-latest"}}
+GEMINI = {"configurable": {"customModelName": "gemini-2.0-flash"}}
+OPENAI = {"configurable": {"customModelName": "gpt-4o-mini"}}
+
+
+@pytest.fixture(autouse=True)
+def _reset_caches():
+    from src.documents.attachments import reset_attachment_store
+    from src.documents.text_cache import reset_pdf_text_cache
+
+    reset_attachment_store()
+    reset_pdf_text_cache()
+    yield
+    reset_attachment_store()
+    reset_pdf_text_cache()
+
+
+def _upload(pdf: str) -> HumanMessage:
+    return HumanMessage(
+        content="Summarize the report",
+        additional_kwargs={"documents": [{"name": "report.pdf", "type": "application/pdf", "data": pdf}]},
+    )
+
+
+async def _doc_message(pdf: str, config: dict, store=None) -> HumanMessage:
+    from src.open_canvas.nodes.generate_path import convert_context_document_to_human_message
+
+    return await convert_context_document_to_human_message([_upload(pdf)], config, store or InMemoryStore())
+
+
+@pytest.mark.unit
+class TestAttachmentStore:
+    """Tests for the two-tier attachment store."""
+
+    @pytest.mark.asyncio
+    async def test_put_and_get(self):
+        """Attachments are addressed by the hash of their content."""
+        from src.documents.attachments import AttachmentStore, get_attachment_stats
+        from src.documents.hashing import content_hash
+
+        attachments = AttachmentStore()
+        digest = await attachments.put("QUJD", "application/pdf")
+
+        assert digest == content_hash("QUJD")
+        assert await attachments.get(digest) == "QUJD"
+        assert await attachments.get("missing") is None
+        assert get_attachment_stats()["memoryHits"] == 1
+        assert get_attachment_stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_evicts_by_bytes(self):
+        """The memory tier keeps at most max_bytes of base64."""
+        from src.documents.attachments import AttachmentStore, get_attachment_stats
+
+        attachments = AttachmentStore(max_bytes=8)
+        first = await attachments.put("AAAA", "application/pdf")
+        await attachments.put("BBBB", "application/pdf")
+        await attachments.put("CCCC", "application/pdf")
+
+        assert await attachments.get(first) is None
+        assert attachments.size == 8
+        assert get_attachment_stats()["evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_store_persistence(self):
+        """Attachments written to the LangGraph store survive a new process-level store."""
+        from src.constants import ATTACHMENTS_NAMESPACE
+        from src.documents.attachments import AttachmentStore, get_attachment_stats
+
+        store = InMemoryStore()
+        digest = await AttachmentStore().put("QUJD", "application/pdf", store)
+        await AttachmentStore().put("QUJD", "application/pdf", store)
+
+        assert store.get(ATTACHMENTS_NAMESPACE, digest).value["mediaType"] == "application/pdf"
+        assert await AttachmentStore().get(digest, store) == "QUJD"
+        assert get_attachment_stats()["persistentHits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_new_store_is_written(self):
+        """A store created after another was released still receives the attachment."""
+        import gc
+
+        from src.constants import ATTACHMENTS_NAMESPACE
+        from src.documents.attachments import AttachmentStore
+
+        attachments = AttachmentStore()
+        digest = await attachments.put("QUJD", "application/pdf", InMemoryStore())
+        gc.collect()
+        store = InMemoryStore()
+        await attachments.put("QUJD", "application/pdf", store)
+
+        assert store.get(ATTACHMENTS_NAMESPACE, digest) is not None
+
+
+@pytest.mark.unit
+class TestDocumentMessages:
+    """Tests for reference parts in converted document messages."""
+
+    @pytest.mark.asyncio
+    async def test_native_pdf_replaced_by_reference(self, make_pdf):
+        """The Anthropic document part becomes a small reference part."""
+        from src.documents.attachments import is_attachment_ref
+        from src.open_canvas.documents.tracking import FORMAT_REF, detect_document_format
+
+        pdf = make_pdf(["Numbers"])
+        message = await _doc_message(pdf, SONNET)
+
+        ref = message.content[1]
+        assert is_attachment_ref(ref)
+        assert ref["format"] == "anthropic"
+        assert ref["mediaType"] == "application/pdf"
+        assert pdf not in json.dumps(message.content)
+        assert detect_document_format(message) == FORMAT_REF
+
+    @pytest.mark.asyncio
+    async def test_refs_disabled(self, make_pdf):
+        """ATTACHMENT_REFS=off keeps the inline base64 part."""
+        pdf = make_pdf(["Numbers"])
+
+        with patch.dict("os.environ", {"ATTACHMENT_REFS": "off"}):
+            message = await _doc_message(pdf, SONNET)
+
+        assert message.content[1]["type"] == "document"
+        assert message.content[1]["source"]["data"] == pdf
+
+    @pytest.mark.asyncio
+    async def test_no_store_keeps_inline_base64(self, make_pdf):
+        """Without a persistent store a reference could not be resolved in another process."""
+        from src.open_canvas.nodes.generate_path import convert_context_document_to_human_message
+
+        pdf = make_pdf(["Numbers"])
+        message = await convert_context_document_to_human_message([_upload(pdf)], SONNET)
+
+        assert message.content[1]["type"] == "document"
+        assert message.content[1]["source"]["data"] == pdf
+
+    @pytest.mark.asyncio
+    async def test_graph_store_used(self, make_pdf):
+        """Inside a compiled graph the store comes from the runtime, not from config["store"]."""
+        from typing import TypedDict
+
+        from langgraph.graph import END, START, StateGraph
+
+        from src.constants import ATTACHMENTS_NAMESPACE
+        from src.open_canvas.nodes.generate_path import convert_context_document_to_human_message
+
+        class State(TypedDict):
+            pdf: str
+            message: HumanMessage
+
+        async def convert(state: State, config) -> dict:
+            return {"message": await convert_context_document_to_human_message([_upload(state["pdf"])], config)}
+
+        builder = StateGraph(State)
+        builder.add_node("convert", convert)
+        builder.add_edge(START, "convert")
+        builder.add_edge("convert", END)
+        store = InMemoryStore()
+        graph = builder.compile(store=store)
+
+        pdf = make_pdf(["Numbers"])
+        result = await graph.ainvoke({"pdf": pdf}, SONNET)
+
+        ref = result["message"].content[1]
+        assert ref["type"] == "attachment_ref"
+        assert store.get(ATTACHMENTS_NAMESPACE, ref["contentHash"]) is not None
+
+    def test_reference_messages_not_fixed(self):
+        """Reference messages are provider-agnostic and never selected for format fixing."""
+        from src.open_canvas.documents.tracking import FORMAT_REF, find_message_to_fix
+
+        message = HumanMessage(id="doc-1", content=[{"type": "attachment_ref", "contentHash": "x"}])
+
+        assert find_message_to_fix([message], {"doc-1": FORMAT_REF}, "text") is None
+
+
+@pytest.mark.unit
+class TestResolveAttachmentRefs:
+    """Tests for expanding references at model-invocation time."""
+
+    @pytest.mark.asyncio
+    async def test_no_refs_returns_same_list(self):
+        """Messages without references are passed through untouched."""
+        from src.open_canvas.documents.attachments import resolve_attachment_refs
+
+        messages = [HumanMessage(content="hi"), AIMessage(content="hello")]
+
+        assert await resolve_attachment_refs(messages, SONNET) is messages
+
+    @pytest.mark.asyncio
+    async def test_resolves_per_provider(self, make_pdf):
+        """One stored message expands to the format of whichever provider is invoked."""
+        from src.open_canvas.documents.attachments import resolve_attachment_refs
+
+        pdf = make_pdf(["Numbers"])
+        message = await _doc_message(pdf, SONNET)
+
+        anthropic = (await resolve_attachment_refs([message], SONNET))[0]
+        gemini = (await resolve_attachment_refs([message], GEMINI))[0]
+        openai = (await resolve_attachment_refs([message], OPENAI))[0]
+
+        assert anthropic.content[1] == {
+            "type": "document",
+            "source": {"type": "base64", "media_type": "application/pdf", "data": pdf},
+        }
+        assert gemini.content[1] == {"type": "application/pdf", "data": pdf}
+        assert openai.content[1] == {"type": "text", "text": "Numbers"}
+        assert anthropic.id == message.id
+        assert message.content[1]["type"] == "attachment_ref"
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_uploaded_documents(self, make_pdf):
+        """An evicted attachment is recovered from the upload's additional_kwargs."""
+        from src.documents.attachments import reset_attachment_store
+        from src.open_canvas.documents.attachments import resolve_attachment_refs
+
+        pdf = make_pdf(["Numbers"])
+        upload = _upload(pdf)
+        message = await _doc_message(pdf, SONNET)
+        reset_attachment_store()
+
+        resolved = await resolve_attachment_refs([upload, message], SONNET)
+
+        assert resolved[1].content[1]["source"]["data"] == pdf
+
+    @pytest.mark.asyncio
+    async def test_missing_attachment_marker(self, make_pdf):
+        """A reference that cannot be resolved becomes a short text marker."""
+        from src.documents.attachments import reset_attachment_store
+        from src.open_canvas.documents.attachments import resolve_attachment_refs
+
+        message = await _doc_message(make_pdf(["Numbers"]), SONNET)
+        reset_attachment_store()
+
+        resolved = await resolve_attachment_refs([message], SONNET)
+
+        assert resolved[0].content[1]["text"].startswith("[Attachment unavailable:")
+
+    @pytest.mark.asyncio
+    async def test_node_invokes_model_with_resolved_parts(self, make_pdf, mock_store):
+        """reply_to_general_input sends the expanded document part to the model."""
+        from src.open_canvas.nodes.reply_to_general_input import reply_to_general_input
+
+        pdf = make_pdf(["Numbers"])
+        upload = _upload(pdf)
+        message = await _doc_message(pdf, SONNET)
+
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke = AsyncMock(return_value=AIMessage(content="Done"))
+        state = {"_messages": [upload, message], "messages": [upload, message], "artifact": None}
+
+        with patch("src.open_canvas.nodes.reply_to_general_input.get_model_from_config", return_value=mock_llm), \
+                patch("src.open_canvas.run_context.RunContext.reflections", return_value=""), \
+                patch("src.open_canvas.run_context.RunContext.context_document_messages", return_value=[]), \
+                patch("src.open_canvas.run_context.RunContext.is_using_o1_mini_model", return_value=False):
+            await reply_to_general_input(state, SONNET, store=mock_store)
+
+        sent = mock_llm.ainvoke.call_args.args[0]
+        assert sent[-1].content[1]["source"]["data"] == pdf
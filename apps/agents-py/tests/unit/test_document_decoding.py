@@ -0,0 +1,146 @@
+"""
+Unit tests for streaming document decoding in src/documents/decode.py
+
+Tests cover:
+- Chunked base64 decoding (data URL prefix, whitespace, chunk boundaries)
+- Text documents decoded incrementally with byte and character caps
+- PDF extraction with page, character and byte caps and truncation markers
+- Temporary files removed after extraction
+"""
+
+import base64
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.mark.unit
+class TestBase64Chunks:
+    """Tests for iter_base64_chunks."""
+
+    @pytest.mark.parametrize("chunk_chars", [1, 3, 4, 7, 1024])
+    def test_matches_b64decode(self, chunk_chars):
+        """Chunked decoding equals a one-shot decode whatever the chunk size."""
+        from src.documents.decode import iter_base64_chunks
+
+        payload = bytes(range(256)) * 3 + b"tail"
+        encoded = base64.encodebytes(payload).decode()  # 76-char lines with newlines
+
+        decoded = b"".join(iter_base64_chunks(f"data:application/pdf;base64,{encoded}", chunk_chars))
+
+        assert decoded == payload
+
+    def test_bad_padding_raises(self):
+        """Truncated input fails like base64.b64decode does."""
+        import binascii
+
+        from src.documents.decode import iter_base64_chunks
+
+        with pytest.raises(binascii.Error):
+            b"".join(iter_base64_chunks("QUJDR"))
+
+
+@pytest.mark.unit
+class TestTextDocuments:
+    """Tests for decode_text_document."""
+
+    def test_full_document(self):
+        """Documents within the limits decode unchanged."""
+        from src.documents.decode import DocumentLimits, decode_text_document
+
+        text = "héllo wörld ✓\n" * 100
+
+        assert decode_text_document(base64.b64encode(text.encode()).decode(), DocumentLimits()) == text
+
+    def test_byte_cap(self):
+        """Decoding stops at max_bytes without splitting a multibyte character."""
+        from src.documents.decode import DocumentLimits, decode_text_document
+
+        data = base64.b64encode("ab✓cd".encode()).decode()  # ✓ is 3 bytes
+
+        text = decode_text_document(data, DocumentLimits(max_bytes=4))
+
+        assert text == "ab\n\n[Truncated: document exceeds 4 bytes]"
+
+    def test_char_cap(self):
+        """Text beyond max_chars is cut and marked."""
+        from src.documents.decode import DocumentLimits, decode_text_document
+
+        data = base64.b64encode(b"x" * 50).decode()
+
+        assert decode_text_document(data, DocumentLimits(max_chars=10)) == (
+            "x" * 10 + "\n\n[Truncated: text exceeds 10 characters]"
+        )
+
+    def test_limits_from_env(self):
+        """DOCUMENT_MAX_* variables override the defaults."""
+        from src.documents.decode import DocumentLimits
+
+        with patch.dict("os.environ", {"DOCUMENT_MAX_PAGES": "7", "DOCUMENT_MAX_CHARS": "bad"}):
+            limits = DocumentLimits.from_env()
+
+        assert limits.max_pages == 7
+        assert limits.max_chars == DocumentLimits().max_chars
+
+
+@pytest.mark.unit
+class TestPdfLimits:
+    """Tests for capped PDF extraction."""
+
+    @staticmethod
+    def _pool(**limits):
+        from src.documents.decode import DocumentLimits
+        from src.documents.extraction import PdfExtractionPool
+
+        return PdfExtractionPool(workers=0, queue_size=4, page_chunk=2, limits=DocumentLimits(**limits))
+
+    @pytest.mark.asyncio
+    async def test_page_cap(self, make_pdf):
+        """Only the first max_pages pages are extracted."""
+        pool = self._pool(max_pages=3)
+
+        text = await pool.extract(make_pdf([f"Page {i}" for i in range(6)]))
+
+        assert text == "Page 0\nPage 1\nPage 2\n\n[Truncated: extracted the first 3 of 6 pages]"
+        assert pool.stats()["truncated"] == 1
+
+    @pytest.mark.asyncio
+    async def test_char_cap_stops_extraction(self, make_pdf):
+        """Pages after the character cap is reached are not extracted."""
+        from src.documents import extraction
+
+        pool = self._pool(max_chars=10)
+
+        with patch.object(extraction, "extract_page_range", wraps=extraction.extract_page_range) as spy:
+            text = await pool.extract(make_pdf([f"Page {i}" for i in range(8)]))
+
+        assert text == "Page 0\nPag\n\n[Truncated: text exceeds 10 characters]"
+        assert spy.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_byte_cap_omits_document(self, make_pdf):
+        """PDFs larger than max_bytes are not decoded or parsed."""
+        from src.documents import extraction
+
+        pool = self._pool(max_bytes=100)
+        data = make_pdf(["Page"])
+
+        with patch.object(extraction, "decode_base64_to_file") as decode:
+            text = await pool.extract(data)
+
+        assert text.startswith("[Document omitted:")
+        decode.assert_not_called()
+        assert pool.stats()["omitted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_temp_file_removed(self, make_pdf, tmp_path):
+        """The decoded temp file is deleted after success and failure."""
+        pool = self._pool()
+
+        with patch.object(tempfile, "tempdir", str(tmp_path)):
+            assert await pool.extract(make_pdf(["Page"])) == "Page"
+            with pytest.raises(Exception):
+                await pool.extract(base64.b64encode(b"not a pdf").decode())
+
+        assert list(tmp_path.iterdir()) == []
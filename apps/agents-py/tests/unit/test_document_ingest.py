@@ -0,0 +1,251 @@
+"""
+Unit tests for the document_ingest graph and ingest records in src/documents/ingest.py
+
+Tests cover:
+- The ingest node extracting text, token counts and digests into the variants store
+- Uploaded documents saved as the assistant's context documents
+- create_context_document_messages using ingested text without parsing
+- Stale or missing records falling back to request-time conversion
+- The request path inside a compiled graph reading the runtime store
+- Record statistics
+"""
+
+import base64
+from unittest.mock import patch
+
+import pytest
+from langgraph.store.memory import InMemoryStore
+
+
+@pytest.fixture(autouse=True)
+def _reset_state():
+    from src.documents.ingest import reset_document_ingest_stats
+    from src.documents.text_cache import reset_pdf_text_cache
+
+    reset_document_ingest_stats()
+    reset_pdf_text_cache()
+    yield
+    reset_pdf_text_cache()
+
+
+def _text_doc(name: str, text: str) -> dict:
+    return {"name": name, "type": "text/plain", "data": base64.b64encode(text.encode()).decode()}
+
+
+async def _ingest(store, documents=None, assistant_id="assistant-1"):
+    from src.document_ingest.graph import ingest_documents
+
+    return await ingest_documents(
+        {"documents": documents} if documents is not None else {},
+        {"configurable": {"open_canvas_assistant_id": assistant_id}},
+        store=store,
+    )
+
+
+@pytest.mark.unit
+class TestIngestRecord:
+    """Tests for the record helpers."""
+
+    def test_record_fields(self):
+        """Each document gets a content hash, sizes and a one-line digest."""
+        from src.documents.ingest import build_ingest_record, document_content_hash
+
+        doc = _text_doc("notes.txt", "x")
+        record = build_ingest_record([doc], ["Line one\n\n  line two " * 40])
+
+        entry = record["documents"][0]
+        assert entry["name"] == "notes.txt"
+        assert entry["contentHash"] == document_content_hash(doc)
+        assert entry["chars"] == len("Line one\n\n  line two " * 40)
+        assert entry["tokens"] == (entry["chars"] + 3) // 4
+        assert "\n" not in entry["digest"]
+        assert len(entry["digest"]) <= 280
+        assert entry["digest"].endswith("…")
+
+    def test_content_hash_ignores_data_url_prefix(self):
+        """The data URL prefix does not change the content hash, the type does."""
+        from src.documents.ingest import document_content_hash
+
+        doc = _text_doc("a.txt", "same")
+        prefixed = {**doc, "data": f"data:text/plain;base64,{doc['data']}"}
+
+        assert document_content_hash(doc) == document_content_hash(prefixed)
+        assert document_content_hash(doc) != document_content_hash({**doc, "type": "text/markdown"})
+
+
+@pytest.mark.unit
+class TestIngestGraph:
+    """Tests for the document_ingest graph node."""
+
+    @pytest.mark.asyncio
+    async def test_ingest_writes_variants(self, make_pdf):
+        """Uploaded documents are saved and their text variants written."""
+        from src.constants import CONTEXT_DOCUMENTS_NAMESPACE, DOCUMENT_VARIANTS_NAMESPACE
+
+        store = InMemoryStore()
+        documents = [
+            {"name": "report.pdf", "type": "application/pdf", "data": make_pdf(["Revenue grew", "Costs fell"])},
+            _text_doc("notes.txt", "Plain notes"),
+            {"name": "image.png", "type": "image/png", "data": "aGVsbG8="},
+        ]
+
+        result = await _ingest(store, documents)
+
+        assert [entry["name"] for entry in result["ingested"]] == ["report.pdf", "notes.txt", "image.png"]
+        assert result["ingested"][0]["chars"] == len("Revenue grew\nCosts fell")
+        assert result["ingested"][2]["chars"] == 0
+
+        saved = store.get(CONTEXT_DOCUMENTS_NAMESPACE, "assistant-1")
+        assert saved.value["documents"] == documents
+
+        record = store.get(DOCUMENT_VARIANTS_NAMESPACE, "assistant-1").value
+        assert record["variants"]["text"] == ["Revenue grew\nCosts fell", "Plain notes", None]
+
+    @pytest.mark.asyncio
+    async def test_ingest_saved_documents(self):
+        """Without input documents the graph ingests the assistant's saved documents."""
+        from src.constants import CONTEXT_DOCUMENTS_NAMESPACE, DOCUMENT_VARIANTS_NAMESPACE
+
+        store = InMemoryStore()
+        store.put(CONTEXT_DOCUMENTS_NAMESPACE, "assistant-1", {"documents": [_text_doc("a.txt", "Saved")]})
+
+        result = await _ingest(store)
+
+        assert result["ingested"][0]["digest"] == "Saved"
+        assert store.get(DOCUMENT_VARIANTS_NAMESPACE, "assistant-1").value["variants"]["text"] == ["Saved"]
+
+    @pytest.mark.asyncio
+    async def test_extraction_failure_recorded_as_missing_text(self):
+        """A document that fails to parse has no text variant; the others are still ingested."""
+        from src.constants import DOCUMENT_VARIANTS_NAMESPACE
+
+        store = InMemoryStore()
+        documents = [
+            {"name": "broken.pdf", "type": "application/pdf", "data": base64.b64encode(b"not a pdf").decode()},
+            _text_doc("ok.txt", "Fine"),
+        ]
+
+        await _ingest(store, documents)
+
+        record = store.get(DOCUMENT_VARIANTS_NAMESPACE, "assistant-1").value
+        assert record["variants"]["text"] == [None, "Fine"]
+
+    @pytest.mark.asyncio
+    async def test_requires_assistant_id(self):
+        """The target assistant must be configured."""
+        from src.document_ingest.graph import ingest_documents
+
+        with pytest.raises(ValueError, match="open_canvas_assistant_id"):
+            await ingest_documents({}, {"configurable": {}}, store=InMemoryStore())
+
+
+@pytest.mark.unit
+class TestRequestPath:
+    """Tests for create_context_document_messages reading ingest records."""
+
+    @staticmethod
+    def _config(store, model="gpt-4o-mini"):
+        return {"configurable": {"customModelName": model, "assistant_id": "assistant-1"}, "store": store}
+
+    @pytest.mark.asyncio
+    async def test_ingested_text_used_without_parsing(self, make_pdf):
+        """After ingestion the request path does not convert the PDF."""
+        from src.documents.ingest import get_document_ingest_stats
+        from src.documents.text_cache import reset_pdf_text_cache
+        from src.utils import create_context_document_messages
+
+        store = InMemoryStore()
+        documents = [{"name": "report.pdf", "type": "application/pdf", "data": make_pdf(["Numbers"])}]
+        await _ingest(store, documents)
+        reset_pdf_text_cache()
+
+        with patch("src.utils.convert_pdf_to_text") as convert:
+            messages = await create_context_document_messages(self._config(store), documents)
+
+        convert.assert_not_called()
+        assert messages[0]["content"][1] == {"type": "text", "text": "Numbers"}
+        assert get_document_ingest_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_record_falls_back(self, make_pdf):
+        """A record for replaced documents is ignored and the document parsed at request time."""
+        from src.documents.ingest import get_document_ingest_stats
+        from src.utils import create_context_document_messages
+
+        store = InMemoryStore()
+        await _ingest(store, [{"name": "old.pdf", "type": "application/pdf", "data": make_pdf(["Old"])}])
+
+        documents = [{"name": "new.pdf", "type": "application/pdf", "data": make_pdf(["New"])}]
+        messages = await create_context_document_messages(self._config(store), documents)
+
+        assert messages[0]["content"][1] == {"type": "text", "text": "New"}
+        assert get_document_ingest_stats()["stale"] == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_record_falls_back(self):
+        """Without a record text documents are decoded at request time."""
+        from src.documents.ingest import get_document_ingest_stats
+        from src.utils import create_context_document_messages
+
+        messages = await create_context_document_messages(
+            self._config(InMemoryStore()), [_text_doc("a.txt", "Decoded")]
+        )
+
+        assert messages[0]["content"][1] == {"type": "text", "text": "Decoded"}
+        assert get_document_ingest_stats()["missing"] == 1
+
+    @pytest.mark.asyncio
+    async def test_native_pdf_still_uses_original_data(self, make_pdf):
+        """Providers with native PDF support keep receiving the original base64."""
+        from src.utils import create_context_document_messages
+
+        store = InMemoryStore()
+        pdf = make_pdf(["Native"])
+        documents = [{"name": "report.pdf", "type": "application/pdf", "data": pdf}]
+        await _ingest(store, documents)
+
+        messages = await create_context_document_messages(
+            self._config(store, "claude-3-5-sonnet-latest"), documents
+        )
+
+        assert pdf in str(messages[0]["content"][1])
+
+    @pytest.mark.asyncio
+    async def test_compiled_graph_uses_runtime_store(self, make_pdf):
+        """Graphs get their store from the runtime; config["store"] is never set by LangGraph."""
+        from typing import TypedDict
+
+        from langgraph.graph import END, START, StateGraph
+
+        from src.document_ingest.graph import build_graph
+        from src.documents.ingest import get_document_ingest_stats
+        from src.documents.text_cache import reset_pdf_text_cache
+        from src.utils import create_context_document_messages
+
+        class State(TypedDict):
+            messages: list
+
+        async def read_documents(state: State, config) -> dict:
+            return {"messages": await create_context_document_messages(config)}
+
+        builder = StateGraph(State)
+        builder.add_node("readDocuments", read_documents)
+        builder.add_edge(START, "readDocuments")
+        builder.add_edge("readDocuments", END)
+
+        store = InMemoryStore()
+        documents = [{"name": "report.pdf", "type": "application/pdf", "data": make_pdf(["Numbers"])}]
+        await build_graph().compile(store=store).ainvoke(
+            {"documents": documents}, {"configurable": {"open_canvas_assistant_id": "assistant-1"}}
+        )
+        reset_pdf_text_cache()
+
+        with patch("src.utils.convert_pdf_to_text") as convert:
+            result = await builder.compile(store=store).ainvoke(
+                {"messages": []},
+                {"configurable": {"customModelName": "gpt-4o-mini", "assistant_id": "assistant-1"}},
+            )
+
+        convert.assert_not_called()
+        assert result["messages"][0]["content"][1] == {"type": "text", "text": "Numbers"}
+        assert get_document_ingest_stats()["hits"] == 1
@@ -0,0 +1,196 @@
+"""
+Unit tests for context-document message tracking in src/open_canvas/documents/tracking.py
+
+Tests cover:
+- Document format detection and provider format mapping
+- Legacy scan building the index
+- Indexed lookups that skip message contents, stale entry pruning
+- Provider switches reusing the PDF text cache
+- generate_path keeping contextDocumentMessages up to date across provider switches
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+
+def _anthropic_doc(msg_id: str, data: str = "UERG") -> HumanMessage:
+    return HumanMessage(
+        id=msg_id,
+        content=[{"type": "document", "source": {"type": "base64", "media_type": "application/pdf", "data": data}}],
+    )
+
+
+def _gemini_doc(msg_id: str, data: str = "UERG") -> HumanMessage:
+    return HumanMessage(id=msg_id, content=[{"type": "application/pdf", "data": data}])
+
+
+class _NoIteration(list):
+    """Message list that fails if it is walked."""
+
+    def __iter__(self):
+        raise AssertionError("messages should not be scanned")
+
+
+@pytest.fixture(autouse=True)
+def _reset_tracking():
+    from src.documents.text_cache import reset_pdf_text_cache
+    from src.open_canvas.documents.tracking import reset_document_tracking_stats
+
+    reset_document_tracking_stats()
+    reset_pdf_text_cache()
+    yield
+    reset_pdf_text_cache()
+
+
+@pytest.mark.unit
+class TestDocumentFormat:
+    """Tests for format detection."""
+
+    def test_detect_document_format(self):
+        """Document parts map to their provider format."""
+        from src.open_canvas.documents.tracking import detect_document_format
+
+        mixed = HumanMessage(content=[*_anthropic_doc("a").content, *_gemini_doc("b").content])
+
+        assert detect_document_format(_anthropic_doc("a")) == "anthropic"
+        assert detect_document_format(_gemini_doc("b")) == "gemini"
+        assert detect_document_format(mixed) == "mixed"
+        assert detect_document_format(HumanMessage(content="plain")) is None
+        assert detect_document_format(AIMessage(content="reply")) is None
+
+    def test_provider_document_format(self):
+        """Providers map to the format their document messages must use."""
+        from src.open_canvas.documents.tracking import provider_document_format
+
+        def fmt(model: str):
+            return provider_document_format({"configurable": {"customModelName": model}})
+
+        assert fmt("gpt-4o-mini") == "text"
+        assert fmt("claude-3-5-sonnet-latest") == "anthropic"
+        assert fmt("gemini-2.0-flash") == "gemini"
+        assert fmt("fake/canned") is None
+
+    def test_provider_document_format_uses_run_context(self):
+        """The model config is taken from the run context instead of being recomputed."""
+        from src.open_canvas.documents.tracking import provider_document_format
+        from src.open_canvas.run_context import attach_run_context, get_run_context
+
+        config = attach_run_context({"configurable": {"customModelName": "gpt-4o-mini"}})
+        get_run_context(config).model_config(config)
+
+        with patch("src.open_canvas.run_context.get_model_config") as get_model_config:
+            assert provider_document_format(config) == "text"
+
+        get_model_config.assert_not_called()
+        assert get_run_context(config).stats()["modelConfigReuses"] == 1
+
+
+@pytest.mark.unit
+class TestIndexLookup:
+    """Tests for the legacy scan and indexed lookups."""
+
+    def test_legacy_scan_builds_index(self):
+        """The scan records document messages in order."""
+        from src.open_canvas.documents.tracking import get_document_tracking_stats, index_document_messages
+
+        messages = [HumanMessage(id="h", content="hi"), _gemini_doc("g"), AIMessage(content="ok"), _anthropic_doc("a")]
+
+        assert list(index_document_messages(messages).items()) == [("g", "gemini"), ("a", "anthropic")]
+        assert get_document_tracking_stats()["legacyScans"] == 1
+
+    def test_matching_format_skips_messages(self):
+        """When every indexed message already has the target format, messages are not walked."""
+        from src.open_canvas.documents.tracking import find_message_to_fix, get_document_tracking_stats
+
+        index = {"a": "anthropic", "t": "text"}
+
+        assert find_message_to_fix(_NoIteration(), index, "anthropic") is None
+        assert find_message_to_fix(_NoIteration(), index, None) is None
+        assert get_document_tracking_stats()["indexedLookups"] == 2
+
+    def test_first_existing_message_is_returned(self):
+        """Stale entries are dropped and the first remaining document message is fixed."""
+        from src.open_canvas.documents.tracking import find_message_to_fix
+
+        gemini = _gemini_doc("g")
+        index = {"gone": "gemini", "g": "gemini", "a": "anthropic"}
+
+        assert find_message_to_fix([gemini, _anthropic_doc("a")], index, "anthropic") is gemini
+        assert "gone" not in index
+
+    def test_first_message_matching_means_no_fix(self):
+        """As before, only the first document message is considered."""
+        from src.open_canvas.documents.tracking import find_message_to_fix
+
+        index = {"a": "anthropic", "g": "gemini"}
+
+        assert find_message_to_fix([_anthropic_doc("a"), _gemini_doc("g")], index, "anthropic") is None
+
+
+@pytest.mark.unit
+class TestProviderSwitchConversion:
+    """Tests for PDF text reuse across provider switches."""
+
+    @pytest.mark.asyncio
+    async def test_pdf_text_extracted_once(self, make_pdf):
+        """The same PDF is parsed once however often it is converted to text."""
+        from src.open_canvas.nodes.generate_path import fix_mis_formatted_context_doc_message
+        from src.utils import _extract_pdf_text
+
+        pdf = make_pdf(["pdf text"])
+        config = {"configurable": {"customModelName": "gpt-4o-mini"}}
+
+        with patch("src.utils._extract_pdf_text", wraps=_extract_pdf_text) as spy:
+            first = await fix_mis_formatted_context_doc_message(_anthropic_doc("a", pdf), config)
+            second = await fix_mis_formatted_context_doc_message(_gemini_doc("g", pdf), config)
+
+        assert spy.call_count == 1
+        assert first[1].content == second[1].content == [{"type": "text", "text": "pdf text"}]
+
+
+@pytest.mark.unit
+class TestGeneratePathIndex:
+    """Tests for index maintenance in generate_path."""
+
+    @pytest.mark.asyncio
+    async def test_provider_switch_updates_index(self, mock_store):
+        """Switching to OpenAI converts the indexed message once and records the new message."""
+        from src.open_canvas.nodes.generate_path import generate_path
+
+        convert = AsyncMock(return_value="pdf text")
+        config = {"configurable": {"customModelName": "gpt-4o-mini"}}
+        state = {
+            "_messages": [_anthropic_doc("a"), HumanMessage(id="q", content="translate")],
+            "contextDocumentMessages": {"a": "anthropic"},
+            "customQuickActionId": "action-1",
+        }
+
+        with patch("src.open_canvas.nodes.generate_path.convert_pdf_to_text", convert):
+            result = await generate_path(state, config, store=mock_store)
+
+            new_message = result["messages"][-1]
+            assert result["contextDocumentMessages"] == {new_message.id: "text"}
+
+            # 下一轮: 索引中的格式已与提供商一致，不再转换
+            next_state = {
+                **state,
+                "_messages": [new_message, HumanMessage(id="q2", content="again")],
+                "contextDocumentMessages": result["contextDocumentMessages"],
+            }
+            assert await generate_path(next_state, config, store=mock_store) == {"next": "customAction"}
+
+        assert convert.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_legacy_thread_gets_index(self, mock_store):
+        """Threads without an index are scanned once and the index is written back."""
+        from src.open_canvas.nodes.generate_path import generate_path
+
+        config = {"configurable": {"customModelName": "claude-3-5-sonnet-latest"}}
+        state = {"_messages": [_anthropic_doc("a")], "customQuickActionId": "action-1"}
+
+        result = await generate_path(state, config, store=mock_store)
+
+        assert result == {"next": "customAction", "contextDocumentMessages": {"a": "anthropic"}}
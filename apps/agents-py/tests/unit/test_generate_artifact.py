@@ -26,11 +26,11 @@ class TestGenerateArtifact:
 
         assert callable(generate_artifact)
 
-    def test_get_model_config_function_exists(self):
-        """get_model_config function should be imported."""
-        from src.open_canvas.nodes.generate_artifact import get_model_config
+    def test_get_run_context_function_exists(self):
+        """get_run_context (run-scoped model config) should be imported."""
+        from src.open_canvas.nodes.generate_artifact import get_run_context
 
-        assert callable(get_model_config)
+        assert callable(get_run_context)
 
     def test_get_model_from_config_function_exists(self):
         """get_model_from_config function should be imported."""
@@ -274,10 +274,10 @@ class TestGenerateArtifactNodeWithMock:
         }
 
         with patch("src.open_canvas.nodes.generate_artifact.get_model_from_config", return_value=mock_llm):
-            with patch("src.open_canvas.nodes.generate_artifact.get_model_config", return_value={"modelName": "gpt-4o"}):
-                with patch("src.open_canvas.nodes.generate_artifact.get_formatted_reflections", return_value=""):
-                    with patch("src.open_canvas.nodes.generate_artifact.create_context_document_messages", return_value=[]):
-                        with patch("src.open_canvas.nodes.generate_artifact.is_using_o1_mini_model", return_value=False):
+            with patch("src.open_canvas.run_context.get_model_config", return_value={"modelName": "gpt-4o"}):
+                with patch("src.open_canvas.run_context.RunContext.reflections", return_value=""):
+                    with patch("src.open_canvas.run_context.RunContext.context_document_messages", return_value=[]):
+                        with patch("src.open_canvas.run_context.RunContext.is_using_o1_mini_model", return_value=False):
                             with patch("src.open_canvas.nodes.generate_artifact.optionally_get_system_prompt_from_config", return_value=None):
                                 result = await generate_artifact(state, mock_config, store=mock_store)
 
@@ -314,10 +314,10 @@ class TestGenerateArtifactNodeWithMock:
         }
 
         with patch("src.open_canvas.nodes.generate_artifact.get_model_from_config", return_value=mock_llm):
-            with patch("src.open_canvas.nodes.generate_artifact.get_model_config", return_value={"modelName": "gpt-4o"}):
-                with patch("src.open_canvas.nodes.generate_artifact.get_formatted_reflections", return_value=""):
-                    with patch("src.open_canvas.nodes.generate_artifact.create_context_document_messages", return_value=[]):
-                        with patch("src.open_canvas.nodes.generate_artifact.is_using_o1_mini_model", return_value=False):
+            with patch("src.open_canvas.run_context.get_model_config", return_value={"modelName": "gpt-4o"}):
+                with patch("src.open_canvas.run_context.RunContext.reflections", return_value=""):
+                    with patch("src.open_canvas.run_context.RunContext.context_document_messages", return_value=[]):
+                        with patch("src.open_canvas.run_context.RunContext.is_using_o1_mini_model", return_value=False):
                             with patch("src.open_canvas.nodes.generate_artifact.optionally_get_system_prompt_from_config", return_value=None):
                                 result = await generate_artifact(state, mock_config, store=mock_store)
 
@@ -347,10 +347,10 @@ class TestGenerateArtifactNodeWithMock:
         }
 
         with patch("src.open_canvas.nodes.generate_artifact.get_model_from_config", return_value=mock_llm):
-            with patch("src.open_canvas.nodes.generate_artifact.get_model_config", return_value={"modelName": "gpt-4o"}):
-                with patch("src.open_canvas.nodes.generate_artifact.get_formatted_reflections", return_value=""):
-                    with patch("src.open_canvas.nodes.generate_artifact.create_context_document_messages", return_value=[]):
-                        with patch("src.open_canvas.nodes.generate_artifact.is_using_o1_mini_model", return_value=False):
+            with patch("src.open_canvas.run_context.get_model_config", return_value={"modelName": "gpt-4o"}):
+                with patch("src.open_canvas.run_context.RunContext.reflections", return_value=""):
+                    with patch("src.open_canvas.run_context.RunContext.context_document_messages", return_value=[]):
+                        with patch("src.open_canvas.run_context.RunContext.is_using_o1_mini_model", return_value=False):
                             with patch("src.open_canvas.nodes.generate_artifact.optionally_get_system_prompt_from_config", return_value=None):
                                 with pytest.raises(ValueError, match="No tool calls found"):
                                     await generate_artifact(state, mock_config, store=mock_store)
@@ -375,10 +375,10 @@ class TestGenerateArtifactNodeWithMock:
         }
 
         with patch("src.open_canvas.nodes.generate_artifact.get_model_from_config", return_value=mock_llm):
-            with patch("src.open_canvas.nodes.generate_artifact.get_model_config", return_value={"modelName": "gpt-4o"}):
-                with patch("src.open_canvas.nodes.generate_artifact.get_formatted_reflections", return_value=""):
-                    with patch("src.open_canvas.nodes.generate_artifact.create_context_document_messages", return_value=[]):
-                        with patch("src.open_canvas.nodes.generate_artifact.is_using_o1_mini_model", return_value=False):
+            with patch("src.open_canvas.run_context.get_model_config", return_value={"modelName": "gpt-4o"}):
+                with patch("src.open_canvas.run_context.RunContext.reflections", return_value=""):
+                    with patch("src.open_canvas.run_context.RunContext.context_document_messages", return_value=[]):
+                        with patch("src.open_canvas.run_context.RunContext.is_using_o1_mini_model", return_value=False):
                             with patch("src.open_canvas.nodes.generate_artifact.optionally_get_system_prompt_from_config", return_value=None):
                                 with pytest.raises(ValueError, match="No args found"):
                                     await generate_artifact(state, mock_config, store=mock_store)
@@ -406,10 +406,10 @@ class TestGenerateArtifactNodeWithMock:
         }
 
         with patch("src.open_canvas.nodes.generate_artifact.get_model_from_config", return_value=mock_llm):
-            with patch("src.open_canvas.nodes.generate_artifact.get_model_config", return_value={"modelName": "o1-mini"}):
-                with patch("src.open_canvas.nodes.generate_artifact.get_formatted_reflections", return_value=""):
-                    with patch("src.open_canvas.nodes.generate_artifact.create_context_document_messages", return_value=[]):
-                        with patch("src.open_canvas.nodes.generate_artifact.is_using_o1_mini_model", return_value=True):
+            with patch("src.open_canvas.run_context.get_model_config", return_value={"modelName": "o1-mini"}):
+                with patch("src.open_canvas.run_context.RunContext.reflections", return_value=""):
+                    with patch("src.open_canvas.run_context.RunContext.context_document_messages", return_value=[]):
+                        with patch("src.open_canvas.run_context.RunContext.is_using_o1_mini_model", return_value=True):
                             with patch("src.open_canvas.nodes.generate_artifact.optionally_get_system_prompt_from_config", return_value=None):
                                 await generate_artifact(state, mock_config, store=mock_store)
 
@@ -453,10 +453,10 @@ class TestGenerateArtifactNodeWithMock:
         user_prompt = "Always use descriptive variable names."
 
         with patch("src.open_canvas.nodes.generate_artifact.get_model_from_config", return_value=mock_llm):
-            with patch("src.open_canvas.nodes.generate_artifact.get_model_config", return_value={"modelName": "gpt-4o"}):
-                with patch("src.open_canvas.nodes.generate_artifact.get_formatted_reflections", return_value=""):
-                    with patch("src.open_canvas.nodes.generate_artifact.create_context_document_messages", return_value=[]):
-                        with patch("src.open_canvas.nodes.generate_artifact.is_using_o1_mini_model", return_value=False):
+            with patch("src.open_canvas.run_context.get_model_config", return_value={"modelName": "gpt-4o"}):
+                with patch("src.open_canvas.run_context.RunContext.reflections", return_value=""):
+                    with patch("src.open_canvas.run_context.RunContext.context_document_messages", return_value=[]):
+                        with patch("src.open_canvas.run_context.RunContext.is_using_o1_mini_model", return_value=False):
                             with patch("src.open_canvas.nodes.generate_artifact.optionally_get_system_prompt_from_config", return_value=user_prompt):
                                 await generate_artifact(state, config, store=mock_store)
 
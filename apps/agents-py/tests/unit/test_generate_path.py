@@ -9,6 +9,7 @@ Tests cover:
 - URL extraction functionality
 - Routing decision logic (hardcoded paths)
 - Artifact content helpers
+- Concurrent prelude steps (documents, URLs, context documents)
 """
 
 import pytest
@@ -26,11 +27,11 @@ class TestGeneratePath:
 
         assert callable(generate_path)
 
-    def test_get_model_config_function_exists(self):
-        """get_model_config function should exist."""
-        from src.open_canvas.nodes.generate_path import get_model_config
+    def test_get_run_context_function_exists(self):
+        """get_run_context (run-scoped model config) should be available."""
+        from src.open_canvas.nodes.generate_path import get_run_context
 
-        assert callable(get_model_config)
+        assert callable(get_run_context)
 
     def test_get_model_from_config_function_exists(self):
         """get_model_from_config function should exist."""
@@ -714,3 +715,67 @@ class TestFindExistingDocMessage:
         result = _find_existing_doc_message([])
 
         assert result is None
+
+
+@pytest.mark.unit
+class TestConcurrentPrelude:
+    """Tests for the concurrent generate_path prelude."""
+
+    @pytest.mark.asyncio
+    async def test_document_and_url_steps_overlap(self, mock_store, mock_config, mock_llm_with_tool_response):
+        """Document conversion and URL handling should run concurrently."""
+        import asyncio
+        import time
+
+        from src.open_canvas.nodes.generate_path import generate_path
+
+        async def slow_convert(messages, config, store=None):
+            await asyncio.sleep(0.2)
+            return HumanMessage(content=[{"type": "text", "text": "doc"}])
+
+        async def slow_urls(message, urls, config):
+            await asyncio.sleep(0.2)
+            return HumanMessage(id=message.id, content="page contents")
+
+        mock_llm = mock_llm_with_tool_response("replyToGeneralInput")
+        state = {"_messages": [HumanMessage(id="m1", content="What does https://example.com say?")], "artifact": None}
+
+        with patch("src.open_canvas.nodes.generate_path.convert_context_document_to_human_message", slow_convert), \
+                patch("src.open_canvas.nodes.generate_path.include_url_contents", slow_urls), \
+                patch("src.open_canvas.nodes.generate_path.get_model_from_config", return_value=mock_llm):
+            started = time.perf_counter()
+            result = await generate_path(state, mock_config, store=mock_store)
+            elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.35
+        assert result["messages"][0].content[0]["text"] == "doc"
+        assert result["_messages"][0].content == "page contents"
+
+    @pytest.mark.asyncio
+    async def test_hardcoded_route_skips_url_handling(self, mock_store, mock_config):
+        """Hardcoded routes should not trigger URL handling."""
+        from src.open_canvas.nodes.generate_path import generate_path
+
+        url_handler = AsyncMock()
+        state = {
+            "_messages": [HumanMessage(content="See https://example.com")],
+            "customQuickActionId": "action-1",
+        }
+
+        with patch("src.open_canvas.nodes.generate_path.include_url_contents", url_handler):
+            result = await generate_path(state, mock_config, store=mock_store)
+
+        assert result == {"next": "customAction"}
+        url_handler.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_step_errors_keep_their_type(self, mock_store, mock_config):
+        """A failing prelude step should raise its own exception, not an ExceptionGroup."""
+        from src.open_canvas.nodes.generate_path import generate_path
+
+        failing_convert = AsyncMock(side_effect=ValueError("bad pdf"))
+        state = {"_messages": [HumanMessage(content="hello")]}
+
+        with patch("src.open_canvas.nodes.generate_path.convert_context_document_to_human_message", failing_convert):
+            with pytest.raises(ValueError, match="bad pdf"):
+                await generate_path(state, mock_config, store=mock_store)
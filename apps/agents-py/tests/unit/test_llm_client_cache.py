@@ -0,0 +1,73 @@
+"""
+Unit tests for the process-wide model client cache in src/llm/client_cache.py
+
+Tests cover:
+- LRU eviction and hit/miss counters
+- get_model_from_config instance reuse keyed by resolved parameters
+"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.mark.unit
+class TestModelClientCache:
+    """Tests for the ModelClientCache LRU."""
+
+    def test_reuses_instance_for_same_key(self):
+        """Same key should return the cached instance and count a hit."""
+        from src.llm.client_cache import ModelClientCache
+
+        cache = ModelClientCache(max_size=2)
+        first = cache.get_or_create(("openai", "gpt-4o"), object)
+        second = cache.get_or_create(("openai", "gpt-4o"), object)
+
+        assert first is second
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_evicts_least_recently_used(self):
+        """Exceeding max_size should evict the least recently used entry."""
+        from src.llm.client_cache import ModelClientCache
+
+        cache = ModelClientCache(max_size=2)
+        a = cache.get_or_create("a", object)
+        cache.get_or_create("b", object)
+        cache.get_or_create("a", object)  # a 变为最近使用
+        cache.get_or_create("c", object)  # 淘汰 b
+
+        assert cache.get_or_create("a", object) is a
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["size"] == 2
+
+    def test_zero_size_disables_caching(self):
+        """max_size=0 should always call the factory."""
+        from src.llm.client_cache import ModelClientCache
+
+        cache = ModelClientCache(max_size=0)
+        assert cache.get_or_create("a", object) is not cache.get_or_create("a", object)
+        assert cache.stats()["misses"] == 2
+
+
+@pytest.mark.unit
+class TestGetModelFromConfigCaching:
+    """Tests for get_model_from_config reusing model instances."""
+
+    @patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"})
+    def test_same_parameters_share_instance(self):
+        """Identical resolved parameters should share one client."""
+        from src.llm.client_cache import clear_model_client_cache
+        from src.utils import get_model_from_config
+
+        clear_model_client_cache()
+        config = {"configurable": {"customModelName": "gpt-4o"}}
+
+        first = get_model_from_config(config, temperature=0)
+        second = get_model_from_config(config, temperature=0)
+        other = get_model_from_config(config, temperature=0.5)
+
+        assert first is second
+        assert first is not other
@@ -0,0 +1,172 @@
+"""
+Unit tests for single-flight request coalescing in src/llm/coalesce.py
+
+Tests cover:
+- Concurrent identical calls sharing one upstream call
+- Cancellation isolation between waiters
+- Stream fan-out with replay
+- ManagedChatModel per-node policy and metrics
+- Coalescing being opt-in and scoped to the run's user/assistant/thread
+"""
+
+import asyncio
+import os
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+
+class SlowModel:
+    """Minimal async model that counts upstream calls."""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.calls = 0
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return AIMessage(content=f"reply {self.calls}")
+
+    async def astream(self, input, config=None, **kwargs):
+        self.calls += 1
+        for token in ("a", "b", "c"):
+            await asyncio.sleep(self.delay / 3)
+            yield token
+
+
+@pytest.mark.unit
+class TestSingleFlight:
+    """Tests for the SingleFlight primitive."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_result(self):
+        """Identical keys in flight should run the factory once."""
+        from src.llm.coalesce import SingleFlight
+
+        flight = SingleFlight()
+        model = SlowModel()
+
+        results = await asyncio.gather(
+            *(flight.do("k", lambda: model.ainvoke("x"), node="n") for _ in range(3))
+        )
+
+        assert model.calls == 1
+        assert results[0] is results[1] is results[2]
+        assert flight.stats()["nodes"]["n"] == {"requests": 3, "coalesced": 2}
+        assert flight.stats()["inFlight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_others(self):
+        """Cancelling the leader caller should not affect joined callers."""
+        from src.llm.coalesce import SingleFlight
+
+        flight = SingleFlight()
+        model = SlowModel(delay=0.05)
+
+        leader = asyncio.create_task(flight.do("k", lambda: model.ainvoke("x")))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("k", lambda: model.ainvoke("x")))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        result = await follower
+        assert result.content == "reply 1"
+        assert leader.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_stream_fan_out_replays_chunks(self):
+        """A late subscriber should receive every chunk of the shared stream."""
+        from src.llm.coalesce import SingleFlight
+
+        flight = SingleFlight()
+        model = SlowModel(delay=0.03)
+
+        async def collect():
+            return [chunk async for chunk in flight.stream("k", lambda: model.astream("x"))]
+
+        first = asyncio.create_task(collect())
+        await asyncio.sleep(0.015)
+        second = asyncio.create_task(collect())
+
+        assert await first == ["a", "b", "c"]
+        assert await second == ["a", "b", "c"]
+        assert model.calls == 1
+
+
+@pytest.mark.unit
+class TestManagedChatModelCoalescing:
+    """Tests for coalescing through ManagedChatModel."""
+
+    @pytest.mark.asyncio
+    @patch.dict(os.environ, {"LLM_COALESCE": "true"})
+    async def test_identical_invocations_coalesce(self):
+        """Same messages through the same model should share one call."""
+        from src.llm.coalesce import get_single_flight
+        from src.llm.managed_model import ManagedChatModel
+
+        get_single_flight().reset_stats()
+        inner = SlowModel()
+        model = ManagedChatModel(inner, provider="openai")
+        messages = [HumanMessage(content="Rewrite it", id="1")]
+
+        await asyncio.gather(model.ainvoke(messages), model.ainvoke(messages))
+        await model.ainvoke([HumanMessage(content="Something else")])
+
+        assert inner.calls == 2
+        assert get_single_flight().stats()["coalesced"] == 1
+
+    @pytest.mark.asyncio
+    async def test_configurable_disables_coalescing(self):
+        """configurable.coalesceRequests=False should bypass single-flight."""
+        from src.llm.managed_model import ManagedChatModel
+
+        inner = SlowModel()
+        model = ManagedChatModel(inner, provider="openai")
+        config = {"configurable": {"coalesceRequests": False}}
+
+        await asyncio.gather(model.ainvoke("x", config), model.ainvoke("x", config))
+
+        assert inner.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self):
+        """Without LLM_COALESCE identical concurrent calls each reach the model."""
+        from src.llm.managed_model import ManagedChatModel
+
+        inner = SlowModel()
+        model = ManagedChatModel(inner, provider="openai")
+
+        with patch.dict(os.environ):
+            os.environ.pop("LLM_COALESCE", None)
+            await asyncio.gather(model.ainvoke("x"), model.ainvoke("x"))
+
+        assert inner.calls == 2
+
+    @pytest.mark.asyncio
+    @patch.dict(os.environ, {"LLM_COALESCE": "true"})
+    async def test_different_threads_not_coalesced(self):
+        """Identical requests from different threads or assistants never share a result."""
+        from src.llm.managed_model import ManagedChatModel
+
+        inner = SlowModel()
+        model = ManagedChatModel(inner, provider="openai")
+        configs = [
+            {"configurable": {"assistant_id": "a", "thread_id": "t1"}},
+            {"configurable": {"assistant_id": "a", "thread_id": "t2"}},
+            {"configurable": {"assistant_id": "b", "thread_id": "t1"}},
+            {"configurable": {"assistant_id": "a", "thread_id": "t1"}},
+        ]
+
+        await asyncio.gather(*(model.ainvoke("x", config) for config in configs))
+
+        assert inner.calls == 3
+
+    @patch.dict(os.environ, {"LLM_COALESCE": "true", "LLM_COALESCE_NODES": "generatePath"})
+    def test_node_allowlist(self):
+        """LLM_COALESCE_NODES should restrict coalescing to listed nodes."""
+        from src.llm.coalesce import is_coalescing_enabled
+
+        assert is_coalescing_enabled("generatePath") is True
+        assert is_coalescing_enabled("rewriteArtifact") is False
@@ -0,0 +1,139 @@
+"""
+Unit tests for the fake streaming provider in src/llm/fake.py
+
+Tests cover:
+- Echo and canned streaming with configured timing
+- Schema-valid tool calls for every tool schema bound in the graphs
+- Structured output
+- fake/ model name resolution through get_model_from_config
+"""
+
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+
+def _fast_model(model_name: str = "canned", **kwargs):
+    from src.llm.fake import FakeStreamingChatModel
+
+    defaults = dict(tokens_per_second=0, first_token_latency=0, jitter=0)
+    defaults.update(kwargs)
+    return FakeStreamingChatModel(model_name=model_name, **defaults)
+
+
+@pytest.mark.unit
+class TestFakeStreaming:
+    """Tests for token streaming."""
+
+    @pytest.mark.asyncio
+    async def test_echo_streams_last_user_message(self):
+        """Echo mode should stream back the last human message token by token."""
+        model = _fast_model("echo")
+
+        chunks = [c async for c in model.astream([HumanMessage(content="hello fake world")])]
+
+        assert [c.content for c in chunks if c.content] == ["hello ", "fake ", "world"]
+        usage = [c.usage_metadata for c in chunks if c.usage_metadata]
+        assert usage[-1]["output_tokens"] == 3
+
+    @pytest.mark.asyncio
+    async def test_timing_follows_configuration(self):
+        """First token latency and token rate should shape total duration."""
+        model = _fast_model(
+            "canned", canned_text="a b c d e", tokens_per_second=100, first_token_latency=0.05
+        )
+
+        start = time.perf_counter()
+        result = await model.ainvoke("hi")
+        elapsed = time.perf_counter() - start
+
+        assert result.content == "a b c d e"
+        assert elapsed >= 0.05 + 4 * 0.01 - 0.005
+
+
+@pytest.mark.unit
+class TestFakeToolCalls:
+    """Tests for schema-driven tool calls."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "module_path, schema_name",
+        [
+            ("src.open_canvas.nodes.generate_artifact", "GenerateArtifactTool"),
+            ("src.open_canvas.nodes.rewrite_artifact", "UpdateArtifactMetaTool"),
+            ("src.open_canvas.nodes.generate_path", "ShouldIncludeUrlContents"),
+            ("src.reflection.graph", "GenerateReflections"),
+            ("src.thread_title.graph", "GenerateTitle"),
+        ],
+    )
+    async def test_tool_args_validate_against_schema(self, module_path, schema_name):
+        """Generated tool arguments should validate against each bound schema."""
+        import importlib
+
+        schema = getattr(importlib.import_module(module_path), schema_name)
+        model = _fast_model().bind_tools([schema], tool_choice=schema_name)
+
+        response = await model.ainvoke("Write a poem")
+
+        assert response.tool_calls[0]["name"] == schema_name
+        schema.model_validate(response.tool_calls[0]["args"])
+
+    @pytest.mark.asyncio
+    async def test_route_enum_and_overrides(self):
+        """Enum fields pick the first option unless overridden per tool."""
+        from typing import Literal
+
+        from pydantic import BaseModel
+
+        class RouteQuerySchema(BaseModel):
+            route: Literal["generateArtifact", "replyToGeneralInput"]
+
+        model = _fast_model()
+        response = await model.bind_tools([RouteQuerySchema], tool_choice="RouteQuerySchema").ainvoke("hi")
+        assert response.tool_calls[0]["args"] == {"route": "generateArtifact"}
+
+        overridden = _fast_model(tool_args={"RouteQuerySchema": {"route": "replyToGeneralInput"}})
+        response = await overridden.bind_tools([RouteQuerySchema], tool_choice="any").ainvoke("hi")
+        assert response.tool_calls[0]["args"] == {"route": "replyToGeneralInput"}
+
+    @pytest.mark.asyncio
+    async def test_structured_output(self):
+        """with_structured_output should parse the generated tool call."""
+        from src.web_search.nodes.classify_message import ClassifyMessage
+
+        result = await _fast_model().with_structured_output(ClassifyMessage).ainvoke("hi")
+
+        assert isinstance(result, ClassifyMessage)
+
+
+@pytest.mark.unit
+class TestFakeProviderWiring:
+    """Tests for the fake/ model name prefix."""
+
+    def test_get_model_config(self):
+        """fake/ prefix should resolve to the fake provider."""
+        from src.utils import get_model_config
+
+        cfg = get_model_config({"configurable": {"customModelName": "fake/echo"}})
+
+        assert cfg["modelProvider"] == "fake"
+        assert cfg["modelName"] == "echo"
+
+    @pytest.mark.asyncio
+    @patch.dict(os.environ, {"FAKE_LLM_FIRST_TOKEN_MS": "0", "FAKE_LLM_TOKENS_PER_SECOND": "0"})
+    async def test_get_model_from_config(self):
+        """The managed model pipeline should wrap the fake model."""
+        from src.llm.client_cache import clear_model_client_cache
+        from src.llm.fake import FakeStreamingChatModel
+        from src.utils import get_model_from_config
+
+        clear_model_client_cache()
+        model = get_model_from_config({"configurable": {"customModelName": "fake/echo"}})
+
+        assert isinstance(model.wrapped, FakeStreamingChatModel)
+        assert model.provider == "fake"
+        result = await model.ainvoke([HumanMessage(content="ping")])
+        assert result.content == "ping"
@@ -0,0 +1,239 @@
+"""
+Unit tests for hedged requests in src/llm/hedging.py
+
+Tests cover:
+- Percentile-based hedge delay
+- Hedge firing, winner selection and loser cancellation
+- Only the winner's callback events reaching the run's handlers
+- Latency samples only from the primary's real first token
+- Empty streams
+- Equivalent model resolution and get_model_from_config wiring
+"""
+
+import asyncio
+import os
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+
+class StreamingModel:
+    """Model that streams chunks after an initial delay."""
+
+    def __init__(self, name: str, first_token_delay: float):
+        self.name = name
+        self.first_token_delay = first_token_delay
+        self.started = 0
+        self.cancelled = False
+
+    async def astream(self, input, config=None, **kwargs):
+        self.started += 1
+        try:
+            await asyncio.sleep(self.first_token_delay)
+            yield AIMessageChunk(content=f"{self.name}-")
+            yield AIMessageChunk(content="done")
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        return AIMessage(content=f"{self.name}-plain")
+
+
+FAST_POLICY = {"default_delay_seconds": 0.02, "min_delay_seconds": 0.0}
+
+
+@pytest.mark.unit
+class TestHedgedAinvoke:
+    """Tests for the hedged call."""
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_does_not_fire_hedge(self):
+        """A primary that answers before the threshold should not hedge."""
+        from src.llm.hedging import HedgePolicy, get_hedge_stats, hedged_ainvoke, reset_hedge_stats
+
+        reset_hedge_stats()
+        primary = StreamingModel("primary", 0)
+        secondary = StreamingModel("secondary", 0)
+
+        result = await hedged_ainvoke(
+            primary, secondary, "hi", None, {},
+            node="replyToGeneralInput", latency_key="openai:gpt-4o",
+            policy=HedgePolicy(enabled=True, **FAST_POLICY),
+        )
+
+        assert isinstance(result, AIMessage)
+        assert result.content == "primary-done"
+        assert secondary.started == 0
+        assert get_hedge_stats()["replyToGeneralInput"]["fireRate"] == 0.0
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_fires_hedge_and_is_cancelled(self):
+        """The hedge should win and the slow primary should be cancelled."""
+        from src.llm.hedging import HedgePolicy, get_hedge_stats, hedged_ainvoke, reset_hedge_stats
+
+        reset_hedge_stats()
+        primary = StreamingModel("primary", 1.0)
+        secondary = StreamingModel("secondary", 0)
+
+        result = await hedged_ainvoke(
+            primary, secondary, "hi", None, {},
+            node="rewriteArtifact", latency_key="openai:gpt-4o",
+            policy=HedgePolicy(enabled=True, **FAST_POLICY),
+        )
+
+        assert result.content == "secondary-done"
+        assert primary.cancelled
+        stats = get_hedge_stats()["rewriteArtifact"]
+        assert stats["fireRate"] == 1.0
+        assert stats["hedgeWinRate"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_latency_sampled_only_from_primary_first_token(self):
+        """A hedged-away primary records no sample; a primary that answers records its latency."""
+        from src.llm.hedging import HedgePolicy, _latency_tracker, hedged_ainvoke, reset_hedge_stats
+
+        reset_hedge_stats()
+        policy = HedgePolicy(enabled=True, **FAST_POLICY)
+
+        await hedged_ainvoke(
+            StreamingModel("primary", 1.0), StreamingModel("secondary", 0), "hi", None, {},
+            node="rewriteArtifact", latency_key="openai:gpt-4o", policy=policy,
+        )
+        assert _latency_tracker.percentile("openai:gpt-4o", 50) is None
+
+        await hedged_ainvoke(
+            StreamingModel("primary", 0.05), StreamingModel("secondary", 1.0), "hi", None, {},
+            node="rewriteArtifact", latency_key="openai:gpt-4o", policy=policy,
+        )
+        assert _latency_tracker.percentile("openai:gpt-4o", 50) == pytest.approx(0.05, abs=0.04)
+
+    @staticmethod
+    def _collector():
+        from langchain_core.callbacks import BaseCallbackHandler
+
+        class Collector(BaseCallbackHandler):
+            def __init__(self):
+                self.tokens = []
+                self.starts = []
+
+            def on_chat_model_start(self, serialized, messages, *, metadata=None, **kwargs):
+                self.starts.append((metadata or {}).get("langgraph_node"))
+
+            def on_llm_new_token(self, token, **kwargs):
+                self.tokens.append(token)
+
+        return Collector()
+
+    @staticmethod
+    def _fake(text: str, first_token_latency: float):
+        from src.llm.fake import FakeStreamingChatModel
+
+        return FakeStreamingChatModel(
+            model_name="fake", canned_text=text, tokens_per_second=0,
+            first_token_latency=first_token_latency, jitter=0,
+        )
+
+    @pytest.mark.asyncio
+    async def test_winning_hedge_replayed_to_callbacks(self):
+        """A winning hedge's events are replayed to the run's handlers with its metadata."""
+        from src.llm.hedging import HedgePolicy, hedged_ainvoke, reset_hedge_stats
+
+        reset_hedge_stats()
+        collector = self._collector()
+        config = {"callbacks": [collector], "metadata": {"langgraph_node": "rewriteArtifact"}}
+
+        result = await hedged_ainvoke(
+            self._fake("PRIMARY", 1.0), self._fake("HEDGE", 0), "hi", config, {},
+            node="rewriteArtifact", latency_key="openai:gpt-4o",
+            policy=HedgePolicy(enabled=True, **FAST_POLICY),
+        )
+
+        assert result.content == "HEDGE"
+        assert "".join(collector.tokens) == "HEDGE"
+        assert collector.starts == ["rewriteArtifact", "rewriteArtifact"]
+
+    @pytest.mark.asyncio
+    async def test_losing_hedge_never_reaches_callbacks(self):
+        """A hedge that loses to the primary emits nothing to the run's handlers."""
+        from src.llm.hedging import HedgePolicy, get_hedge_stats, hedged_ainvoke, reset_hedge_stats
+
+        reset_hedge_stats()
+        collector = self._collector()
+
+        result = await hedged_ainvoke(
+            self._fake("PRIMARY", 0.1), self._fake("HEDGE", 1.0), "hi", {"callbacks": [collector]}, {},
+            node="rewriteArtifact", latency_key="openai:gpt-4o",
+            policy=HedgePolicy(enabled=True, **FAST_POLICY),
+        )
+
+        assert result.content == "PRIMARY"
+        assert "".join(collector.tokens) == "PRIMARY"
+        assert len(collector.starts) == 1
+        assert get_hedge_stats()["rewriteArtifact"]["fired"] == 1
+
+    @pytest.mark.asyncio
+    async def test_empty_stream_returns_empty_message(self):
+        """A winner whose stream ends without chunks yields an empty message, not StopAsyncIteration."""
+        from src.llm.hedging import HedgePolicy, _latency_tracker, hedged_ainvoke, reset_hedge_stats
+
+        class EmptyModel:
+            async def astream(self, input, config=None, **kwargs):
+                return
+                yield
+
+        reset_hedge_stats()
+        result = await hedged_ainvoke(
+            EmptyModel(), StreamingModel("secondary", 1.0), "hi", None, {},
+            node="rewriteArtifact", latency_key="openai:gpt-4o",
+            policy=HedgePolicy(enabled=True, **FAST_POLICY),
+        )
+
+        assert result == AIMessage(content="")
+        assert _latency_tracker.percentile("openai:gpt-4o", 50) is None
+
+    def test_delay_uses_latency_percentile(self):
+        """With enough samples the delay should follow the configured percentile."""
+        from src.llm.hedging import HedgePolicy, _latency_tracker, hedge_delay, reset_hedge_stats
+
+        reset_hedge_stats()
+        policy = HedgePolicy(enabled=True, percentile=90, min_samples=10, min_delay_seconds=0)
+        assert hedge_delay("k", policy) == policy.default_delay_seconds
+
+        for i in range(1, 11):
+            _latency_tracker.record("k", i / 10)
+
+        assert hedge_delay("k", policy) == pytest.approx(0.9)
+
+
+@pytest.mark.unit
+class TestHedgeWiring:
+    """Tests for equivalent model resolution and model layer wiring."""
+
+    @patch.dict(os.environ, {"_AZURE_OPENAI_API_KEY": "k", "OPENAI_API_KEY": "k"})
+    def test_openai_and_azure_are_equivalent(self):
+        """OpenAI and Azure deployments of the same model hedge to each other."""
+        from src.llm.hedging import resolve_hedge_model_name
+
+        assert resolve_hedge_model_name({"modelProvider": "openai", "modelName": "gpt-4o"}) == "azure/gpt-4o"
+        assert resolve_hedge_model_name({"modelProvider": "azure_openai", "modelName": "gpt-4o"}) == "gpt-4o"
+        assert resolve_hedge_model_name({"modelProvider": "anthropic", "modelName": "claude-3-5-haiku"}) is None
+
+    @patch.dict(
+        os.environ,
+        {"LLM_HEDGING": "true", "OPENAI_API_KEY": "k", "_AZURE_OPENAI_API_KEY": "k",
+         "_AZURE_OPENAI_API_INSTANCE_NAME": "inst"},
+    )
+    def test_get_model_from_config_attaches_hedge(self):
+        """Enabled hedging should attach the equivalent model, including bound tools."""
+        from src.llm.client_cache import clear_model_client_cache
+        from src.utils import get_model_from_config
+
+        clear_model_client_cache()
+        model = get_model_from_config({"configurable": {"customModelName": "gpt-4o"}}, temperature=0)
+
+        assert model.hedge is not None
+        assert model.hedge.provider == "azure_openai"
+        assert model.hedge.hedge is None
+        assert model.bind(stop=["x"]).hedge is not None
@@ -0,0 +1,209 @@
+"""
+Unit tests for the per-provider limiter in src/llm/limiter.py
+
+Tests cover:
+- AIMD window growth and shrink
+- Retries honouring rate-limit headers
+- Circuit breaker fail-fast and half-open recovery
+- Half-open probes that never run releasing the probe slot
+- Queueing under the concurrency window
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+
+class FakeStatusError(Exception):
+    """Mimics SDK status errors carrying an httpx response."""
+
+    def __init__(self, status_code: int, headers: dict | None = None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = httpx.Response(status_code, headers=headers or {})
+
+
+def _settings(**overrides):
+    from src.llm.limiter import LimiterSettings
+
+    defaults = dict(
+        initial_window=4,
+        min_window=1,
+        max_window=8,
+        base_backoff_seconds=0,
+        max_backoff_seconds=0,
+        failure_threshold=2,
+        cooldown_seconds=60,
+    )
+    defaults.update(overrides)
+    return LimiterSettings(**defaults)
+
+
+@pytest.mark.unit
+class TestProviderLimiter:
+    """Tests for ProviderLimiter."""
+
+    @pytest.mark.asyncio
+    async def test_aimd_window(self):
+        """Success grows the window additively; 429 halves it."""
+        from src.llm.limiter import ProviderLimiter
+
+        limiter = ProviderLimiter("openai", _settings(max_retries=0))
+
+        async def ok():
+            return "ok"
+
+        async def throttled():
+            raise FakeStatusError(429)
+
+        await limiter.run(ok)
+        assert limiter.stats()["window"] == pytest.approx(4.25)
+
+        with pytest.raises(FakeStatusError):
+            await limiter.run(throttled)
+        stats = limiter.stats()
+        assert stats["window"] == pytest.approx(2.12, abs=0.01)
+        assert stats["throttled"] == 1
+        assert stats["inFlight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_retry_honours_retry_after_header(self):
+        """Overload errors are retried using the Retry-After hint."""
+        from src.llm.limiter import ProviderLimiter, retry_after_seconds
+
+        limiter = ProviderLimiter("anthropic", _settings(max_retries=2, max_backoff_seconds=5))
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise FakeStatusError(429, {"retry-after": "1.5"})
+            return "ok"
+
+        assert retry_after_seconds(FakeStatusError(429, {"retry-after-ms": "200"})) == 0.2
+        assert retry_after_seconds(FakeStatusError(429, {"x-ratelimit-reset-requests": "1m30s"})) == 90
+
+        with patch("src.llm.limiter.asyncio.sleep") as sleep:
+            sleep.return_value = None
+            assert await limiter.run(flaky) == "ok"
+
+        assert sleep.call_args.args[0] >= 1.5
+        assert limiter.stats()["retries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_non_overload_errors_are_not_retried(self):
+        """4xx errors other than 429 should propagate immediately."""
+        from src.llm.limiter import ProviderLimiter
+
+        limiter = ProviderLimiter("openai", _settings())
+        calls = []
+
+        async def bad_request():
+            calls.append(1)
+            raise FakeStatusError(400)
+
+        with pytest.raises(FakeStatusError):
+            await limiter.run(bad_request)
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_circuit_opens_and_recovers(self):
+        """Consecutive overloads open the circuit; a successful probe closes it."""
+        from src.llm.limiter import CircuitOpenError, ProviderLimiter
+
+        limiter = ProviderLimiter("google-genai", _settings(max_retries=0))
+
+        async def down():
+            raise FakeStatusError(503)
+
+        async def ok():
+            return "ok"
+
+        for _ in range(2):
+            with pytest.raises(FakeStatusError):
+                await limiter.run(down)
+
+        with pytest.raises(CircuitOpenError):
+            await limiter.run(ok)
+        assert limiter.stats()["circuitState"] == "open"
+        assert limiter.stats()["rejections"] == 1
+
+        limiter._opened_at -= 61
+        assert limiter.stats()["circuitState"] == "half_open"
+        assert await limiter.run(ok) == "ok"
+        assert limiter.stats()["circuitState"] == "closed"
+
+    @pytest.mark.asyncio
+    async def test_probe_released_when_probe_never_runs(self):
+        """A half-open probe that is cancelled in the queue or rejected frees the probe slot."""
+        import time
+
+        from src.llm.limiter import LimiterRejectedError, ProviderLimiter
+
+        async def ok():
+            return "ok"
+
+        limiter = ProviderLimiter("openai", _settings(initial_window=1, max_window=1))
+        limiter._opened_at = time.monotonic() - 61
+        limiter._in_flight = 1
+
+        probe = asyncio.create_task(limiter.run(ok))
+        await asyncio.sleep(0.01)
+        assert limiter.stats()["queueDepth"] == 1
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        limiter._in_flight = 0
+        assert await limiter.run(ok) == "ok"
+        assert limiter.stats()["circuitState"] == "closed"
+
+        full = ProviderLimiter("openai", _settings(initial_window=1, max_window=1, max_queue=0))
+        full._opened_at = time.monotonic() - 61
+        full._in_flight = 1
+        with pytest.raises(LimiterRejectedError):
+            await full.run(ok)
+
+        full._in_flight = 0
+        assert await full.run(ok) == "ok"
+        assert full.stats()["circuitState"] == "closed"
+
+    @pytest.mark.asyncio
+    async def test_requests_queue_beyond_window(self):
+        """Requests beyond the window wait in the queue until a slot frees."""
+        from src.llm.limiter import ProviderLimiter
+
+        limiter = ProviderLimiter("fireworks", _settings(initial_window=1, max_window=1))
+        gate = asyncio.Event()
+        peak = []
+
+        async def held():
+            peak.append(limiter.stats()["inFlight"])
+            await gate.wait()
+            return "ok"
+
+        tasks = [asyncio.create_task(limiter.run(held)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert limiter.stats()["queueDepth"] == 2
+
+        gate.set()
+        assert await asyncio.gather(*tasks) == ["ok", "ok", "ok"]
+        assert max(peak) == 1
+        assert limiter.stats()["queueDepth"] == 0
+
+
+@pytest.mark.unit
+class TestProviderRetryKwargs:
+    """Tests for disabling SDK-level retries."""
+
+    def test_sdk_retries_disabled_when_limiter_enabled(self):
+        """SDK max_retries should be zeroed for providers that support it."""
+        from src.llm.limiter import get_provider_retry_kwargs
+
+        with patch.dict("os.environ", {"LLM_LIMITER": "true"}):
+            assert get_provider_retry_kwargs("openai") == {"max_retries": 0}
+            assert get_provider_retry_kwargs("ollama") == {}
+        with patch.dict("os.environ", {"LLM_LIMITER": "false"}):
+            assert get_provider_retry_kwargs("openai") == {}
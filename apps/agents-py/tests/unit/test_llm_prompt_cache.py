@@ -0,0 +1,174 @@
+"""
+Unit tests for provider prompt caching in src/llm/prompt_cache.py
+
+Tests cover:
+- Opt-in flag resolution
+- Cache-friendly message layout and Anthropic cache_control breakpoints
+- OpenAI prompt_cache_key invoke kwargs
+- Cache-read token accounting
+"""
+
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+
+DOC_MESSAGES = [
+    {"role": "user", "content": [{"type": "text", "text": "doc one"}, {"type": "text", "text": "doc two"}]}
+]
+
+
+@pytest.mark.unit
+class TestPromptCachingFlag:
+    """Tests for enabling prompt caching."""
+
+    @patch.dict(os.environ, {"LLM_PROMPT_CACHING": "true"})
+    def test_configurable_overrides_env(self):
+        """configurable.promptCaching should take precedence over the env var."""
+        from src.llm.prompt_cache import is_prompt_caching_enabled
+
+        assert is_prompt_caching_enabled({"configurable": {}}) is True
+        assert is_prompt_caching_enabled({"configurable": {"promptCaching": False}}) is False
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_disabled_by_default(self):
+        """Prompt caching is opt-in."""
+        from src.llm.prompt_cache import get_prompt_cache_invoke_kwargs, is_prompt_caching_enabled
+
+        config = {"configurable": {"customModelName": "gpt-4o"}}
+        assert is_prompt_caching_enabled(config) is False
+        assert get_prompt_cache_invoke_kwargs(config) == {}
+
+
+@pytest.mark.unit
+class TestBuildPromptCacheMessages:
+    """Tests for the cache-friendly message layout."""
+
+    def test_anthropic_layout_and_breakpoints(self):
+        """Stable system prefix and documents should carry cache_control breakpoints."""
+        from src.llm.prompt_cache import build_prompt_cache_messages
+
+        config = {"configurable": {"customModelName": "claude-3-5-sonnet-latest"}}
+        conversation = [HumanMessage(content="hi")]
+        messages = build_prompt_cache_messages(
+            config,
+            stable_segments=["user prompt", "", "instructions"],
+            context_document_messages=DOC_MESSAGES,
+            volatile="<artifact>x</artifact>",
+            conversation=conversation,
+        )
+
+        system, docs, volatile, last = messages
+        assert isinstance(system, SystemMessage)
+        assert [b["text"] for b in system.content] == ["user prompt", "instructions"]
+        assert system.content[-1]["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in system.content[0]
+        assert docs["content"][-1]["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in DOC_MESSAGES[0]["content"][-1]
+        assert isinstance(volatile, HumanMessage)
+        assert last is conversation[0]
+
+    def test_openai_volatile_segment_is_system(self):
+        """OpenAI keeps the artifact as a system message after the documents."""
+        from src.llm.prompt_cache import build_prompt_cache_messages
+
+        config = {"configurable": {"customModelName": "gpt-4o"}}
+        messages = build_prompt_cache_messages(
+            config,
+            stable_segments=["user prompt", "instructions"],
+            context_document_messages=DOC_MESSAGES,
+            volatile="<artifact>x</artifact>",
+            conversation=[],
+        )
+
+        assert messages[0].content == "user prompt\ninstructions"
+        assert messages[1] is DOC_MESSAGES[0]
+        assert isinstance(messages[2], SystemMessage)
+        assert messages[2].content == "<artifact>x</artifact>"
+
+    @patch.dict(os.environ, {"LLM_PROMPT_CACHING": "true"})
+    def test_openai_prompt_cache_key_per_thread(self):
+        """OpenAI calls should receive a thread-scoped prompt_cache_key."""
+        from src.llm.prompt_cache import get_prompt_cache_invoke_kwargs
+
+        config = {"configurable": {"customModelName": "gpt-4o", "assistant_id": "a", "thread_id": "t"}}
+        anthropic = {"configurable": {"customModelName": "claude-3-5-sonnet-latest"}}
+
+        assert get_prompt_cache_invoke_kwargs(config) == {"prompt_cache_key": "open-canvas:a:t"}
+        assert get_prompt_cache_invoke_kwargs(anthropic) == {}
+
+
+@pytest.mark.unit
+class TestPromptCacheStats:
+    """Tests for cache-read token accounting."""
+
+    def test_records_cache_read_tokens(self):
+        """usage_metadata input_token_details should be accumulated per node."""
+        from src.llm.prompt_cache import (
+            get_prompt_cache_stats,
+            record_prompt_cache_usage,
+            reset_prompt_cache_stats,
+        )
+
+        reset_prompt_cache_stats()
+        response = AIMessage(
+            content="ok",
+            usage_metadata={
+                "input_tokens": 1000,
+                "output_tokens": 10,
+                "total_tokens": 1010,
+                "input_token_details": {"cache_read": 800, "cache_creation": 0},
+            },
+        )
+
+        entry = record_prompt_cache_usage("replyToGeneralInput", response)
+        record_prompt_cache_usage("replyToGeneralInput", AIMessage(content="no usage"))
+
+        assert entry["cacheReadTokens"] == 800
+        stats = get_prompt_cache_stats()["replyToGeneralInput"]
+        assert stats["calls"] == 1
+        assert stats["cacheHitRate"] == pytest.approx(0.8)
+
+
+@pytest.mark.unit
+class TestReplyToGeneralInputPromptCaching:
+    """Tests for the reply node in prompt caching mode."""
+
+    @pytest.mark.asyncio
+    async def test_artifact_moves_after_documents(self, mock_store):
+        """The artifact should no longer be part of the cached system prefix."""
+        from src.open_canvas.nodes.reply_to_general_input import reply_to_general_input
+
+        mock_llm = MagicMock()
+        mock_llm.ainvoke = AsyncMock(return_value=AIMessage(content="answer"))
+        state = {
+            "_messages": [HumanMessage(content="What does it do?")],
+            "artifact": {
+                "currentIndex": 1,
+                "contents": [{"index": 1, "type": "text", "title": "T", "fullMarkdown": "ARTIFACT BODY"}],
+            },
+        }
+        config = {
+            "configurable": {
+                "assistant_id": "a",
+                "thread_id": "t",
+                "customModelName": "gpt-4o",
+                "promptCaching": True,
+            }
+        }
+
+        with patch(
+            "src.open_canvas.nodes.reply_to_general_input.get_model_from_config",
+            return_value=mock_llm,
+        ), patch(
+            "src.open_canvas.run_context.RunContext.context_document_messages",
+            AsyncMock(return_value=[]),
+        ):
+            await reply_to_general_input(state, config, store=mock_store)
+
+        messages = mock_llm.ainvoke.call_args.args[0]
+        assert "ARTIFACT BODY" not in messages[0].content
+        assert "ARTIFACT BODY" in messages[1].content
+        assert mock_llm.ainvoke.call_args.kwargs["prompt_cache_key"] == "open-canvas:a:t"
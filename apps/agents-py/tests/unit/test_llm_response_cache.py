@@ -0,0 +1,121 @@
+"""
+Unit tests for the deterministic response cache in src/llm/response_cache.py
+
+Tests cover:
+- Prompt normalization and LRU/TTL behaviour
+- SQLite persistence
+- Integration with LangChain chat models
+- get_model_from_config attaching the cache only at temperature 0
+"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration
+
+
+def _generations(text: str) -> list[ChatGeneration]:
+    return [ChatGeneration(message=AIMessage(content=text))]
+
+
+@pytest.mark.unit
+class TestResponseCache:
+    """Tests for the in-memory LRU + TTL layer."""
+
+    def test_normalized_prompt_ignores_message_ids(self):
+        """Prompts differing only in volatile fields should share a key."""
+        from langchain_core.load import dumps
+
+        from src.llm.response_cache import make_cache_key
+
+        first = dumps([AIMessage(content="hi", id="1", response_metadata={"a": 1})])
+        second = dumps([AIMessage(content="hi", id="2")])
+        third = dumps([AIMessage(content="hello")])
+
+        assert make_cache_key(first, "llm") == make_cache_key(second, "llm")
+        assert make_cache_key(first, "llm") != make_cache_key(third, "llm")
+        assert make_cache_key(first, "llm") != make_cache_key(first, "other-llm")
+
+    def test_lru_eviction_and_stats(self):
+        """Exceeding max_size evicts the least recently used response."""
+        from src.llm.response_cache import ResponseCache
+
+        cache = ResponseCache(max_size=1, ttl_seconds=None)
+        cache.update("p1", "llm", _generations("a"))
+        cache.update("p2", "llm", _generations("b"))
+
+        assert cache.lookup("p1", "llm") is None
+        assert cache.lookup("p2", "llm")[0].message.content == "b"
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hitRate"] == pytest.approx(0.5)
+
+    def test_ttl_expiry(self):
+        """Entries older than the TTL should be treated as misses."""
+        from src.llm.response_cache import ResponseCache
+
+        cache = ResponseCache(max_size=4, ttl_seconds=10)
+        with patch("src.llm.response_cache.time.monotonic", return_value=100.0):
+            cache.update("p", "llm", _generations("a"))
+        with patch("src.llm.response_cache.time.monotonic", return_value=111.0):
+            assert cache.lookup("p", "llm") is None
+
+        assert cache.stats()["expirations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_sqlite_backend_persists(self, tmp_path):
+        """A new cache instance should read responses written by a previous one."""
+        from src.llm.response_cache import ResponseCache, SQLiteResponseStore
+
+        path = tmp_path / "responses.sqlite"
+        writer = ResponseCache(store=SQLiteResponseStore(path))
+        await writer.aupdate("p", "llm", _generations("persisted"))
+
+        reader = ResponseCache(store=SQLiteResponseStore(path))
+        value = await reader.alookup("p", "llm")
+
+        assert value[0].message.content == "persisted"
+        assert reader.stats()["diskHits"] == 1
+
+
+@pytest.mark.unit
+class TestResponseCacheWithChatModel:
+    """Tests for the cache attached to a LangChain chat model."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_call_skips_model(self):
+        """The second identical call should be served from the cache."""
+        from src.llm.response_cache import ResponseCache
+
+        cache = ResponseCache()
+        model = FakeListChatModel(responses=["first", "second"], cache=cache)
+
+        a = await model.ainvoke([HumanMessage(content="route me", id="x")])
+        b = await model.ainvoke([HumanMessage(content="route me", id="y")])
+
+        assert a.content == b.content == "first"
+        assert cache.stats()["hits"] == 1
+
+    @patch.dict(os.environ, {"OPENAI_API_KEY": "test-key", "LLM_RESPONSE_CACHE": "memory"})
+    def test_get_model_from_config_only_caches_temperature_zero(self):
+        """response_cache=True should only attach the cache for temperature 0."""
+        from src.llm.client_cache import clear_model_client_cache
+        from src.llm.response_cache import ResponseCache
+        from src.utils import get_model_from_config
+
+        clear_model_client_cache()
+        config = {"configurable": {"customModelName": "gpt-4o"}}
+
+        cached = get_model_from_config(config, temperature=0, response_cache=True)
+        plain = get_model_from_config(config, temperature=0)
+        warm = get_model_from_config(config, temperature=0.5, response_cache=True)
+
+        assert isinstance(cached.cache, ResponseCache)
+        assert plain is not cached
+        assert plain.cache is None
+        assert warm.cache is None
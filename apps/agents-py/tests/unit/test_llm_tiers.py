@@ -0,0 +1,93 @@
+"""
+Unit tests for the model tier policy in src/llm/tiers.py
+
+Tests cover:
+- Call site to tier resolution and overrides
+- Fast model resolution per provider, env and configurable
+- get_model_from_config model swap and tracing metadata
+"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+
+def _config(model_name: str, **configurable):
+    return {"configurable": {"customModelName": model_name, **configurable}}
+
+
+@pytest.mark.unit
+class TestTierResolution:
+    """Tests for call site and fast model resolution."""
+
+    @patch.dict(os.environ, {"LLM_MODEL_TIERS": "true", "LLM_MODEL_TIER_OVERRIDES": "reflection=quality"})
+    def test_call_site_tiers(self):
+        """Auxiliary call sites are fast; unknown ones and overrides are honoured."""
+        from src.llm.tiers import resolve_call_site_tier
+
+        assert resolve_call_site_tier("routeQuery") == "fast"
+        assert resolve_call_site_tier("generateArtifact") == "quality"
+        assert resolve_call_site_tier("reflection") == "quality"
+        assert resolve_call_site_tier("threadTitle", {"configurable": {"modelTiers": {"threadTitle": "quality"}}}) == "quality"
+        assert resolve_call_site_tier("routeQuery", {"configurable": {"modelTiering": False}}) == "quality"
+
+    @patch.dict(os.environ, {"LLM_FAST_MODELS": "openai=gpt-4.1-mini"})
+    def test_fast_model_resolution(self):
+        """Provider defaults, env mapping and explicit overrides resolve in order."""
+        from src.llm.tiers import resolve_fast_model_name
+
+        os.environ.pop("LLM_FAST_MODEL", None)
+        assert resolve_fast_model_name(_config("claude-sonnet-4-5"), "anthropic") == "claude-haiku-4-5"
+        assert resolve_fast_model_name(_config("gpt-5"), "openai") == "gpt-4.1-mini"
+        assert resolve_fast_model_name(_config("azure/gpt-4o"), "azure_openai") is None
+        assert resolve_fast_model_name(_config("gpt-5", fastModelName="ollama-llama3.3"), "openai") == "ollama-llama3.3"
+
+    def test_apply_model_tier_drops_model_config(self):
+        """Swapping to the fast model drops the selected model's modelConfig."""
+        from src.llm.tiers import apply_model_tier
+
+        config = _config("gemini-2.5-pro", modelConfig={"temperatureRange": {"current": 0.9}})
+        with patch.dict(os.environ, {"LLM_MODEL_TIERS": "true"}):
+            os.environ.pop("LLM_FAST_MODEL", None)
+            tier_config, tier = apply_model_tier(config, "classifyMessage", "google-genai")
+            same_config, quality = apply_model_tier(config, "generateArtifact", "google-genai")
+
+        assert tier == "fast"
+        assert tier_config["configurable"]["customModelName"] == "gemini-2.0-flash"
+        assert "modelConfig" not in tier_config["configurable"]
+        assert quality == "quality"
+        assert same_config is config
+
+
+@pytest.mark.unit
+class TestTierWiring:
+    """Tests for get_model_from_config with call_site."""
+
+    @pytest.mark.asyncio
+    @patch.dict(
+        os.environ,
+        {"LLM_MODEL_TIERS": "true", "LLM_FAST_MODEL": "fake/canned",
+         "FAKE_LLM_FIRST_TOKEN_MS": "0", "FAKE_LLM_TOKENS_PER_SECOND": "0"},
+    )
+    async def test_fast_tier_model_and_tracing_metadata(self):
+        """Fast call sites use the fast model and record the tier in run metadata."""
+        from langchain_core.tracers.context import collect_runs
+
+        from src.llm.client_cache import clear_model_client_cache
+        from src.utils import get_model_from_config
+
+        clear_model_client_cache()
+        config = _config("fake/echo")
+        fast = get_model_from_config(config, temperature=0, call_site="routeQuery")
+        quality = get_model_from_config(config, temperature=0)
+
+        assert fast.wrapped.model_name == "canned"
+        assert quality.wrapped.model_name == "echo"
+
+        with collect_runs() as cb:
+            await fast.bind(stop=["\n"]).ainvoke("hi")
+        run = cb.traced_runs[0]
+        assert run.extra["metadata"]["model_tier"] == "fast"
+        assert run.extra["metadata"]["model_call_site"] == "routeQuery"
+        assert "model_tier:fast" in run.tags
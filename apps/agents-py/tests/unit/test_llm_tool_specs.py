@@ -0,0 +1,97 @@
+"""
+Unit tests for precompiled tool specs in src/llm/tool_specs.py
+
+Tests cover:
+- Tool spec precompilation and reuse
+- Bound model caching per model instance and tool set
+- Route query schema variants in generate_path
+- Structured output through the managed model
+"""
+
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+@pytest.mark.unit
+class TestToolSpecs:
+    """Tests for precompiled tool specs."""
+
+    def test_precompiled_spec_is_reused(self):
+        """The same schema should map to the same compiled spec object."""
+        from src.llm.tool_specs import precompile_tool_spec
+        from src.thread_title.graph import GenerateTitle
+
+        spec = precompile_tool_spec(GenerateTitle)
+
+        assert spec["function"]["name"] == "GenerateTitle"
+        assert precompile_tool_spec(GenerateTitle) is spec
+
+    def test_route_query_schema_variants(self):
+        """Both route variants are created once with the artifact route first."""
+        from src.llm.tool_specs import precompile_tool_spec
+        from src.open_canvas.nodes.generate_path import ROUTE_QUERY_SCHEMAS
+
+        for artifact_route, schema in ROUTE_QUERY_SCHEMAS.items():
+            spec = precompile_tool_spec(schema)
+            assert spec["function"]["name"] == "RouteQuerySchema"
+            assert spec["function"]["parameters"]["properties"]["route"]["enum"] == [
+                artifact_route,
+                "replyToGeneralInput",
+            ]
+
+
+@pytest.mark.unit
+class TestBoundModelCache:
+    """Tests for bound runnable caching."""
+
+    def test_bind_tools_cached_per_model_and_tool(self):
+        """Repeated binds reuse the bound runnable; other models or tools miss."""
+        from src.llm.tool_specs import bind_tools_cached, clear_tool_binding_cache, precompile_tool_spec
+        from src.reflection.graph import GenerateReflections
+        from src.thread_title.graph import GenerateTitle
+
+        clear_tool_binding_cache()
+        model = MagicMock()
+        model.bind_tools.side_effect = lambda *a, **k: object()
+
+        first = bind_tools_cached(model, [GenerateTitle], tool_choice="GenerateTitle")
+        second = bind_tools_cached(model, [GenerateTitle], tool_choice="GenerateTitle")
+        other_tool = bind_tools_cached(model, [GenerateReflections], tool_choice="GenerateReflections")
+        other_model = bind_tools_cached(MagicMock(), [GenerateTitle], tool_choice="GenerateTitle")
+
+        assert first is second
+        assert other_tool is not first
+        assert other_model is not first
+        assert model.bind_tools.call_count == 2
+        assert model.bind_tools.call_args_list[0].args[0] == [precompile_tool_spec(GenerateTitle)]
+
+    @pytest.mark.asyncio
+    @patch.dict(
+        os.environ,
+        {"LLM_MODEL_TIERS": "true", "FAKE_LLM_FIRST_TOKEN_MS": "0", "FAKE_LLM_TOKENS_PER_SECOND": "0"},
+    )
+    async def test_managed_model_bindings_are_reused(self):
+        """get_model_from_config models, including tier wrappers, hit the binding cache."""
+        from src.llm.client_cache import clear_model_client_cache
+        from src.llm.tool_specs import (
+            clear_tool_binding_cache,
+            get_tool_binding_stats,
+            with_structured_output_cached,
+        )
+        from src.utils import get_model_from_config
+        from src.web_search.nodes.classify_message import ClassifyMessage
+
+        clear_model_client_cache()
+        clear_tool_binding_cache()
+        config = {"configurable": {"customModelName": "fake/canned"}}
+
+        for _ in range(3):
+            model = get_model_from_config(config, temperature=0, call_site="classifyMessage")
+            structured = with_structured_output_cached(model, ClassifyMessage, method="function_calling")
+
+        assert isinstance(await structured.ainvoke("hi"), ClassifyMessage)
+        stats = get_tool_binding_stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 2
@@ -0,0 +1,137 @@
+"""
+Unit tests for the shared pooled HTTP transport in src/llm/transport.py
+
+Tests cover:
+- One client per provider endpoint
+- Provider constructor injection
+- ChatAnthropic client injection against the pinned langchain-anthropic
+- Pool statistics
+"""
+
+import os
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+
+@pytest.mark.unit
+class TestHttpClientPool:
+    """Tests for the per-endpoint client pool."""
+
+    def test_one_client_per_endpoint(self):
+        """Same origin should share a client regardless of path."""
+        from src.llm.transport import HttpClientPool
+
+        pool = HttpClientPool()
+        first = pool.get_async_client("https://api.openai.com/v1")
+        second = pool.get_async_client("https://API.openai.com/v1/chat")
+        other = pool.get_async_client("https://api.anthropic.com")
+
+        assert first is second
+        assert first is not other
+
+    def test_settings_applied_to_client(self):
+        """Connection limits and HTTP/2 flag should come from settings."""
+        from src.llm.transport import HttpClientPool, HttpTransportSettings
+
+        settings = HttpTransportSettings(max_connections=7, http2=False)
+        pool = HttpClientPool(settings)
+        client = pool.get_async_client("https://api.groq.com")
+
+        assert isinstance(client, httpx.AsyncClient)
+        stats = pool.stats()["https://api.groq.com"]
+        assert stats["maxConnections"] == 7
+        assert stats["requests"] == 0
+
+    @pytest.mark.asyncio
+    async def test_stats_count_requests(self):
+        """Event hooks should count requests and response status classes."""
+        from src.llm.transport import HttpClientPool
+
+        pool = HttpClientPool()
+        client = pool.get_async_client("https://example.test")
+        client._transport = httpx.MockTransport(lambda request: httpx.Response(200))
+
+        await client.get("https://example.test/ping")
+
+        stats = pool.stats()["https://example.test"]
+        assert stats["requests"] == 1
+        assert stats["statusClasses"] == {"2xx": 1}
+        await pool.aclose()
+
+
+@pytest.mark.unit
+class TestProviderTransportKwargs:
+    """Tests for provider constructor injection."""
+
+    def test_openai_shares_async_client(self):
+        """OpenAI models should receive the same shared http_async_client."""
+        from src.llm.transport import get_provider_transport_kwargs
+
+        first = get_provider_transport_kwargs("openai", {})
+        second = get_provider_transport_kwargs("openai", {})
+
+        assert first["http_async_client"] is second["http_async_client"]
+
+    def test_ollama_receives_client_kwargs(self):
+        """Ollama should receive tuned httpx kwargs for its own client."""
+        from src.llm.transport import get_provider_transport_kwargs
+
+        kwargs = get_provider_transport_kwargs("ollama", {"baseUrl": "http://localhost:11434"})
+
+        assert "limits" in kwargs["client_kwargs"]
+        assert kwargs["client_kwargs"]["http2"] is False
+
+    @patch.dict(os.environ, {"LLM_SHARED_TRANSPORT": "false"})
+    def test_disabled_transport_injects_nothing(self):
+        """LLM_SHARED_TRANSPORT=false should leave SDK defaults untouched."""
+        from src.llm.transport import get_provider_transport_kwargs
+
+        assert get_provider_transport_kwargs("openai", {}) == {}
+
+
+@pytest.mark.unit
+class TestAnthropicTransport:
+    """Tests for attaching the shared client to ChatAnthropic."""
+
+    def test_chat_anthropic_exposes_lazy_client(self):
+        """The pinned langchain-anthropic still lazily builds its client from _client_params."""
+        from langchain_anthropic import ChatAnthropic
+        from src.llm.transport import _supports_async_client_override
+
+        model = ChatAnthropic(model="claude-3-5-sonnet-latest", api_key="test-key")
+
+        assert _supports_async_client_override(model)
+        assert model._client_params["api_key"] == "test-key"
+
+    def test_attach_uses_pool_client(self):
+        """ChatAnthropic should talk through the pooled httpx client for its endpoint."""
+        from langchain_anthropic import ChatAnthropic
+        from src.llm.transport import (
+            _sdk_httpx_module,
+            attach_shared_transport,
+            get_http_client_pool,
+            resolve_provider_endpoint,
+        )
+
+        model = ChatAnthropic(model="claude-3-5-sonnet-latest", api_key="test-key")
+        attach_shared_transport("anthropic", model, {})
+
+        shared = get_http_client_pool().get_async_client(
+            resolve_provider_endpoint("anthropic", {}), _sdk_httpx_module("anthropic")
+        )
+        assert model._async_client._client is shared
+        assert model._async_client.api_key == "test-key"
+
+    def test_unsupported_model_left_untouched(self):
+        """A model without the expected lazy client attribute is returned as is."""
+        from src.llm.transport import attach_shared_transport
+
+        class OtherModel:
+            pass
+
+        model = OtherModel()
+
+        assert attach_shared_transport("anthropic", model, {}) is model
+        assert "_async_client" not in model.__dict__
@@ -0,0 +1,187 @@
+"""
+Unit tests for off-loop PDF extraction in src/documents/extraction.py
+
+Tests cover:
+- Extraction in a real process pool with page-level chunks joined in page order
+- The event loop staying responsive during extraction
+- Bounded queue limiting in-flight chunks
+- Per-document timeout and cancellation of pending chunks
+- Multiple documents in one request converted concurrently
+"""
+
+import asyncio
+import base64
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+
+def _b64(label: str) -> str:
+    return base64.b64encode(label.encode()).decode()
+
+
+def _fake_pages(total: int, delay: float, calls: list, active: list):
+    """Stand-in for extract_page_range that records concurrency; page text is '<file content>:<page>'."""
+    lock = threading.Lock()
+
+    def extract(path, start, stop, max_chars=None):
+        with open(path, "rb") as fh:
+            label = fh.read().decode()
+        with lock:
+            calls.append(start)
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        time.sleep(delay)
+        with lock:
+            active[0] -= 1
+        stop = total if stop is None else min(stop, total)
+        return [f"{label}:{i}" for i in range(start, stop)], total
+
+    return extract
+
+
+@pytest.fixture
+def thread_pool():
+    executor = ThreadPoolExecutor(max_workers=4)
+    yield executor
+    executor.shutdown(wait=True, cancel_futures=True)
+
+
+@pytest.mark.unit
+class TestProcessPool:
+    """Tests against a real process pool."""
+
+    @pytest.mark.asyncio
+    async def test_page_chunks_joined_in_order(self, make_pdf):
+        """Large PDFs are split into page chunks whose text is joined in page order."""
+        from src.documents.extraction import PdfExtractionPool
+
+        pool = PdfExtractionPool(workers=2, queue_size=4, page_chunk=2)
+        try:
+            text = await pool.extract(make_pdf([f"Page {i}" for i in range(5)]))
+        finally:
+            pool.shutdown()
+
+        assert text == "\n".join(f"Page {i}" for i in range(5))
+        assert pool.stats()["pageChunks"] == 3
+        assert pool.stats()["mode"] == "process"
+
+
+@pytest.mark.unit
+class TestScheduling:
+    """Tests for queueing, timeouts and cancellation."""
+
+    @pytest.mark.asyncio
+    async def test_event_loop_not_blocked(self, thread_pool):
+        """Other coroutines keep running while a document is extracted."""
+        from src.documents.extraction import PdfExtractionPool
+
+        pool = PdfExtractionPool(workers=1, queue_size=1, executor=thread_pool)
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        beat = asyncio.create_task(heartbeat())
+        with patch("src.documents.extraction.extract_page_range", _fake_pages(1, 0.2, [], [0, 0])):
+            await pool.extract(_b64("doc"))
+        beat.cancel()
+
+        assert ticks >= 5
+
+    @pytest.mark.asyncio
+    async def test_queue_bounds_in_flight_chunks(self, thread_pool):
+        """No more than queue_size chunks run at once; the rest wait."""
+        from src.documents.extraction import PdfExtractionPool
+
+        pool = PdfExtractionPool(workers=4, queue_size=2, page_chunk=1, executor=thread_pool)
+        calls, active = [], [0, 0]
+
+        with patch("src.documents.extraction.extract_page_range", _fake_pages(3, 0.02, calls, active)):
+            texts = await asyncio.gather(pool.extract(_b64("a")), pool.extract(_b64("b")))
+
+        assert texts == ["a:0\na:1\na:2", "b:0\nb:1\nb:2"]
+        assert active[1] == 2
+
+    @pytest.mark.asyncio
+    async def test_timeout(self, thread_pool):
+        """A document exceeding the timeout raises PdfExtractionTimeoutError."""
+        from src.documents.extraction import PdfExtractionPool, PdfExtractionTimeoutError
+
+        pool = PdfExtractionPool(workers=1, queue_size=1, timeout_seconds=0.05, executor=thread_pool)
+
+        with patch("src.documents.extraction.extract_page_range", _fake_pages(1, 0.3, [], [0, 0])):
+            with pytest.raises(PdfExtractionTimeoutError):
+                await pool.extract(_b64("doc"))
+
+        assert pool.stats()["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancellation_drops_pending_chunks(self, thread_pool):
+        """Cancelling the caller stops chunks that have not started."""
+        from src.documents.extraction import PdfExtractionPool
+
+        pool = PdfExtractionPool(workers=1, queue_size=1, page_chunk=1, executor=thread_pool)
+        calls = []
+
+        with patch("src.documents.extraction.extract_page_range", _fake_pages(10, 0.05, calls, [0, 0])):
+            task = asyncio.create_task(pool.extract(_b64("doc")))
+            await asyncio.sleep(0.08)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            await asyncio.sleep(0.1)
+
+        assert len(calls) < 10
+        assert pool.stats()["cancellations"] == 1
+
+    def test_workers_zero_uses_threads(self):
+        """PDF_EXTRACT_WORKERS=0 selects thread mode."""
+        from src.documents.extraction import get_pdf_extraction_pool, shutdown_pdf_extraction_pool
+
+        shutdown_pdf_extraction_pool()
+        try:
+            with patch.dict("os.environ", {"PDF_EXTRACT_WORKERS": "0", "PDF_EXTRACT_QUEUE_SIZE": "3"}):
+                stats = get_pdf_extraction_pool().stats()
+        finally:
+            shutdown_pdf_extraction_pool()
+
+        assert stats["mode"] == "thread"
+        assert stats["queueSize"] == 3
+
+
+@pytest.mark.unit
+class TestParallelDocuments:
+    """Tests for converting several documents at once."""
+
+    @pytest.mark.asyncio
+    async def test_documents_converted_concurrently(self):
+        """All PDFs of a request are converted at the same time, output order unchanged."""
+        from src.utils import create_context_document_messages_openai
+
+        active, peak = 0, 0
+
+        async def convert(data, store=None):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+            return f"text of {data}"
+
+        documents = [
+            {"name": "a.pdf", "type": "application/pdf", "data": "A"},
+            {"name": "b.txt", "type": "text", "data": "plain"},
+            {"name": "c.pdf", "type": "application/pdf", "data": "C"},
+        ]
+        with patch("src.utils.convert_pdf_to_text", convert):
+            messages = await create_context_document_messages_openai(documents)
+
+        assert [m["text"] for m in messages] == ["text of A", "plain", "text of C"]
+        assert peak == 2
@@ -0,0 +1,247 @@
+"""
+Unit tests for the PDF text cache in src/documents/text_cache.py
+
+Tests cover:
+- convert_pdf_to_text parsing each unique document once (data URL prefix ignored)
+- Byte-bounded LRU eviction, oversized texts skipped
+- Disk and LangGraph store persistent tiers
+- Lookups that never extract
+- Concurrent requests sharing one extraction, failures not cached
+- Hit rate and bytes saved statistics
+- Content hashing off the event loop for large documents
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from langgraph.store.memory import InMemoryStore
+
+
+@pytest.fixture(autouse=True)
+def _reset_cache():
+    from src.documents.text_cache import reset_pdf_text_cache
+
+    reset_pdf_text_cache()
+    yield
+    reset_pdf_text_cache()
+
+
+@pytest.mark.unit
+class TestConvertPdfToText:
+    """Tests for the cached convert_pdf_to_text."""
+
+    @pytest.mark.asyncio
+    async def test_each_document_parsed_once(self, make_pdf):
+        """Repeated conversions of the same document reuse the extracted text."""
+        from src.documents.text_cache import get_pdf_text_cache_stats
+        from src.utils import _extract_pdf_text, convert_pdf_to_text
+
+        pdf = make_pdf(["Quarterly report", "Page two"])
+
+        with patch("src.utils._extract_pdf_text", wraps=_extract_pdf_text) as spy:
+            first = await convert_pdf_to_text(pdf)
+            second = await convert_pdf_to_text(f"data:application/pdf;base64,{pdf}")
+            other = await convert_pdf_to_text(make_pdf(["Something else"]))
+
+        assert first == second == "Quarterly report\nPage two"
+        assert other == "Something else"
+        assert spy.call_count == 2
+
+        stats = get_pdf_text_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+        assert stats["hitRate"] == pytest.approx(1 / 3)
+        assert stats["bytesSaved"] == len(pdf) * 3 // 4
+
+    @pytest.mark.asyncio
+    async def test_routing_and_nodes_share_cache(self, make_pdf):
+        """create_context_document_messages for OpenAI and non-native Anthropic reuse one parse."""
+        from src.utils import _extract_pdf_text, create_context_document_messages
+
+        documents = [{"name": "report.pdf", "type": "application/pdf", "data": make_pdf(["Numbers"])}]
+
+        with patch("src.utils._extract_pdf_text", wraps=_extract_pdf_text) as spy:
+            for model in ("gpt-4o-mini", "gpt-4o", "claude-3-haiku-20240307"):
+                messages = await create_context_document_messages(
+                    {"configurable": {"customModelName": model}}, documents
+                )
+                assert messages[0]["content"][1] == {"type": "text", "text": "Numbers"}
+
+        assert spy.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_disabled(self, make_pdf):
+        """PDF_TEXT_CACHE=off parses every time."""
+        from src.utils import _extract_pdf_text, convert_pdf_to_text
+
+        pdf = make_pdf(["Text"])
+
+        with patch.dict("os.environ", {"PDF_TEXT_CACHE": "off"}), \
+                patch("src.utils._extract_pdf_text", wraps=_extract_pdf_text) as spy:
+            await convert_pdf_to_text(pdf)
+            await convert_pdf_to_text(pdf)
+
+        assert spy.call_count == 2
+
+
+@pytest.mark.unit
+class TestMemoryTier:
+    """Tests for the byte-bounded memory tier."""
+
+    @pytest.mark.asyncio
+    async def test_lru_bounded_by_bytes(self):
+        """Least recently used texts are evicted once the byte budget is exceeded."""
+        from src.documents.text_cache import PdfTextCache
+
+        cache = PdfTextCache(max_bytes=10)
+        texts = {"a": "aaaa", "b": "bbbb", "c": "cccc", "big": "x" * 11}
+
+        for key in ("a", "b"):
+            await cache.get_or_extract(key, texts.get)
+        await cache.get_or_extract("a", texts.get)
+        await cache.get_or_extract("c", texts.get)
+        await cache.get_or_extract("big", texts.get)
+
+        stats = cache.stats()
+        assert stats["bytes"] == 8
+        assert stats["evictions"] == 1
+        assert stats["size"] == 2
+
+        extracted = []
+        await cache.get_or_extract("a", lambda data: extracted.append(data) or texts[data])
+        await cache.get_or_extract("b", lambda data: extracted.append(data) or texts[data])
+        assert extracted == ["b"]
+
+
+@pytest.mark.unit
+class TestPersistentTiers:
+    """Tests for the disk and store tiers."""
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_restart(self, tmp_path):
+        """A new cache (new process) reads texts written by an earlier one."""
+        from src.documents.text_cache import DiskTextStore, PdfTextCache
+
+        first = PdfTextCache(persistence="disk", disk_store=DiskTextStore(tmp_path))
+        await first.get_or_extract("QUJD", lambda data: "text \ud800")
+
+        second = PdfTextCache(persistence="disk", disk_store=DiskTextStore(tmp_path))
+        text = await second.get_or_extract("QUJD", lambda data: pytest.fail("should not extract"))
+
+        assert text == "text \ud800"
+        assert second.stats()["persistentHits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_store_tier(self):
+        """With PDF_TEXT_CACHE=store, texts are shared through the LangGraph store."""
+        from src.constants import PDF_TEXT_NAMESPACE
+        from src.documents.hashing import content_hash
+        from src.documents.text_cache import PdfTextCache
+
+        store = InMemoryStore()
+        await PdfTextCache(persistence="store").get_or_extract("QUJD", lambda data: "stored", store=store)
+
+        item = await store.aget(PDF_TEXT_NAMESPACE, content_hash("QUJD"))
+        assert item.value == {"text": "stored"}
+
+        fresh = PdfTextCache(persistence="store")
+        assert await fresh.get_or_extract("QUJD", lambda data: pytest.fail("should not extract"), store=store) == "stored"
+
+    @pytest.mark.asyncio
+    async def test_get_never_extracts(self):
+        """get() reads every tier but returns None instead of extracting on a miss."""
+        from src.documents.text_cache import PdfTextCache
+
+        store = InMemoryStore()
+        assert await PdfTextCache(persistence="store").get("QUJD", store) is None
+
+        await PdfTextCache(persistence="store").get_or_extract("QUJD", lambda data: "stored", store=store)
+        fresh = PdfTextCache(persistence="store")
+
+        assert await fresh.get("QUJD", store) == "stored"
+        assert await fresh.get("QUJD") == "stored"
+        assert fresh.stats()["persistentHits"] == 1
+        assert fresh.stats()["misses"] == 0
+
+    @pytest.mark.asyncio
+    async def test_env_selects_tier(self, tmp_path):
+        """PDF_TEXT_CACHE / PDF_TEXT_CACHE_DIR configure the process cache."""
+        from src.documents.text_cache import get_pdf_text_cache
+
+        with patch.dict("os.environ", {"PDF_TEXT_CACHE": "disk", "PDF_TEXT_CACHE_DIR": str(tmp_path)}):
+            cache = get_pdf_text_cache()
+
+        assert cache.persistence == "disk"
+        assert cache.disk_store.path == tmp_path
+
+
+@pytest.mark.unit
+class TestConcurrency:
+    """Tests for concurrent extraction."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_extract_once(self):
+        """Concurrent conversions of one document wait for a single extraction."""
+        from src.documents.text_cache import PdfTextCache
+
+        cache = PdfTextCache()
+        calls = 0
+
+        async def extract(data):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            return "text"
+
+        results = await asyncio.gather(*(cache.get_or_extract("QUJD", extract) for _ in range(4)))
+
+        assert results == ["text"] * 4
+        assert calls == 1
+        assert cache.stats()["hits"] == 3
+
+    @pytest.mark.asyncio
+    async def test_failure_not_cached(self):
+        """A failed extraction raises and the next call retries."""
+        from src.documents.text_cache import PdfTextCache
+
+        cache = PdfTextCache()
+        outcomes = [ValueError("bad pdf"), "text"]
+
+        def extract(data):
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        with pytest.raises(ValueError, match="bad pdf"):
+            await cache.get_or_extract("QUJD", extract)
+        assert await cache.get_or_extract("QUJD", extract) == "text"
+
+
+@pytest.mark.unit
+class TestContentHash:
+    """Tests for the shared content hash helper."""
+
+    def test_chunked_hash_matches_sha256(self):
+        """Hashing in chunks gives the plain SHA-256 of the whole content."""
+        import hashlib
+
+        from src.documents.hashing import content_hash
+
+        data = "QUJD" * (700 * 1024)
+
+        assert content_hash(data) == hashlib.sha256(data.encode()).hexdigest()
+
+    @pytest.mark.asyncio
+    async def test_large_content_hashed_in_thread(self):
+        """Only content above the inline limit is hashed in a worker thread."""
+        from src.documents.hashing import INLINE_HASH_LIMIT, acontent_hash, content_hash
+
+        large = "A" * (INLINE_HASH_LIMIT + 1)
+
+        with patch("src.documents.hashing.asyncio.to_thread", wraps=asyncio.to_thread) as to_thread:
+            assert await acontent_hash("QUJD") == content_hash("QUJD")
+            to_thread.assert_not_called()
+            assert await acontent_hash(large) == content_hash(large)
+            to_thread.assert_called_once()
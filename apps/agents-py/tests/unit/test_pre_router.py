@@ -0,0 +1,127 @@
+"""
+Unit tests for the lexical pre-router in src/open_canvas/routing/pre_router.py
+
+Tests cover:
+- High-confidence rule decisions with and without an artifact
+- Uncertain messages falling below the threshold
+- generate_path skipping the LLM on confident decisions and falling back otherwise
+"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+
+def _state(text: str, artifact=None) -> dict:
+    return {
+        "_messages": [HumanMessage(content=text)],
+        "messages": [HumanMessage(content=text)],
+        "artifact": artifact,
+        "webSearchEnabled": False,
+    }
+
+
+CODE_ARTIFACT = {
+    "currentIndex": 1,
+    "contents": [{"index": 1, "type": "code", "code": "def hello(): pass"}],
+}
+
+
+@pytest.mark.unit
+class TestPreRoute:
+    """Tests for pre_route rules."""
+
+    @pytest.mark.parametrize(
+        "message, has_artifact, expected",
+        [
+            ("Write me a blog post about Rust", False, "generateArtifact"),
+            ("Can you draft an email to my landlord?", False, "generateArtifact"),
+            ("What is the capital of France?", False, "replyToGeneralInput"),
+            ("thanks!", True, "replyToGeneralInput"),
+            ("Make it shorter", True, "rewriteArtifact"),
+            ("Please fix the bug in this function", True, "rewriteArtifact"),
+            ("Write a new poem about dogs", True, "rewriteArtifact"),
+        ],
+    )
+    def test_confident_decisions(self, message, has_artifact, expected):
+        """Clear instructions and questions should be decided above the threshold."""
+        from src.open_canvas.routing.pre_router import get_pre_router_threshold, pre_route
+
+        decision = pre_route(message, has_artifact)
+
+        assert decision.route == expected
+        assert decision.source == "rules"
+        assert decision.confidence >= get_pre_router_threshold()
+
+    @pytest.mark.parametrize(
+        "message, has_artifact",
+        [
+            ("How do I write a function that reverses a list?", False),
+            ("the sea at night", False),
+            ("yes", True),
+        ],
+    )
+    def test_uncertain_messages(self, message, has_artifact):
+        """Ambiguous messages should stay below the threshold."""
+        from src.open_canvas.routing.pre_router import get_pre_router_threshold, pre_route
+
+        assert pre_route(message, has_artifact).confidence < get_pre_router_threshold()
+
+    def test_new_documents_lower_confidence(self):
+        """Newly attached documents should lower confidence."""
+        from src.open_canvas.routing.pre_router import pre_route
+
+        plain = pre_route("Write a summary", False)
+        with_docs = pre_route("Write a summary", False, has_new_documents=True)
+
+        assert with_docs.confidence < plain.confidence
+
+
+@pytest.mark.unit
+class TestPreRouterInGeneratePath:
+    """Tests for pre-router wiring in generate_path."""
+
+    @pytest.mark.asyncio
+    async def test_confident_decision_skips_llm(self, mock_store, mock_config, mock_llm_with_tool_response):
+        """A confident rule decision should not call the routing model."""
+        from src.open_canvas.nodes.generate_path import generate_path
+
+        mock_llm = mock_llm_with_tool_response("replyToGeneralInput")
+
+        with patch("src.open_canvas.nodes.generate_path.get_model_from_config", return_value=mock_llm):
+            result = await generate_path(_state("Make it shorter", CODE_ARTIFACT), mock_config, store=mock_store)
+
+        assert result["next"] == "rewriteArtifact"
+        mock_llm.ainvoke.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_uncertain_decision_falls_back_to_llm(self, mock_store, mock_config, mock_llm_with_tool_response):
+        """Low-confidence messages should be routed by the model."""
+        from src.open_canvas.nodes.generate_path import generate_path
+
+        mock_llm = mock_llm_with_tool_response("generateArtifact")
+
+        with patch("src.open_canvas.nodes.generate_path.get_model_from_config", return_value=mock_llm), \
+                patch("src.open_canvas.nodes.generate_path.get_routing_classifier", return_value=None):
+            with patch("src.open_canvas.nodes.generate_path.create_context_document_messages", return_value=[]):
+                result = await generate_path(_state("the sea at night"), mock_config, store=mock_store)
+
+        assert result["next"] == "generateArtifact"
+        mock_llm.ainvoke.assert_called_once()
+
+    @pytest.mark.asyncio
+    @patch.dict(os.environ, {"ROUTER_PRE_ROUTER": "false"})
+    async def test_disabled_pre_router_uses_llm(self, mock_store, mock_config, mock_llm_with_tool_response):
+        """With the pre-router disabled every free-form message goes to the model."""
+        from src.open_canvas.nodes.generate_path import generate_path
+
+        mock_llm = mock_llm_with_tool_response("replyToGeneralInput")
+
+        with patch("src.open_canvas.nodes.generate_path.get_model_from_config", return_value=mock_llm):
+            with patch("src.open_canvas.nodes.generate_path.create_context_document_messages", return_value=[]):
+                result = await generate_path(_state("Write a poem"), mock_config, store=mock_store)
+
+        assert result["next"] == "replyToGeneralInput"
+        mock_llm.ainvoke.assert_called_once()
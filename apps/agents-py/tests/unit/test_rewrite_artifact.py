@@ -26,11 +26,11 @@ class TestRewriteArtifact:
 
         assert callable(rewrite_artifact)
 
-    def test_get_model_config_function_exists(self):
-        """get_model_config function should be imported."""
-        from src.open_canvas.nodes.rewrite_artifact import get_model_config
+    def test_get_run_context_function_exists(self):
+        """get_run_context (run-scoped model config) should be imported."""
+        from src.open_canvas.nodes.rewrite_artifact import get_run_context
 
-        assert callable(get_model_config)
+        assert callable(get_run_context)
 
     def test_get_model_from_config_function_exists(self):
         """get_model_from_config function should be imported."""
@@ -376,10 +376,10 @@ class TestRewriteArtifactNodeWithMock:
         }
 
         with patch("src.open_canvas.nodes.rewrite_artifact.get_model_from_config", return_value=mock_llm):
-            with patch("src.open_canvas.nodes.rewrite_artifact.get_model_config", return_value={"modelName": "gpt-4o"}):
-                with patch("src.open_canvas.nodes.rewrite_artifact.get_formatted_reflections", return_value=""):
-                    with patch("src.open_canvas.nodes.rewrite_artifact.create_context_document_messages", return_value=[]):
-                        with patch("src.open_canvas.nodes.rewrite_artifact.is_using_o1_mini_model", return_value=False):
+            with patch("src.open_canvas.run_context.get_model_config", return_value={"modelName": "gpt-4o"}):
+                with patch("src.open_canvas.run_context.RunContext.reflections", return_value=""):
+                    with patch("src.open_canvas.run_context.RunContext.context_document_messages", return_value=[]):
+                        with patch("src.open_canvas.run_context.RunContext.is_using_o1_mini_model", return_value=False):
                             with patch("src.open_canvas.nodes.rewrite_artifact.is_thinking_model", return_value=False):
                                 with patch("src.open_canvas.nodes.rewrite_artifact.optionally_get_system_prompt_from_config", return_value=None):
                                     result = await rewrite_artifact(state, mock_config, store=mock_store)
@@ -425,10 +425,10 @@ class TestRewriteArtifactNodeWithMock:
         }
 
         with patch("src.open_canvas.nodes.rewrite_artifact.get_model_from_config", return_value=mock_llm):
-            with patch("src.open_canvas.nodes.rewrite_artifact.get_model_config", return_value={"modelName": "gpt-4o"}):
-                with patch("src.open_canvas.nodes.rewrite_artifact.get_formatted_reflections", return_value=""):
-                    with patch("src.open_canvas.nodes.rewrite_artifact.create_context_document_messages", return_value=[]):
-                        with patch("src.open_canvas.nodes.rewrite_artifact.is_using_o1_mini_model", return_value=False):
+            with patch("src.open_canvas.run_context.get_model_config", return_value={"modelName": "gpt-4o"}):
+                with patch("src.open_canvas.run_context.RunContext.reflections", return_value=""):
+                    with patch("src.open_canvas.run_context.RunContext.context_document_messages", return_value=[]):
+                        with patch("src.open_canvas.run_context.RunContext.is_using_o1_mini_model", return_value=False):
                             with patch("src.open_canvas.nodes.rewrite_artifact.is_thinking_model", return_value=False):
                                 with patch("src.open_canvas.nodes.rewrite_artifact.optionally_get_system_prompt_from_config", return_value=None):
                                     result = await rewrite_artifact(state, mock_config, store=mock_store)
@@ -472,10 +472,10 @@ class TestRewriteArtifactNodeWithMock:
         }
 
         with patch("src.open_canvas.nodes.rewrite_artifact.get_model_from_config", return_value=mock_llm):
-            with patch("src.open_canvas.nodes.rewrite_artifact.get_model_config", return_value={"modelName": "gpt-4o"}):
-                with patch("src.open_canvas.nodes.rewrite_artifact.get_formatted_reflections", return_value=""):
-                    with patch("src.open_canvas.nodes.rewrite_artifact.create_context_document_messages", return_value=[]):
-                        with patch("src.open_canvas.nodes.rewrite_artifact.is_using_o1_mini_model", return_value=False):
+            with patch("src.open_canvas.run_context.get_model_config", return_value={"modelName": "gpt-4o"}):
+                with patch("src.open_canvas.run_context.RunContext.reflections", return_value=""):
+                    with patch("src.open_canvas.run_context.RunContext.context_document_messages", return_value=[]):
+                        with patch("src.open_canvas.run_context.RunContext.is_using_o1_mini_model", return_value=False):
                             with patch("src.open_canvas.nodes.rewrite_artifact.is_thinking_model", return_value=False):
                                 with patch("src.open_canvas.nodes.rewrite_artifact.optionally_get_system_prompt_from_config", return_value=None):
                                     result = await rewrite_artifact(state, mock_config, store=mock_store)
@@ -500,8 +500,8 @@ class TestRewriteArtifactNodeWithMock:
         }
 
         with patch("src.open_canvas.nodes.rewrite_artifact.get_model_from_config", return_value=mock_llm):
-            with patch("src.open_canvas.nodes.rewrite_artifact.get_model_config", return_value={"modelName": "gpt-4o"}):
-                with patch("src.open_canvas.nodes.rewrite_artifact.get_formatted_reflections", return_value=""):
+            with patch("src.open_canvas.run_context.get_model_config", return_value={"modelName": "gpt-4o"}):
+                with patch("src.open_canvas.run_context.RunContext.reflections", return_value=""):
                     with pytest.raises(ValueError, match="No artifact found"):
                         await rewrite_artifact(state, mock_config, store=mock_store)
 
@@ -522,8 +522,8 @@ class TestRewriteArtifactNodeWithMock:
         }
 
         with patch("src.open_canvas.nodes.rewrite_artifact.get_model_from_config", return_value=mock_llm):
-            with patch("src.open_canvas.nodes.rewrite_artifact.get_model_config", return_value={"modelName": "gpt-4o"}):
-                with patch("src.open_canvas.nodes.rewrite_artifact.get_formatted_reflections", return_value=""):
+            with patch("src.open_canvas.run_context.get_model_config", return_value={"modelName": "gpt-4o"}):
+                with patch("src.open_canvas.run_context.RunContext.reflections", return_value=""):
                     with pytest.raises(ValueError, match="No recent human message found"):
                         await rewrite_artifact(state, mock_config, store=mock_store)
 
@@ -554,10 +554,10 @@ class TestRewriteArtifactNodeWithMock:
         }
 
         with patch("src.open_canvas.nodes.rewrite_artifact.get_model_from_config", return_value=mock_llm):
-            with patch("src.open_canvas.nodes.rewrite_artifact.get_model_config", return_value={"modelName": "deepseek-reasoner"}):
-                with patch("src.open_canvas.nodes.rewrite_artifact.get_formatted_reflections", return_value=""):
-                    with patch("src.open_canvas.nodes.rewrite_artifact.create_context_document_messages", return_value=[]):
-                        with patch("src.open_canvas.nodes.rewrite_artifact.is_using_o1_mini_model", return_value=False):
+            with patch("src.open_canvas.run_context.get_model_config", return_value={"modelName": "deepseek-reasoner"}):
+                with patch("src.open_canvas.run_context.RunContext.reflections", return_value=""):
+                    with patch("src.open_canvas.run_context.RunContext.context_document_messages", return_value=[]):
+                        with patch("src.open_canvas.run_context.RunContext.is_using_o1_mini_model", return_value=False):
                             with patch("src.open_canvas.nodes.rewrite_artifact.is_thinking_model", return_value=True):
                                 with patch("src.open_canvas.nodes.rewrite_artifact.optionally_get_system_prompt_from_config", return_value=None):
                                     result = await rewrite_artifact(state, mock_config, store=mock_store)
@@ -602,10 +602,10 @@ class TestRewriteArtifactNodeWithMock:
         }
 
         with patch("src.open_canvas.nodes.rewrite_artifact.get_model_from_config", return_value=mock_llm):
-            with patch("src.open_canvas.nodes.rewrite_artifact.get_model_config", return_value={"modelName": "gpt-4o"}):
-                with patch("src.open_canvas.nodes.rewrite_artifact.get_formatted_reflections", return_value=""):
-                    with patch("src.open_canvas.nodes.rewrite_artifact.create_context_document_messages", return_value=[]):
-                        with patch("src.open_canvas.nodes.rewrite_artifact.is_using_o1_mini_model", return_value=False):
+            with patch("src.open_canvas.run_context.get_model_config", return_value={"modelName": "gpt-4o"}):
+                with patch("src.open_canvas.run_context.RunContext.reflections", return_value=""):
+                    with patch("src.open_canvas.run_context.RunContext.context_document_messages", return_value=[]):
+                        with patch("src.open_canvas.run_context.RunContext.is_using_o1_mini_model", return_value=False):
                             with patch("src.open_canvas.nodes.rewrite_artifact.is_thinking_model", return_value=False):
                                 with patch("src.open_canvas.nodes.rewrite_artifact.optionally_get_system_prompt_from_config", return_value=None):
                                     result = await rewrite_artifact(state, mock_config, store=mock_store)
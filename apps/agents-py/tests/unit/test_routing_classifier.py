@@ -0,0 +1,169 @@
+"""
+Unit tests for the local routing classifier in src/open_canvas/routing/classifier.py
+
+Tests cover:
+- Training on the seed examples and route masking by artifact state
+- Artifact save/load round trip
+- Opt-in loading and warnings when an enabled classifier cannot be used
+- Parsing the query routing eval set
+- Decision logging and generate_path consulting the classifier
+"""
+
+import json
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+pytest.importorskip("numpy")
+
+EVAL_PATH = Path(__file__).resolve().parents[4] / "packages" / "evals" / "src" / "data" / "query_routing.ts"
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    from src.open_canvas.routing.classifier import SEED_EXAMPLES_PATH, load_jsonl_examples, train_classifier
+
+    return train_classifier(load_jsonl_examples(SEED_EXAMPLES_PATH), epochs=200)
+
+
+@pytest.mark.unit
+class TestRoutingClassifier:
+    """Tests for training and inference."""
+
+    def test_fits_seed_examples(self, classifier):
+        """The trained model should fit its seed examples."""
+        from src.open_canvas.routing.classifier import (
+            SEED_EXAMPLES_PATH,
+            evaluate_classifier,
+            load_jsonl_examples,
+        )
+
+        report = evaluate_classifier(classifier, load_jsonl_examples(SEED_EXAMPLES_PATH))
+
+        assert report["accuracy"] >= 0.9
+        assert report["latencyMsP50"] < 5
+
+    def test_unavailable_route_is_masked(self, classifier):
+        """generateArtifact is impossible with an artifact, rewriteArtifact without one."""
+        with_artifact = classifier.predict_proba("Write a poem", has_artifact=True)
+        without_artifact = classifier.predict_proba("Make it shorter", has_artifact=False)
+
+        assert with_artifact["generateArtifact"] == 0.0
+        assert without_artifact["rewriteArtifact"] == 0.0
+        assert sum(with_artifact.values()) == pytest.approx(1.0)
+
+    def test_save_and_load_round_trip(self, classifier, tmp_path):
+        """A saved artifact should reproduce the same predictions."""
+        from src.open_canvas.routing.classifier import RoutingClassifier
+
+        path = tmp_path / "router.npz"
+        classifier.save(path)
+        loaded = RoutingClassifier.load(path)
+
+        assert loaded.labels == classifier.labels
+        assert loaded.metadata["examples"] == classifier.metadata["examples"]
+        assert loaded.predict_proba("Add logging", True) == pytest.approx(
+            classifier.predict_proba("Add logging", True), abs=1e-5
+        )
+
+
+@pytest.mark.unit
+class TestClassifierLoading:
+    """Tests for the process-level classifier."""
+
+    @pytest.fixture(autouse=True)
+    def _reset(self):
+        from src.open_canvas.routing.classifier import reset_routing_classifier
+
+        reset_routing_classifier()
+        yield
+        reset_routing_classifier()
+
+    def test_disabled_by_default(self, classifier, tmp_path):
+        """Without ROUTER_CLASSIFIER=true an existing model file is not loaded."""
+        from src.open_canvas.routing.classifier import get_routing_classifier
+
+        path = tmp_path / "router.npz"
+        classifier.save(path)
+        env = {k: v for k, v in os.environ.items() if k != "ROUTER_CLASSIFIER"}
+
+        with patch.dict(os.environ, {**env, "ROUTER_CLASSIFIER_PATH": str(path)}, clear=True):
+            assert get_routing_classifier() is None
+
+    def test_enabled_loads_model(self, classifier, tmp_path):
+        """An enabled classifier is loaded from ROUTER_CLASSIFIER_PATH."""
+        from src.open_canvas.routing.classifier import get_routing_classifier
+
+        path = tmp_path / "router.npz"
+        classifier.save(path)
+
+        with patch.dict(os.environ, {"ROUTER_CLASSIFIER": "true", "ROUTER_CLASSIFIER_PATH": str(path)}):
+            assert get_routing_classifier() is not None
+
+    def test_missing_model_warns(self, tmp_path, caplog):
+        """An enabled classifier without a model file logs a warning."""
+        from src.open_canvas.routing.classifier import get_routing_classifier
+
+        path = tmp_path / "missing.npz"
+        with patch.dict(os.environ, {"ROUTER_CLASSIFIER": "true", "ROUTER_CLASSIFIER_PATH": str(path)}), \
+                caplog.at_level("WARNING"):
+            assert get_routing_classifier() is None
+
+        assert "does not exist" in caplog.text
+
+
+@pytest.mark.unit
+class TestRoutingData:
+    """Tests for eval parsing and decision logging."""
+
+    @pytest.mark.skipif(not EVAL_PATH.is_file(), reason="evals package not present")
+    def test_load_eval_examples(self):
+        """The TS eval set should yield the last human message and the reference route."""
+        from src.open_canvas.routing.classifier import load_eval_examples
+
+        examples = load_eval_examples(EVAL_PATH)
+
+        assert len(examples) == 1
+        assert examples[0].message == "Where's the LLM?"
+        assert examples[0].has_artifact is True
+        assert examples[0].route == "rewriteArtifact"
+
+    def test_log_route_decision(self, tmp_path):
+        """LLM decisions should be appended as JSONL training rows."""
+        from src.open_canvas.routing.classifier import load_jsonl_examples, log_route_decision
+        from src.open_canvas.routing.pre_router import RouteDecision
+
+        log_path = tmp_path / "decisions.jsonl"
+        with patch.dict(os.environ, {"ROUTER_DECISION_LOG": str(log_path)}):
+            log_route_decision("the sea at night", False, RouteDecision("generateArtifact", 1.0, "llm"))
+
+        row = json.loads(log_path.read_text())
+        assert row["route"] == "generateArtifact"
+        assert load_jsonl_examples(log_path, sources={"llm"})[0].message == "the sea at night"
+        assert load_jsonl_examples(log_path, sources={"rules"}) == []
+
+
+@pytest.mark.unit
+class TestClassifierInGeneratePath:
+    """Tests for the classifier stage in generate_path."""
+
+    @pytest.mark.asyncio
+    async def test_confident_classifier_skips_llm(
+        self, classifier, mock_store, mock_config, mock_llm_with_tool_response
+    ):
+        """A confident classifier decision should be used when rules are uncertain."""
+        from src.open_canvas.nodes.generate_path import generate_path
+
+        mock_llm = mock_llm_with_tool_response("replyToGeneralInput")
+        state = {"_messages": [HumanMessage(content="the sea at night")], "artifact": None}
+
+        with patch("src.open_canvas.nodes.generate_path.get_model_from_config", return_value=mock_llm), \
+                patch("src.open_canvas.nodes.generate_path.get_routing_classifier", return_value=classifier), \
+                patch("src.open_canvas.nodes.generate_path.get_classifier_threshold", return_value=0.0):
+            result = await generate_path(state, mock_config, store=mock_store)
+
+        assert result["next"] in ("generateArtifact", "replyToGeneralInput")
+        mock_llm.ainvoke.assert_not_called()
@@ -0,0 +1,212 @@
+"""
+Unit tests for routing digests in src/open_canvas/routing/digest.py
+
+Tests cover:
+- Artifact digests (outline, excerpts, budget)
+- Document digests for stored documents and attached document messages
+- PDF snippets read from ingest records or the PDF text cache, parsing only on a miss
+- Context mode and budget configuration
+- Routing prompt size staying constant in digest mode and full mode passthrough
+"""
+
+import base64
+import os
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+
+def _text_artifact(body: str) -> dict:
+    return {"index": 1, "type": "text", "title": "Trip notes", "fullMarkdown": body}
+
+
+@pytest.mark.unit
+class TestArtifactDigest:
+    """Tests for build_artifact_digest."""
+
+    def test_text_outline_and_excerpts(self):
+        """Text artifacts list headings and keep head/tail excerpts within budget."""
+        from src.open_canvas.routing.digest import build_artifact_digest
+
+        body = "# Intro\nstart marker\n" + "filler text\n" * 1000 + "## Outro\nend marker"
+        digest = build_artifact_digest(_text_artifact(body), 800)
+
+        assert len(digest) <= 800
+        assert "title: Trip notes" in digest
+        assert "headings: Intro; Outro" in digest
+        assert "start marker" in digest
+        assert "end marker" in digest
+
+    def test_code_symbols(self):
+        """Code artifacts list language and top-level symbols."""
+        from src.open_canvas.routing.digest import build_artifact_digest
+
+        content = {
+            "index": 1,
+            "type": "code",
+            "title": "Utils",
+            "language": "python",
+            "code": "import os\n\nclass Loader:\n    pass\n\nasync def fetch(url):\n    return url\n",
+        }
+        digest = build_artifact_digest(content, 500)
+
+        assert "type: code (python)" in digest
+        assert "symbols: Loader; fetch" in digest
+
+    def test_small_artifact_kept_whole(self):
+        """Artifacts that fit the budget are included verbatim."""
+        from src.open_canvas.routing.digest import build_artifact_digest
+
+        assert "short body" in build_artifact_digest(_text_artifact("short body"), 500)
+
+
+@pytest.mark.unit
+class TestDocumentsDigest:
+    """Tests for build_documents_digest."""
+
+    @pytest.mark.asyncio
+    async def test_stored_and_attached_documents(self):
+        """Stored documents show name and snippet; attached blocks show type and size."""
+        from src.open_canvas.routing.digest import build_documents_digest
+
+        text = "Quarterly revenue grew. " * 1000
+        documents = [{"name": "report.txt", "type": "text/plain", "data": base64.b64encode(text.encode()).decode()}]
+        attached = HumanMessage(content=[
+            {"type": "text", "text": "Meeting notes " * 1000},
+            {"type": "application/pdf", "data": "A" * 4000},
+        ])
+
+        digest = await build_documents_digest(documents, [attached], 600)
+
+        assert len(digest) <= 600
+        assert "report.txt (text/plain" in digest
+        assert "Quarterly revenue grew." in digest
+        assert "application/pdf, 2.9 KB" in digest
+
+    @pytest.mark.asyncio
+    async def test_pdf_snippet_from_ingest_record(self, make_pdf):
+        """Ingested documents are summarized from the record without opening the PDF."""
+        from langgraph.store.memory import InMemoryStore
+
+        from src.document_ingest.graph import ingest_documents
+        from src.open_canvas.routing.digest import build_documents_digest
+
+        store = InMemoryStore()
+        documents = [{"name": "report.pdf", "type": "application/pdf", "data": make_pdf(["Revenue grew"])}]
+        await ingest_documents(
+            {"documents": documents}, {"configurable": {"open_canvas_assistant_id": "a1"}}, store=store
+        )
+
+        with patch("src.open_canvas.routing.digest._first_page_text") as first_page:
+            digest = await build_documents_digest(documents, [], 600, store, "a1")
+
+        first_page.assert_not_called()
+        assert "report.pdf (application/pdf" in digest
+        assert "Revenue grew" in digest
+
+    @pytest.mark.asyncio
+    async def test_pdf_snippet_from_text_cache(self, make_pdf):
+        """A PDF already converted this process is read from the PDF text cache."""
+        from src.documents.text_cache import reset_pdf_text_cache
+        from src.open_canvas.routing.digest import build_documents_digest
+        from src.utils import convert_pdf_to_text
+
+        reset_pdf_text_cache()
+        pdf = make_pdf(["Cached page"])
+        await convert_pdf_to_text(pdf)
+        documents = [{"name": "report.pdf", "type": "application/pdf", "data": pdf}]
+
+        try:
+            with patch("src.open_canvas.routing.digest._first_page_text") as first_page:
+                digest = await build_documents_digest(documents, [], 600)
+        finally:
+            reset_pdf_text_cache()
+
+        first_page.assert_not_called()
+        assert "Cached page" in digest
+
+    @pytest.mark.asyncio
+    async def test_pdf_snippet_parsed_on_miss(self, make_pdf):
+        """Without a record or cached text only the first page is parsed."""
+        from src.documents.text_cache import reset_pdf_text_cache
+        from src.open_canvas.routing.digest import build_documents_digest
+
+        reset_pdf_text_cache()
+        documents = [{"name": "report.pdf", "type": "application/pdf", "data": make_pdf(["First", "Second"])}]
+
+        digest = await build_documents_digest(documents, [], 600)
+
+        assert "First" in digest
+        assert "Second" not in digest
+
+    @pytest.mark.asyncio
+    async def test_no_documents(self):
+        """Without documents the digest is empty."""
+        from src.open_canvas.routing.digest import build_documents_digest
+
+        assert await build_documents_digest([], [], 600) == ""
+
+
+@pytest.mark.unit
+class TestDigestConfig:
+    """Tests for mode and budget configuration."""
+
+    def test_context_mode(self):
+        """Digest is the default; configurable.routerContextMode overrides the env var."""
+        from src.open_canvas.routing.digest import get_router_context_mode
+
+        with patch.dict(os.environ, {}, clear=True):
+            assert get_router_context_mode() == "digest"
+        with patch.dict(os.environ, {"ROUTER_CONTEXT_MODE": "full"}):
+            assert get_router_context_mode() == "full"
+            assert get_router_context_mode({"configurable": {"routerContextMode": "digest"}}) == "digest"
+
+    def test_budget_split(self):
+        """Document share is given to the artifact when there are no documents."""
+        from src.open_canvas.routing.digest import split_digest_budget
+
+        with_docs = split_digest_budget(1000, has_documents=True)
+        without_docs = split_digest_budget(1000, has_documents=False)
+
+        assert sum(with_docs.values()) == sum(without_docs.values()) == 4000
+        assert without_docs["documents"] == 0
+        assert without_docs["artifact"] > with_docs["artifact"]
+
+
+@pytest.mark.unit
+class TestRouteQueryMessages:
+    """Tests for routing prompt construction in generate_path."""
+
+    @staticmethod
+    async def _build(size: int, mode: str) -> list:
+        from src.open_canvas.nodes.generate_path import (
+            ROUTE_QUERY_OPTIONS_HAS_ARTIFACTS,
+            _build_route_query_messages,
+        )
+
+        state = {
+            "_messages": [HumanMessage(content="Make it shorter")],
+            "artifact": {"currentIndex": 1, "contents": [_text_artifact("word " * size)]},
+        }
+        config = {"configurable": {"customModelName": "fake/canned", "routerContextMode": mode}}
+        attached = HumanMessage(content=[{"type": "text", "text": "doc " * size}])
+        return await _build_route_query_messages(state, config, ROUTE_QUERY_OPTIONS_HAS_ARTIFACTS, [attached])
+
+    @pytest.mark.asyncio
+    async def test_digest_prompt_size_is_constant(self):
+        """Digest mode sends one bounded prompt regardless of artifact/document size."""
+        small = await self._build(10_000, "digest")
+        large = await self._build(100_000, "digest")
+
+        assert len(small) == len(large) == 1
+        assert "<documents-digest>" in large[0].content
+        assert abs(len(large[0].content) - len(small[0].content)) < 50
+
+    @pytest.mark.asyncio
+    async def test_full_mode_passes_context_through(self):
+        """Full mode keeps the original prompt with the complete artifact and new messages."""
+        messages = await self._build(1000, "full")
+
+        assert len(messages) == 2
+        assert ("word " * 1000).strip() in messages[-1].content
@@ -0,0 +1,230 @@
+"""
+Unit tests for the run-scoped context in src/open_canvas/run_context.py
+
+Tests cover:
+- Locating the context by attached object, run_id, or per-call fallback
+- Model config memoization (tiered configs kept apart)
+- Single initialization of async values, cancellation handover, failures not cached
+- Store reads and context document conversions shared between nodes of one run
+- Uploaded document conversion reusing the run's model config
+"""
+
+import asyncio
+import base64
+from unittest.mock import patch
+
+import pytest
+from langgraph.store.memory import InMemoryStore
+
+
+@pytest.fixture(autouse=True)
+def _reset_registry():
+    from src.open_canvas.run_context import reset_run_contexts
+
+    reset_run_contexts()
+    yield
+    reset_run_contexts()
+
+
+def _config(**configurable) -> dict:
+    return {"configurable": {"customModelName": "gpt-4o-mini", "assistant_id": "assistant-1", **configurable}}
+
+
+class _CountingStore(InMemoryStore):
+    def __init__(self) -> None:
+        super().__init__()
+        self.reads = 0
+
+    async def aget(self, namespace, key, **kwargs):
+        self.reads += 1
+        return await super().aget(namespace, key, **kwargs)
+
+
+@pytest.mark.unit
+class TestRunContextLookup:
+    """Tests for get_run_context."""
+
+    def test_same_run_id_shares_context(self):
+        """Nodes of one run (same run_id) get the same context."""
+        from src.open_canvas.run_context import get_run_context
+
+        assert get_run_context(_config(run_id="r1")) is get_run_context(_config(run_id="r1"))
+        assert get_run_context(_config(run_id="r1")) is not get_run_context(_config(run_id="r2"))
+
+    def test_attached_context_and_fallback(self):
+        """An attached context wins; without a run id every call gets a fresh one."""
+        from src.open_canvas.run_context import attach_run_context, get_run_context
+
+        config = attach_run_context(_config(run_id="r1"))
+
+        assert get_run_context(config) is get_run_context(config)
+        assert get_run_context(config) is not get_run_context(_config(run_id="r1"))
+        assert get_run_context(_config()) is not get_run_context(_config())
+
+    def test_registry_is_bounded(self):
+        """Old runs are evicted beyond RUN_CONTEXT_MAX_RUNS."""
+        from src.open_canvas.run_context import get_run_context
+
+        with patch.dict("os.environ", {"RUN_CONTEXT_MAX_RUNS": "2"}):
+            first = get_run_context(_config(run_id="r1"))
+            get_run_context(_config(run_id="r2"))
+            get_run_context(_config(run_id="r3"))
+
+            assert get_run_context(_config(run_id="r1")) is not first
+
+
+@pytest.mark.unit
+class TestModelConfig:
+    """Tests for model config memoization."""
+
+    def test_computed_once_per_model(self):
+        """Repeated lookups reuse the first result; a tiered model name is resolved separately."""
+        from src.open_canvas.run_context import RunContext
+        from src.utils import get_model_config
+
+        run = RunContext()
+        with patch("src.open_canvas.run_context.get_model_config", wraps=get_model_config) as spy:
+            assert run.model_config(_config())["modelName"] == "gpt-4o-mini"
+            assert not run.is_using_o1_mini_model(_config())
+            assert run.model_config(_config(customModelName="gpt-4o"))["modelName"] == "gpt-4o"
+
+        assert spy.call_count == 2
+        assert run.stats()["modelConfigReuses"] == 1
+
+
+@pytest.mark.unit
+class TestSingleInitialization:
+    """Tests for async single initialization."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_load(self):
+        """Concurrent callers wait for the same initialization."""
+        from src.open_canvas.run_context import RunContext
+
+        run = RunContext()
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "value"
+
+        results = await asyncio.gather(*(run._amemo("k", load, "storeReadsAvoided") for _ in range(5)))
+
+        assert results == ["value"] * 5
+        assert calls == 1
+        assert run.stats()["storeReadsAvoided"] == 4
+
+    @pytest.mark.asyncio
+    async def test_cancelled_initializer_hands_over(self):
+        """If the initializing task is cancelled, a waiter takes over."""
+        from src.open_canvas.run_context import RunContext
+
+        run = RunContext()
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return calls
+
+        first = asyncio.create_task(run._amemo("k", load, "storeReadsAvoided"))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(run._amemo("k", load, "storeReadsAvoided"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == 2
+        assert first.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self):
+        """A failed initialization raises and is retried on the next call."""
+        from src.open_canvas.run_context import RunContext
+
+        run = RunContext()
+        outcomes = [ValueError("store down"), "ok"]
+
+        async def load():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        with pytest.raises(ValueError, match="store down"):
+            await run._amemo("k", load, "storeReadsAvoided")
+        assert await run._amemo("k", load, "storeReadsAvoided") == "ok"
+
+
+@pytest.mark.unit
+class TestSharedAcrossNodes:
+    """Tests for values shared by the nodes of a run."""
+
+    @pytest.mark.asyncio
+    async def test_reflections_read_once(self):
+        """Reflections are read from the store once per run, formatted per caller."""
+        from src.open_canvas.run_context import get_run_context
+
+        store = _CountingStore()
+        await store.aput(("memories", "assistant-1"), "reflection", {"styleRules": ["Be brief"], "content": ["Likes tea"]})
+        config = _config(run_id="r1")
+
+        full = await get_run_context(config).reflections(config, store)
+        content_only = await get_run_context(config).reflections(config, store, only_content=True)
+
+        assert "Be brief" in full and "Likes tea" in full
+        assert "Be brief" not in content_only
+        assert store.reads == 1
+        assert get_run_context(config).stats()["storeReadsAvoided"] == 1
+
+    @pytest.mark.asyncio
+    async def test_context_documents_converted_once(self):
+        """Routing and the artifact node share one decode/convert of the assistant documents."""
+        from src.open_canvas.run_context import get_run_context
+        from src.utils import create_context_document_messages
+
+        store = InMemoryStore()
+        data = base64.b64encode(b"quarterly numbers").decode()
+        await store.aput(("context_documents",), "assistant-1", {
+            "documents": [{"name": "notes.txt", "type": "text/plain", "data": data}],
+        })
+        config = {**_config(run_id="r1"), "store": store}
+
+        with patch(
+            "src.open_canvas.run_context.create_context_document_messages", wraps=create_context_document_messages
+        ) as spy:
+            routing = await get_run_context(config).context_document_messages(config)
+            node = await get_run_context(config).context_document_messages(config)
+
+        assert spy.call_count == 1
+        assert routing == node
+        assert "quarterly numbers" in str(node)
+        node[0]["content"].clear()
+        assert (await get_run_context(config).context_document_messages(config))[0]["content"]
+        assert get_run_context(config).stats()["conversionsAvoided"] == 2
+
+    @pytest.mark.asyncio
+    async def test_uploaded_documents_use_run_model_config(self):
+        """Converting documents attached to a message reuses the run's model config."""
+        from langchain_core.messages import HumanMessage
+
+        from src.open_canvas.nodes.generate_path import convert_context_document_to_human_message
+        from src.open_canvas.run_context import get_run_context
+
+        config = _config(run_id="r1")
+        get_run_context(config).model_config(config)
+        upload = HumanMessage(
+            content="Summarize",
+            additional_kwargs={"documents": [
+                {"name": "notes.txt", "type": "text/plain", "data": base64.b64encode(b"numbers").decode()},
+            ]},
+        )
+
+        with patch("src.utils.get_model_config") as get_model_config:
+            message = await convert_context_document_to_human_message([upload], config)
+
+        get_model_config.assert_not_called()
+        assert "numbers" in str(message.content)
+        assert get_run_context(config).stats()["modelConfigReuses"] == 1
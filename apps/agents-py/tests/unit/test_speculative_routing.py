@@ -0,0 +1,315 @@
+"""
+Unit tests for speculative route execution in src/open_canvas/routing/speculative.py
+
+Tests cover:
+- Confidence band policy and configurable override
+- Cancelling the losing branch and committing the winner
+- Streaming only the winner's callback events to the run
+- Wasted-token accounting and routing failures
+- generate_path committing the winner and jumping to its successor node
+"""
+
+import asyncio
+import os
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    from src.open_canvas.routing.speculative import reset_speculation_stats
+
+    reset_speculation_stats()
+    yield
+    reset_speculation_stats()
+
+
+async def _route_after(route: str, delay: float = 0.05) -> str:
+    await asyncio.sleep(delay)
+    return route
+
+
+@pytest.mark.unit
+class TestSpeculationPolicy:
+    """Tests for SpeculationPolicy."""
+
+    @patch.dict(os.environ, {"ROUTER_SPECULATIVE": "true"})
+    def test_confidence_band(self):
+        """Only pre-router confidences inside [min, max) should speculate."""
+        from src.open_canvas.routing.pre_router import RouteDecision
+        from src.open_canvas.routing.speculative import SpeculationPolicy
+
+        policy = SpeculationPolicy.from_config()
+
+        assert policy.should_speculate(RouteDecision("replyToGeneralInput", 0.6, "rules"))
+        assert not policy.should_speculate(RouteDecision("replyToGeneralInput", 0.3, "rules"))
+        assert not policy.should_speculate(RouteDecision("replyToGeneralInput", 0.8, "rules"))
+        assert not policy.should_speculate(None)
+
+    def test_disabled_by_default_and_configurable_override(self):
+        """Speculation is opt-in and configurable.speculativeRouting enables it per run."""
+        from src.open_canvas.routing.speculative import SpeculationPolicy
+
+        with patch.dict(os.environ, {}, clear=True):
+            assert SpeculationPolicy.from_config().enabled is False
+            assert SpeculationPolicy.from_config({"configurable": {"speculativeRouting": True}}).enabled
+
+    @patch.dict(os.environ, {"ROUTER_SPECULATIVE_ROUTES": "replyToGeneralInput,unknownNode"})
+    def test_routes_filter(self):
+        """Only known candidate nodes can be speculated."""
+        from src.open_canvas.routing.speculative import SpeculationPolicy
+
+        assert SpeculationPolicy.from_config().routes == frozenset({"replyToGeneralInput"})
+
+
+@pytest.mark.unit
+class TestRunSpeculativeRoute:
+    """Tests for run_speculative_route."""
+
+    @pytest.mark.asyncio
+    async def test_loser_cancelled_winner_committed(self):
+        """The losing branch is cancelled and the winner's update is returned."""
+        from src.open_canvas.routing.speculative import get_speculation_stats, run_speculative_route
+
+        loser_cancelled = asyncio.Event()
+
+        async def slow_loser(cfg):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                loser_cancelled.set()
+                raise
+
+        async def winner(cfg):
+            assert cfg["metadata"]["langgraph_node"] == "replyToGeneralInput"
+            return {"messages": [AIMessage(content="hello")]}
+
+        route, update = await run_speculative_route(
+            _route_after("replyToGeneralInput"),
+            {"replyToGeneralInput": winner, "generateArtifact": slow_loser},
+            {},
+        )
+
+        assert route == "replyToGeneralInput"
+        assert update["messages"][0].content == "hello"
+        assert loser_cancelled.is_set()
+        stats = get_speculation_stats()
+        assert stats["speculations"] == 1
+        assert stats["committed"] == 1
+        assert stats["cancelled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_wasted_tokens_counted(self):
+        """Tokens spent by a finished losing branch are recorded as wasted."""
+        from src.llm.fake import FakeStreamingChatModel
+        from src.open_canvas.routing.speculative import get_speculation_stats, run_speculative_route
+
+        model = FakeStreamingChatModel(
+            model_name="fake", canned_text="one two three",
+            tokens_per_second=0, first_token_latency=0, jitter=0,
+        )
+
+        async def loser(cfg):
+            return {"messages": [await model.ainvoke("hi", cfg)]}
+
+        async def winner(cfg):
+            return {"messages": [AIMessage(content="done")]}
+
+        # 路由明显晚于落选分支输出完毕
+        route, update = await run_speculative_route(
+            _route_after("generateArtifact", 0.2),
+            {"replyToGeneralInput": loser, "generateArtifact": winner},
+            {},
+        )
+
+        assert route == "generateArtifact"
+        assert update is not None
+        assert get_speculation_stats()["wastedTokens"] > 0
+
+    @pytest.mark.asyncio
+    async def test_only_winner_events_reach_run_callbacks(self):
+        """The winner's streamed tokens reach the run's handlers; the loser's never do."""
+        from langchain_core.callbacks import BaseCallbackHandler
+        from src.llm.fake import FakeStreamingChatModel
+        from src.open_canvas.routing.speculative import run_speculative_route
+
+        class Collector(BaseCallbackHandler):
+            def __init__(self):
+                self.tokens = []
+                self.nodes = set()
+
+            def on_chat_model_start(self, serialized, messages, *, metadata=None, **kwargs):
+                self.nodes.add((metadata or {}).get("langgraph_node"))
+
+            def on_llm_new_token(self, token, **kwargs):
+                self.tokens.append(token)
+
+        def branch(text):
+            model = FakeStreamingChatModel(
+                model_name="fake", canned_text=text, tokens_per_second=0, first_token_latency=0, jitter=0
+            )
+
+            async def run(cfg):
+                return {"messages": [await model.ainvoke("hi", cfg)]}
+
+            return run
+
+        collector = Collector()
+        _, update = await run_speculative_route(
+            _route_after("generateArtifact"),
+            {"replyToGeneralInput": branch("loser text"), "generateArtifact": branch("winner text")},
+            {"callbacks": [collector]},
+        )
+
+        assert update["messages"][0].content == "winner text"
+        assert "".join(collector.tokens) == "winner text"
+        assert collector.nodes == {"generateArtifact"}
+
+    @pytest.mark.asyncio
+    async def test_nodes_calling_model_with_own_config_are_relayed(self):
+        """Model calls that pass their own config= still go through the branch relay."""
+        from langchain_core.callbacks import BaseCallbackHandler
+        from langchain_core.runnables import RunnableLambda
+        from src.llm.fake import FakeStreamingChatModel
+        from src.open_canvas.routing.speculative import get_speculation_stats, run_speculative_route
+
+        class Collector(BaseCallbackHandler):
+            def __init__(self):
+                self.tokens = []
+                self.nodes = set()
+
+            def on_chat_model_start(self, serialized, messages, *, metadata=None, **kwargs):
+                self.nodes.add((metadata or {}).get("langgraph_node"))
+
+            def on_llm_new_token(self, token, **kwargs):
+                self.tokens.append(token)
+
+        def node(text):
+            model = FakeStreamingChatModel(
+                model_name="fake", canned_text=text, tokens_per_second=0, first_token_latency=0, jitter=0
+            )
+
+            async def run(cfg):
+                # 与真实节点一样只传 run_name，不转发收到的配置
+                return {"messages": [await model.ainvoke("hi", config={"run_name": "node_call"})]}
+
+            return run
+
+        async def generate_path(_input, config):
+            return await run_speculative_route(
+                _route_after("generateArtifact", 0.2),
+                {"replyToGeneralInput": node("LOSER"), "generateArtifact": node("WINNER")},
+                config,
+            )
+
+        collector = Collector()
+        _, update = await RunnableLambda(generate_path).ainvoke(None, {"callbacks": [collector]})
+
+        assert update["messages"][0].content == "WINNER"
+        assert "".join(collector.tokens) == "WINNER"
+        assert collector.nodes == {"generateArtifact"}
+        assert get_speculation_stats()["wastedTokens"] > 0
+
+    @pytest.mark.asyncio
+    async def test_unspeculated_or_failed_winner_returns_none(self):
+        """A failed winning branch falls back to running the node normally."""
+        from src.open_canvas.routing.speculative import get_speculation_stats, run_speculative_route
+
+        async def failing(cfg):
+            raise RuntimeError("boom")
+
+        _, update = await run_speculative_route(
+            _route_after("replyToGeneralInput", 0), {"replyToGeneralInput": failing}, {}
+        )
+        _, missing = await run_speculative_route(
+            _route_after("rewriteArtifact", 0), {"replyToGeneralInput": failing}, {}
+        )
+
+        assert update is None
+        assert missing is None
+        assert get_speculation_stats()["winnerFailures"] == 1
+
+    @pytest.mark.asyncio
+    async def test_routing_failure_cancels_candidates(self):
+        """If routing fails, every speculative branch is cancelled."""
+        from src.open_canvas.routing.speculative import run_speculative_route
+
+        cancelled = asyncio.Event()
+
+        async def failing_route():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("routing failed")
+
+        async def candidate(cfg):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(RuntimeError):
+            await run_speculative_route(failing_route(), {"replyToGeneralInput": candidate}, {})
+        assert cancelled.is_set()
+
+
+@pytest.mark.unit
+class TestSpeculationInGeneratePath:
+    """Tests for speculation wiring in generate_path."""
+
+    @pytest.mark.asyncio
+    @patch.dict(os.environ, {"ROUTER_SPECULATIVE": "true"})
+    async def test_winner_committed_and_successor_routed(
+        self, mock_store, mock_config, mock_llm_with_tool_response
+    ):
+        """The winner's update is merged and routing skips straight to its successor."""
+        import importlib
+
+        generate_path_module = importlib.import_module("src.open_canvas.nodes.generate_path")
+
+        mock_llm = mock_llm_with_tool_response("replyToGeneralInput")
+        seen_states = []
+
+        async def fake_reply(state, config, *, store):
+            seen_states.append(state)
+            return {"messages": [AIMessage(content="reply")], "_messages": [AIMessage(content="reply")]}
+
+        async def fake_generate(state, config, *, store):
+            await asyncio.sleep(10)
+
+        nodes = {"replyToGeneralInput": fake_reply, "generateArtifact": fake_generate}
+        state = {
+            "_messages": [HumanMessage(content="the sea at night")],
+            "messages": [HumanMessage(content="the sea at night")],
+            "artifact": None,
+        }
+
+        with patch.object(generate_path_module, "get_model_from_config", return_value=mock_llm), \
+                patch.object(generate_path_module, "get_routing_classifier", return_value=None), \
+                patch.object(generate_path_module, "create_context_document_messages", return_value=[]), \
+                patch.dict(generate_path_module._SPECULATIVE_NODES, nodes):
+            result = await generate_path_module.generate_path(state, mock_config, store=mock_store)
+
+        assert result["next"] == "cleanState"
+        assert result["messages"][-1].content == "reply"
+        assert seen_states[0]["_messages"][-1].content == "the sea at night"
+
+    @pytest.mark.asyncio
+    @patch.dict(os.environ, {"ROUTER_SPECULATIVE": "true"})
+    async def test_out_of_band_skips_speculation(self, mock_store, mock_config, mock_llm_with_tool_response):
+        """Low pre-router confidence routes normally without speculation."""
+        from src.open_canvas.nodes.generate_path import generate_path
+        from src.open_canvas.routing.speculative import get_speculation_stats
+
+        mock_llm = mock_llm_with_tool_response("generateArtifact")
+        state = {"_messages": [HumanMessage(content="the sea at night")], "artifact": None}
+
+        with patch.dict(os.environ, {"ROUTER_SPECULATIVE_MIN_CONFIDENCE": "0.6"}), \
+                patch("src.open_canvas.nodes.generate_path.get_model_from_config", return_value=mock_llm), \
+                patch("src.open_canvas.nodes.generate_path.get_routing_classifier", return_value=None), \
+                patch("src.open_canvas.nodes.generate_path.create_context_document_messages", return_value=[]):
+            result = await generate_path(state, mock_config, store=mock_store)
+
+        assert result == {"next": "generateArtifact"}
+        assert get_speculation_stats()["skipped"] == 1
@@ -0,0 +1,92 @@
+"""
+Unit tests for single-pass URL extraction in src/open_canvas/urls/extract.py
+
+Tests cover:
+- First-appearance ordering and deduplication
+- Markdown links taking precedence over plain URLs they overlap
+- Equivalence with the previous sub-then-scan implementation on randomized input
+- Linear behaviour on pathological near-URL text
+"""
+
+import random
+import re
+import time
+
+import pytest
+
+
+def _legacy_extract_urls(text: str) -> set[str]:
+    """Previous implementation: blank markdown links, then scan the copy."""
+    markdown = re.compile(r'\[([^\]]+)\]\((https?://[^\s)]+)\)')
+    plain = re.compile(r'https?://[^\s<\]"\'{}|\\^`]+(?:[^<.,:;"\')\]\s]|(?=\s|$))', re.IGNORECASE)
+    urls = set()
+
+    def replace_markdown(match):
+        urls.add(match.group(2))
+        return " " * len(match.group(0))
+
+    for url in plain.findall(markdown.sub(replace_markdown, text)):
+        urls.add(url.rstrip(".,;:!?'\")"))
+    return urls
+
+
+@pytest.mark.unit
+class TestExtractUrls:
+    """Tests for extract_urls."""
+
+    def test_order_stable_and_deduplicated(self):
+        """URLs are returned once, in order of first appearance."""
+        from src.open_canvas.urls.extract import extract_urls
+
+        text = "b https://b.com, then [a](https://a.com) and https://b.com again, https://c.com."
+
+        assert extract_urls(text) == ["https://b.com", "https://a.com", "https://c.com"]
+
+    def test_markdown_link_text_not_scanned(self):
+        """A URL used as markdown link text is not extracted on its own."""
+        from src.open_canvas.urls.extract import extract_urls
+
+        assert extract_urls("[https://shown.com](https://target.com)") == ["https://target.com"]
+
+    def test_plain_url_cut_at_markdown_link(self):
+        """A plain URL running into a markdown link stops where the link starts."""
+        from src.open_canvas.urls.extract import extract_urls
+
+        assert extract_urls("https://a.io/[x](https://b.io)") == ["https://a.io/", "https://b.io"]
+
+    def test_generate_path_reexport(self):
+        """generate_path keeps exposing the same extract_urls."""
+        from src.open_canvas.nodes.generate_path import extract_urls as from_node
+        from src.open_canvas.urls.extract import extract_urls
+
+        assert from_node is extract_urls
+
+    def test_matches_legacy_implementation(self):
+        """Randomized inputs built from URL-ish fragments yield the same URL set as before."""
+        from src.open_canvas.urls.extract import extract_urls
+
+        fragments = [
+            "http://", "https://", "HTTP://", "[", "]", "(", ")", "](", "a", "b.c", "/", ".", ",",
+            " ", "\n", "<", "'", '"', "`", "?", ":", "[t](https://m.io)",
+        ]
+        rng = random.Random(1234)
+        for _ in range(20_000):
+            text = "".join(rng.choice(fragments) for _ in range(rng.randint(0, 25)))
+            urls = extract_urls(text)
+            assert set(urls) == _legacy_extract_urls(text), text
+            assert len(urls) == len(set(urls))
+
+    @pytest.mark.parametrize(
+        "unit",
+        ["[", "[a](b ", "http:/ htt://x ", "https://x" + "." * 50],
+        ids=["unclosed-bracket", "broken-markdown", "near-miss-scheme", "dots"],
+    )
+    def test_pathological_input_is_fast(self, unit):
+        """Near-URL text that made the old scan quadratic stays linear."""
+        from src.open_canvas.urls.extract import extract_urls
+
+        text = unit * (200_000 // len(unit))
+        started = time.perf_counter()
+        extract_urls(text)
+
+        assert time.perf_counter() - started < 1.0
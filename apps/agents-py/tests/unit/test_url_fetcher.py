@@ -0,0 +1,253 @@
+"""
+Unit tests for the async URL fetcher in src/open_canvas/urls/fetcher.py
+
+Tests cover:
+- URL normalization for cache keys
+- Bounded parallel fetching, per-URL timeouts and the total deadline
+- Size caps and the TTL/LRU content cache
+- The HTTP and FireCrawl backends and include_url_contents wiring
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+
+class SlowBackend:
+    """Backend that sleeps per URL and records peak concurrency."""
+
+    name = "slow"
+
+    def __init__(self, delays: dict[str, float] | None = None, content: str = "page") -> None:
+        self.delays = delays or {}
+        self.content = content
+        self.calls: list[str] = []
+        self.active = 0
+        self.peak = 0
+
+    async def fetch(self, url: str, timeout: float) -> str:
+        self.calls.append(url)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            return await asyncio.wait_for(self._page(url), timeout)
+        finally:
+            self.active -= 1
+
+    async def _page(self, url: str) -> str:
+        await asyncio.sleep(self.delays.get(url, 0.05))
+        return f"{self.content} {url}"
+
+
+def _fetcher(backend, **settings):
+    from src.open_canvas.urls.fetcher import UrlFetcher, UrlFetchSettings
+
+    return UrlFetcher(backend, UrlFetchSettings(**settings))
+
+
+@pytest.mark.unit
+class TestNormalizeUrl:
+    """Tests for normalize_url."""
+
+    def test_equivalent_urls_share_a_key(self):
+        """Case, default ports, fragments, trailing slashes and tracking params are ignored."""
+        from src.open_canvas.urls.fetcher import normalize_url
+
+        assert normalize_url("HTTPS://Example.com:443/docs/?b=2&a=1&utm_source=x#intro") == \
+            normalize_url("https://example.com/docs?a=1&b=2")
+        assert normalize_url("http://example.com:8080") == "http://example.com:8080/"
+
+
+@pytest.mark.unit
+class TestUrlFetcher:
+    """Tests for UrlFetcher."""
+
+    @pytest.mark.asyncio
+    async def test_parallel_and_bounded(self):
+        """URLs are fetched concurrently up to the concurrency limit, in input order."""
+        backend = SlowBackend()
+        fetcher = _fetcher(backend, max_concurrency=2)
+        urls = [f"https://example.com/{i}" for i in range(4)]
+
+        started = time.perf_counter()
+        results = await fetcher.fetch_many(urls)
+        elapsed = time.perf_counter() - started
+
+        assert [r["url"] for r in results] == urls
+        assert backend.peak == 2
+        assert elapsed < 0.18
+
+    @pytest.mark.asyncio
+    async def test_timeout_and_deadline(self):
+        """Slow URLs yield empty content without delaying the others past the deadline."""
+        backend = SlowBackend({"https://slow.com": 1.0, "https://stuck.com": 1.0})
+        timeout_fetcher = _fetcher(backend, timeout_seconds=0.2)
+        deadline_fetcher = _fetcher(backend, timeout_seconds=5, deadline_seconds=0.2)
+
+        timed_out = await timeout_fetcher.fetch_many(["https://slow.com", "https://fast.com"])
+        started = time.perf_counter()
+        past_deadline = await deadline_fetcher.fetch_many(["https://stuck.com", "https://fast.com"])
+
+        assert timed_out[0]["pageContent"] == ""
+        assert timed_out[1]["pageContent"] == "page https://fast.com"
+        assert past_deadline[0]["pageContent"] == ""
+        assert past_deadline[1]["pageContent"] == "page https://fast.com"
+        assert time.perf_counter() - started < 0.4
+        assert timeout_fetcher.stats()["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_and_dedup(self):
+        """Equivalent URLs are fetched once and served from the cache afterwards."""
+        backend = SlowBackend()
+        fetcher = _fetcher(backend)
+
+        await fetcher.fetch_many(["https://example.com/a", "https://EXAMPLE.com/a/"])
+        results = await fetcher.fetch_many(["https://example.com/a#top"])
+
+        assert len(backend.calls) == 1
+        assert results[0]["pageContent"] == "page https://example.com/a"
+        assert fetcher.stats()["cache"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_size_cap(self):
+        """Long pages are truncated to max_chars."""
+        fetcher = _fetcher(SlowBackend(content="x" * 1000), max_chars=100)
+
+        content = (await fetcher.fetch_many(["https://example.com"]))[0]["pageContent"]
+
+        assert content.startswith("x" * 100)
+        assert content.endswith("[content truncated]")
+        assert fetcher.stats()["truncated"] == 1
+
+    def test_cache_lru_and_ttl(self):
+        """The cache evicts least recently used entries and expires old ones."""
+        from src.open_canvas.urls.fetcher import UrlContentCache
+
+        cache = UrlContentCache(max_size=2, ttl_seconds=60)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+
+        with patch("src.open_canvas.urls.fetcher.time.monotonic", return_value=time.monotonic() + 120):
+            assert cache.get("a") is None
+
+
+@pytest.mark.unit
+class TestHttpBackend:
+    """Tests for the HTTP backend."""
+
+    @pytest.mark.asyncio
+    async def test_html_is_reduced_to_text(self):
+        """HTML responses are stripped of tags, scripts and styles."""
+        import httpx
+
+        from src.open_canvas.urls.fetcher import HttpBackend
+
+        html = "<html><head><style>p{}</style><script>x()</script></head><body><p>Hello</p> world</body></html>"
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(200, text=html, headers={"content-type": "text/html"})
+        )
+
+        text = await HttpBackend(transport=transport).fetch("https://example.com", timeout=1)
+
+        assert text == "Hello world"
+
+
+@pytest.mark.unit
+class TestFirecrawlBackend:
+    """Tests for the FireCrawl backend."""
+
+    @pytest.mark.asyncio
+    async def test_scrape_request(self):
+        """The scrape call carries the key, the URL and the per-request timeout."""
+        import json
+
+        import httpx
+
+        from src.open_canvas.urls.fetcher import FirecrawlBackend
+
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"success": True, "data": {"markdown": "# Page"}})
+
+        backend = FirecrawlBackend(api_key="fc-key", api_url="https://fc.local/", transport=httpx.MockTransport(handler))
+        text = await backend.fetch("https://example.com", timeout=2.5)
+
+        assert text == "# Page"
+        assert str(requests[0].url) == "https://fc.local/v1/scrape"
+        assert requests[0].headers["authorization"] == "Bearer fc-key"
+        assert json.loads(requests[0].content) == {
+            "url": "https://example.com", "formats": ["markdown"], "timeout": 2500,
+        }
+
+    @pytest.mark.asyncio
+    async def test_timeout_cancels_request(self):
+        """A request that outlives its timeout is cancelled rather than left running."""
+        import httpx
+
+        from src.open_canvas.urls.fetcher import FirecrawlBackend
+
+        cancelled = asyncio.Event()
+
+        async def handler(request):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return httpx.Response(200, json={})
+
+        backend = FirecrawlBackend(api_key="", api_url="https://fc.local", transport=httpx.MockTransport(handler))
+
+        with pytest.raises(asyncio.TimeoutError):
+            await backend.fetch("https://example.com", timeout=0.05)
+        assert cancelled.is_set()
+
+    @pytest.mark.asyncio
+    async def test_failed_scrape_raises(self):
+        """An unsuccessful scrape is reported as a fetch failure."""
+        import httpx
+
+        from src.open_canvas.urls.fetcher import FirecrawlBackend
+
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"success": False, "error": "blocked"}))
+
+        with pytest.raises(RuntimeError, match="blocked"):
+            await FirecrawlBackend(api_key="", api_url="https://fc.local", transport=transport).fetch("https://x.com", 1)
+
+
+@pytest.mark.unit
+class TestIncludeUrlContents:
+    """Tests for include_url_contents using the fetcher."""
+
+    @pytest.mark.asyncio
+    async def test_urls_replaced_with_fetched_contents(self, mock_config):
+        """Fetched page contents replace the URLs in the message."""
+        from unittest.mock import AsyncMock, MagicMock
+
+        from langchain_core.messages import AIMessage, HumanMessage
+
+        from src.open_canvas.nodes.generate_path import include_url_contents
+
+        response = AIMessage(content="", tool_calls=[{
+            "name": "ShouldIncludeUrlContents", "args": {"shouldIncludeUrlContents": True}, "id": "1",
+        }])
+        model = MagicMock()
+        model.ainvoke = AsyncMock(return_value=response)
+        model.bind_tools = MagicMock(return_value=model)
+        fetcher = _fetcher(SlowBackend())
+        message = HumanMessage(id="m1", content="Summarize https://a.com and https://b.com")
+
+        with patch("src.open_canvas.nodes.generate_path.get_model_from_config", return_value=model), \
+                patch("src.open_canvas.nodes.generate_path.get_url_fetcher", return_value=fetcher):
+            updated = await include_url_contents(message, ["https://a.com", "https://b.com"], mock_config)
+
+        assert '<page-contents url="https://a.com">' in updated.content
+        assert "page https://b.com" in updated.content
@@ -0,0 +1,107 @@
+"""
+Unit tests for local URL-intent detection in src/open_canvas/urls/intent.py
+
+Tests cover:
+- Accuracy and coverage on the labelled corpus
+- Code spans, markdown links and link-insertion wording
+- include_url_contents using rules, LLM fallback and LLM mode
+"""
+
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+
+def _intent_llm(include: bool) -> MagicMock:
+    response = AIMessage(content="", tool_calls=[{
+        "name": "ShouldIncludeUrlContents", "args": {"shouldIncludeUrlContents": include}, "id": "1",
+    }])
+    model = MagicMock()
+    model.ainvoke = AsyncMock(return_value=response)
+    model.bind_tools = MagicMock(return_value=model)
+    return model
+
+
+@pytest.mark.unit
+class TestDetectUrlIntent:
+    """Tests for detect_url_intent."""
+
+    def test_corpus_accuracy_and_coverage(self):
+        """Confident decisions should be correct and cover most of the corpus."""
+        from src.open_canvas.urls.intent import (
+            detect_url_intent,
+            get_url_intent_threshold,
+            load_url_intent_examples,
+        )
+
+        examples = load_url_intent_examples()
+        decisions = [(detect_url_intent(message), label) for message, label in examples]
+        confident = [(d, label) for d, label in decisions if d.confidence >= get_url_intent_threshold()]
+
+        assert len(examples) >= 40
+        assert len(confident) / len(examples) >= 0.85
+        assert all(d.include == label for d, label in confident)
+
+    @pytest.mark.parametrize(
+        "message, include",
+        [
+            ("Summarize https://example.com/post", True),
+            ("https://example.com/post", True),
+            ("Add [docs](https://docs.example.com) to the intro", False),
+            ("Set `URL = 'https://api.example.com'` in the config", False),
+            ("Add a link to https://example.com in the footer", False),
+        ],
+    )
+    def test_rules(self, message, include):
+        """Typical phrasings should be decided confidently."""
+        from src.open_canvas.urls.intent import detect_url_intent, get_url_intent_threshold
+
+        decision = detect_url_intent(message)
+
+        assert decision.include is include
+        assert decision.confidence >= get_url_intent_threshold()
+
+
+@pytest.mark.unit
+class TestShouldIncludeUrlContents:
+    """Tests for URL-intent wiring in generate_path."""
+
+    @pytest.mark.asyncio
+    async def test_confident_rules_skip_llm(self, mock_config):
+        """A confident local decision should not call the model."""
+        from src.open_canvas.nodes.generate_path import _should_include_url_contents
+
+        model = _intent_llm(False)
+        with patch("src.open_canvas.nodes.generate_path.get_model_from_config", return_value=model):
+            assert await _should_include_url_contents("Summarize https://example.com", mock_config) is True
+
+        model.ainvoke.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_uncertain_rules_fall_back_to_llm(self, mock_config):
+        """Low-confidence messages should be decided by the fast model."""
+        from src.open_canvas.nodes.generate_path import _should_include_url_contents
+
+        model = _intent_llm(True)
+        message = "I'm a developer at Acme (https://acme.example.com) and I love hiking"
+        with patch("src.open_canvas.nodes.generate_path.get_model_from_config", return_value=model):
+            assert await _should_include_url_contents(message, mock_config) is True
+            with patch.dict(os.environ, {"URL_INTENT_LLM_FALLBACK": "false"}):
+                assert await _should_include_url_contents(message, mock_config) is False
+
+        model.ainvoke.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_llm_mode(self, mock_config):
+        """URL_INTENT_DETECTOR=llm keeps the previous behaviour."""
+        from src.open_canvas.nodes.generate_path import include_url_contents
+
+        model = _intent_llm(False)
+        message = HumanMessage(id="m1", content="Summarize https://example.com")
+        with patch.dict(os.environ, {"URL_INTENT_DETECTOR": "llm"}), \
+                patch("src.open_canvas.nodes.generate_path.get_model_from_config", return_value=model):
+            assert await include_url_contents(message, ["https://example.com"], mock_config) is None
+
+        model.ainvoke.assert_called_once()
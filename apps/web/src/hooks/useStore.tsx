@@ -7,6 +7,7 @@ import { useState } from "react";
 import { useToast } from "./use-toast";
 import { Item } from "@langchain/langgraph-sdk";
 import { CONTEXT_DOCUMENTS_NAMESPACE } from "@opencanvas/shared/constants";
+import { createClient } from "./utils";
 
 export function useStore() {
   const { toast } = useToast();
@@ -254,6 +255,35 @@ export function useStore() {
       }
     } catch (e) {
       console.error("Failed to put context documents.\n", e);
+      return;
+    }
+
+    await ingestContextDocuments(assistantId);
+  };
+
+  /**
+   * Starts a background run of the document_ingest graph, which pre-extracts
+   * the text of the saved context documents so the first message after an
+   * upload does not have to parse them.
+   */
+  const ingestContextDocuments = async (
+    assistantId: string
+  ): Promise<void> => {
+    try {
+      const client = createClient();
+      const thread = await client.threads.create();
+      await client.runs.create(thread.thread_id, "document_ingest", {
+        input: {},
+        config: {
+          configurable: {
+            open_canvas_assistant_id: assistantId,
+          },
+        },
+      });
+    } catch (e) {
+      // Ingestion is an optimization: requests fall back to parsing the
+      // documents on demand.
+      console.error("Failed to start context document ingestion.\n", e);
     }
   };
 